@@ -194,6 +194,33 @@ except ImportError:
     HAS_TRACKING_SERVICE = False
     def track_page(page_name): pass
 
+# Query profiler (per-rerun database query budget)
+try:
+    from services.database.profiler import get_query_profiler
+    HAS_QUERY_PROFILER = True
+except ImportError:
+    HAS_QUERY_PROFILER = False
+
+# Embedding model warmup (loads sentence-transformers off the request path)
+try:
+    from services.ai.warmup import start_embedding_warmup
+    HAS_WARMUP = True
+except ImportError:
+    HAS_WARMUP = False
+    def start_embedding_warmup(model_name=None): pass
+
+
+def start_background_warmup():
+    """Start loading the embedding model once per process."""
+    if not HAS_WARMUP:
+        return
+    try:
+        from core.config import get_settings
+        if get_settings().ai.embedding_warmup:
+            start_embedding_warmup()
+    except Exception:
+        pass
+
 
 # =============================================================================
 # SESSION STATE INITIALIZATION
@@ -570,9 +597,22 @@ def render_page():
 
 def main():
     """Main application entry point."""
+    # Attribute this rerun's database queries to the page for the budget report
+    if HAS_QUERY_PROFILER:
+        with get_query_profiler().rerun(st.session_state.get("current_page", "home")):
+            run_app()
+    else:
+        run_app()
+
+
+def run_app():
+    """Render one rerun of the app."""
     # Initialize session state
     init_session_state()
     
+    # Warm up the embedding model in the background (idempotent)
+    start_background_warmup()
+    
     # Initialize PWA support
     if HAS_PWA:
         init_pwa()
@@ -35,6 +35,25 @@ class DatabaseConfig:
     pool_timeout: int = 30
     echo: bool = False
     
+    # Query profiler (services.database.profiler)
+    profile_queries: bool = True
+    slow_query_ms: float = 200.0
+    slow_query_top_n: int = 20
+    explain_threshold_ms: float = 0.0  # 0 = never capture EXPLAIN plans
+    rerun_query_budget: int = 10  # Queries per Streamlit rerun before warning
+    
+    # Repository query cache (services.database.cache)
+    query_cache_enabled: bool = True
+    query_cache_max_entries: int = 1000
+    query_cache_ttl_seconds: int = 300
+    query_cache_watermark_seconds: int = 10  # Min interval between change checks per table
+    
+    # Concurrent reads (services.database.async_connection)
+    async_queries_enabled: bool = True
+    async_pool_size: int = 6  # Queries of one batch that run at the same time
+    async_query_timeout: float = 30.0  # Seconds to wait for a whole batch
+    async_retry_seconds: float = 30.0  # Backoff after the async pool failed to open
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "DatabaseConfig":
         return cls(
@@ -42,7 +61,20 @@ class DatabaseConfig:
             pool_size=data.get("pool_size", 5),
             max_overflow=data.get("max_overflow", 10),
             pool_timeout=data.get("pool_timeout", 30),
-            echo=data.get("echo", False)
+            echo=data.get("echo", False),
+            profile_queries=data.get("profile_queries", True),
+            slow_query_ms=data.get("slow_query_ms", 200.0),
+            slow_query_top_n=data.get("slow_query_top_n", 20),
+            explain_threshold_ms=data.get("explain_threshold_ms", 0.0),
+            rerun_query_budget=data.get("rerun_query_budget", 10),
+            query_cache_enabled=data.get("query_cache_enabled", True),
+            query_cache_max_entries=data.get("query_cache_max_entries", 1000),
+            query_cache_ttl_seconds=data.get("query_cache_ttl_seconds", 300),
+            query_cache_watermark_seconds=data.get("query_cache_watermark_seconds", 10),
+            async_queries_enabled=data.get("async_queries_enabled", True),
+            async_pool_size=data.get("async_pool_size", 6),
+            async_query_timeout=data.get("async_query_timeout", 30.0),
+            async_retry_seconds=data.get("async_retry_seconds", 30.0)
         )
 
 
@@ -61,9 +93,44 @@ class AIConfig:
     
     # RAG Configuration
     embedding_model: str = "all-MiniLM-L6-v2"
-    chunk_size: int = 500
-    chunk_overlap: int = 50
+    embedding_cache_dir: str = ".cache/embeddings"
+    embedding_cache_max_entries: int = 200000  # Vectors stored per model before the cache stops growing
+    embedding_worker_processes: int = 0  # 0 = encode in the calling thread
+    embedding_max_batch: int = 32
+    embedding_max_wait_ms: float = 5.0
+    embedding_queue_size: int = 1024
+    embedding_warmup: bool = True  # Load the model in a background thread at startup
+    knowledge_snapshot_path: str = ".cache/knowledge_snapshot.bin"
+    vector_store_backend: str = "chroma"
+    vector_store_dir: str = ".cache/vector_store"
+    vector_store_quantization: str = "none"  # none | int8 (numpy backend)
+    vector_rerank_factor: int = 4
+    hybrid_retrieval: bool = False
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl_seconds: int = 3600
+    semantic_cache_max_bytes: int = 16777216  # 16MB
+    chunk_size: int = 200  # tokens
+    chunk_overlap: int = 30  # tokens
+    context_token_budget: int = 1500
     top_k_results: int = 5
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+    rerank_candidates: int = 20
+    rerank_budget_ms: float = 150.0
+    intent_router_enabled: bool = True  # Answer clear FAQ intents without the LLM
+    intent_keyword_threshold: float = 0.65
+    intent_semantic_threshold: float = 0.8
+    history_compaction_enabled: bool = True  # Summarize older chat turns into a rolling memory
+    history_max_tokens: int = 400
+    history_recent_tokens: int = 150
+    history_summary_tokens: int = 120
+    
+    # Provider hedging (UnifiedChatService)
+    hedge_requests: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay_ms: float = 500.0
+    hedge_max_delay_ms: float = 10000.0
     
     # Rate Limiting
     requests_per_minute: int = 30
@@ -79,9 +146,45 @@ class AIConfig:
             openai_api_key=os.getenv("OPENAI_API_KEY", data.get("openai_api_key", "")),
             openai_model=data.get("openai_model", "gpt-4o-mini"),
             embedding_model=data.get("embedding_model", "all-MiniLM-L6-v2"),
-            chunk_size=data.get("chunk_size", 500),
-            chunk_overlap=data.get("chunk_overlap", 50),
+            embedding_cache_dir=data.get("embedding_cache_dir", ".cache/embeddings"),
+            embedding_cache_max_entries=data.get("embedding_cache_max_entries", 200000),
+            embedding_worker_processes=data.get("embedding_worker_processes", 0),
+            embedding_max_batch=data.get("embedding_max_batch", 32),
+            embedding_max_wait_ms=data.get("embedding_max_wait_ms", 5.0),
+            embedding_queue_size=data.get("embedding_queue_size", 1024),
+            embedding_warmup=data.get("embedding_warmup", True),
+            knowledge_snapshot_path=os.getenv(
+                "LABBAIK_KNOWLEDGE_SNAPSHOT",
+                data.get("knowledge_snapshot_path", ".cache/knowledge_snapshot.bin"),
+            ),
+            vector_store_backend=data.get("vector_store_backend", "chroma"),
+            vector_store_dir=data.get("vector_store_dir", ".cache/vector_store"),
+            vector_store_quantization=data.get("vector_store_quantization", "none"),
+            vector_rerank_factor=data.get("vector_rerank_factor", 4),
+            hybrid_retrieval=data.get("hybrid_retrieval", False),
+            semantic_cache_enabled=data.get("semantic_cache_enabled", True),
+            semantic_cache_threshold=data.get("semantic_cache_threshold", 0.92),
+            semantic_cache_ttl_seconds=data.get("semantic_cache_ttl_seconds", 3600),
+            semantic_cache_max_bytes=data.get("semantic_cache_max_bytes", 16777216),
+            chunk_size=data.get("chunk_size", 200),
+            chunk_overlap=data.get("chunk_overlap", 30),
+            context_token_budget=data.get("context_token_budget", 1500),
             top_k_results=data.get("top_k_results", 5),
+            rerank_enabled=data.get("rerank_enabled", False),
+            rerank_model=data.get("rerank_model", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"),
+            rerank_candidates=data.get("rerank_candidates", 20),
+            rerank_budget_ms=data.get("rerank_budget_ms", 150.0),
+            intent_router_enabled=data.get("intent_router_enabled", True),
+            intent_keyword_threshold=data.get("intent_keyword_threshold", 0.65),
+            intent_semantic_threshold=data.get("intent_semantic_threshold", 0.8),
+            history_compaction_enabled=data.get("history_compaction_enabled", True),
+            history_max_tokens=data.get("history_max_tokens", 400),
+            history_recent_tokens=data.get("history_recent_tokens", 150),
+            history_summary_tokens=data.get("history_summary_tokens", 120),
+            hedge_requests=data.get("hedge_requests", False),
+            hedge_percentile=data.get("hedge_percentile", 95.0),
+            hedge_min_delay_ms=data.get("hedge_min_delay_ms", 500.0),
+            hedge_max_delay_ms=data.get("hedge_max_delay_ms", 10000.0),
             requests_per_minute=data.get("requests_per_minute", 30),
             tokens_per_minute=data.get("tokens_per_minute", 100000)
         )
@@ -429,13 +429,25 @@ class PerformanceLogger:
             tags={"endpoint": endpoint, "status": str(status_code)}
         )
     
-    def log_ai_latency(self, provider: str, model: str, duration_ms: float, tokens: int):
-        """Log AI service latency."""
+    def log_ai_latency(
+        self,
+        provider: str,
+        model: str,
+        duration_ms: float,
+        tokens: int,
+        stage: str = "total"
+    ):
+        """
+        Log AI service latency.
+        
+        ``stage`` is "total" for full completions and "ttft" for the
+        time-to-first-token of streamed answers.
+        """
         self.log_metric(
             metric_name="ai_latency",
             value=duration_ms,
             unit="ms",
-            tags={"provider": provider, "model": model, "tokens": str(tokens)}
+            tags={"provider": provider, "model": model, "tokens": str(tokens), "stage": stage}
         )
 
 
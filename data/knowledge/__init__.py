@@ -51,6 +51,28 @@ from .faq import (
     FAQ_TEXT,
 )
 
+# Inverted index over all of the above, loaded on first search
+from .search_index import (
+    SearchHit,
+    InvertedIndex,
+    build_knowledge_index,
+    get_knowledge_index,
+    search_all,
+)
+
+from .snapshot import (
+    KnowledgeSnapshot,
+    build_snapshot,
+    load_or_build_snapshot,
+)
+
+from .transliteration import (
+    TransliterationIndex,
+    FuzzyHit,
+    normalize_transliteration,
+    fuzzy_search_phrases,
+)
+
 
 # =============================================================================
 # COMBINED KNOWLEDGE BASE
@@ -86,6 +108,56 @@ def get_full_knowledge_base() -> str:
     return "\n".join(sections)
 
 
+def get_knowledge_sources() -> list:
+    """
+    Get the knowledge base as independent source units.
+    
+    Each guide, FAQ and phrase is its own unit so indexing can detect and
+    re-embed only the units that changed.
+    
+    Returns:
+        List of dicts with ``source_id``, ``kind``, ``category`` and ``text``
+    """
+    sources = []
+    
+    for topic, content in get_all_guides().items():
+        sources.append({
+            "source_id": f"guide:{topic}",
+            "kind": "guide",
+            "category": topic,
+            "text": content.strip(),
+        })
+    
+    sources.append({
+        "source_id": "guide:preparation",
+        "kind": "guide",
+        "category": "preparation",
+        "text": UMRAH_PREPARATION.strip(),
+    })
+    
+    for faq in get_all_faqs():
+        sources.append({
+            "source_id": f"faq:{faq.id}",
+            "kind": "faq",
+            "category": faq.category,
+            "text": f"**Q: {faq.question}**\n\n{faq.answer}",
+        })
+    
+    for phrase in get_all_phrases():
+        sources.append({
+            "source_id": f"phrase:{phrase.id}",
+            "kind": "phrase",
+            "category": phrase.category,
+            "text": (
+                f"**{phrase.transliteration}** ({phrase.arabic})\n"
+                f"Arti: {phrase.meaning_id}\n"
+                f"Konteks: {phrase.context}"
+            ),
+        })
+    
+    return sources
+
+
 def get_knowledge_stats() -> dict:
     """
     Get statistics about the knowledge base.
@@ -122,6 +194,9 @@ def search_knowledge_base(query: str, limit: int = 10) -> dict:
     """
     Search across all knowledge base content.
     
+    All sources are ranked by the shared inverted index, so ``score`` is
+    comparable between guides, phrases and FAQs.
+    
     Args:
         query: Search query
         limit: Maximum results per category
@@ -135,23 +210,20 @@ def search_knowledge_base(query: str, limit: int = 10) -> dict:
         "faqs": [],
     }
     
-    # Search guides
-    guide_results = search_guides(query)
-    for topic, content in guide_results[:limit]:
-        results["guides"].append({
-            "topic": topic,
-            "preview": content[:200] + "..." if len(content) > 200 else content
-        })
-    
-    # Search phrases
-    phrase_results = search_phrases(query)
-    for phrase in phrase_results[:limit]:
-        results["phrases"].append(phrase.to_dict())
-    
-    # Search FAQs
-    faq_results = search_faqs(query)
-    for faq in faq_results[:limit]:
-        results["faqs"].append(faq.to_dict())
+    for hit in get_knowledge_index().search(query):
+        if hit.kind == "guide":
+            if len(results["guides"]) < limit:
+                topic, content = hit.item
+                results["guides"].append({
+                    "topic": topic,
+                    "preview": content[:200] + "..." if len(content) > 200 else content,
+                    "score": hit.score,
+                })
+        elif hit.kind == "phrase":
+            if len(results["phrases"]) < limit:
+                results["phrases"].append({**hit.item.to_dict(), "score": hit.score})
+        elif len(results["faqs"]) < limit:
+            results["faqs"].append({**hit.item.to_dict(), "score": hit.score})
     
     return results
 
@@ -240,9 +312,26 @@ __all__ = [
     "search_faqs",
     "get_faq_count",
     "FAQ_TEXT",
+    # Search index
+    "SearchHit",
+    "InvertedIndex",
+    "build_knowledge_index",
+    "get_knowledge_index",
+    "search_all",
+    # Transliteration search
+    "TransliterationIndex",
+    "FuzzyHit",
+    "normalize_transliteration",
+    "fuzzy_search_phrases",
     # Combined functions
     "get_full_knowledge_base",
+    "get_knowledge_sources",
     "get_knowledge_stats",
     "search_knowledge_base",
     "KNOWLEDGE_CATEGORIES",
+    # Snapshot
+    "KnowledgeSnapshot",
+    "build_snapshot",
+    "load_or_build_snapshot",
 ]
+
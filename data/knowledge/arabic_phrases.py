@@ -464,19 +464,21 @@ def get_phrase_categories() -> List[str]:
 
 
 def search_phrases(query: str) -> List[ArabicPhrase]:
-    """Search phrases by keyword."""
-    query = query.lower()
-    all_phrases = get_all_phrases()
+    """
+    Search phrases by Arabic text, transliteration or meaning.
     
-    results = []
-    for phrase in all_phrases:
-        if (query in phrase.arabic or
-            query in phrase.transliteration.lower() or
-            query in phrase.meaning_id.lower() or
-            query in phrase.meaning_en.lower()):
-            results.append(phrase)
+    Keyword matches are returned when there are any; only otherwise are
+    fuzzy transliteration matches ("labaik", "syukron") used, so typo
+    tolerance never pads a good keyword result with look-alike words.
+    """
+    # Avoid circular imports
+    from .search_index import get_knowledge_index
+    from .transliteration import fuzzy_search_phrases
     
-    return results
+    results = [hit.item for hit in get_knowledge_index().search(query, kinds=("phrase",))]
+    if results:
+        return results
+    return fuzzy_search_phrases(query, limit=None)
 
 
 def get_phrase_count() -> int:
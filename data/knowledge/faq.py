@@ -575,33 +575,10 @@ def get_faq_categories() -> List[str]:
 
 
 def search_faqs(query: str) -> List[FAQ]:
-    """Search FAQs by keyword."""
-    query = query.lower()
-    all_faqs = get_all_faqs()
-    
-    results = []
-    for faq in all_faqs:
-        score = 0
-        
-        # Check keywords
-        for kw in faq.keywords:
-            if kw in query or query in kw:
-                score += 2
-        
-        # Check question
-        if query in faq.question.lower():
-            score += 3
-        
-        # Check answer
-        if query in faq.answer.lower():
-            score += 1
-        
-        if score > 0:
-            results.append((faq, score))
+    """Search FAQs by keyword, best match first."""
+    from .search_index import get_knowledge_index  # Avoid circular import
     
-    # Sort by score
-    results.sort(key=lambda x: x[1], reverse=True)
-    return [f for f, _ in results]
+    return [hit.item for hit in get_knowledge_index().search(query, kinds=("faq",))]
 
 
 def get_faq_count() -> int:
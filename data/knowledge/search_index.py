@@ -0,0 +1,431 @@
+"""
+LABBAIK AI v6.0 - Knowledge Search Index
+========================================
+In-memory inverted index over guides, FAQs and Arabic phrases.
+
+Every item is tokenized, lowercased and stemmed once; postings store a
+precomputed BM25F impact (field-weighted term frequency, length
+normalisation and IDF over the whole knowledge base), so a query is a
+handful of dictionary lookups and all three sources are ranked on the
+same scale.
+"""
+
+import re
+import math
+import bisect
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .faq import FAQ, get_all_faqs
+from .arabic_phrases import ArabicPhrase, get_all_phrases
+from .umrah_guide import get_all_guides
+from .snapshot import load_knowledge_index
+
+
+# =============================================================================
+# TEXT NORMALIZATION
+# =============================================================================
+
+STOPWORDS = frozenset([
+    "yang", "dan", "di", "ke", "dari", "untuk", "dengan", "pada", "dalam",
+    "ini", "itu", "atau", "adalah", "akan", "juga", "saja", "apa", "apakah",
+    "bagaimana", "berapa", "kapan", "mengapa", "kenapa", "saat", "oleh",
+    "bisa", "harus", "ada", "tidak", "sudah", "belum", "the", "a", "of",
+])
+
+_APOSTROPHES = re.compile(r"['‘’ʼ`]")
+_ARABIC_MARKS = re.compile("[\u064B-\u065F\u0670\u0640]")  # Harakat and tatweel
+_TOKEN = re.compile(r"[0-9a-zÀ-ɏ؀-ۿ]+")
+
+_PARTICLES = ("lah", "kah", "tah", "pun")
+_POSSESSIVES = ("nya", "ku", "mu")
+_SUFFIXES = ("kan", "an")
+_VOWELS = "aiueo"
+_MIN_STEM = 3
+
+
+def _strip_prefix(word: str) -> str:
+    """Remove one Indonesian prefix, restoring the dropped initial consonant."""
+    for prefix in ("di", "ke", "se"):
+        if word.startswith(prefix) and len(word) - len(prefix) >= 4:
+            return word[len(prefix):]
+
+    for prefix in ("ber", "ter", "per"):
+        if word.startswith(prefix) and len(word) - len(prefix) >= 4:
+            return word[len(prefix):]
+
+    # me-/pe- with nasal assimilation: menyapa -> sapa, memakai -> pakai,
+    # menunggu -> tunggu, mengunjungi -> kunjungi
+    for head in ("me", "pe"):
+        if not word.startswith(head):
+            continue
+        rest = word[2:]
+        if rest.startswith("ny") and len(rest) >= 5:
+            return "s" + rest[2:]
+        if rest.startswith("ng") and len(rest) >= 5:
+            return ("k" + rest[2:]) if rest[2] in _VOWELS else rest[2:]
+        if rest[:1] == "m" and len(rest) >= 5:
+            return ("p" + rest[1:]) if rest[1] in _VOWELS else rest[1:]
+        if rest[:1] == "n" and len(rest) >= 5:
+            return ("t" + rest[1:]) if rest[1] in _VOWELS else rest[1:]
+        if rest[:1] in ("l", "r", "w", "y") and len(rest) >= 4:
+            return rest
+    return word
+
+
+@lru_cache(maxsize=8192)
+def stem(word: str) -> str:
+    """
+    Light rule-based Indonesian stemmer.
+
+    Strips one particle, one possessive, one prefix and one derivational
+    suffix (-kan/-an). Short and non-Latin words are returned unchanged; the
+    suffix -i is left alone since it would mangle loanwords like "haji".
+    """
+    if len(word) <= 4 or not word.isascii() or not word.isalpha():
+        return word
+
+    for suffix in _PARTICLES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+    for suffix in _POSSESSIVES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+
+    word = _strip_prefix(word)
+
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM + 1:
+            word = word[:-len(suffix)]
+            break
+    return word
+
+
+def normalize(text: str) -> str:
+    """Lowercase, fold apostrophes (sa'i -> sai) and strip Arabic diacritics."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _APOSTROPHES.sub("", text)
+    return _ARABIC_MARKS.sub("", text)
+
+
+def analyze(text: str) -> List[str]:
+    """Normalize, tokenize, drop stopwords and stem."""
+    return [stem(t) for t in _TOKEN.findall(normalize(text)) if t not in STOPWORDS]
+
+
+# =============================================================================
+# INVERTED INDEX
+# =============================================================================
+
+@dataclass
+class SearchHit:
+    """A ranked knowledge item."""
+    kind: str
+    key: str
+    score: float
+    item: Any
+    matched_terms: List[str] = field(default_factory=list)
+
+
+class InvertedIndex:
+    """
+    BM25F inverted index over weighted text fields.
+
+    Items are added with ``add()`` and the index is frozen with ``build()``,
+    which turns raw weighted term frequencies into per-posting impact
+    scores. Ranked results of repeated queries are kept in a small LRU,
+    dropped whenever the index is rebuilt.
+    """
+
+    PREFIX_PENALTY = 0.5
+    MAX_PREFIX_TERMS = 20
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, cache_size: int = 1024):
+        """
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+            cache_size: Ranked results kept for repeated queries (0 disables)
+        """
+        self.k1 = k1
+        self.b = b
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, Optional[frozenset]], List[SearchHit]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._items: List[Tuple[str, str, Any]] = []
+        self._tfs: List[Dict[str, float]] = []
+        self._lengths: List[float] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._vocabulary: List[str] = []
+        self._built = False
+
+    def add(self, kind: str, key: str, item: Any, fields: Iterable[Tuple[str, float]]):
+        """
+        Add an item.
+
+        Args:
+            kind: Source type ("faq", "phrase", "guide")
+            key: Identifier unique within ``kind``
+            item: Object returned with search hits
+            fields: (text, weight) pairs
+        """
+        tf: Dict[str, float] = {}
+        length = 0.0
+        for text, weight in fields:
+            terms = analyze(text or "")
+            length += weight * len(terms)
+            for term in terms:
+                tf[term] = tf.get(term, 0.0) + weight
+        self._items.append((kind, key, item))
+        self._tfs.append(tf)
+        self._lengths.append(length)
+        self._built = False
+
+    def build(self) -> "InvertedIndex":
+        """Compute impact scores for all postings."""
+        count = len(self._items)
+        avg_length = (sum(self._lengths) / count) if count else 1.0
+
+        doc_freq: Dict[str, int] = {}
+        for tf in self._tfs:
+            for term in tf:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc, tf in enumerate(self._tfs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / (avg_length or 1.0))
+            for term, freq in tf.items():
+                df = doc_freq[term]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                impact = idf * freq * (self.k1 + 1) / (freq + norm)
+                postings.setdefault(term, []).append((doc, impact))
+
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._cache.clear()
+        self._built = True
+        return self
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # ==================== SERIALIZATION ====================
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serializable index state; items are stored as (kind, key) references."""
+        if not self._built:
+            self.build()
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "items": [[kind, key] for kind, key, _ in self._items],
+            "lengths": self._lengths,
+            "postings": {term: [list(p) for p in postings] for term, postings in self._postings.items()},
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        resolve: Callable[[str, str], Any]
+    ) -> "InvertedIndex":
+        """
+        Restore an index saved with ``to_state()``.
+
+        Args:
+            state: Saved state
+            resolve: Maps (kind, key) back to the live item
+
+        Returns:
+            A built index
+        """
+        index = cls(k1=state["k1"], b=state["b"])
+        index._items = [(kind, key, resolve(kind, key)) for kind, key in state["items"]]
+        index._lengths = state["lengths"]
+        index._postings = {
+            term: [(int(doc), float(impact)) for doc, impact in postings]
+            for term, postings in state["postings"].items()
+        }
+        index._vocabulary = sorted(index._postings)
+        index._built = True
+        return index
+
+    def _expand_prefix(self, token: str) -> List[str]:
+        """Vocabulary terms starting with ``token`` (for partial words)."""
+        start = bisect.bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:start + self.MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def search(
+        self,
+        query: str,
+        kinds: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        where: Optional[Callable[[Any], bool]] = None
+    ) -> List[SearchHit]:
+        """
+        Rank items for ``query``.
+
+        Args:
+            query: Free-text query
+            kinds: Restrict to these item kinds
+            limit: Max hits to return
+            where: Extra predicate on the item
+
+        Returns:
+            Hits, best first
+        """
+        if not self._built:
+            self.build()
+
+        kinds = frozenset(kinds) if kinds else None
+        cache_key = (query, kinds)
+        if where is None:
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+            if cached is not None:
+                return cached[:limit] if limit else list(cached)
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+        for term, factor in self._query_terms(query):
+            for doc, impact in self._postings[term]:
+                scores[doc] = scores.get(doc, 0.0) + impact * factor
+                matched.setdefault(doc, []).append(term)
+
+        hits = []
+        for doc, score in scores.items():
+            kind, key, item = self._items[doc]
+            if kinds is not None and kind not in kinds:
+                continue
+            if where is not None and not where(item):
+                continue
+            hits.append(SearchHit(kind, key, score, item, matched[doc]))
+
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+
+        if where is None and self.cache_size:
+            with self._cache_lock:
+                self._cache[cache_key] = hits
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            hits = list(hits)
+        return hits[:limit] if limit else hits
+
+    def _query_terms(self, query: str) -> List[Tuple[str, float]]:
+        """Indexed terms for a query as (term, weight) pairs."""
+        terms: List[Tuple[str, float]] = []
+        raw_tokens = [t for t in _TOKEN.findall(normalize(query)) if t not in STOPWORDS]
+        for raw in dict.fromkeys(raw_tokens):
+            term = stem(raw)
+            if term in self._postings:
+                terms.append((term, 1.0))
+            elif len(raw) >= 3:
+                # Partial word ("taw", "ihr"): match vocabulary prefixes
+                terms.extend((t, self.PREFIX_PENALTY) for t in self._expand_prefix(raw))
+        return terms
+
+
+# =============================================================================
+# KNOWLEDGE INDEX
+# =============================================================================
+
+# Field weights, shared by all sources so scores are comparable
+TITLE_WEIGHT = 3.0
+KEYWORD_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+_HEADING = re.compile(r"^\s*#{1,6}\s+(.*)$", re.MULTILINE)
+
+
+def _faq_fields(faq: FAQ) -> List[Tuple[str, float]]:
+    return [
+        (faq.question, TITLE_WEIGHT),
+        (" ".join(faq.keywords), KEYWORD_WEIGHT),
+        (faq.answer, BODY_WEIGHT),
+    ]
+
+
+def _phrase_fields(phrase: ArabicPhrase) -> List[Tuple[str, float]]:
+    return [
+        (phrase.transliteration, TITLE_WEIGHT),
+        (phrase.arabic, TITLE_WEIGHT),
+        (phrase.meaning_id, KEYWORD_WEIGHT),
+        (phrase.meaning_en, KEYWORD_WEIGHT),
+        (phrase.context, BODY_WEIGHT),
+    ]
+
+
+def _guide_fields(topic: str, content: str) -> List[Tuple[str, float]]:
+    headings = " ".join(_HEADING.findall(content))
+    return [
+        (topic, TITLE_WEIGHT),
+        (headings, KEYWORD_WEIGHT),
+        (content, BODY_WEIGHT),
+    ]
+
+
+def build_knowledge_index() -> InvertedIndex:
+    """Index every guide, FAQ and Arabic phrase."""
+    index = InvertedIndex()
+    for topic, content in get_all_guides().items():
+        index.add("guide", topic, (topic, content), _guide_fields(topic, content))
+    for faq in get_all_faqs():
+        index.add("faq", faq.id, faq, _faq_fields(faq))
+    for phrase in get_all_phrases():
+        index.add("phrase", phrase.id, phrase, _phrase_fields(phrase))
+    return index.build()
+
+
+# Loaded on first use
+_knowledge_index: Optional[InvertedIndex] = None
+
+
+def item_resolver() -> Callable[[str, str], Any]:
+    """Resolver mapping (kind, key) index references back to live items."""
+    items = {
+        "guide": {topic: (topic, content) for topic, content in get_all_guides().items()},
+        "faq": {faq.id: faq for faq in get_all_faqs()},
+        "phrase": {phrase.id: phrase for phrase in get_all_phrases()},
+    }
+    return lambda kind, key: items[kind][key]
+
+
+def get_knowledge_index() -> InvertedIndex:
+    """
+    Get the process-wide knowledge index.
+
+    Loaded on first use from the knowledge snapshot when it is current;
+    otherwise built in memory from the source modules.
+    """
+    global _knowledge_index
+    if _knowledge_index is None:
+        _knowledge_index = load_knowledge_index()
+    return _knowledge_index
+
+
+def search_all(query: str, limit: int = 10) -> List[SearchHit]:
+    """
+    Search guides, FAQs and phrases together.
+
+    Args:
+        query: Search query
+        limit: Maximum hits
+
+    Returns:
+        Hits from all sources, best first
+    """
+    return get_knowledge_index().search(query, limit=limit)
+
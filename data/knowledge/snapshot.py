@@ -0,0 +1,465 @@
+"""
+LABBAIK AI v6.0 - Knowledge Snapshot
+====================================
+Compiled, versioned snapshot of the knowledge base.
+
+The Python modules in this package stay the editable source. A build step
+compiles them into one binary file holding the source units, the search
+index, chunk boundaries and (optionally) precomputed chunk embeddings,
+which processes memory-map at startup instead of re-deriving them.
+
+File layout::
+
+    8 bytes   magic b"LBKSNAP1"
+    8 bytes   header length (little-endian uint64)
+    header    JSON: format, checksum, sections {name: [offset, length]},
+              chunk_config, embedding {model, dim, rows, offset}
+    sections  JSON section payloads (never pickle: the file lives in a
+              writable cache directory)
+    vectors   float32 embedding matrix, 64-byte aligned
+
+The checksum covers the source modules and the code that derives the
+index, so any edit makes the snapshot stale and it is rebuilt. The file
+is located with ``ai.knowledge_snapshot_path``; relative paths are taken
+from the project root, not the working directory.
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2  # 2: JSON sections (1 was pickle)
+MAGIC = b"LBKSNAP1"
+ALIGNMENT = 64
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Files whose content determines the snapshot
+SOURCE_MODULES = ("umrah_guide.py", "faq.py", "arabic_phrases.py", "__init__.py", "search_index.py")
+
+
+def source_checksum() -> str:
+    """sha256 over the snapshot format and the knowledge source modules."""
+    digest = hashlib.sha256(f"format={SNAPSHOT_FORMAT}\n".encode("utf-8"))
+    package_dir = Path(__file__).parent
+    for name in SOURCE_MODULES:
+        digest.update(name.encode("utf-8") + b"\x00")
+        digest.update((package_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def resolve_snapshot_path(path: Optional[str] = None) -> Optional[Path]:
+    """
+    Snapshot location.
+
+    Args:
+        path: Explicit path (default: ``ai.knowledge_snapshot_path``, which
+            ``LABBAIK_KNOWLEDGE_SNAPSHOT`` overrides)
+
+    Returns:
+        Absolute path (relative ones are under the project root), or None
+        when no snapshot is configured
+    """
+    if path is None:
+        try:
+            from core.config import get_settings
+            path = get_settings().ai.knowledge_snapshot_path
+        except Exception:
+            path = os.getenv("LABBAIK_KNOWLEDGE_SNAPSHOT", ".cache/knowledge_snapshot.bin")
+    if not path:
+        return None
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def _validate_section(name: str, value: Any):
+    """Check the shape of a decoded section before it is used."""
+    def records(fields):
+        if not isinstance(value, list) or not all(
+            isinstance(record, dict) and all(isinstance(record.get(f), t) for f, t in fields)
+            for record in value
+        ):
+            raise ValueError(f"malformed {name} section")
+
+    if name == "sources":
+        records((("source_id", str), ("text", str)))
+    elif name == "chunks":
+        records((("source_id", str), ("kind", str), ("category", str),
+                 ("position", int), ("text", str), ("tokens", int)))
+    elif name == "search_index":
+        if not (
+            isinstance(value, dict)
+            and isinstance(value.get("items"), list)
+            and isinstance(value.get("lengths"), list)
+            and isinstance(value.get("postings"), dict)
+            and len(value["items"]) == len(value["lengths"])
+        ):
+            raise ValueError("malformed search_index section")
+
+
+def chunk_config_of(chunker) -> Dict[str, int]:
+    """Chunker settings that determine chunk boundaries."""
+    return {
+        "max_tokens": int(chunker.max_tokens),
+        "overlap_tokens": int(chunker.overlap_tokens),
+    }
+
+
+# =============================================================================
+# SNAPSHOT FILE
+# =============================================================================
+
+class KnowledgeSnapshot:
+    """
+    Read-only view of a snapshot file.
+
+    The file is memory-mapped; JSON sections are decoded and validated on
+    first access and the embedding matrix is a zero-copy numpy view of the map.
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any], mapped: mmap.mmap):
+        self.path = path
+        self.header = header
+        self._mmap = mapped
+        self._sections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str) -> Optional["KnowledgeSnapshot"]:
+        """
+        Map a snapshot file.
+
+        Returns:
+            The snapshot, or None if it is missing, truncated or of another
+            format version
+        """
+        path = Path(path)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if mapped[:8] != MAGIC:
+                raise ValueError("bad magic")
+            (header_length,) = struct.unpack("<Q", mapped[8:16])
+            header = json.loads(mapped[16:16 + header_length].decode("utf-8"))
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"format {header.get('format')}")
+            end = max(
+                [offset + length for offset, length in header["sections"].values()]
+                + [header["embedding"]["offset"] + header["embedding"]["bytes"]]
+                if header.get("embedding") else
+                [offset + length for offset, length in header["sections"].values()]
+            )
+            if end > len(mapped):
+                raise ValueError("truncated")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable knowledge snapshot {path}: {e}")
+            mapped.close()
+            return None
+        return cls(path, header, mapped)
+
+    def close(self):
+        """Release the mapping (deferred to GC while embedding views are alive)."""
+        self._sections.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    @property
+    def checksum(self) -> str:
+        return self.header.get("checksum", "")
+
+    def is_current(self, checksum: Optional[str] = None) -> bool:
+        """Whether the snapshot was built from the current sources."""
+        return self.checksum == (checksum or source_checksum())
+
+    def section(self, name: str) -> Any:
+        """
+        Decode a section (cached).
+
+        Raises:
+            ValueError: The section is not valid JSON of the expected shape
+        """
+        with self._lock:
+            if name not in self._sections:
+                offset, length = self.header["sections"][name]
+                value = json.loads(self._mmap[offset:offset + length].decode("utf-8"))
+                _validate_section(name, value)
+                self._sections[name] = value
+            return self._sections[name]
+
+    def validate(self) -> bool:
+        """Decode and check every section."""
+        try:
+            for name in self.header["sections"]:
+                self.section(name)
+            return True
+        except (ValueError, KeyError, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring corrupt knowledge snapshot {self.path}: {e}")
+            return False
+
+    def has_chunks(self, chunker) -> bool:
+        return (
+            "chunks" in self.header["sections"]
+            and self.header.get("chunk_config") == chunk_config_of(chunker)
+        )
+
+    def has_embeddings(self, model_name: str) -> bool:
+        embedding = self.header.get("embedding")
+        return bool(embedding) and embedding["model"] == model_name
+
+    @property
+    def sources(self) -> List[Dict[str, Any]]:
+        """Knowledge source units, as from ``get_knowledge_sources()``."""
+        return self.section("sources")
+
+    @property
+    def chunks(self) -> List[Dict[str, Any]]:
+        """Chunk records: source_id, kind, category, position, text, tokens."""
+        return self.section("chunks") if "chunks" in self.header["sections"] else []
+
+    def embeddings(self):
+        """float32 matrix aligned with ``chunks`` (a view of the mapped file)."""
+        import numpy as np
+
+        embedding = self.header.get("embedding")
+        if not embedding:
+            return None
+        return np.frombuffer(
+            self._mmap, dtype=np.float32,
+            count=embedding["rows"] * embedding["dim"], offset=embedding["offset"],
+        ).reshape(embedding["rows"], embedding["dim"])
+
+
+def write_snapshot(
+    path: str,
+    checksum: str,
+    sections: Dict[str, Any],
+    chunk_config: Optional[Dict[str, int]] = None,
+    embeddings=None,
+    embedding_model: str = ""
+) -> Dict[str, Any]:
+    """
+    Write a snapshot file atomically.
+
+    Args:
+        path: Destination
+        checksum: Source checksum the sections were built from
+        sections: JSON-serializable section payloads by name
+        chunk_config: Chunker settings of the "chunks" section
+        embeddings: Optional (rows, dim) float32 matrix aligned with chunks
+        embedding_model: Model that produced ``embeddings``
+
+    Returns:
+        The written header
+    """
+    blobs = {
+        name: json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        for name, value in sections.items()
+    }
+
+    def layout(header_length: int) -> Dict[str, Any]:
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "checksum": checksum,
+            "created_at": time.time(),
+            "chunk_config": chunk_config,
+            "sections": {},
+            "embedding": None,
+        }
+        offset = 16 + header_length
+        for name, blob in blobs.items():
+            header["sections"][name] = [offset, len(blob)]
+            offset += len(blob)
+        if embeddings is not None:
+            offset += -offset % ALIGNMENT
+            rows, dim = embeddings.shape
+            header["embedding"] = {
+                "model": embedding_model, "rows": rows, "dim": dim,
+                "offset": offset, "bytes": rows * dim * 4,
+            }
+        return header
+
+    # Offsets depend on the header length; iterate until it is stable
+    header_length = 0
+    while True:
+        header = layout(header_length)
+        encoded = json.dumps(header).encode("utf-8")
+        if len(encoded) <= header_length:
+            encoded = encoded.ljust(header_length)
+            break
+        header_length = len(encoded) + 64
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", header_length))
+        f.write(encoded)
+        for blob in blobs.values():
+            f.write(blob)
+        if embeddings is not None:
+            f.write(b"\x00" * (header["embedding"]["offset"] - f.tell()))
+            f.write(embeddings.astype("<f4", copy=False).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return header
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def build_snapshot(
+    path: Optional[str] = None,
+    chunker=None,
+    embedder=None,
+    previous: Optional[KnowledgeSnapshot] = None
+) -> KnowledgeSnapshot:
+    """
+    Compile the knowledge base into a snapshot file.
+
+    Args:
+        path: Destination (default ``ai.knowledge_snapshot_path``)
+        chunker: Chunker with ``chunk(text)``; adds the "chunks" section
+        embedder: Embedding service with ``embed(texts)`` and ``model_name``;
+            adds chunk embeddings (requires ``chunker``)
+        previous: Current snapshot whose chunks/embeddings may be reused
+
+    Returns:
+        The newly written snapshot, mapped
+    """
+    from . import get_knowledge_sources
+    from .search_index import build_knowledge_index
+
+    path = resolve_snapshot_path(path)
+    if path is None:
+        raise ValueError("No knowledge snapshot path configured")
+    start = time.perf_counter()
+    checksum = source_checksum()
+    sources = get_knowledge_sources()
+
+    sections: Dict[str, Any] = {
+        "sources": sources,
+        "search_index": build_knowledge_index().to_state(),
+    }
+
+    reusable = previous is not None and previous.is_current(checksum)
+    chunk_config = None
+    chunks: List[Dict[str, Any]] = []
+    if chunker is not None:
+        chunk_config = chunk_config_of(chunker)
+        if reusable and previous.has_chunks(chunker):
+            chunks = previous.chunks
+        else:
+            for source in sources:
+                for position, piece in enumerate(chunker.chunk(source["text"])):
+                    chunks.append({
+                        "source_id": source["source_id"],
+                        "kind": source.get("kind", "general"),
+                        "category": source.get("category", "general"),
+                        "position": position,
+                        "text": piece.text,
+                        "tokens": piece.tokens,
+                    })
+        sections["chunks"] = chunks
+    elif reusable and "chunks" in previous.header["sections"]:
+        chunk_config = previous.header.get("chunk_config")
+        chunks = previous.chunks
+        sections["chunks"] = chunks
+
+    embeddings, model = None, ""
+    if embedder is not None and chunks:
+        import numpy as np
+
+        model = embedder.model_name
+        if reusable and previous.has_embeddings(model) and previous.chunks == chunks:
+            embeddings = np.array(previous.embeddings())
+        else:
+            embeddings = np.asarray(embedder.embed([c["text"] for c in chunks]), dtype=np.float32)
+
+    write_snapshot(path, checksum, sections, chunk_config, embeddings, model)
+    logger.info(
+        f"Knowledge snapshot built: {path} ({len(sources)} sources, {len(chunks)} chunks, "
+        f"embeddings={'yes' if embeddings is not None else 'no'}) "
+        f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+    )
+    return KnowledgeSnapshot.open(path)
+
+
+def load_or_build_snapshot(
+    path: Optional[str] = None,
+    chunker=None,
+    embedder=None
+) -> Optional[KnowledgeSnapshot]:
+    """
+    Open the snapshot, rebuilding it when it is stale or lacks a section
+    requested through ``chunker`` / ``embedder``.
+
+    Returns:
+        A current snapshot, or None if none is configured or it could not
+        be written
+    """
+    path = resolve_snapshot_path(path)
+    if path is None:
+        return None
+    checksum = source_checksum()
+    snapshot = KnowledgeSnapshot.open(path)
+
+    if snapshot is not None and snapshot.is_current(checksum) and snapshot.validate():
+        if (chunker is None or snapshot.has_chunks(chunker)) and (
+            embedder is None or snapshot.has_embeddings(embedder.model_name)
+        ):
+            return snapshot
+        reason = "missing sections"
+    else:
+        reason = "missing" if snapshot is None else "stale"
+
+    logger.info(f"Rebuilding knowledge snapshot ({reason})")
+    try:
+        return build_snapshot(path, chunker=chunker, embedder=embedder, previous=snapshot)
+    except OSError as e:
+        logger.warning(f"Could not write knowledge snapshot {path}: {e}")
+        return None
+    finally:
+        if snapshot is not None:
+            snapshot.close()
+
+
+def load_knowledge_index(path: Optional[str] = None):
+    """
+    Load the search index from a current snapshot, or build it in memory.
+
+    Nothing is written here: the snapshot is (re)built by the knowledge
+    indexer and scripts/build_knowledge_snapshot.py.
+    """
+    from .search_index import InvertedIndex, build_knowledge_index, item_resolver
+
+    path = resolve_snapshot_path(path)
+    snapshot = KnowledgeSnapshot.open(path) if path is not None else None
+    if snapshot is None:
+        return build_knowledge_index()
+    try:
+        if snapshot.is_current():
+            return InvertedIndex.from_state(snapshot.section("search_index"), item_resolver())
+        logger.info("Knowledge snapshot is stale, building the search index in memory")
+    except (ValueError, KeyError) as e:
+        logger.warning(f"Ignoring knowledge snapshot {path}: {e}")
+    finally:
+        snapshot.close()
+    return build_knowledge_index()
@@ -0,0 +1,269 @@
+"""
+LABBAIK AI v6.0 - Fuzzy Transliteration Search
+==============================================
+Typo-tolerant lookup of Arabic phrases and duas by their Latin
+transliteration.
+
+People spell transliterations many ways ("labbaika", "labaik", "labbayk";
+"sa'i", "sai", "sa'ie"). Text is first folded to a phonetic key that
+erases the common variants (doubled consonants, apostrophes, digraphs,
+vowel spellings), then matched word by word with padded character
+trigrams, so remaining typos still score high.
+"""
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .arabic_phrases import ArabicPhrase, get_all_phrases
+
+
+# =============================================================================
+# NORMALIZATION
+# =============================================================================
+
+# Applied in order; digraphs before single letters
+_DIGRAPHS = [
+    ("sy", "s"), ("sh", "s"), ("ts", "s"), ("th", "t"),
+    ("dz", "z"), ("zh", "z"), ("dh", "d"), ("kh", "h"), ("gh", "g"),
+    ("q", "k"), ("ie", "i"), ("ee", "i"), ("oo", "u"),
+    # Indonesian spelling writes a heavy fathah as "o": khoiron, syukron, sholat
+    ("e", "i"), ("o", "a"),
+]
+_VOWEL = "aiu"
+_NON_LETTER = re.compile(r"[^a-z\s]+")
+_REPEAT = re.compile(r"(.)\1+")
+_WORD = re.compile(r"[a-z]+")
+
+
+@lru_cache(maxsize=8192)
+def normalize_word(word: str) -> str:
+    """
+    Fold one transliterated word to its phonetic key.
+
+    labbaika -> labaika, labbayk -> labaik, sa'ie -> sai,
+    dzikir -> zikir, syukron -> sukran
+    """
+    for src, dst in _DIGRAPHS:
+        word = word.replace(src, dst)
+    # Semivowels closing a syllable are vowels: labbayk -> labbaik, law -> lau
+    word = re.sub(r"y(?=[^aiu]|$)", "i", word)
+    word = re.sub(r"w(?=[^aiu]|$)", "u", word)
+    word = _REPEAT.sub(r"\1", word)
+    # Final -h after a vowel is usually silent: umrah/umra, mahabbah/mahabba
+    if len(word) > 3 and word.endswith("h") and word[-2] in _VOWEL:
+        word = word[:-1]
+    return word
+
+
+def normalize_transliteration(text: str) -> List[str]:
+    """
+    Split text into phonetic word keys.
+
+    Apostrophes and hyphens join their neighbours (sa'i -> sai,
+    fid-dunya -> fiddunya) before folding.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"['‘’ʼ`\-]", "", text)
+    text = _NON_LETTER.sub(" ", text)
+    return [key for key in (normalize_word(w) for w in _WORD.findall(text)) if key]
+
+
+def trigrams(key: str) -> frozenset:
+    """Padded character trigrams ("  s", " sa", "sai", "ai ")."""
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# =============================================================================
+# TRIGRAM INDEX
+# =============================================================================
+
+@dataclass
+class FuzzyHit:
+    """A fuzzy transliteration match."""
+    item: Any
+    score: float  # 0..1, mean best-word similarity of the query words
+    matched: List[Tuple[str, str]] = field(default_factory=list)  # (query key, matched key)
+
+
+class TransliterationIndex:
+    """
+    Word-level trigram index over transliterated text.
+
+    Each distinct phonetic word key is stored once with its trigram set;
+    a trigram -> words map finds candidate words for a query word, which
+    are scored by Dice similarity. Words map back to the items containing
+    them, weighted by the field they came from.
+    """
+
+    SIMILAR_CACHE_SIZE = 4096
+
+    def __init__(
+        self,
+        min_similarity: float = 0.5,
+        short_word_similarity: float = 0.7,
+        short_word_length: int = 5
+    ):
+        """
+        Args:
+            min_similarity: Dice similarity below which a word does not match
+            short_word_similarity: Stricter threshold for short query words,
+                which share most trigrams with unrelated words ("haid" ~ "hair")
+            short_word_length: Query words up to this many letters are short
+        """
+        self.min_similarity = min_similarity
+        self.short_word_similarity = short_word_similarity
+        self.short_word_length = short_word_length
+        self._items: List[Any] = []
+        self._word_grams: Dict[str, frozenset] = {}
+        self._gram_words: Dict[str, List[str]] = {}
+        self._word_items: Dict[str, Dict[int, float]] = {}
+        self._similar_cache: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, item: Any, fields: Iterable[Tuple[str, float]]):
+        """
+        Add an item.
+
+        Args:
+            item: Object returned with hits
+            fields: (text, weight) pairs, e.g. transliteration at 1.0
+        """
+        with self._lock:
+            doc = len(self._items)
+            self._items.append(item)
+            for text, weight in fields:
+                words = normalize_transliteration(text or "")
+                # Adjacent pairs too, so "insyaallah" matches "insya allah"
+                joined = [normalize_word(a + b) for a, b in zip(words, words[1:])]
+                for key in words + joined:
+                    if key not in self._word_grams:
+                        grams = trigrams(key)
+                        self._word_grams[key] = grams
+                        for gram in grams:
+                            self._gram_words.setdefault(gram, []).append(key)
+                    postings = self._word_items.setdefault(key, {})
+                    postings[doc] = max(postings.get(doc, 0.0), weight)
+            self._similar_cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _similar_words(self, key: str) -> Tuple[Tuple[str, float], ...]:
+        """Indexed words whose Dice similarity to ``key`` passes the threshold."""
+        cached = self._similar_cache.get(key)
+        if cached is not None:
+            return cached
+
+        grams = trigrams(key)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for word in self._gram_words.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+
+        threshold = self.min_similarity
+        if len(key) <= self.short_word_length:
+            threshold = max(threshold, self.short_word_similarity)
+
+        similar = []
+        for word, count in shared.items():
+            dice = 2 * count / (len(grams) + len(self._word_grams[word]))
+            if dice >= threshold:
+                similar.append((word, dice))
+
+        similar = tuple(similar)
+        if len(self._similar_cache) < self.SIMILAR_CACHE_SIZE:
+            self._similar_cache[key] = similar
+        return similar
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 10,
+        min_score: float = 0.5
+    ) -> List[FuzzyHit]:
+        """
+        Rank items by fuzzy transliteration match.
+
+        Args:
+            query: Transliteration as typed by the user
+            limit: Max hits
+            min_score: Minimum item score (0..1)
+
+        Returns:
+            Hits, best first
+        """
+        keys = list(dict.fromkeys(normalize_transliteration(query)))
+        if not keys:
+            return []
+
+        best: Dict[int, Dict[str, Tuple[float, str]]] = {}
+        for key in keys:
+            for word, similarity in self._similar_words(key):
+                for doc, weight in self._word_items[word].items():
+                    score = similarity * weight
+                    current = best.setdefault(doc, {}).get(key)
+                    if current is None or score > current[0]:
+                        best[doc][key] = (score, word)
+
+        hits = []
+        for doc, matches in best.items():
+            score = sum(s for s, _ in matches.values()) / len(keys)
+            if score >= min_score:
+                hits.append(FuzzyHit(
+                    item=self._items[doc],
+                    score=score,
+                    matched=[(key, word) for key, (_, word) in matches.items()],
+                ))
+
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:limit] if limit else hits
+
+
+# =============================================================================
+# ARABIC PHRASES
+# =============================================================================
+
+# Phrase category / doa name words count a little less than the transliteration
+LABEL_WEIGHT = 0.8
+
+_phrase_index: Optional[TransliterationIndex] = None
+
+
+def get_phrase_transliteration_index() -> TransliterationIndex:
+    """Trigram index over ``get_all_phrases()`` (built on first use)."""
+    global _phrase_index
+    if _phrase_index is None:
+        index = TransliterationIndex()
+        for phrase in get_all_phrases():
+            index.add(phrase, [
+                (phrase.transliteration, 1.0),
+                (phrase.category, LABEL_WEIGHT),
+            ])
+        _phrase_index = index
+    return _phrase_index
+
+
+def fuzzy_search_phrases(
+    query: str,
+    limit: Optional[int] = 10,
+    min_score: float = 0.5
+) -> List[ArabicPhrase]:
+    """
+    Typo-tolerant phrase lookup by transliteration.
+
+    Args:
+        query: Transliteration ("labaik", "sa'ie", "syukron")
+        limit: Max phrases (None for all)
+        min_score: Minimum match score (0..1)
+
+    Returns:
+        Matching phrases, best first
+    """
+    hits = get_phrase_transliteration_index().search(query, limit=limit, min_score=min_score)
+    return [hit.item for hit in hits]
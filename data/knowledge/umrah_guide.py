@@ -4,7 +4,7 @@ LABBAIK AI v6.0 - Umrah Knowledge Base
 Comprehensive knowledge base for Umrah guidance.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
 
@@ -823,6 +823,33 @@ PACKING_LIST = {
 }
 
 
+# =============================================================================
+# COMBINED SECTIONS
+# =============================================================================
+
+PACKING_LIST_LABELS = {
+    "documents": "Dokumen",
+    "clothing_men": "Pakaian Pria",
+    "clothing_women": "Pakaian Wanita",
+    "toiletries": "Perlengkapan Mandi",
+    "health": "Kesehatan",
+    "electronics": "Elektronik",
+    "others": "Lain-lain",
+}
+
+UMRAH_PREPARATION = "# Daftar Perlengkapan Umrah\n\n" + "\n\n".join([
+    f"## {PACKING_LIST_LABELS.get(key, key)}\n\n" + "\n".join(f"- {item}" for item in items)
+    for key, items in PACKING_LIST.items()
+])
+
+UMRAH_RITUALS = "\n".join([
+    IHRAM_GUIDE,
+    TAWAF_GUIDE,
+    SAI_GUIDE,
+    TAHALLUL_GUIDE,
+])
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -839,6 +866,26 @@ def get_all_guides() -> Dict[str, str]:
     }
 
 
+def get_guide_by_topic(topic: str) -> Optional[str]:
+    """Get guide content by topic name."""
+    return get_all_guides().get(topic.lower())
+
+
+def search_guides(query: str) -> List[Tuple[str, str]]:
+    """
+    Search guides by keyword.
+    
+    Args:
+        query: Search query
+    
+    Returns:
+        List of (topic, content) tuples, best match first
+    """
+    from .search_index import get_knowledge_index  # Avoid circular import
+    
+    return [hit.item for hit in get_knowledge_index().search(query, kinds=("guide",))]
+
+
 def get_arabic_phrases(category: str = None) -> List[Dict]:
     """Get Arabic phrases, optionally filtered by category."""
     if category:
@@ -856,6 +903,30 @@ def get_packing_list() -> Dict[str, List[str]]:
     return PACKING_LIST
 
 
+_legacy_index = None
+
+
+def _get_legacy_index():
+    """Index over the guides and the legacy FAQ_DATA / ARABIC_PHRASES dicts."""
+    global _legacy_index
+    if _legacy_index is None:
+        from .search_index import InvertedIndex, TITLE_WEIGHT, KEYWORD_WEIGHT, BODY_WEIGHT
+        
+        index = InvertedIndex()
+        for name, content in get_all_guides().items():
+            index.add("guide", name, (name, content), [(name, TITLE_WEIGHT), (content, BODY_WEIGHT)])
+        for i, faq in enumerate(FAQ_DATA):
+            index.add("faq", str(i), faq, [(faq["question"], TITLE_WEIGHT), (faq["answer"], BODY_WEIGHT)])
+        for phrase in ARABIC_PHRASES:
+            index.add("phrase", str(phrase["id"]), phrase, [
+                (phrase["transliteration"], TITLE_WEIGHT),
+                (phrase["arabic"], TITLE_WEIGHT),
+                (phrase["meaning"], KEYWORD_WEIGHT),
+            ])
+        _legacy_index = index.build()
+    return _legacy_index
+
+
 def search_knowledge(query: str) -> List[Dict[str, Any]]:
     """
     Simple keyword search in knowledge base.
@@ -864,43 +935,30 @@ def search_knowledge(query: str) -> List[Dict[str, Any]]:
         query: Search query
     
     Returns:
-        List of matching content
+        List of matching content, most relevant first
     """
-    query_lower = query.lower()
     results = []
-    
-    # Search in guides
-    guides = get_all_guides()
-    for name, content in guides.items():
-        if query_lower in content.lower():
+    for hit in _get_legacy_index().search(query, limit=10):
+        if hit.kind == "guide":
+            name, content = hit.item
             results.append({
                 "type": "guide",
                 "name": name,
                 "content": content[:500] + "...",
-                "relevance": content.lower().count(query_lower)
+                "relevance": hit.score
             })
-    
-    # Search in FAQ
-    for faq in FAQ_DATA:
-        if query_lower in faq["question"].lower() or query_lower in faq["answer"].lower():
+        elif hit.kind == "faq":
             results.append({
                 "type": "faq",
-                "question": faq["question"],
-                "answer": faq["answer"],
-                "relevance": 1
+                "question": hit.item["question"],
+                "answer": hit.item["answer"],
+                "relevance": hit.score
             })
-    
-    # Search in Arabic phrases
-    for phrase in ARABIC_PHRASES:
-        if (query_lower in phrase["meaning"].lower() or 
-            query_lower in phrase["transliteration"].lower()):
+        else:
             results.append({
                 "type": "phrase",
-                "data": phrase,
-                "relevance": 1
+                "data": hit.item,
+                "relevance": hit.score
             })
     
-    # Sort by relevance
-    results.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-    
-    return results[:10]
+    return results
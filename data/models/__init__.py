@@ -142,6 +142,7 @@ class MessageRole(str, Enum):
 
 class ChatMessage(BaseModel):
     """Single chat message."""
+    id: Optional[int] = None  # conversation_messages row id once stored
     role: MessageRole
     content: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
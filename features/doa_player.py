@@ -239,6 +239,47 @@ UMRAH_DOAS: List[Doa] = [
 ]
 
 
+# =============================================================================
+# DOA SEARCH
+# =============================================================================
+
+_doa_index = None
+
+
+def _get_doa_index():
+    """Fuzzy transliteration index over UMRAH_DOAS (built on first use)."""
+    global _doa_index
+    if _doa_index is None:
+        from data.knowledge.transliteration import TransliterationIndex, LABEL_WEIGHT
+        
+        index = TransliterationIndex()
+        for doa in UMRAH_DOAS:
+            index.add(doa, [
+                (doa.latin, 1.0),
+                (doa.name, LABEL_WEIGHT),
+                (doa.category.value, LABEL_WEIGHT),
+            ])
+        _doa_index = index
+    return _doa_index
+
+
+def search_doas(query: str, limit: Optional[int] = 10) -> List[Doa]:
+    """
+    Find duas by transliteration or name, tolerant of spelling variants
+    ("labaik", "labbayk", "sa'ie") and typos.
+    
+    Args:
+        query: Search text
+        limit: Max results (None for all)
+    
+    Returns:
+        Matching duas, best first
+    """
+    if not query or not query.strip():
+        return []
+    return [hit.item for hit in _get_doa_index().search(query, limit=limit)]
+
+
 # =============================================================================
 # TTS COMPONENT (Web Speech API)
 # =============================================================================
@@ -360,11 +401,15 @@ def render_doa_card(doa: Doa, show_audio: bool = True):
         st.divider()
 
 
-def render_doa_list(category: DoaCategory = None, wajib_only: bool = False):
-    """Render list of duas filtered by category."""
+def render_doa_list(
+    category: DoaCategory = None,
+    wajib_only: bool = False,
+    query: str = ""
+):
+    """Render list of duas filtered by category and search text."""
     
     # Filter doas
-    doas = UMRAH_DOAS
+    doas = search_doas(query, limit=None) if query.strip() else UMRAH_DOAS
     
     if category:
         doas = [d for d in doas if d.category == category]
@@ -400,6 +445,11 @@ def render_doa_player_page():
     with col2:
         wajib_only = st.checkbox("⚠️ Hanya Wajib")
     
+    query = st.text_input(
+        "🔍 Cari doa",
+        placeholder="Contoh: labbaik, sa'i, rabbana atina",
+    )
+    
     st.divider()
     
     # Tabs
@@ -407,12 +457,12 @@ def render_doa_player_page():
     
     with tab1:
         if selected == "Semua":
-            render_doa_list(wajib_only=wajib_only)
+            render_doa_list(wajib_only=wajib_only, query=query)
         else:
             # Convert back to enum
             category_map = {c.value.title(): c for c in DoaCategory}
             category = category_map.get(selected)
-            render_doa_list(category=category, wajib_only=wajib_only)
+            render_doa_list(category=category, wajib_only=wajib_only, query=query)
     
     with tab2:
         bookmarks = st.session_state.get("doa_bookmarks", set())
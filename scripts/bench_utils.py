@@ -0,0 +1,70 @@
+"""
+LABBAIK AI - Benchmark Helpers
+==============================
+Shared timing helpers for the scripts in this folder.
+"""
+
+import os
+import sys
+import time
+from typing import Callable, List, Dict
+
+# Allow running as `python scripts/<benchmark>.py` from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def time_calls(fn: Callable[[], object], repeat: int = 200, warmup: int = 10) -> List[float]:
+    """Call ``fn`` repeatedly and return per-call latencies in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/mean summary in milliseconds."""
+    return {
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": sum(samples) / len(samples) if samples else 0.0,
+    }
+
+
+def print_table(title: str, rows: List[Dict[str, object]]):
+    """Print rows of dicts as an aligned table."""
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+    if not rows:
+        print("(no results)")
+        return
+
+    columns = list(rows[0].keys())
+    cells = [[_fmt(row.get(c)) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
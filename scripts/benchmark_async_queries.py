@@ -0,0 +1,205 @@
+"""
+LABBAIK AI - Concurrent Dashboard Queries Benchmark
+===================================================
+Load time of the dashboard aggregates (PriceRepository.get_price_summary,
+PriceRepository.get_price_ranges and AnalyticsTracker.get_stats; 14
+queries) with the queries of each call run one after another on the
+psycopg2 pool vs. together through ``gather_queries`` on the async pool.
+
+A local TCP proxy delays every packet by ``--latency-ms`` in each
+direction to stand in for the round-trip to a remote (Neon) database.
+The query cache is disabled so every load reaches the database.
+
+Needs a scratch PostgreSQL database and psycopg 3 (``psycopg[pool]``).
+Tables are created in a throwaway ``labbaik_bench_async`` schema that is
+dropped afterwards.
+
+Usage:
+    python scripts/benchmark_async_queries.py --dsn postgresql://localhost/labbaik_bench [--latency-ms 20] [--samples 30]
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import threading
+
+from bench_utils import time_calls, summarize, print_table
+
+from psycopg2.extensions import make_dsn, parse_dsn
+
+from services.analytics.tracker import AnalyticsTracker
+from services.database.async_connection import get_async_db
+from services.database.cache import QueryCache
+from services.database.repository import get_db
+from services.price.repository import PriceRepository
+
+SCHEMA = "labbaik_bench_async"
+
+SEED_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+SET search_path TO {SCHEMA};
+
+CREATE TABLE prices_packages (
+    id SERIAL PRIMARY KEY, price_idr BIGINT, is_available BOOLEAN, scraped_at TIMESTAMP
+);
+CREATE TABLE prices_hotels (
+    id SERIAL PRIMARY KEY, city TEXT, price_per_night_idr BIGINT, is_available BOOLEAN, scraped_at TIMESTAMP
+);
+CREATE TABLE prices_flights (
+    id SERIAL PRIMARY KEY, origin_city TEXT, destination_city TEXT, price_idr BIGINT,
+    is_available BOOLEAN, departure_date DATE, scraped_at TIMESTAMP
+);
+CREATE TABLE visitor_stats (
+    date DATE, page TEXT, unique_visitors INTEGER, page_views INTEGER
+);
+CREATE TABLE visitor_sessions (
+    session_id TEXT, page_count INTEGER, duration_seconds INTEGER, is_returning BOOLEAN,
+    device_type TEXT, last_activity TIMESTAMP
+);
+
+INSERT INTO prices_packages (price_idr, is_available, scraped_at)
+SELECT 23000000 + (n * 7919) % 32000000, n % 10 <> 0, NOW() - (n % 48) * INTERVAL '1 hour'
+FROM generate_series(1, 500) n;
+INSERT INTO prices_hotels (city, price_per_night_idr, is_available, scraped_at)
+SELECT CASE WHEN n % 2 = 0 THEN 'Makkah' ELSE 'Madinah' END, 400000 + (n * 104729) % 4600000,
+       n % 10 <> 0, NOW() - (n % 48) * INTERVAL '1 hour'
+FROM generate_series(1, 2000) n;
+INSERT INTO prices_flights (origin_city, destination_city, price_idr, is_available, departure_date, scraped_at)
+SELECT (ARRAY['Jakarta', 'Surabaya', 'Medan', 'Makassar'])[1 + n % 4],
+       (ARRAY['Jeddah', 'Madinah'])[1 + n % 2], 10000000 + (n * 15485) % 10000000,
+       n % 10 <> 0, CURRENT_DATE + (n % 120) - 20, NOW() - (n % 48) * INTERVAL '1 hour'
+FROM generate_series(1, 3000) n;
+INSERT INTO visitor_stats (date, page, unique_visitors, page_views)
+SELECT CURRENT_DATE - d, p, 20 + (d * 13) % 40, 40 + (d * 17) % 80
+FROM generate_series(0, 89) d,
+     unnest(ARRAY['home', 'chat', 'simulator', 'umrah_mandiri', 'umrah_bareng', 'booking', 'analytics']) p;
+INSERT INTO visitor_sessions (session_id, page_count, duration_seconds, is_returning, device_type, last_activity)
+SELECT md5(n::text), 1 + n % 5, 30 + n % 600, n % 3 = 0,
+       CASE WHEN n % 3 = 0 THEN 'desktop' ELSE 'mobile' END, NOW() - (n % 45) * INTERVAL '1 day'
+FROM generate_series(1, 5000) n;
+ANALYZE;
+"""
+
+
+# =============================================================================
+# LATENCY PROXY
+# =============================================================================
+
+class LatencyProxy:
+    """TCP proxy that delivers every chunk ``latency_ms`` after it was read."""
+
+    def __init__(self, upstream_host: str, upstream_port: int, latency_ms: float):
+        self.upstream = (upstream_host, upstream_port)
+        self.delay = latency_ms / 1000
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def start(self) -> int:
+        threading.Thread(target=self._serve, name="latency-proxy", daemon=True).start()
+        self._ready.wait()
+        return self.port
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(*self.upstream)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+            return_exceptions=True,
+        )
+
+    async def _pipe(self, reader, writer):
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                await asyncio.sleep(max(0.0, due - self._loop.time()))
+                if not data:
+                    writer.close()
+                    return
+                writer.write(data)
+                await writer.drain()
+
+        sender = asyncio.ensure_future(deliver())
+        while True:
+            data = await reader.read(65536)
+            # Keep reading while earlier chunks wait: latency, not throughput
+            queue.put_nowait((self._loop.time() + self.delay, data))
+            if not data:
+                break
+        await sender
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="One-way delay")
+    parser.add_argument("--samples", type=int, default=30)
+    args = parser.parse_args()
+    if not args.dsn:
+        raise SystemExit("❌ Pass --dsn or set DATABASE_URL")
+
+    params = parse_dsn(args.dsn)
+    proxy = LatencyProxy(params.get("host") or "127.0.0.1", int(params.get("port") or 5432), args.latency_ms)
+    port = proxy.start()
+    dsn = make_dsn(args.dsn, host="127.0.0.1", port=port, options=f"-c search_path={SCHEMA}")
+
+    db = get_db()
+    if not db.initialize(dsn):
+        raise SystemExit("❌ Could not connect through the latency proxy")
+    async_db = get_async_db()
+    if not async_db.initialize(dsn):
+        raise SystemExit("❌ Async pool unavailable; install psycopg[binary,pool]")
+
+    db.execute(SEED_SQL)
+    try:
+        prices = PriceRepository(db, cache=QueryCache(enabled=False))
+        tracker = AnalyticsTracker()
+        tracker._db = db
+
+        def dashboard():
+            prices.get_price_summary()
+            prices.get_price_ranges()
+            stats = tracker.get_stats()
+            assert stats["source"] == "database", "visitor stats fell back to demo data"
+
+        warmup = min(3, args.samples)
+        rows = []
+        for mode, concurrent in (("sequential", False), ("gather_queries", True)):
+            async_db.enabled = concurrent
+            start = time.perf_counter()
+            samples = time_calls(dashboard, repeat=args.samples, warmup=warmup)
+            rows.append({"mode": mode, **summarize(samples), "wall_s": time.perf_counter() - start})
+
+        print_table(
+            f"Dashboard load: 14 aggregate queries, {args.latency_ms:g} ms one-way latency "
+            f"({args.samples} loads, cache off)",
+            rows,
+        )
+        sequential, gathered = rows[0]["p50_ms"], rows[1]["p50_ms"]
+        print(f"\np50 {sequential:.0f} ms -> {gathered:.0f} ms ({sequential / gathered:.1f}x faster)")
+    finally:
+        async_db.enabled = True
+        db.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        async_db.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+LABBAIK AI - Bulk Write Benchmark
+=================================
+Rows/sec of the BaseRepository write paths at 10k and 1M rows:
+
+* ``create`` in a loop (one INSERT ... RETURNING round trip per row; only
+  up to ``--loop-rows`` rows, it is far too slow beyond that)
+* ``create_many`` (multi-row INSERT per ``--batch-size`` rows)
+* ``upsert_many`` over the same ids (ON CONFLICT DO UPDATE of every row)
+* ``copy_from_iter`` (COPY FROM STDIN, streamed)
+
+Rows mimic analytics events: a UUID, timestamps, a few text/int columns
+and a JSON payload. Models are generated lazily, so memory stays flat.
+
+Needs a scratch PostgreSQL database; a throwaway ``labbaik_bench_bulk``
+schema is created and dropped afterwards.
+
+Usage:
+    python scripts/benchmark_bulk_writes.py --dsn postgresql://localhost/labbaik_bench [--rows 10000,1000000]
+"""
+
+import os
+import time
+import uuid
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+from bench_utils import print_table
+
+from pydantic import BaseModel, Field
+
+from services.database.cache import QueryCache
+from services.database.repository import BaseRepository, get_db
+
+SCHEMA = "labbaik_bench_bulk"
+
+SCHEMA_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.bench_events (
+    id VARCHAR(36) PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    session_id VARCHAR(50) NOT NULL,
+    page VARCHAR(100) NOT NULL,
+    duration_ms INTEGER,
+    payload JSONB DEFAULT '{{}}'
+);
+"""
+
+PAGES = ["home", "chat", "simulator", "umrah_mandiri", "umrah_bareng", "booking"]
+
+
+class BenchEvent(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    session_id: str
+    page: str
+    duration_ms: int = 0
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BenchEventRepository(BaseRepository):
+    watermark_sql = None
+
+    @property
+    def table_name(self) -> str:
+        return f"{SCHEMA}.bench_events"
+
+    @property
+    def model_class(self):
+        return BenchEvent
+
+
+def events(ids: List[str], revision: int = 0) -> Iterator[BenchEvent]:
+    for i, event_id in enumerate(ids):
+        yield BenchEvent(
+            id=event_id,
+            session_id=f"s{i // 7}",
+            page=PAGES[i % len(PAGES)],
+            duration_ms=(i * 37 + revision) % 60000,
+            payload={"device": "mobile" if i % 3 else "desktop", "revision": revision, "ref": f"r{i % 97}"},
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--rows", default="10000,1000000", help="Comma-separated row counts")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--loop-rows", type=int, default=10000, help="Max rows for the create() loop")
+    args = parser.parse_args()
+    if not args.dsn:
+        raise SystemExit("❌ Pass --dsn or set DATABASE_URL")
+
+    db = get_db()
+    if not db.initialize(args.dsn):
+        raise SystemExit("❌ Could not connect; pass --dsn or set DATABASE_URL")
+    db.execute(SCHEMA_SQL)
+
+    repo = BenchEventRepository(db=db, cache=QueryCache(enabled=False))
+    table = repo.table_name
+    rows = []
+    try:
+        for n in (int(x) for x in args.rows.split(",")):
+            ids = [str(uuid.uuid4()) for _ in range(n)]
+
+            def run(name: str, fn, truncate: bool = True):
+                if truncate:
+                    db.execute(f"TRUNCATE {table}")
+                start = time.perf_counter()
+                written = fn()
+                seconds = time.perf_counter() - start
+                count = db.fetch_one(f"SELECT COUNT(*) AS n FROM {table}")["n"]
+                rows.append({
+                    "rows": n,
+                    "method": name,
+                    "seconds": seconds,
+                    "rows_per_sec": f"{written / seconds:,.0f}",
+                    "in_table": count,
+                })
+
+            if n <= args.loop_rows:
+                run("create (loop)", lambda: sum(1 for event in events(ids) if repo.create(event)))
+            else:
+                rows.append({"rows": n, "method": "create (loop)", "seconds": "-",
+                             "rows_per_sec": f"skipped (> --loop-rows {args.loop_rows})", "in_table": "-"})
+            run("create_many", lambda: repo.create_many(
+                events(ids), batch_size=args.batch_size, returning=False))
+            # Every row already exists: each one is updated
+            run("upsert_many", lambda: repo.upsert_many(
+                events(ids, revision=1), batch_size=args.batch_size, returning=False), truncate=False)
+            run("copy_from_iter", lambda: repo.copy_from_iter(events(ids)))
+
+        print_table(f"Bulk writes (batch size {args.batch_size})", rows)
+    finally:
+        db.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
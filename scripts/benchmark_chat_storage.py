@@ -0,0 +1,135 @@
+"""
+LABBAIK AI - Chat Storage Benchmark
+===================================
+Per-message write latency of ChatRepository at conversation lengths of
+10, 100 and 1000 messages: the previous JSON-column path (load the whole
+conversation, append, rewrite ``messages``; inlined below as the baseline)
+vs. the append-only ``conversation_messages`` INSERT. Also times reading
+the newest history page.
+
+Needs a scratch PostgreSQL database; the schema from
+scripts/conversation_messages_schema.sql is applied and the benchmark
+conversations are deleted afterwards.
+
+Usage:
+    python scripts/benchmark_chat_storage.py --dsn postgresql://localhost/labbaik_bench [--samples 50]
+"""
+
+import os
+import json
+import time
+import uuid
+import argparse
+
+from bench_utils import PROJECT_ROOT, time_calls, summarize, print_table
+
+from data.models import ChatConversation, ChatMessage, MessageRole
+from services.database.repository import ChatRepository, get_db
+
+LENGTHS = [10, 100, 1000]
+MESSAGE = "Bagaimana tata cara tawaf yang benar? " * 8  # ~300 chars
+
+
+def legacy_add_message(repo: ChatRepository, conversation_id: str, role: str, content: str):
+    """
+    The previous add_message: read-modify-write of the JSON column.
+
+    Dumped with mode="json"; the original plain model_dump() left datetimes
+    that json.dumps rejects.
+    """
+    conv = repo.find_by_id(conversation_id)
+    conv.messages.append(ChatMessage(role=MessageRole(role), content=content))
+    return repo.update(conversation_id, {
+        "messages": [m.model_dump(mode="json") for m in conv.messages]
+    })
+
+
+def seed_conversation(repo: ChatRepository, db, length: int) -> str:
+    """Conversation with ``length`` messages in both storage layouts."""
+    messages = [
+        ChatMessage(role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT, content=MESSAGE)
+        for i in range(length)
+    ]
+    conversation = repo.create(ChatConversation(
+        id=str(uuid.uuid4()), user_id="bench", title=f"bench {length}",
+    ))
+    db.execute(
+        "UPDATE conversations SET messages = %s WHERE id = %s",
+        (json.dumps([m.model_dump(mode="json") for m in messages]), conversation.id),
+    )
+    db.execute(
+        """
+        INSERT INTO conversation_messages (conversation_id, role, content)
+        SELECT %s, CASE WHEN n %% 2 = 0 THEN 'user' ELSE 'assistant' END, %s
+        FROM generate_series(0, %s - 1) AS n
+        """,
+        (conversation.id, MESSAGE, length),
+    )
+    return conversation.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+
+    db = get_db()
+    if not db.initialize(args.dsn or None):
+        raise SystemExit("❌ Could not connect; pass --dsn or set DATABASE_URL")
+
+    with open(os.path.join(PROJECT_ROOT, "scripts", "conversation_messages_schema.sql")) as f:
+        db.execute(f.read())
+
+    repo = ChatRepository(db)
+    created = []
+    rows = []
+    try:
+        for length in LENGTHS:
+            conversation_id = seed_conversation(repo, db, length)
+            created.append(conversation_id)
+            base_messages = db.fetch_one(
+                "SELECT messages FROM conversations WHERE id = %s", (conversation_id,)
+            )["messages"]
+
+            def time_legacy_writes():
+                # Time the write only; the JSON is reset to ``length`` messages in between
+                latencies = []
+                for _ in range(args.samples):
+                    start = time.perf_counter()
+                    legacy_add_message(repo, conversation_id, "user", MESSAGE)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    db.execute(
+                        "UPDATE conversations SET messages = %s WHERE id = %s",
+                        (json.dumps(base_messages), conversation_id),
+                    )
+                return summarize(latencies)
+
+            cases = [
+                ("JSON column rewrite (old)", time_legacy_writes()),
+                ("append INSERT", summarize(time_calls(
+                    lambda: repo.append_message(conversation_id, "user", MESSAGE),
+                    repeat=args.samples, warmup=0,
+                ))),
+                ("read newest page (50)", summarize(time_calls(
+                    lambda: repo.get_messages(conversation_id, limit=50),
+                    repeat=args.samples,
+                ))),
+            ]
+            for name, stats in cases:
+                rows.append({
+                    "messages": length,
+                    "operation": name,
+                    "p50_ms": stats["p50_ms"],
+                    "p99_ms": stats["p99_ms"],
+                })
+    finally:
+        for conversation_id in created:
+            db.execute("DELETE FROM conversations WHERE id = %s", (conversation_id,))
+        db.close()
+
+    print_table(f"Chat message storage ({args.samples} samples per case)", rows)
+
+
+if __name__ == "__main__":
+    main()
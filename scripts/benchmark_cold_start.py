@@ -0,0 +1,104 @@
+"""
+LABBAIK AI - Cold Start Benchmark
+=================================
+Measures, in fresh interpreter processes:
+
+* ``import services`` with lazy AI imports vs. importing every AI module
+  eagerly (the previous behaviour of ``services/__init__.py``)
+* latency of the first embedding query after process start, when the
+  model is loaded on the request path (cold) vs. when the background
+  warmup has already finished (warm)
+
+Usage:
+    python scripts/benchmark_cold_start.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from bench_utils import PROJECT_ROOT, summarize, print_table
+
+IMPORT_LAZY = """
+import time
+start = time.perf_counter()
+import services.database.repository
+print((time.perf_counter() - start) * 1000)
+"""
+
+IMPORT_EAGER = """
+import time, importlib
+start = time.perf_counter()
+import services
+for module in sorted(set(services._LAZY_IMPORTS.values())):
+    importlib.import_module(module)
+import services.database.repository
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_QUERY_COLD = """
+import time
+from services.ai.rag_service import LocalEmbeddingService
+service = LocalEmbeddingService()
+start = time.perf_counter()
+service.embed_single("Apa saja rukun umrah?")
+print((time.perf_counter() - start) * 1000)
+"""
+
+FIRST_QUERY_WARM = """
+import time
+from services.ai.warmup import start_embedding_warmup, wait_for_embedding
+from services.ai.rag_service import LocalEmbeddingService
+start_embedding_warmup(LocalEmbeddingService.DEFAULT_MODEL)
+wait_for_embedding(timeout=600)  # Stands in for the time before the first chat
+service = LocalEmbeddingService()
+start = time.perf_counter()
+service.embed_single("Apa saja rukun umrah?")
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def run_child(code: str) -> float:
+    """Run ``code`` in a fresh interpreter and return the ms it prints."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-model", action="store_true",
+                        help="Only measure import time")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    cases = [
+        ("import services (eager AI)", IMPORT_EAGER),
+        ("import services (lazy AI)", IMPORT_LAZY),
+    ]
+    if not args.skip_model:
+        cases += [
+            ("first query (cold)", FIRST_QUERY_COLD),
+            ("first query (warmed)", FIRST_QUERY_WARM),
+        ]
+
+    rows = []
+    for name, code in cases:
+        samples = [run_child(code) for _ in range(args.runs)]
+        rows.append({"case": name, "runs": args.runs, **summarize(samples)})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table("Cold start", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+LABBAIK AI - Chat History Compaction Benchmark
+==============================================
+Replays multi-turn conversations built from the FAQ (each user turn is an
+FAQ question, each assistant turn its curated answer) through RAGService
+and reports prompt tokens per turn for:
+
+* the previous prompt layout (inlined below as the baseline): context in
+  the system prompt, last 6 messages verbatim
+* the current layout: fixed system prompt, rolling history summary, recent
+  turns verbatim, context in the final user message
+
+"reusable prefix" is the number of leading prompt tokens identical to the
+previous turn's prompt, i.e. what a provider with prefix caching can reuse.
+Summaries are extractive here (no LLM key needed); with a chat service the
+summary is written by the model and capped at the same token budget.
+
+Usage:
+    python scripts/benchmark_history_compaction.py [--conversations 20] [--turns 12]
+"""
+
+import argparse
+import tempfile
+from typing import List
+
+from bench_utils import print_table
+
+from core.config import get_settings
+from data.knowledge.faq import get_all_faqs
+from services.ai.base import (
+    BaseChatService,
+    ChatMessage,
+    ChatCompletionRequest,
+    ChatCompletionResponse,
+)
+from services.ai.chunking import count_tokens
+from services.ai.history import HistoryCompactor
+from services.ai.indexing import KnowledgeIndexer
+from services.ai.rag_service import RAGService, LocalEmbeddingService, NumpyVectorStore
+
+LEGACY_SYSTEM_PROMPT = """Anda adalah LABBAIK AI, asisten cerdas untuk perencanaan ibadah Umrah.
+
+Gunakan konteks berikut untuk menjawab pertanyaan pengguna. Jika informasi tidak ada dalam konteks,
+katakan bahwa Anda tidak memiliki informasi tersebut dan sarankan untuk mencari dari sumber terpercaya.
+
+KONTEKS:
+{context}
+
+INSTRUKSI:
+1. Jawab berdasarkan konteks yang diberikan
+2. Jika konteks tidak cukup, katakan dengan jujur
+3. Gunakan bahasa Indonesia yang baik dan santun
+4. Sertakan referensi sumber jika relevan
+5. Dorong pengguna untuk DYOR (Do Your Own Research)"""
+
+
+class ReplayChatService(BaseChatService):
+    """Answers with the scripted reply and keeps the last request."""
+
+    def __init__(self):
+        super().__init__(api_key="")
+        self.reply = ""
+        self.last_request = None
+
+    @property
+    def provider_name(self) -> str:
+        return "replay"
+
+    def initialize(self) -> bool:
+        self._initialized = True
+        return True
+
+    def complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        self.last_request = request
+        return ChatCompletionResponse(
+            content=self.reply, model="replay", usage={}, finish_reason="stop", latency_ms=0.0
+        )
+
+    def stream(self, request):
+        yield self.complete(request).content
+
+    async def acomplete(self, request):
+        return self.complete(request)
+
+    async def astream(self, request):
+        yield self.complete(request).content
+
+
+def legacy_messages(context: str, history: List[ChatMessage], question: str) -> List[ChatMessage]:
+    """The previous prompt: context in the system prompt, last 6 messages."""
+    return [
+        ChatMessage.system(LEGACY_SYSTEM_PROMPT.format(context=context)),
+        *history[-6:],
+        ChatMessage.user(question),
+    ]
+
+
+def tokens_of(messages: List[ChatMessage]) -> int:
+    return sum(count_tokens(msg.content) for msg in messages)
+
+
+def reusable_prefix(previous: List[ChatMessage], current: List[ChatMessage]) -> int:
+    """Tokens of the leading messages identical in both prompts."""
+    shared = 0
+    for before, after in zip(previous, current):
+        if before.role != after.role or before.content != after.content:
+            break
+        shared += count_tokens(after.content)
+    return shared
+
+
+def main():
+    ai = get_settings().ai
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--max-tokens", type=int, default=ai.history_max_tokens)
+    parser.add_argument("--recent-tokens", type=int, default=ai.history_recent_tokens)
+    parser.add_argument("--summary-tokens", type=int, default=ai.history_summary_tokens)
+    args = parser.parse_args()
+
+    embedder = LocalEmbeddingService(cache_dir=tempfile.mkdtemp(prefix="labbaik-emb-"))
+    store = NumpyVectorStore(
+        persist_directory=tempfile.mkdtemp(prefix="labbaik-history-"),
+        embedding_service=embedder,
+    )
+    store.initialize()
+
+    replay = ReplayChatService()
+    compactor = HistoryCompactor(
+        None,  # Extractive summaries: the replay service cannot summarize
+        max_tokens=args.max_tokens,
+        recent_tokens=args.recent_tokens,
+        summary_tokens=args.summary_tokens,
+    )
+    rag = RAGService(
+        chat_service=replay,
+        vector_store=store,
+        top_k=ai.top_k_results,
+        context_budget=ai.context_token_budget,
+        history_compactor=compactor,
+    )
+    KnowledgeIndexer(rag, manifest_path=tempfile.mktemp(suffix=".json")).run()
+
+    faqs = get_all_faqs()
+    per_turn = [
+        {"old": 0, "new": 0, "old_history": 0, "new_history": 0, "old_prefix": 0, "new_prefix": 0}
+        for _ in range(args.turns)
+    ]
+    for c in range(args.conversations):
+        history: List[ChatMessage] = []
+        previous_old: List[ChatMessage] = []
+        previous_new: List[ChatMessage] = []
+        for turn in range(args.turns):
+            faq = faqs[(c * 7 + turn * 5) % len(faqs)]
+            replay.reply = faq.answer
+            response = rag.query(faq.question, chat_history=history or None, conversation_id=f"c{c}")
+
+            old = legacy_messages(response.context, history, faq.question)
+            new = replay.last_request.messages
+            row = per_turn[turn]
+            row["old"] += tokens_of(old)
+            row["new"] += response.prompt_tokens
+            row["old_history"] += tokens_of(history[-6:])
+            row["new_history"] += tokens_of(new[1:-1])
+            row["old_prefix"] += reusable_prefix(previous_old, old)
+            row["new_prefix"] += reusable_prefix(previous_new, new)
+            previous_old, previous_new = old, new
+
+            history += [ChatMessage.user(faq.question), ChatMessage.assistant(response.answer)]
+
+    n = args.conversations
+    rows = [
+        {
+            "turn": turn + 1,
+            "old_prompt": row["old"] / n,
+            "new_prompt": row["new"] / n,
+            "old_history": row["old_history"] / n,
+            "new_history": row["new_history"] / n,
+            "old_prefix": row["old_prefix"] / n,
+            "new_prefix": row["new_prefix"] / n,
+        }
+        for turn, row in enumerate(per_turn)
+    ]
+    print_table(
+        f"Prompt tokens per turn (mean of {n} replayed conversations; "
+        f"compact above {args.max_tokens}, keep {args.recent_tokens}, summary <= {args.summary_tokens})",
+        rows,
+    )
+
+    old_total = sum(row["old"] for row in per_turn)
+    new_total = sum(row["new"] for row in per_turn)
+    new_prefix = sum(row["new_prefix"] for row in per_turn)
+    old_prefix = sum(row["old_prefix"] for row in per_turn)
+    stats = compactor.get_stats()
+    print(
+        f"\nprompt tokens {old_total / (n * args.turns):.0f} -> {new_total / (n * args.turns):.0f} per turn "
+        f"({1 - new_total / old_total:.0%} fewer); reusable prefix {old_prefix / old_total:.0%} -> "
+        f"{new_prefix / new_total:.0%} of prompt tokens; {stats['summaries']} summaries over "
+        f"{stats['turns']} turns ({stats['compacted_turns']} with a summary)"
+    )
+
+
+if __name__ == "__main__":
+    main()
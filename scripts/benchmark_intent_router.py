@@ -0,0 +1,98 @@
+"""
+LABBAIK AI - Intent Router Benchmark
+====================================
+Replays labelled chat questions (the quick questions plus paraphrases)
+through the IntentRouter and reports the share answered from the FAQ
+without an LLM call, how many of those answers were the expected FAQ, and
+routing latency. Runs keyword-only routing, then keyword + embedding
+nearest-neighbour routing (needs sentence-transformers).
+
+Usage:
+    python scripts/benchmark_intent_router.py [--repeat 2000] [--skip-model]
+"""
+
+import argparse
+
+from bench_utils import time_calls, summarize, print_table
+
+from services.ai.intent_router import IntentRouter
+
+# (question, FAQ that answers it, or None when it needs the LLM)
+QUESTIONS = [
+    ("Apa saja syarat umrah?", "prep_001"),
+    ("Dokumen apa yang harus disiapkan?", "prep_001"),
+    ("Berapa lama proses visa umrah?", "prep_002"),
+    ("Vaksin apa yang diperlukan?", "prep_004"),
+    ("Apa yang harus dibawa ke tanah suci?", "prep_003"),
+    ("Bagaimana tata cara umrah?", None),
+    ("Apa saja rukun umrah?", "ritual_001"),
+    ("Bagaimana cara thawaf yang benar?", "ritual_003"),
+    ("Apa doa saat sa'i?", None),
+    ("Kapan waktu terbaik untuk umrah?", "gen_004"),
+    ("Berapa biaya umrah tahun ini?", "gen_005"),
+    ("Umrah saat haid bagaimana?", "women_001"),
+    ("Aturan mahram untuk wanita?", "women_002"),
+    ("Apa itu umrah?", "gen_001"),
+    ("Apa bedanya umrah dan haji?", "gen_002"),
+    ("Berapa hari perjalanan umrah?", "gen_003"),
+    ("Cara mengurus visa umrah", "prep_002"),
+    ("Perlengkapan apa yang perlu dibawa?", "prep_003"),
+    ("Suntik meningitis wajib?", "prep_004"),
+    ("Tata cara ihram bagaimana?", "ritual_002"),
+    ("Cara sai dari safa ke marwah", "ritual_004"),
+    ("Perempuan menstruasi boleh umrah?", "women_001"),
+    ("Tips menjaga kesehatan selama umrah", "health_001"),
+    ("Kalau sakit di sana harus ke dokter mana?", "health_002"),
+    ("Hotel terbaik dekat Masjidil Haram?", None),
+    ("Paket umrah paling ekonomis?", None),
+    ("Cara mengucapkan talbiyah?", None),
+    ("Frasa penting di Arab Saudi?", None),
+    ("Bagaimana cara cicilan umrah?", None),
+    ("Tolong buatkan itinerary 9 hari dengan city tour Thaif", None),
+]
+
+
+def evaluate(router: IntentRouter, repeat: int) -> dict:
+    answered = correct = 0
+    for question, expected in QUESTIONS:
+        match = router.route(question)
+        if match.answered:
+            answered += 1
+            correct += match.intent == expected
+
+    state = {"i": 0}
+
+    def run():
+        router.route(QUESTIONS[state["i"] % len(QUESTIONS)][0])
+        state["i"] += 1
+
+    stats = summarize(time_calls(run, repeat=repeat))
+    return {
+        "llm_free": f"{answered}/{len(QUESTIONS)}",
+        "correct": f"{correct}/{answered}",
+        "p50_us": stats["p50_ms"] * 1000,
+        "p99_us": stats["p99_ms"] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--skip-model", action="store_true")
+    args = parser.parse_args()
+
+    rows = [{"routing": "keywords", **evaluate(IntentRouter(), args.repeat)}]
+    if not args.skip_model:
+        from services.ai.rag_service import LocalEmbeddingService
+        router = IntentRouter(embedding_service=LocalEmbeddingService())
+        rows.append({"routing": "keywords + nearest FAQ", **evaluate(router, args.repeat)})
+
+    expected = sum(faq is not None for _, faq in QUESTIONS)
+    print_table(
+        f"Intent routing ({len(QUESTIONS)} questions, {expected} answerable from the FAQ)",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+LABBAIK AI - Keyset Pagination Benchmark
+========================================
+Latency of one page at increasing depth: ``find_all`` (LIMIT/OFFSET)
+vs. ``find_page`` (keyset seek on ``(created_at, id)``), plus a full scan
+with ``iter_by`` (server-side cursor) vs. a single ``fetch_all``, with
+peak Python memory.
+
+The table is loaded with ``copy_from_iter`` and indexed like
+scripts/keyset_pagination_indexes.sql. The query cache is disabled.
+
+Needs a scratch PostgreSQL database; a throwaway ``labbaik_bench_keyset``
+schema is created and dropped afterwards.
+
+Usage:
+    python scripts/benchmark_keyset_pagination.py --dsn postgresql://localhost/labbaik_bench [--rows 1000000] [--page 50]
+"""
+
+import os
+import time
+import uuid
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+
+from bench_utils import time_calls, summarize, print_table
+
+from pydantic import BaseModel, Field
+
+from services.database.cache import QueryCache
+from services.database.repository import BaseRepository, get_db
+
+SCHEMA = "labbaik_bench_keyset"
+
+SCHEMA_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.bench_items (
+    id VARCHAR(36) PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    title TEXT NOT NULL,
+    is_active BOOLEAN DEFAULT true,
+    metadata JSONB DEFAULT '{{}}'
+);
+"""
+
+INDEX_SQL = f"""
+CREATE INDEX ON {SCHEMA}.bench_items(created_at DESC, id DESC);
+ANALYZE {SCHEMA}.bench_items;
+"""
+
+
+class BenchItem(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime
+    updated_at: datetime
+    title: str
+    is_active: bool = True
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BenchItemRepository(BaseRepository):
+    watermark_sql = None
+
+    @property
+    def table_name(self) -> str:
+        return f"{SCHEMA}.bench_items"
+
+    @property
+    def model_class(self):
+        return BenchItem
+
+
+def items(n: int) -> Iterator[BenchItem]:
+    start = datetime(2025, 1, 1)
+    for i in range(n):
+        # Two rows per second: created_at alone is not unique, id breaks ties
+        created = start + timedelta(seconds=i // 2)
+        yield BenchItem(created_at=created, updated_at=created, title=f"Item {i}", metadata={"n": i})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+    if not args.dsn:
+        raise SystemExit("❌ Pass --dsn or set DATABASE_URL")
+
+    db = get_db()
+    if not db.initialize(args.dsn):
+        raise SystemExit("❌ Could not connect; pass --dsn or set DATABASE_URL")
+    db.execute(SCHEMA_SQL)
+
+    repo = BenchItemRepository(db=db, cache=QueryCache(enabled=False))
+    try:
+        start = time.perf_counter()
+        repo.copy_from_iter(items(args.rows))
+        db.execute(INDEX_SQL)
+        print(f"Loaded {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        depths = sorted({d for d in (0, 1_000, 10_000, 100_000, args.rows // 2, args.rows - args.page)
+                         if 0 <= d <= args.rows - args.page})
+        rows = []
+        for depth in depths:
+            after = None
+            if depth:
+                # Key of the last row of the previous page (untimed)
+                last = db.fetch_one(
+                    f"SELECT created_at, id FROM {repo.table_name} "
+                    f"ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET %s",
+                    (depth - 1,),
+                )
+                after = (last["created_at"], last["id"])
+
+            offset_page = repo.find_all(limit=args.page, offset=depth, order_by="created_at DESC, id")
+            keyset_page, _ = repo.find_page(after=after, limit=args.page)
+            assert [m.id for m in keyset_page] == [m.id for m in offset_page], "pages differ"
+
+            offset = summarize(time_calls(
+                lambda: repo.find_all(limit=args.page, offset=depth, order_by="created_at DESC, id"),
+                repeat=args.samples, warmup=2,
+            ))
+            keyset = summarize(time_calls(
+                lambda: repo.find_page(after=after, limit=args.page),
+                repeat=args.samples, warmup=2,
+            ))
+            rows.append({
+                "depth": depth,
+                "offset_p50_ms": offset["p50_ms"],
+                "offset_p99_ms": offset["p99_ms"],
+                "keyset_p50_ms": keyset["p50_ms"],
+                "keyset_p99_ms": keyset["p99_ms"],
+                "speedup": f"{offset['p50_ms'] / keyset['p50_ms']:.1f}x",
+            })
+        print_table(f"One page of {args.page} rows at depth ({args.rows:,} rows)", rows)
+
+        scans = []
+        for name, scan in (
+            ("fetch_all", lambda: sum(1 for _ in map(repo._to_model, db.fetch_all(f"SELECT * FROM {repo.table_name}")))),
+            ("iter_by", lambda: sum(1 for _ in repo.iter_by(batch_size=2000))),
+        ):
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = scan()
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            scans.append({
+                "method": name,
+                "rows": count,
+                "seconds": seconds,
+                "rows_per_sec": f"{count / seconds:,.0f}",
+                "peak_mb": peak / 1024 / 1024,
+            })
+        print_table("Full scan", scans)
+    finally:
+        db.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
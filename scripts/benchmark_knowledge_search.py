@@ -0,0 +1,140 @@
+"""
+LABBAIK AI - Knowledge Search Benchmark
+=======================================
+Per-query latency of ``search_knowledge_base`` (guides + phrases + FAQs)
+on the prebuilt inverted index (with its result cache cleared before every
+query, and with repeated queries served from it) vs. the previous
+implementation, which rebuilt the item lists and lower-cased every field on
+every call (inlined below as the baseline).
+
+Usage:
+    python scripts/benchmark_knowledge_search.py [--repeat 2000]
+"""
+
+import argparse
+import time
+
+from bench_utils import time_calls, summarize, print_table
+
+from data.knowledge import (
+    get_all_faqs,
+    get_all_guides,
+    get_all_phrases,
+    build_knowledge_index,
+    get_knowledge_index,
+    search_knowledge_base,
+)
+
+QUERIES = [
+    "miqat",
+    "dam",
+    "haid",
+    "ihram",
+    "sa'i",
+    "larangan ihram",
+    "vaksin meningitis",
+    "terima kasih",
+    "Apa itu Umrah?",
+    "Doa saat tawaf di Multazam",
+]
+
+
+# ==================== BASELINE (previous scans) ====================
+
+def scan_guides(query):
+    query_lower = query.lower()
+    matches = [
+        (topic, content, content.lower().count(query_lower))
+        for topic, content in get_all_guides().items()
+    ]
+    matches = [m for m in matches if m[2] > 0]
+    matches.sort(key=lambda m: m[2], reverse=True)
+    return [(topic, content) for topic, content, _ in matches]
+
+
+def scan_phrases(query):
+    query = query.lower()
+    return [
+        phrase for phrase in get_all_phrases()
+        if (query in phrase.arabic or
+            query in phrase.transliteration.lower() or
+            query in phrase.meaning_id.lower() or
+            query in phrase.meaning_en.lower())
+    ]
+
+
+def scan_faqs(query):
+    query = query.lower()
+    results = []
+    for faq in get_all_faqs():
+        score = 0
+        for kw in faq.keywords:
+            if kw in query or query in kw:
+                score += 2
+        if query in faq.question.lower():
+            score += 3
+        if query in faq.answer.lower():
+            score += 1
+        if score > 0:
+            results.append((faq, score))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return [f for f, _ in results]
+
+
+def scan_knowledge_base(query, limit=10):
+    return {
+        "guides": [
+            {"topic": topic, "preview": content[:200]}
+            for topic, content in scan_guides(query)[:limit]
+        ],
+        "phrases": [p.to_dict() for p in scan_phrases(query)[:limit]],
+        "faqs": [f.to_dict() for f in scan_faqs(query)[:limit]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_knowledge_index()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    shared = get_knowledge_index()
+
+    def uncached(query):
+        shared._cache.clear()
+        return search_knowledge_base(query)
+
+    rows = []
+    for name, fn in (
+        ("scan (old)", scan_knowledge_base),
+        ("inverted index", uncached),
+        ("inverted index, repeated query", search_knowledge_base),
+    ):
+        state = {"i": 0}
+
+        def run():
+            fn(QUERIES[state["i"] % len(QUERIES)])
+            state["i"] += 1
+
+        stats = summarize(time_calls(run, repeat=args.repeat))
+        found = sum(
+            sum(len(v) for v in fn(q).values()) > 0 for q in QUERIES
+        )
+        rows.append({
+            "search": name,
+            "queries_with_hits": f"{found}/{len(QUERIES)}",
+            "p50_us": stats["p50_ms"] * 1000,
+            "p99_us": stats["p99_ms"] * 1000,
+        })
+
+    print_table(
+        f"search_knowledge_base ({len(index)} items, index build {build_ms:.1f}ms)",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+LABBAIK AI - Knowledge Startup Benchmark
+========================================
+Measures, in fresh interpreter processes:
+
+* loading the knowledge search index (done on first search): building
+  it from the source modules vs. loading it from the snapshot
+* preparing the RAG knowledge (chunk every source unit and embed every
+  chunk, model load included) vs. reading chunks and embeddings from the
+  snapshot
+
+numpy is imported before the timer in the RAG cases.
+
+Usage:
+    python scripts/benchmark_knowledge_startup.py [--runs 5] [--skip-model]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_utils import PROJECT_ROOT, summarize, print_table
+
+INDEX_BUILD = """
+import time
+from data.knowledge import search_index
+search_index.stem.cache_clear()  # As on a first build
+start = time.perf_counter()
+search_index.build_knowledge_index()
+print((time.perf_counter() - start) * 1000)
+"""
+
+INDEX_SNAPSHOT = """
+import time
+from data.knowledge.snapshot import load_knowledge_index
+start = time.perf_counter()
+load_knowledge_index()
+print((time.perf_counter() - start) * 1000)
+"""
+
+PREPARE_FROM_SOURCES = """
+import time
+import numpy
+from data.knowledge import get_knowledge_sources
+from services.ai.chunking import MarkdownChunker
+from services.ai.rag_service import LocalEmbeddingService
+start = time.perf_counter()
+chunker = MarkdownChunker(max_tokens=200, overlap_tokens=30)
+chunks = [piece.text for source in get_knowledge_sources() for piece in chunker.chunk(source["text"])]
+LocalEmbeddingService().embed(chunks)
+print((time.perf_counter() - start) * 1000)
+"""
+
+PREPARE_FROM_SNAPSHOT = """
+import os, time
+import numpy
+from data.knowledge import KnowledgeSnapshot
+from services.ai.rag_service import LocalEmbeddingService
+start = time.perf_counter()
+snapshot = KnowledgeSnapshot.open(os.environ["LABBAIK_KNOWLEDGE_SNAPSHOT"])
+chunks = [record["text"] for record in snapshot.chunks]
+service = LocalEmbeddingService()
+service.seed(chunks, snapshot.embeddings())
+service.embed(chunks)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def run_child(code: str, snapshot_path: str) -> float:
+    """Run ``code`` in a fresh interpreter and return the ms it prints."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    env["LABBAIK_KNOWLEDGE_SNAPSHOT"] = snapshot_path
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def build(path: str, with_model: bool):
+    """Build the snapshot used by the snapshot cases."""
+    from data.knowledge import build_snapshot
+    from services.ai.chunking import MarkdownChunker
+
+    embedder = None
+    if with_model:
+        from services.ai.rag_service import LocalEmbeddingService
+        embedder = LocalEmbeddingService()
+    build_snapshot(path, chunker=MarkdownChunker(max_tokens=200, overlap_tokens=30),
+                   embedder=embedder).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-model", action="store_true",
+                        help="Only measure the search index")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "knowledge_snapshot.bin")
+        build(snapshot_path, with_model=not args.skip_model)
+        # A path that cannot be created forces the build-from-source path
+        unusable_path = os.path.join(os.devnull, "knowledge_snapshot.bin")
+
+        cases = [
+            ("search index: build", INDEX_BUILD, unusable_path),
+            ("search index: snapshot", INDEX_SNAPSHOT, snapshot_path),
+        ]
+        if not args.skip_model:
+            cases += [
+                ("chunk + embed sources", PREPARE_FROM_SOURCES, unusable_path),
+                ("chunks + embeddings from snapshot", PREPARE_FROM_SNAPSHOT, snapshot_path),
+            ]
+
+        rows = []
+        for name, code, path in cases:
+            samples = [run_child(code, path) for _ in range(args.runs)]
+            rows.append({"case": name, "runs": args.runs, **summarize(samples)})
+
+        size_kb = os.path.getsize(snapshot_path) / 1024
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(f"Knowledge startup (snapshot {size_kb:.0f} KB)", rows)
+
+
+if __name__ == "__main__":
+    main()
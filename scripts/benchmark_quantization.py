@@ -0,0 +1,139 @@
+"""
+LABBAIK AI - int8 Quantization Benchmark
+========================================
+Recall@k, resident memory and search latency of NumpyVectorStore with
+int8 codes (with and without exact rerank) against the float32 index, on
+the real knowledge base. FAQ questions and a few free-form queries are
+used as probes; recall is measured against the float32 top-k.
+
+``--scale-rows`` adds noisy copies of the knowledge base vectors to show
+how memory and recall behave at user-generated-content scale.
+
+Usage:
+    python scripts/benchmark_quantization.py [--top-k 5] [--scale-rows 50000]
+"""
+
+import argparse
+import tempfile
+
+import numpy as np
+
+from bench_utils import time_calls, summarize, print_table
+
+from data.knowledge import get_knowledge_sources
+from data.knowledge.faq import get_all_faqs
+from services.ai.rag_service import RAGService, LocalEmbeddingService, NumpyVectorStore
+from services.ai.indexing import KnowledgeIndexer
+
+EXTRA_QUERIES = [
+    "miqat",
+    "dam",
+    "haid thawaf",
+    "Doa saat sa'i antara Shafa dan Marwah",
+    "Larangan ihram bagi wanita",
+    "Vaksin meningitis",
+    "Cara tahallul",
+]
+
+
+def build_store(embedder, chunks, quantization, rerank_factor, extra_rows=None):
+    store = NumpyVectorStore(
+        persist_directory=tempfile.mkdtemp(prefix="labbaik-q8-"),
+        embedding_service=embedder,
+        quantization=quantization,
+        rerank_factor=rerank_factor,
+    )
+    store.initialize()
+    store.add_documents(chunks)
+
+    if extra_rows is not None:
+        # Append synthetic rows directly; they only serve as distractors
+        store._reserve(len(extra_rows), extra_rows.shape[1])
+        start = store._size
+        store._matrix[start:start + len(extra_rows)] = extra_rows
+        for i in range(len(extra_rows)):
+            doc_id = f"synthetic-{i}"
+            store._ids.append(doc_id)
+            store._contents.append("")
+            store._metadatas.append({"source": "synthetic"})
+            store._id_to_row[doc_id] = start + i
+        store._size += len(extra_rows)
+        store._rebuild_masks()
+        store._quantize()
+        store._persist()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale-rows", type=int, default=0,
+                        help="Synthetic distractor rows to append")
+    args = parser.parse_args()
+
+    embedder = LocalEmbeddingService(cache_dir=tempfile.mkdtemp(prefix="labbaik-emb-"))
+    rag = RAGService(chat_service=None, vector_store=NumpyVectorStore(embedding_service=embedder))
+    indexer = KnowledgeIndexer(rag, manifest_path=tempfile.mktemp(suffix=".json"))
+    chunks = list(indexer.build_chunks(get_knowledge_sources()).values())
+
+    queries = [faq.question for faq in get_all_faqs()] + EXTRA_QUERIES
+    embedder.embed(queries)  # Prime the cache so timings exclude the model
+
+    extra_rows = None
+    if args.scale_rows:
+        base = NumpyVectorStore._normalize(embedder.embed([c.content for c in chunks]))
+        rng = np.random.default_rng(0)
+        picks = base[rng.integers(0, len(base), args.scale_rows)]
+        extra_rows = NumpyVectorStore._normalize(
+            picks + rng.normal(0, 0.05, picks.shape).astype(np.float32)
+        )
+
+    configs = [
+        ("float32", None, 1),
+        ("int8 no rerank", "int8", 1),
+        ("int8 rerank x2", "int8", 2),
+        ("int8 rerank x4", "int8", 4),
+    ]
+
+    reference = None
+    rows = []
+    for name, quantization, factor in configs:
+        store = build_store(embedder, chunks, quantization, factor, extra_rows)
+        results = [
+            [doc.id for doc in store.search(q, top_k=args.top_k).documents]
+            for q in queries
+        ]
+        if reference is None:
+            reference = results
+
+        recall = np.mean([
+            len(set(got) & set(ref)) / max(1, len(ref))
+            for got, ref in zip(results, reference)
+        ])
+
+        state = {"i": 0}
+
+        def run_query():
+            store.search(queries[state["i"] % len(queries)], top_k=args.top_k)
+            state["i"] += 1
+
+        latency = summarize(time_calls(run_query, args.repeat))
+        memory = store.memory_usage()
+        rows.append({
+            "mode": name,
+            f"recall@{args.top_k}": float(recall),
+            "resident_kb": memory["resident_bytes"] / 1024,
+            "p50_ms": latency["p50_ms"],
+            "p99_ms": latency["p99_ms"],
+        })
+
+    print_table(
+        f"int8 quantization ({len(chunks) + args.scale_rows} rows, "
+        f"{len(queries)} queries, top_k={args.top_k})",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
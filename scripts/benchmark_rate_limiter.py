@@ -0,0 +1,92 @@
+"""
+LABBAIK AI - RateLimiter Micro-Benchmark
+========================================
+Per-call cost of the rate limit check as the number of requests inside the
+one-minute window grows, for the deque-based RateLimiter and the previous
+list-rebuilding implementation (inlined below as the baseline).
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--repeat 2000]
+"""
+
+import argparse
+from datetime import datetime
+
+from bench_utils import time_calls, summarize, print_table
+
+from services.ai.base import RateLimiter
+
+WINDOW_SIZES = [100, 1000, 5000, 20000]
+
+
+class ListRateLimiter:
+    """The pre-deque implementation: rebuilds both lists on every check."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_timestamps = []
+        self._token_usage = []
+
+    def can_proceed(self, estimated_tokens: int = 0):
+        now = datetime.utcnow()
+        cutoff = now.timestamp() - 60
+        self._request_timestamps = [
+            ts for ts in self._request_timestamps if ts.timestamp() > cutoff
+        ]
+        self._token_usage = [
+            (ts, tokens) for ts, tokens in self._token_usage if ts.timestamp() > cutoff
+        ]
+        if len(self._request_timestamps) >= self.requests_per_minute:
+            return False, 0
+        total_tokens = sum(tokens for _, tokens in self._token_usage)
+        if total_tokens + estimated_tokens > self.tokens_per_minute:
+            return False, 0
+        return True, 0
+
+    def record_request(self, tokens_used: int = 0):
+        now = datetime.utcnow()
+        self._request_timestamps.append(now)
+        if tokens_used > 0:
+            self._token_usage.append((now, tokens_used))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = []
+    for size in WINDOW_SIZES:
+        # Limits far above the window so every call does the full check
+        limits = (size * 10, size * 10000)
+
+        legacy = ListRateLimiter(*limits)
+        for _ in range(size):
+            legacy.record_request(100)
+
+        limiter = RateLimiter(*limits)
+        for _ in range(size):
+            limiter.record_request(100)
+
+        # Baseline cost grows with the window, so cap its repeats
+        legacy_repeat = max(20, min(args.repeat, 200000 // size))
+
+        for name, fn, repeat in (
+            ("list (old)", lambda: legacy.can_proceed(100), legacy_repeat),
+            ("deque can_proceed", lambda: limiter.can_proceed(100), args.repeat),
+            ("deque try_acquire", lambda: limiter.try_acquire(100), args.repeat),
+        ):
+            stats = summarize(time_calls(fn, repeat=repeat))
+            rows.append({
+                "window": size,
+                "limiter": name,
+                "p50_us": stats["p50_ms"] * 1000,
+                "p99_us": stats["p99_ms"] * 1000,
+            })
+
+    print_table("Rate limit check cost vs. requests in window", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+LABBAIK AI - Cross-Encoder Rerank Benchmark
+===========================================
+Runs every FAQ question against the real knowledge base and reports, for
+first-stage retrieval alone and with the cross-encoder second stage:
+
+* hit@1: the top chunk is the FAQ entry the question came from
+* per-query latency
+* how often reranking changed the top-1, and how often the budget expired
+
+Usage:
+    python scripts/benchmark_rerank.py [--candidates 20] [--budget-ms 150]
+"""
+
+import time
+import argparse
+import tempfile
+
+from bench_utils import summarize, print_table
+
+from core.config import get_settings
+from data.knowledge.faq import get_all_faqs
+from services.ai.rag_service import RAGService, LocalEmbeddingService, NumpyVectorStore
+from services.ai.reranker import CrossEncoderReranker
+from services.ai.indexing import KnowledgeIndexer
+
+
+def evaluate(rag: RAGService, faqs) -> dict:
+    hits, samples = 0, []
+    for faq in faqs:
+        start = time.perf_counter()
+        result = rag.retrieve(faq.question)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.documents and result.documents[0].metadata.get("source") == f"faq:{faq.id}":
+            hits += 1
+    return {"hit@1": hits / len(faqs), **summarize(samples)}
+
+
+def main():
+    ai = get_settings().ai
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=ai.rerank_model)
+    parser.add_argument("--candidates", type=int, default=ai.rerank_candidates)
+    parser.add_argument("--budget-ms", type=float, default=ai.rerank_budget_ms)
+    parser.add_argument("--top-k", type=int, default=ai.top_k_results)
+    args = parser.parse_args()
+
+    embedder = LocalEmbeddingService(cache_dir=tempfile.mkdtemp(prefix="labbaik-emb-"))
+    store = NumpyVectorStore(
+        persist_directory=tempfile.mkdtemp(prefix="labbaik-rerank-"),
+        embedding_service=embedder,
+    )
+    store.initialize()
+
+    baseline = RAGService(chat_service=None, vector_store=store, top_k=args.top_k)
+    indexer = KnowledgeIndexer(baseline, manifest_path=tempfile.mktemp(suffix=".json"))
+    indexer.run()
+
+    faqs = get_all_faqs()
+    embedder.embed([faq.question for faq in faqs])  # Exclude embedding from timings
+
+    reranker = CrossEncoderReranker(
+        model_name=args.model, candidates=args.candidates, budget_ms=args.budget_ms
+    )
+    loading = reranker.warmup()
+    if loading is not None:
+        loading.result()
+    if not reranker.ready:
+        print(f"❌ Could not load {args.model}: {reranker.get_stats()['load_error']}")
+        return 1
+    reranked = RAGService(
+        chat_service=None, vector_store=store, top_k=args.top_k, reranker=reranker
+    )
+    # One untimed pass so lazy kernel initialisation is not counted
+    reranked.retrieve(faqs[0].question)
+    reranker.queries = reranker.reranked = reranker.top1_changed = 0
+    reranker.timeouts = reranker.skipped = 0
+
+    rows = [
+        {"stage": "first-stage", **evaluate(baseline, faqs)},
+        {"stage": f"rerank top-{args.candidates}", **evaluate(reranked, faqs)},
+    ]
+    print_table(
+        f"Rerank ({len(faqs)} FAQ questions, {store.count()} chunks, "
+        f"budget {args.budget_ms:.0f}ms)",
+        rows,
+    )
+
+    stats = reranker.get_stats()
+    print(
+        f"\nrerank p50 {stats['latency']['p50_ms']:.1f}ms, "
+        f"p99 {stats['latency']['p99_ms']:.1f}ms; "
+        f"top-1 changed {stats['top1_changed']}/{stats['reranked']} "
+        f"({stats['top1_changed_rate']:.0%}); "
+        f"timeouts {stats['timeouts']}, skipped {stats['skipped']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+LABBAIK AI - Fuzzy Transliteration Benchmark
+============================================
+Spelling variants and typos of phrase / doa transliterations, looked up
+with the previous exact substring match and with the trigram index.
+Reports hit@3 and lookup latency over the full phrase + doa set.
+
+Usage:
+    python scripts/benchmark_transliteration.py [--repeat 2000]
+"""
+
+import argparse
+
+from bench_utils import time_calls, summarize, print_table
+
+from data.knowledge import get_all_phrases
+from data.knowledge.transliteration import TransliterationIndex, LABEL_WEIGHT
+from features.doa_player import UMRAH_DOAS
+
+# (query, id expected in the top 3)
+VARIANTS = [
+    ("labbaika", "ihram_001"),
+    ("labaik", "ihram_002"),
+    ("labbayk allahumma", "ihram_002"),
+    ("sa'i", "sai_001"),
+    ("sai", "sai_001"),
+    ("sa'ie", "sai_001"),
+    ("syukron", "greet_005"),
+    ("sukran", "greet_005"),
+    ("jazakallah khoiron", "greet_007"),
+    ("insyaallah", "greet_008"),
+    ("masyaallah", "greet_009"),
+    ("asalamualaikum", "greet_001"),
+    ("alhamdulilah", "greet_010"),
+    ("rabbana aatina", "tawaf_002"),
+    ("bismilah", "tahallul_001"),
+    ("tsalasah", "num_003"),
+    ("talbiyah", "doa_011"),
+    ("labaik allahuma labaik", "doa_011"),
+    ("bismillahi tawakaltu", "doa_001"),
+    ("allohummaftah", "doa_040"),
+]
+
+
+def item_id(item) -> str:
+    return item.id
+
+
+def substring_search(items, query):
+    """The previous behaviour: case-insensitive substring on the transliteration."""
+    query = query.lower()
+    return [
+        item for item in items
+        if query in getattr(item, "transliteration", getattr(item, "latin", "")).lower()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = list(get_all_phrases()) + list(UMRAH_DOAS)
+
+    index = TransliterationIndex()
+    for phrase in get_all_phrases():
+        index.add(phrase, [(phrase.transliteration, 1.0), (phrase.category, LABEL_WEIGHT)])
+    for doa in UMRAH_DOAS:
+        index.add(doa, [(doa.latin, 1.0), (doa.name, LABEL_WEIGHT)])
+
+    searches = {
+        "substring (old)": lambda q: substring_search(items, q)[:3],
+        "trigram index": lambda q: [hit.item for hit in index.search(q, limit=3)],
+    }
+
+    rows = []
+    for name, search in searches.items():
+        hits = sum(
+            expected in [item_id(item) for item in search(query)]
+            for query, expected in VARIANTS
+        )
+        state = {"i": 0}
+
+        def run():
+            search(VARIANTS[state["i"] % len(VARIANTS)][0])
+            state["i"] += 1
+
+        stats = summarize(time_calls(run, repeat=args.repeat))
+        rows.append({
+            "search": name,
+            "hit@3": f"{hits}/{len(VARIANTS)}",
+            "p50_us": stats["p50_ms"] * 1000,
+            "p99_us": stats["p99_ms"] * 1000,
+        })
+
+    print_table(f"Transliteration lookup ({len(items)} phrases + duas)", rows)
+
+    misses = [
+        (query, expected) for query, expected in VARIANTS
+        if expected not in [item_id(h.item) for h in index.search(query, limit=3)]
+    ]
+    for query, expected in misses:
+        print(f"  miss: {query!r} (expected {expected})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+LABBAIK AI - Vector Store Benchmark
+===================================
+Compares search latency of ChromaVectorStore and NumpyVectorStore on the
+real knowledge base.
+
+Query embeddings are served from the embedding cache after warmup, so the
+numbers isolate the index/query path of each backend.
+
+Usage: python scripts/benchmark_vector_store.py [--repeat 500]
+"""
+
+import argparse
+import tempfile
+
+from bench_utils import time_calls, summarize, print_table
+
+from data.knowledge import get_full_knowledge_base
+from services.ai.chunking import MarkdownChunker
+from services.ai.rag_service import (
+    LocalEmbeddingService,
+    ChromaVectorStore,
+    NumpyVectorStore,
+)
+
+QUERIES = [
+    "miqat",
+    "dam",
+    "haid thawaf",
+    "Apa saja rukun umrah?",
+    "Doa saat sa'i antara Shafa dan Marwah",
+    "Larangan ihram bagi wanita",
+    "Vaksin meningitis",
+    "Cara tahallul",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="labbaik-emb-")
+    embedder = LocalEmbeddingService(cache_dir=cache_dir)
+
+    chunks = MarkdownChunker().split(get_full_knowledge_base())
+    metadatas = [{"source": "knowledge_base", "category": "general"} for _ in chunks]
+    print(f"Indexing {len(chunks)} chunks")
+
+    stores = {
+        "chroma": ChromaVectorStore(embedding_service=embedder),
+        "numpy": NumpyVectorStore(
+            persist_directory=tempfile.mkdtemp(prefix="labbaik-vec-"),
+            embedding_service=embedder,
+        ),
+    }
+
+    rows = []
+    for name, store in stores.items():
+        if not store.initialize():
+            print(f"Skipping {name}: backend unavailable")
+            continue
+        store.clear()
+        store.add_texts(chunks, metadatas)
+
+        # Prime query embeddings in the cache
+        for q in QUERIES:
+            store.search(q, top_k=args.top_k)
+
+        state = {"i": 0}
+
+        def run_query():
+            q = QUERIES[state["i"] % len(QUERIES)]
+            state["i"] += 1
+            store.search(q, top_k=args.top_k)
+
+        def run_filtered():
+            store.search(QUERIES[0], top_k=args.top_k, filter_metadata={"category": "general"})
+
+        rows.append({"backend": name, "filter": "none", **summarize(time_calls(run_query, args.repeat))})
+        rows.append({"backend": name, "filter": "category", **summarize(time_calls(run_filtered, args.repeat))})
+
+    print_table(f"Vector search latency ({len(chunks)} docs, top_k={args.top_k})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+LABBAIK AI - Build Knowledge Snapshot
+=====================================
+Compiles data/knowledge into the binary snapshot loaded at startup:
+source units, search index, chunks for the configured chunker and chunk
+embeddings for the configured model.
+
+The app rebuilds a stale snapshot by itself (without embeddings); run this
+after editing the knowledge modules to ship one with embeddings included.
+
+Usage: python scripts/build_knowledge_snapshot.py [--no-embeddings] [--force]
+"""
+
+import os
+import sys
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.config import Settings
+from data.knowledge import build_snapshot, load_or_build_snapshot
+from services.ai.chunking import MarkdownChunker
+from services.ai.rag_service import LocalEmbeddingService
+
+
+def main() -> int:
+    settings = Settings.from_yaml(os.path.join(PROJECT_ROOT, "config", "settings.yaml"))
+    ai = settings.ai
+
+    parser = argparse.ArgumentParser(description="Build the knowledge base snapshot")
+    parser.add_argument("--path", default=ai.knowledge_snapshot_path)
+    parser.add_argument("--no-embeddings", action="store_true",
+                        help="Only items, search index and chunks")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if current")
+    args = parser.parse_args()
+
+    chunker = MarkdownChunker(max_tokens=ai.chunk_size, overlap_tokens=ai.chunk_overlap)
+    embedder = None
+    if not args.no_embeddings:
+        embedder = LocalEmbeddingService(
+            model_name=ai.embedding_model,
+            cache_dir=ai.embedding_cache_dir or None,
+        )
+
+    if args.force:
+        snapshot = build_snapshot(args.path, chunker=chunker, embedder=embedder)
+    else:
+        snapshot = load_or_build_snapshot(args.path, chunker=chunker, embedder=embedder)
+    if snapshot is None:
+        print(f"❌ Could not write {args.path or '(no ai.knowledge_snapshot_path)'}")
+        return 1
+
+    header = snapshot.header
+    embedding = header.get("embedding") or {}
+    print(f"✅ {snapshot.path} ({os.path.getsize(snapshot.path) / 1024:.0f} KB)")
+    print(f"   checksum  {snapshot.checksum[:16]}")
+    print(f"   sources   {len(snapshot.sources)}")
+    print(f"   chunks    {len(snapshot.chunks)} {header.get('chunk_config') or ''}")
+    print(f"   vectors   {embedding.get('rows', 0)} x {embedding.get('dim', 0)} "
+          f"{embedding.get('model', '')}")
+    snapshot.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
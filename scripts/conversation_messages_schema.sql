@@ -0,0 +1,65 @@
+-- =============================================================================
+-- LABBAIK AI v6.0 - Conversation Messages Schema
+-- =============================================================================
+-- Run this in Neon SQL Editor. Safe to run again: tables are created if
+-- missing and only conversations without rows in conversation_messages
+-- are migrated.
+-- =============================================================================
+
+-- Conversations (existing table; created here only for fresh databases)
+CREATE TABLE IF NOT EXISTS conversations (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id VARCHAR(36) NOT NULL,
+    title TEXT,
+    messages JSONB DEFAULT '[]'::jsonb,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    is_archived BOOLEAN DEFAULT false,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations(user_id, updated_at DESC);
+
+-- Conversation Messages (one row per message, append-only)
+CREATE TABLE IF NOT EXISTS conversation_messages (
+    id BIGSERIAL PRIMARY KEY,
+    conversation_id VARCHAR(36) NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    role VARCHAR(20) NOT NULL,
+    content TEXT NOT NULL,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- History pages are read newest first by id within a conversation
+CREATE INDEX IF NOT EXISTS idx_conversation_messages_conv
+    ON conversation_messages(conversation_id, id DESC);
+
+-- =============================================================================
+-- MIGRATION: conversations.messages JSON -> conversation_messages
+-- =============================================================================
+-- Legacy messages without a role are imported as 'user' and non-object
+-- metadata as {}; a missing or malformed timestamp falls back to the
+-- conversation's created_at, so one bad row does not abort the statement.
+
+INSERT INTO conversation_messages (conversation_id, role, content, metadata, created_at)
+SELECT
+    c.id,
+    LEFT(COALESCE(NULLIF(m.value->>'role', ''), 'user'), 20),
+    COALESCE(m.value->>'content', ''),
+    CASE WHEN jsonb_typeof(m.value->'metadata') = 'object'
+        THEN m.value->'metadata' ELSE '{}'::jsonb END,
+    CASE WHEN m.value->>'timestamp' ~
+            '^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])([T ]([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?)?([+-]\d{2}(:?\d{2})?|Z)?$'
+        THEN (m.value->>'timestamp')::timestamp
+        ELSE c.created_at END
+FROM conversations c
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(c.messages::jsonb) = 'array' THEN c.messages::jsonb ELSE '[]'::jsonb END
+) WITH ORDINALITY AS m(value, position)
+WHERE NOT EXISTS (
+    SELECT 1 FROM conversation_messages cm WHERE cm.conversation_id = c.id
+)
+ORDER BY c.id, m.position;
+
+-- After verifying the copy, the JSON column can be emptied:
+-- UPDATE conversations SET messages = '[]'::jsonb;
@@ -0,0 +1,26 @@
+-- =============================================================================
+-- LABBAIK AI v6.0 - Keyset Pagination Indexes
+-- =============================================================================
+-- Run this in Neon SQL Editor. Safe to run again.
+--
+-- BaseRepository.find_page orders by (order_by, id) and seeks with
+-- WHERE (created_at, id) < (%s, %s); each index below lets a page of any
+-- depth be read with one index range scan. Conditions passed to find_page
+-- come first in the index (e.g. is_active for find_active_users).
+-- =============================================================================
+
+-- Users: newest first, and active users (UserRepository.find_active_users)
+CREATE INDEX IF NOT EXISTS idx_users_created_id
+    ON users(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_users_active_created_id
+    ON users(is_active, created_at DESC, id DESC);
+
+-- Conversations
+CREATE INDEX IF NOT EXISTS idx_conversations_created_id
+    ON conversations(created_at DESC, id DESC);
+
+-- Bookings: newest first, and by status (pending/confirmed queues)
+CREATE INDEX IF NOT EXISTS idx_bookings_created_id
+    ON bookings(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_bookings_status_created_id
+    ON bookings(status, created_at DESC, id DESC);
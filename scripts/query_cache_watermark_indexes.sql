@@ -0,0 +1,27 @@
+-- =============================================================================
+-- LABBAIK AI v6.0 - Query Cache Watermark Indexes
+-- =============================================================================
+-- Run this in Neon SQL Editor. Safe to run again.
+--
+-- QueryCache re-reads a watermark per cached table every
+-- watermark_seconds to catch writes made outside the app. Repositories use
+-- SELECT MAX(updated_at), price tables SELECT MAX(scraped_at); with the
+-- indexes below each is answered from the end of a B-tree instead of a
+-- table scan.
+-- =============================================================================
+
+-- BaseRepository tables (DEFAULT_WATERMARK_SQL)
+CREATE INDEX IF NOT EXISTS idx_users_updated_at
+    ON users(updated_at);
+CREATE INDEX IF NOT EXISTS idx_conversations_updated_at
+    ON conversations(updated_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_updated_at
+    ON bookings(updated_at);
+
+-- Price tables written by the n8n workflow (PriceRepository.WATERMARK_SQL)
+CREATE INDEX IF NOT EXISTS idx_prices_packages_scraped_at
+    ON prices_packages(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_prices_hotels_scraped_at
+    ON prices_hotels(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_prices_flights_scraped_at
+    ON prices_flights(scraped_at);
@@ -0,0 +1,89 @@
+"""
+LABBAIK AI - Knowledge Reindex
+==============================
+Incrementally syncs the RAG indexes with data/knowledge.
+
+Only chunks whose content hash changed are embedded; removed chunks are
+deleted. Prints chunks added/removed/unchanged and wall time.
+
+Usage: python scripts/reindex_knowledge.py [--backend numpy] [--dry-run]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.config import Settings
+from services.ai.rag_service import RAGService, LocalEmbeddingService, create_vector_store
+from services.ai.sparse_index import BM25Index
+from services.ai.chunking import MarkdownChunker
+from services.ai.indexing import KnowledgeIndexer
+
+
+def main() -> int:
+    settings = Settings.from_yaml(os.path.join(PROJECT_ROOT, "config", "settings.yaml"))
+    ai = settings.ai
+
+    parser = argparse.ArgumentParser(description="Incrementally reindex the knowledge base")
+    parser.add_argument("--backend", default=ai.vector_store_backend, choices=["chroma", "numpy"])
+    parser.add_argument("--persist-dir", default=ai.vector_store_dir)
+    parser.add_argument("--hybrid", action="store_true", default=ai.hybrid_retrieval,
+                        help="Also maintain the BM25 index")
+    parser.add_argument("--quantization", default=ai.vector_store_quantization,
+                        choices=["none", "int8"], help="numpy backend storage mode")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the diff")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    embedding_service = LocalEmbeddingService(
+        model_name=ai.embedding_model,
+        cache_dir=ai.embedding_cache_dir or None,
+    )
+    store_options = {}
+    if args.backend == "numpy":
+        store_options = {
+            "quantization": args.quantization,
+            "rerank_factor": ai.vector_rerank_factor,
+        }
+    vector_store = create_vector_store(
+        args.backend,
+        persist_directory=args.persist_dir,
+        embedding_service=embedding_service,
+        **store_options,
+    )
+    sparse_index = (
+        BM25Index(persist_path=os.path.join(args.persist_dir, "bm25.npz"))
+        if args.hybrid else None
+    )
+
+    rag = RAGService(
+        chat_service=None,
+        vector_store=vector_store,
+        sparse_index=sparse_index,
+        chunker=MarkdownChunker(max_tokens=ai.chunk_size, overlap_tokens=ai.chunk_overlap),
+    )
+    if not vector_store.initialize():
+        print(f"❌ Could not initialize {args.backend} vector store")
+        return 1
+
+    indexer = KnowledgeIndexer(
+        rag,
+        manifest_path=os.path.join(args.persist_dir, f"manifest_{args.backend}.json"),
+        snapshot_path=ai.knowledge_snapshot_path or None,
+    )
+    report = indexer.run(dry_run=args.dry_run)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(f"✅ {report.summary()}")
+        print(f"   knowledge version: {report.knowledge_version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
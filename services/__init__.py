@@ -4,22 +4,53 @@ LABBAIK AI v6.0 - Services Package
 Business logic services.
 """
 
-from services.ai.chat_service import (
-    GroqChatService,
-    OpenAIChatService,
-    UnifiedChatService,
-)
-from services.ai.rag_service import (
-    RAGService,
-    LocalEmbeddingService,
-    ChromaVectorStore,
-)
-from services.ai.base import (
-    ChatMessage,
-    ChatCompletionRequest,
-    ChatCompletionResponse,
-    AIServiceFactory,
-)
+# AI services are imported lazily (PEP 562): rag_service pulls in numpy and
+# the vector store backends, and pages that never touch RAG should not pay
+# for that on every Streamlit rerun.
+_LAZY_IMPORTS = {
+    "GroqChatService": "services.ai.chat_service",
+    "OpenAIChatService": "services.ai.chat_service",
+    "UnifiedChatService": "services.ai.chat_service",
+    "RAGService": "services.ai.rag_service",
+    "RAGStreamEvent": "services.ai.rag_service",
+    "LocalEmbeddingService": "services.ai.rag_service",
+    "ChromaVectorStore": "services.ai.rag_service",
+    "NumpyVectorStore": "services.ai.rag_service",
+    "create_vector_store": "services.ai.rag_service",
+    "BM25Index": "services.ai.sparse_index",
+    "SemanticAnswerCache": "services.ai.answer_cache",
+    "KnowledgeIndexer": "services.ai.indexing",
+    "IndexReport": "services.ai.indexing",
+    "MarkdownChunker": "services.ai.chunking",
+    "ContextPacker": "services.ai.chunking",
+    "count_tokens": "services.ai.chunking",
+    "CoalescingChatService": "services.ai.coalescing",
+    "CrossEncoderReranker": "services.ai.reranker",
+    "IntentRouter": "services.ai.intent_router",
+    "IntentMatch": "services.ai.intent_router",
+    "HistoryCompactor": "services.ai.history",
+    "CompactedHistory": "services.ai.history",
+    "start_embedding_warmup": "services.ai.warmup",
+    "is_embedding_ready": "services.ai.warmup",
+    "ChatMessage": "services.ai.base",
+    "ChatCompletionRequest": "services.ai.base",
+    "ChatCompletionResponse": "services.ai.base",
+    "AIServiceFactory": "services.ai.base",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Cache so __getattr__ runs once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
 # Database services
 from services.database.repository import (
@@ -174,9 +205,27 @@ __all__ = [
     "GroqChatService",
     "OpenAIChatService",
     "UnifiedChatService",
+    "CoalescingChatService",
+    "CrossEncoderReranker",
+    "IntentRouter",
+    "IntentMatch",
+    "HistoryCompactor",
+    "CompactedHistory",
     "RAGService",
+    "RAGStreamEvent",
     "LocalEmbeddingService",
     "ChromaVectorStore",
+    "NumpyVectorStore",
+    "create_vector_store",
+    "BM25Index",
+    "SemanticAnswerCache",
+    "KnowledgeIndexer",
+    "IndexReport",
+    "MarkdownChunker",
+    "ContextPacker",
+    "count_tokens",
+    "start_embedding_warmup",
+    "is_embedding_ready",
     "ChatMessage",
     "ChatCompletionRequest",
     "ChatCompletionResponse",
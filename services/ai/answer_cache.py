@@ -0,0 +1,252 @@
+"""
+LABBAIK AI v6.0 - Semantic Answer Cache
+=======================================
+Caches RAG answers by question embedding so paraphrases of popular
+questions are served without another LLM completion.
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class CachedAnswer:
+    """A cached RAG answer."""
+    question: str
+    vector: Any            # Normalized float32 numpy vector
+    response: Any          # RAGResponse
+    scope: str             # Filter scope the answer was produced under
+    created_at: float      # time.monotonic()
+    size_bytes: int
+
+
+# =============================================================================
+# SEMANTIC ANSWER CACHE
+# =============================================================================
+
+class SemanticAnswerCache:
+    """
+    Nearest-question cache in front of ``RAGService.query``.
+
+    A lookup embeds the question, finds the most similar cached question in
+    the same scope and returns its stored response if the cosine similarity
+    clears ``similarity_threshold``. Entries are evicted LRU-first when the
+    entry or byte cap is exceeded, expire after ``ttl_seconds``, and are
+    dropped wholesale when the knowledge base version changes.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: int = 3600,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._bytes = 0
+        self._knowledge_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        # Stacked vectors for one matrix-vector product per lookup
+        self._matrix = None
+        self._matrix_keys: list = []
+
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ==================== HELPERS ====================
+
+    @staticmethod
+    def _normalize(vector):
+        import numpy as np
+
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _estimate_size(question: str, vector, response) -> int:
+        """Approximate memory footprint of an entry."""
+        size = sys.getsizeof(question) + vector.nbytes
+        size += sys.getsizeof(response.answer) + sys.getsizeof(response.context)
+        for source in response.sources:
+            size += sum(sys.getsizeof(v) for v in source.values())
+        return size
+
+    def _check_version(self, knowledge_version: Optional[str]):
+        """Drop everything when the knowledge base changed (lock held)."""
+        if knowledge_version != self._knowledge_version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info("Knowledge base changed, semantic answer cache invalidated")
+            self._entries.clear()
+            self._bytes = 0
+            self._matrix = None
+            self._knowledge_version = knowledge_version
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry.size_bytes
+            self._matrix = None
+
+    def _expire(self):
+        """Remove entries older than the TTL (lock held)."""
+        if not self.ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Insertion order is refreshed on hit, so scan all entries
+        for key in [k for k, e in self._entries.items() if e.created_at < cutoff]:
+            self._remove(key)
+
+    def _evict(self):
+        """Evict least-recently-used entries over the caps (lock held)."""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _stacked(self):
+        """Matrix of cached vectors in ``_matrix_keys`` order (lock held)."""
+        import numpy as np
+
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries.keys())
+            self._matrix = (
+                np.stack([self._entries[k].vector for k in self._matrix_keys])
+                if self._matrix_keys else None
+            )
+        return self._matrix
+
+    # ==================== PUBLIC API ====================
+
+    def lookup(
+        self,
+        vector,
+        scope: str = "",
+        knowledge_version: Optional[str] = None
+    ) -> Optional[Tuple[Any, float]]:
+        """
+        Find a cached answer for a question embedding.
+
+        Args:
+            vector: Question embedding
+            scope: Retrieval scope (e.g. serialized metadata filter)
+            knowledge_version: Current knowledge base version
+
+        Returns:
+            (RAGResponse, similarity) on hit, None on miss
+        """
+        import numpy as np
+
+        query = self._normalize(vector)
+
+        with self._lock:
+            self._check_version(knowledge_version)
+            self._expire()
+
+            matrix = self._stacked()
+            if matrix is None:
+                self.misses += 1
+                return None
+
+            similarities = matrix @ query
+            best_key, best_sim = None, -1.0
+            for i in np.argsort(-similarities):
+                key = self._matrix_keys[i]
+                if self._entries[key].scope == scope:
+                    best_key, best_sim = key, float(similarities[i])
+                    break
+
+            if best_key is None or best_sim < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.tokens_saved += entry.response.chat_response.total_tokens
+
+            chat_response = entry.response.chat_response
+            cached_chat = replace(chat_response, metadata={
+                **chat_response.metadata,
+                "semantic_cache_hit": True,
+                "cached_question": entry.question,
+                "similarity": best_sim,
+            })
+            return replace(entry.response, chat_response=cached_chat), best_sim
+
+    def store(
+        self,
+        question: str,
+        vector,
+        response,
+        scope: str = "",
+        knowledge_version: Optional[str] = None
+    ):
+        """Cache a freshly generated response."""
+        vector = self._normalize(vector)
+        key = f"{scope}\x00{question.strip().lower()}"
+
+        with self._lock:
+            self._check_version(knowledge_version)
+            self._remove(key)
+
+            entry = CachedAnswer(
+                question=question,
+                vector=vector,
+                response=response,
+                scope=scope,
+                created_at=time.monotonic(),
+                size_bytes=self._estimate_size(question, vector, response),
+            )
+            if entry.size_bytes > self.max_bytes:
+                return
+
+            self._entries[key] = entry
+            self._bytes += entry.size_bytes
+            self._matrix = None
+            self._evict()
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._matrix = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "llm_tokens_saved": self.tokens_saved,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
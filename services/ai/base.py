@@ -5,11 +5,16 @@ Abstract base classes for AI services with common functionality.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any, Generator, AsyncGenerator
+from typing import Optional, List, Dict, Any, Generator, AsyncGenerator, Deque, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import deque
 from enum import Enum
+import time
+import math
+import asyncio
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -212,8 +217,35 @@ class BaseEmbeddingService(BaseAIService):
 # RATE LIMITER
 # =============================================================================
 
+class RateReservation:
+    """Tokens reserved by ``RateLimiter.acquire``; settle with ``record_usage``."""
+    
+    __slots__ = ("bucket", "tokens")
+    
+    def __init__(self, bucket: Optional[List[Any]] = None, tokens: int = 0):
+        self.bucket = bucket    # [start, tokens, live] of the window bucket
+        self.tokens = tokens
+
+
 class RateLimiter:
-    """Token bucket rate limiter."""
+    """
+    Sliding-window rate limiter for requests and tokens per minute.
+    
+    Request times live in a deque of monotonic timestamps. Tokens are
+    summed per ``TOKEN_BUCKET_SECONDS`` bucket with a running total, so a
+    reservation is settled by adjusting its bucket in place and the wait
+    for tokens looks at no more than ``WINDOW_SECONDS / TOKEN_BUCKET_SECONDS``
+    buckets however many requests are in the window (token waits round up
+    to the end of a bucket). All methods are thread-safe; use
+    ``RateLimiter.shared`` so every session in the process draws from the
+    same provider budget.
+    """
+    
+    WINDOW_SECONDS = 60.0
+    TOKEN_BUCKET_SECONDS = 1.0
+    
+    _shared: Dict[str, "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
     
     def __init__(
         self,
@@ -222,50 +254,261 @@ class RateLimiter:
     ):
         self.requests_per_minute = requests_per_minute
         self.tokens_per_minute = tokens_per_minute
-        self._request_timestamps: List[datetime] = []
-        self._token_usage: List[tuple] = []  # (timestamp, tokens)
+        self._request_times: Deque[float] = deque()
+        self._token_buckets: Deque[List[Any]] = deque()  # [start, tokens, live]
+        self._token_sum = 0
+        self._lock = threading.Lock()
     
-    def can_proceed(self, estimated_tokens: int = 0) -> tuple[bool, float]:
+    @classmethod
+    def shared(
+        cls,
+        key: str,
+        requests_per_minute: int = 30,
+        tokens_per_minute: int = 100000
+    ) -> "RateLimiter":
+        """
+        Get the process-wide limiter for ``key`` (e.g. "groq:<model>").
+        
+        The limits of the first caller win.
+        """
+        with cls._shared_lock:
+            limiter = cls._shared.get(key)
+            if limiter is None:
+                limiter = cls(requests_per_minute, tokens_per_minute)
+                cls._shared[key] = limiter
+            return limiter
+    
+    # ==================== WINDOW ====================
+    
+    def _expire(self, now: float):
+        """Drop entries that left the window (lock held)."""
+        cutoff = now - self.WINDOW_SECONDS
+        while self._request_times and self._request_times[0] <= cutoff:
+            self._request_times.popleft()
+        # A bucket leaves once its last possible entry has
+        while self._token_buckets and self._token_buckets[0][0] + self.TOKEN_BUCKET_SECONDS <= cutoff:
+            bucket = self._token_buckets.popleft()
+            self._token_sum -= bucket[1]
+            bucket[2] = False
+    
+    def _wait_time(self, now: float, estimated_tokens: int) -> float:
+        """Seconds until a request of ``estimated_tokens`` fits (lock held)."""
+        wait = 0.0
+        
+        if len(self._request_times) >= self.requests_per_minute:
+            index = len(self._request_times) - self.requests_per_minute
+            wait = self._request_times[index] + self.WINDOW_SECONDS - now
+        
+        # A single request larger than the budget only needs an empty window
+        estimated_tokens = min(estimated_tokens, self.tokens_per_minute)
+        excess = self._token_sum + estimated_tokens - self.tokens_per_minute
+        if excess > 0:
+            # At most WINDOW_SECONDS / TOKEN_BUCKET_SECONDS + 1 buckets
+            freed = 0
+            for start, tokens, _ in self._token_buckets:
+                freed += tokens
+                if freed >= excess:
+                    wait = max(wait, start + self.TOKEN_BUCKET_SECONDS + self.WINDOW_SECONDS - now)
+                    break
+        
+        return max(0.0, wait)
+    
+    def _record(self, now: float, tokens: int, count_request: bool) -> RateReservation:
+        """Add to the window (lock held)."""
+        if count_request:
+            self._request_times.append(now)
+        if not tokens:
+            return RateReservation()
+        start = now - now % self.TOKEN_BUCKET_SECONDS
+        if not self._token_buckets or self._token_buckets[-1][0] != start:
+            self._token_buckets.append([start, 0, True])
+        bucket = self._token_buckets[-1]
+        bucket[1] += tokens
+        self._token_sum += tokens
+        return RateReservation(bucket, tokens)
+    
+    def _try_reserve(self, estimated_tokens: int) -> Tuple[float, Optional[RateReservation]]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            wait = self._wait_time(now, estimated_tokens)
+            if wait:
+                return wait, None
+            return 0.0, self._record(now, estimated_tokens, count_request=True)
+    
+    # ==================== PUBLIC API ====================
+    
+    def can_proceed(self, estimated_tokens: int = 0) -> Tuple[bool, float]:
         """
         Check if request can proceed.
         
         Returns:
             Tuple of (can_proceed, wait_seconds)
         """
-        now = datetime.utcnow()
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            wait = self._wait_time(now, estimated_tokens)
+            return wait == 0, wait
+    
+    def record_request(self, tokens_used: int = 0):
+        """Record a completed request."""
+        with self._lock:
+            self._record(time.monotonic(), tokens_used, count_request=True)
+    
+    def try_acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Reserve a request slot and ``estimated_tokens`` if they fit now.
         
-        # Clean old entries (older than 1 minute)
-        cutoff = now.timestamp() - 60
-        self._request_timestamps = [
-            ts for ts in self._request_timestamps 
-            if ts.timestamp() > cutoff
-        ]
-        self._token_usage = [
-            (ts, tokens) for ts, tokens in self._token_usage 
-            if ts.timestamp() > cutoff
-        ]
+        Returns:
+            0 when reserved, otherwise seconds to wait before retrying
+        """
+        return self._try_reserve(estimated_tokens)[0]
+    
+    def acquire(
+        self,
+        estimated_tokens: int = 0,
+        timeout: Optional[float] = None
+    ) -> Optional[RateReservation]:
+        """
+        Block until a slot is reserved.
         
-        # Check request limit
-        if len(self._request_timestamps) >= self.requests_per_minute:
-            oldest = min(self._request_timestamps)
-            wait_time = 60 - (now.timestamp() - oldest.timestamp())
-            return False, max(0, wait_time)
+        Args:
+            estimated_tokens: Tokens to reserve
+            timeout: Max seconds to wait (None waits as long as needed)
         
-        # Check token limit
-        total_tokens = sum(tokens for _, tokens in self._token_usage)
-        if total_tokens + estimated_tokens > self.tokens_per_minute:
-            oldest_ts, _ = min(self._token_usage, key=lambda x: x[0])
-            wait_time = 60 - (now.timestamp() - oldest_ts.timestamp())
-            return False, max(0, wait_time)
+        Returns:
+            The reservation (pass it to ``record_usage``), or None if the
+            wait would exceed ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait, reservation = self._try_reserve(estimated_tokens)
+            if reservation is not None:
+                return reservation
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return None
+            time.sleep(wait)
+    
+    async def acquire_async(
+        self,
+        estimated_tokens: int = 0,
+        timeout: Optional[float] = None
+    ) -> Optional[RateReservation]:
+        """Like ``acquire`` but awaits instead of blocking the thread."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait, reservation = self._try_reserve(estimated_tokens)
+            if reservation is not None:
+                return reservation
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return None
+            await asyncio.sleep(wait)
+    
+    def record_usage(self, reservation: Optional[RateReservation], tokens_used: int):
+        """
+        Settle a reservation with the actual token usage.
+        
+        The reservation's bucket and the running total are corrected in
+        place; a bucket that already left the window needs no correction.
         
-        return True, 0
+        Args:
+            reservation: Returned by ``acquire``/``acquire_async``
+            tokens_used: Tokens the request actually consumed
+        """
+        if reservation is None:
+            return
+        with self._lock:
+            delta = tokens_used - reservation.tokens
+            bucket = reservation.bucket
+            if delta and bucket is not None and bucket[2]:
+                bucket[1] += delta
+                self._token_sum += delta
+                reservation.tokens = tokens_used
+            elif delta and bucket is None and tokens_used:
+                # Nothing was reserved: count the usage now
+                reservation.bucket = self._record(time.monotonic(), tokens_used, count_request=False).bucket
+                reservation.tokens = tokens_used
     
-    def record_request(self, tokens_used: int = 0):
-        """Record a completed request."""
-        now = datetime.utcnow()
-        self._request_timestamps.append(now)
-        if tokens_used > 0:
-            self._token_usage.append((now, tokens_used))
+    def get_stats(self) -> Dict[str, Any]:
+        """Current window usage."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "requests_in_window": len(self._request_times),
+                "tokens_in_window": self._token_sum,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+            }
+
+
+# =============================================================================
+# LATENCY HISTOGRAM
+# =============================================================================
+
+class LatencyHistogram:
+    """
+    Thread-safe log-bucketed latency histogram.
+    
+    Buckets grow by ``growth`` from ``min_ms`` so percentiles are accurate
+    to a few percent at any scale while recording stays O(1).
+    """
+    
+    def __init__(self, min_ms: float = 1.0, max_ms: float = 120000.0, growth: float = 1.15):
+        self.min_ms = min_ms
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self._buckets = [0] * (int(math.log(max_ms / min_ms) / self._log_growth) + 2)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, duration_ms: float):
+        """Record one observation."""
+        if duration_ms <= self.min_ms:
+            index = 0
+        else:
+            index = int(math.log(duration_ms / self.min_ms) / self._log_growth) + 1
+        index = min(index, len(self._buckets) - 1)
+        with self._lock:
+            self._buckets[index] += 1
+            self._count += 1
+            self._sum += duration_ms
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    def percentile(self, pct: float) -> float:
+        """
+        Estimate a percentile.
+        
+        Args:
+            pct: Percentile in [0, 100]
+        
+        Returns:
+            Upper bound of the bucket holding the percentile (0 when empty)
+        """
+        with self._lock:
+            if not self._count:
+                return 0.0
+            target = max(1, math.ceil(self._count * pct / 100))
+            seen = 0
+            for index, bucket in enumerate(self._buckets):
+                seen += bucket
+                if seen >= target:
+                    return self.min_ms * (self.growth ** index)
+        return self.min_ms * (self.growth ** (len(self._buckets) - 1))
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Summary percentiles."""
+        return {
+            "count": self._count,
+            "mean_ms": self._sum / self._count if self._count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
 
 
 # =============================================================================
@@ -5,7 +5,11 @@ Chat completion services for Groq and OpenAI.
 """
 
 import time
+import queue
+import asyncio
 import logging
+import threading
+from concurrent.futures import Future, FIRST_COMPLETED, wait
 from typing import Optional, Generator, AsyncGenerator, List, Dict, Any
 from dataclasses import dataclass
 
@@ -16,6 +20,8 @@ from services.ai.base import (
     ChatMessage,
     MessageRole,
     RateLimiter,
+    RateReservation,
+    LatencyHistogram,
     AIServiceFactory,
 )
 from core.exceptions import AIServiceError, AIRateLimitError, AIQuotaExceededError
@@ -39,6 +45,9 @@ class GroqChatService(BaseChatService):
         "gemma2-9b-it",
     ]
     
+    # Longest a caller may be held back before the request is refused
+    RATE_LIMIT_MAX_WAIT = 10.0
+    
     def __init__(
         self,
         api_key: str,
@@ -54,7 +63,9 @@ class GroqChatService(BaseChatService):
         self.max_tokens = max_tokens
         self.temperature = temperature
         self._client = None
-        self._rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._rate_limiter = RateLimiter.shared(
+            f"groq:{self.model}", requests_per_minute, tokens_per_minute
+        )
     
     @property
     def provider_name(self) -> str:
@@ -75,12 +86,25 @@ class GroqChatService(BaseChatService):
             logger.error(f"Failed to initialize Groq: {e}")
             return False
     
-    def _check_rate_limit(self, estimated_tokens: int = 1000):
-        """Check and wait for rate limit if needed."""
-        can_proceed, wait_time = self._rate_limiter.can_proceed(estimated_tokens)
-        if not can_proceed:
-            logger.warning(f"Rate limit hit, waiting {wait_time:.1f}s")
-            time.sleep(wait_time)
+    def _check_rate_limit(self, estimated_tokens: int = 1000) -> RateReservation:
+        """Reserve rate limit budget, waiting briefly if needed."""
+        reservation = self._rate_limiter.acquire(estimated_tokens, timeout=self.RATE_LIMIT_MAX_WAIT)
+        if reservation is None:
+            _, wait_time = self._rate_limiter.can_proceed(estimated_tokens)
+            logger.warning(f"Rate limit hit, retry in {wait_time:.1f}s")
+            raise AIRateLimitError(provider="groq", retry_after=int(wait_time) + 1)
+        return reservation
+    
+    async def _acheck_rate_limit(self, estimated_tokens: int = 1000) -> RateReservation:
+        """Async variant of ``_check_rate_limit`` that never blocks the loop."""
+        reservation = await self._rate_limiter.acquire_async(
+            estimated_tokens, timeout=self.RATE_LIMIT_MAX_WAIT
+        )
+        if reservation is None:
+            _, wait_time = self._rate_limiter.can_proceed(estimated_tokens)
+            logger.warning(f"Rate limit hit, retry in {wait_time:.1f}s")
+            raise AIRateLimitError(provider="groq", retry_after=int(wait_time) + 1)
+        return reservation
     
     def _prepare_messages(self, messages: List[ChatMessage]) -> List[Dict[str, str]]:
         """Convert ChatMessage objects to API format."""
@@ -89,7 +113,7 @@ class GroqChatService(BaseChatService):
     def complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
         """Generate chat completion."""
         self._ensure_initialized()
-        self._check_rate_limit(request.max_tokens)
+        reservation = self._check_rate_limit(request.max_tokens)
         
         start_time = time.time()
         
@@ -112,7 +136,7 @@ class GroqChatService(BaseChatService):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
-            self._rate_limiter.record_request(usage["total_tokens"])
+            self._rate_limiter.record_usage(reservation, usage["total_tokens"])
             
             return ChatCompletionResponse(
                 content=response.choices[0].message.content,
@@ -135,7 +159,7 @@ class GroqChatService(BaseChatService):
     def stream(self, request: ChatCompletionRequest) -> Generator[str, None, None]:
         """Generate streaming chat completion."""
         self._ensure_initialized()
-        self._check_rate_limit(request.max_tokens)
+        reservation = self._check_rate_limit(request.max_tokens)
         
         try:
             stream_response = self._client.chat.completions.create(
@@ -152,7 +176,7 @@ class GroqChatService(BaseChatService):
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
             
-            self._rate_limiter.record_request(request.max_tokens // 2)
+            self._rate_limiter.record_usage(reservation, request.max_tokens // 2)
             
         except Exception as e:
             logger.error(f"Groq streaming error: {e}")
@@ -161,6 +185,7 @@ class GroqChatService(BaseChatService):
     async def acomplete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
         """Async chat completion."""
         self._ensure_initialized()
+        reservation = await self._acheck_rate_limit(request.max_tokens)
         
         try:
             from groq import AsyncGroq
@@ -183,6 +208,7 @@ class GroqChatService(BaseChatService):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            self._rate_limiter.record_usage(reservation, usage["total_tokens"])
             
             return ChatCompletionResponse(
                 content=response.choices[0].message.content,
@@ -199,6 +225,7 @@ class GroqChatService(BaseChatService):
     async def astream(self, request: ChatCompletionRequest) -> AsyncGenerator[str, None]:
         """Async streaming chat completion."""
         self._ensure_initialized()
+        reservation = await self._acheck_rate_limit(request.max_tokens)
         
         try:
             from groq import AsyncGroq
@@ -215,6 +242,8 @@ class GroqChatService(BaseChatService):
             async for chunk in stream_response:
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
+            
+            self._rate_limiter.record_usage(reservation, request.max_tokens // 2)
                     
         except Exception as e:
             logger.error(f"Groq async streaming error: {e}")
@@ -236,6 +265,9 @@ class OpenAIChatService(BaseChatService):
         "gpt-3.5-turbo",
     ]
     
+    # Longest a caller may be held back before the request is refused
+    RATE_LIMIT_MAX_WAIT = 10.0
+    
     def __init__(
         self,
         api_key: str,
@@ -251,7 +283,9 @@ class OpenAIChatService(BaseChatService):
         self.max_tokens = max_tokens
         self.temperature = temperature
         self._client = None
-        self._rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._rate_limiter = RateLimiter.shared(
+            f"openai:{self.model}", requests_per_minute, tokens_per_minute
+        )
     
     @property
     def provider_name(self) -> str:
@@ -272,6 +306,26 @@ class OpenAIChatService(BaseChatService):
             logger.error(f"Failed to initialize OpenAI: {e}")
             return False
     
+    def _check_rate_limit(self, estimated_tokens: int = 1000) -> RateReservation:
+        """Reserve rate limit budget, waiting briefly if needed."""
+        reservation = self._rate_limiter.acquire(estimated_tokens, timeout=self.RATE_LIMIT_MAX_WAIT)
+        if reservation is None:
+            _, wait_time = self._rate_limiter.can_proceed(estimated_tokens)
+            logger.warning(f"Rate limit hit, retry in {wait_time:.1f}s")
+            raise AIRateLimitError(provider="openai", retry_after=int(wait_time) + 1)
+        return reservation
+    
+    async def _acheck_rate_limit(self, estimated_tokens: int = 1000) -> RateReservation:
+        """Async variant of ``_check_rate_limit`` that never blocks the loop."""
+        reservation = await self._rate_limiter.acquire_async(
+            estimated_tokens, timeout=self.RATE_LIMIT_MAX_WAIT
+        )
+        if reservation is None:
+            _, wait_time = self._rate_limiter.can_proceed(estimated_tokens)
+            logger.warning(f"Rate limit hit, retry in {wait_time:.1f}s")
+            raise AIRateLimitError(provider="openai", retry_after=int(wait_time) + 1)
+        return reservation
+    
     def _prepare_messages(self, messages: List[ChatMessage]) -> List[Dict[str, str]]:
         """Convert ChatMessage objects to API format."""
         return [msg.to_dict() for msg in messages]
@@ -279,6 +333,7 @@ class OpenAIChatService(BaseChatService):
     def complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
         """Generate chat completion."""
         self._ensure_initialized()
+        reservation = self._check_rate_limit(request.max_tokens)
         
         start_time = time.time()
         
@@ -299,6 +354,7 @@ class OpenAIChatService(BaseChatService):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            self._rate_limiter.record_usage(reservation, usage["total_tokens"])
             
             return ChatCompletionResponse(
                 content=response.choices[0].message.content,
@@ -315,6 +371,7 @@ class OpenAIChatService(BaseChatService):
     def stream(self, request: ChatCompletionRequest) -> Generator[str, None, None]:
         """Generate streaming chat completion."""
         self._ensure_initialized()
+        reservation = self._check_rate_limit(request.max_tokens)
         
         try:
             stream_response = self._client.chat.completions.create(
@@ -328,6 +385,8 @@ class OpenAIChatService(BaseChatService):
             for chunk in stream_response:
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
+            
+            self._rate_limiter.record_usage(reservation, request.max_tokens // 2)
                     
         except Exception as e:
             logger.error(f"OpenAI streaming error: {e}")
@@ -336,6 +395,7 @@ class OpenAIChatService(BaseChatService):
     async def acomplete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
         """Async chat completion."""
         self._ensure_initialized()
+        reservation = await self._acheck_rate_limit(request.max_tokens)
         
         try:
             from openai import AsyncOpenAI
@@ -357,6 +417,7 @@ class OpenAIChatService(BaseChatService):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            self._rate_limiter.record_usage(reservation, usage["total_tokens"])
             
             return ChatCompletionResponse(
                 content=response.choices[0].message.content,
@@ -373,6 +434,7 @@ class OpenAIChatService(BaseChatService):
     async def astream(self, request: ChatCompletionRequest) -> AsyncGenerator[str, None]:
         """Async streaming chat completion."""
         self._ensure_initialized()
+        reservation = await self._acheck_rate_limit(request.max_tokens)
         
         try:
             from openai import AsyncOpenAI
@@ -389,6 +451,8 @@ class OpenAIChatService(BaseChatService):
             async for chunk in stream_response:
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
+            
+            self._rate_limiter.record_usage(reservation, request.max_tokens // 2)
                     
         except Exception as e:
             logger.error(f"OpenAI async streaming error: {e}")
@@ -399,28 +463,203 @@ class OpenAIChatService(BaseChatService):
 # UNIFIED CHAT SERVICE WITH FALLBACK
 # =============================================================================
 
+class _Attempt:
+    """
+    Latency sample of one provider call, recorded exactly once.
+    
+    A call that finishes records its latency; a hedging loser that is
+    cancelled or stopped records the time it had run so far instead, a
+    censored sample (the true latency was at least that long) that keeps
+    slow calls from vanishing out of the percentile.
+    """
+    
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _close(self) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            self._closed = True
+            return True
+    
+    def record(self) -> bool:
+        """Record the elapsed time (False if already recorded or discarded)."""
+        if not self._close():
+            return False
+        self.histogram.record((time.perf_counter() - self.start) * 1000)
+        return True
+    
+    def discard(self):
+        """Close without a sample (failed calls)."""
+        self._close()
+
+
 class UnifiedChatService:
     """
     Unified chat service with automatic fallback between providers.
     Tries primary provider first, falls back to secondary if it fails.
+    
+    With ``hedge=True`` a slow primary is raced against the fallback: if the
+    primary has not answered (or streamed its first token) within the
+    ``hedge_percentile`` of its own recent latency, the fallback is fired
+    concurrently and whichever finishes first wins.
     """
     
     def __init__(
         self,
         primary_service: BaseChatService,
         fallback_service: Optional[BaseChatService] = None,
-        max_retries: int = 2
+        max_retries: int = 2,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay_ms: float = 500.0,
+        hedge_max_delay_ms: float = 10000.0,
+        hedge_initial_delay_ms: float = 3000.0,
+        hedge_min_samples: int = 20
     ):
         self.primary = primary_service
         self.fallback = fallback_service
         self.max_retries = max_retries
         self._current_service = primary_service
+        
+        # Hedging
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_ms = hedge_min_delay_ms
+        self.hedge_max_delay_ms = hedge_max_delay_ms
+        self.hedge_initial_delay_ms = hedge_initial_delay_ms
+        self.hedge_min_samples = hedge_min_samples
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._stats_lock = threading.Lock()
+        self._hedge_stats = {"requests": 0, "hedged": 0, "wins": {}, "censored": 0}
+    
+    @property
+    def provider_name(self) -> str:
+        """Provider currently serving requests."""
+        return self._current_service.provider_name
+    
+    @property
+    def model(self) -> str:
+        """Model of the provider currently serving requests."""
+        return getattr(self._current_service, "model", "")
+    
+    # ==================== LATENCY TRACKING ====================
+    
+    def _histogram(self, service: BaseChatService, kind: str) -> LatencyHistogram:
+        key = f"{service.provider_name}:{kind}"
+        if key not in self._latency:
+            with self._stats_lock:
+                self._latency.setdefault(key, LatencyHistogram())
+        return self._latency[key]
+    
+    def hedge_delay_ms(self, kind: str = "complete") -> float:
+        """
+        Current hedge deadline for the primary provider.
+        
+        Args:
+            kind: "complete" for full responses, "ttft" for first streamed token
+        
+        Returns:
+            Delay in milliseconds before the fallback is fired
+        """
+        histogram = self._histogram(self.primary, kind)
+        if histogram.count < self.hedge_min_samples:
+            return self.hedge_initial_delay_ms
+        delay = histogram.percentile(self.hedge_percentile)
+        return min(max(delay, self.hedge_min_delay_ms), self.hedge_max_delay_ms)
+    
+    def _timed_complete(
+        self,
+        service: BaseChatService,
+        request: ChatCompletionRequest,
+        attempt: Optional[_Attempt] = None
+    ) -> ChatCompletionResponse:
+        attempt = attempt or _Attempt(self._histogram(service, "complete"))
+        try:
+            response = service.complete(request)
+        except BaseException:
+            attempt.discard()
+            raise
+        attempt.record()
+        return response
+    
+    async def _timed_acomplete(
+        self,
+        service: BaseChatService,
+        request: ChatCompletionRequest,
+        attempt: Optional[_Attempt] = None
+    ) -> ChatCompletionResponse:
+        attempt = attempt or _Attempt(self._histogram(service, "complete"))
+        try:
+            response = await service.acomplete(request)
+        except asyncio.CancelledError:
+            raise  # Censored by the hedging race
+        except BaseException:
+            attempt.discard()
+            raise
+        attempt.record()
+        return response
+    
+    def _censor(self, attempt: _Attempt):
+        """Record an abandoned hedging loser's elapsed time."""
+        if attempt.record():
+            with self._stats_lock:
+                self._hedge_stats["censored"] += 1
+    
+    def _count_request(self, hedged: bool = False):
+        with self._stats_lock:
+            if hedged:
+                self._hedge_stats["hedged"] += 1
+            else:
+                self._hedge_stats["requests"] += 1
+    
+    def _count_win(self, service: BaseChatService, hedged: bool):
+        if not hedged:
+            return
+        with self._stats_lock:
+            wins = self._hedge_stats["wins"]
+            wins[service.provider_name] = wins.get(service.provider_name, 0) + 1
+    
+    @staticmethod
+    def _spawn(fn, *args) -> Future:
+        """
+        Run one racer on its own daemon thread.
+        
+        Each hedged call gets its own threads, so concurrent requests never
+        queue behind each other's slow providers in a shared pool.
+        """
+        future: Future = Future()
+        
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+        return future
+    
+    @staticmethod
+    def _tag(response: ChatCompletionResponse, service: BaseChatService, hedged: bool):
+        response.metadata = {**response.metadata, "provider": service.provider_name, "hedged": hedged}
+        return response
+    
+    # ==================== COMPLETION ====================
     
     def complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
         """Generate completion with automatic fallback."""
+        if self.hedge and self.fallback:
+            return self._hedged_complete(request)
+        
         for attempt in range(self.max_retries):
             try:
-                return self._current_service.complete(request)
+                return self._timed_complete(self._current_service, request)
             except AIServiceError as e:
                 logger.warning(f"Service error (attempt {attempt + 1}): {e}")
                 if self.fallback and self._current_service == self.primary:
@@ -433,8 +672,122 @@ class UnifiedChatService:
         self._current_service = self.primary
         raise AIServiceError(message="All providers failed")
     
+    def _hedged_complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Race the fallback against a primary that misses its deadline."""
+        self._count_request()
+        delay = self.hedge_delay_ms("complete") / 1000
+        attempts: Dict[Future, _Attempt] = {}
+        
+        def race(service: BaseChatService) -> Future:
+            attempt = _Attempt(self._histogram(service, "complete"))
+            future = self._spawn(self._timed_complete, service, request, attempt)
+            attempts[future] = attempt
+            return future
+        
+        pending = {race(self.primary): self.primary}
+        hedged = False
+        error: Optional[AIServiceError] = None
+        
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=None if len(pending) > 1 or hedged or error else delay,
+                return_when=FIRST_COMPLETED
+            )
+            
+            if not done:
+                # Primary is slow: fire the fallback alongside it
+                hedged = True
+                self._count_request(hedged=True)
+                logger.info(f"Hedging {self.primary.provider_name} after {delay * 1000:.0f}ms")
+                pending[race(self.fallback)] = self.fallback
+                continue
+            
+            for future in done:
+                service = pending.pop(future)
+                try:
+                    response = future.result()
+                except AIServiceError as e:
+                    logger.warning(f"{service.provider_name} failed: {e}")
+                    error = e
+                    if service is self.primary and not hedged:
+                        pending[race(self.fallback)] = self.fallback
+                    continue
+                
+                # Loser keeps running in its thread but its result is discarded
+                for loser in pending:
+                    loser.cancel()
+                    self._censor(attempts[loser])
+                self._count_win(service, hedged)
+                return self._tag(response, service, hedged)
+        
+        raise error or AIServiceError(message="All providers failed")
+    
+    async def acomplete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Async completion with fallback (and hedging when enabled)."""
+        if not (self.hedge and self.fallback):
+            try:
+                return await self._timed_acomplete(self.primary, request)
+            except AIServiceError:
+                if not self.fallback:
+                    raise
+                logger.info("Switching to fallback service")
+                return await self._timed_acomplete(self.fallback, request)
+        
+        self._count_request()
+        delay = self.hedge_delay_ms("complete") / 1000
+        attempts: Dict[asyncio.Future, _Attempt] = {}
+        
+        def race(service: BaseChatService) -> asyncio.Future:
+            attempt = _Attempt(self._histogram(service, "complete"))
+            task = asyncio.ensure_future(self._timed_acomplete(service, request, attempt))
+            attempts[task] = attempt
+            return task
+        
+        tasks = {race(self.primary): self.primary}
+        hedged = False
+        error: Optional[AIServiceError] = None
+        
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=None if len(tasks) > 1 or hedged or error else delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    hedged = True
+                    self._count_request(hedged=True)
+                    tasks[race(self.fallback)] = self.fallback
+                    continue
+                
+                for task in done:
+                    service = tasks.pop(task)
+                    try:
+                        response = task.result()
+                    except AIServiceError as e:
+                        error = e
+                        if service is self.primary and not hedged:
+                            tasks[race(self.fallback)] = self.fallback
+                        continue
+                    self._count_win(service, hedged)
+                    return self._tag(response, service, hedged)
+        finally:
+            for task in tasks:
+                task.cancel()
+                self._censor(attempts[task])
+        
+        raise error or AIServiceError(message="All providers failed")
+    
+    # ==================== STREAMING ====================
+    
     def stream(self, request: ChatCompletionRequest) -> Generator[str, None, None]:
         """Generate streaming completion with fallback."""
+        if self.hedge and self.fallback:
+            yield from self._hedged_stream(request)
+            return
+        
         try:
             yield from self._current_service.stream(request)
         except AIServiceError as e:
@@ -446,6 +799,207 @@ class UnifiedChatService:
                 raise
         finally:
             self._current_service = self.primary
+    
+    def _hedged_stream(self, request: ChatCompletionRequest) -> Generator[str, None, None]:
+        """
+        Stream from whichever provider produces the first token first.
+        
+        Each provider is pumped by a worker thread into a shared queue; once
+        a winner emits its first token the other pump is told to stop.
+        """
+        self._count_request()
+        events: "queue.Queue" = queue.Queue()
+        stop = {self.primary: threading.Event(), self.fallback: threading.Event()}
+        attempts: Dict[BaseChatService, _Attempt] = {}
+        
+        def pump(service: BaseChatService):
+            attempt = attempts[service]
+            tokens = service.stream(request)
+            try:
+                for token in tokens:
+                    if stop[service].is_set():
+                        return
+                    attempt.record()  # First token only
+                    events.put((service, "token", token))
+                attempt.record()
+                events.put((service, "end", None))
+            except Exception as e:
+                attempt.discard()
+                events.put((service, "error", e))
+            finally:
+                tokens.close()
+        
+        def launch(service: BaseChatService):
+            attempts[service] = _Attempt(self._histogram(service, "ttft"))
+            self._spawn(pump, service)
+        
+        launch(self.primary)
+        started = {self.primary}
+        failed = set()
+        hedged = False
+        winner = None
+        deadline = time.monotonic() + self.hedge_delay_ms("ttft") / 1000
+        
+        try:
+            while True:
+                timeout = None
+                if self.fallback not in started:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    service, kind, payload = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedged = True
+                    self._count_request(hedged=True)
+                    logger.info(f"Hedging {self.primary.provider_name} stream")
+                    started.add(self.fallback)
+                    launch(self.fallback)
+                    continue
+                
+                if winner is None:
+                    if kind == "error":
+                        logger.warning(f"{service.provider_name} stream failed: {payload}")
+                        failed.add(service)
+                        if self.fallback not in started:
+                            started.add(self.fallback)
+                            launch(self.fallback)
+                        elif failed == started:
+                            raise payload
+                        continue
+                    winner = service
+                    self._count_win(winner, hedged)
+                    for other, flag in stop.items():
+                        if other is not winner:
+                            flag.set()
+                            if other in attempts:
+                                self._censor(attempts[other])
+                elif service is not winner:
+                    continue
+                
+                if kind == "token":
+                    yield payload
+                elif kind == "end":
+                    return
+                else:
+                    raise payload
+        finally:
+            for flag in stop.values():
+                flag.set()
+            # Abandoned before any first token (e.g. the reader stopped early)
+            for attempt in attempts.values():
+                self._censor(attempt)
+    
+    async def astream(self, request: ChatCompletionRequest) -> AsyncGenerator[str, None]:
+        """Async streaming completion with fallback (and hedging when enabled)."""
+        if self.hedge and self.fallback:
+            async for token in self._hedged_astream(request):
+                yield token
+            return
+        
+        try:
+            async for token in self._current_service.astream(request):
+                yield token
+        except AIServiceError:
+            if self.fallback and self._current_service == self.primary:
+                logger.info("Switching to fallback service for async streaming")
+                self._current_service = self.fallback
+                async for token in self._current_service.astream(request):
+                    yield token
+            else:
+                raise
+        finally:
+            self._current_service = self.primary
+    
+    async def _hedged_astream(self, request: ChatCompletionRequest) -> AsyncGenerator[str, None]:
+        """Async first-token race; the losing stream is cancelled and closed."""
+        self._count_request()
+        streams: Dict[BaseChatService, Any] = {}
+        attempts: Dict[BaseChatService, _Attempt] = {}
+        tasks: Dict[asyncio.Task, BaseChatService] = {}
+        
+        def start(service: BaseChatService):
+            streams[service] = service.astream(request)
+            attempts[service] = _Attempt(self._histogram(service, "ttft"))
+            tasks[asyncio.ensure_future(streams[service].__anext__())] = service
+        
+        start(self.primary)
+        hedged = False
+        winner, first_token = None, None
+        error: Optional[BaseException] = None
+        hedge_at = time.monotonic() + self.hedge_delay_ms("ttft") / 1000
+        
+        try:
+            while tasks and winner is None:
+                timeout = None
+                if self.fallback not in streams:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    hedged = True
+                    self._count_request(hedged=True)
+                    start(self.fallback)
+                    continue
+                
+                for task in done:
+                    service = tasks.pop(task)
+                    try:
+                        first_token = task.result()
+                    except StopAsyncIteration:
+                        winner, first_token = service, None
+                        attempts[service].record()
+                        break
+                    except Exception as e:
+                        error = e
+                        attempts[service].discard()
+                        if self.fallback not in streams:
+                            start(self.fallback)
+                        continue
+                    winner = service
+                    attempts[service].record()
+                    break
+        finally:
+            for task, service in tasks.items():
+                task.cancel()
+                self._censor(attempts[service])
+                try:
+                    await task
+                except BaseException:
+                    pass
+                if service is not winner:
+                    await streams[service].aclose()
+        
+        if winner is None:
+            raise error or AIServiceError(message="All providers failed")
+        
+        self._count_win(winner, hedged)
+        if first_token is None:
+            return
+        yield first_token
+        async for token in streams[winner]:
+            yield token
+    
+    # ==================== STATS ====================
+    
+    def get_hedge_stats(self) -> Dict[str, Any]:
+        """Hedging counters and per-provider latency percentiles."""
+        with self._stats_lock:
+            requests = self._hedge_stats["requests"]
+            hedged = self._hedge_stats["hedged"]
+            wins = dict(self._hedge_stats["wins"])
+            censored = self._hedge_stats["censored"]
+        return {
+            "enabled": self.hedge,
+            "requests": requests,
+            "hedged": hedged,
+            "hedge_rate": hedged / requests if requests else 0.0,
+            "wins": wins,
+            "censored": censored,
+            "hedge_delay_ms": self.hedge_delay_ms("complete"),
+            "hedge_ttft_delay_ms": self.hedge_delay_ms("ttft"),
+            "latency": {key: h.get_stats() for key, h in self._latency.items()},
+        }
 
 
 # =============================================================================
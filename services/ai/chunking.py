@@ -0,0 +1,340 @@
+"""
+LABBAIK AI v6.0 - Chunking & Context Packing
+============================================
+Token-aware chunking of markdown knowledge and budgeted packing of
+retrieved chunks into the RAG prompt.
+"""
+
+import re
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# TOKEN COUNTING
+# =============================================================================
+
+class TokenCounter:
+    """
+    Counts prompt tokens.
+
+    Uses tiktoken (cl100k_base) when installed; otherwise an estimate of
+    1.3 tokens per word plus one per punctuation mark, which tracks
+    Llama/GPT tokenizers on Indonesian text closely enough for budgeting.
+    """
+
+    _WORD = re.compile(r"\w+", re.UNICODE)
+    _PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._checked = False
+
+    def _get_encoding(self):
+        if not self._checked:
+            self._checked = True
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except ImportError:
+                logger.debug("tiktoken not installed, using token estimate")
+            except Exception as e:
+                logger.warning(f"Failed to load tiktoken encoding: {e}")
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+        words = len(self._WORD.findall(text))
+        punct = len(self._PUNCT.findall(text))
+        return math.ceil(words * 1.3) + punct
+
+
+_default_counter = TokenCounter()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the shared TokenCounter."""
+    return _default_counter.count(text)
+
+
+# =============================================================================
+# MARKDOWN CHUNKER
+# =============================================================================
+
+@dataclass
+class TextChunk:
+    """A chunk of source text."""
+    text: str
+    tokens: int
+    heading: str = ""
+
+
+class MarkdownChunker:
+    """
+    Sentence- and heading-aware chunker.
+
+    Text is split into sections at markdown headings; each section is split
+    into sentences / list items, which are packed greedily up to
+    ``max_tokens``. Chunks carry their heading path as a first line so they
+    stay self-describing, and the trailing sentences of a chunk (up to
+    ``overlap_tokens``) are repeated at the start of the next one.
+    """
+
+    _HEADING = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+    _SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(*\[])")
+
+    def __init__(
+        self,
+        max_tokens: int = 200,
+        overlap_tokens: int = 30,
+        counter: Optional[TokenCounter] = None
+    ):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.counter = counter or _default_counter
+
+    def _sections(self, text: str) -> List[Tuple[str, List[str]]]:
+        """Split text into (heading path, lines) sections."""
+        sections: List[Tuple[str, List[str]]] = []
+        path: List[Tuple[int, str]] = []
+        lines: List[str] = []
+        in_code = False
+
+        def flush():
+            if any(line.strip() for line in lines):
+                heading = " > ".join(title for _, title in path)
+                sections.append((heading, list(lines)))
+            lines.clear()
+
+        for line in text.splitlines():
+            if line.strip().startswith("```"):
+                in_code = not in_code
+            match = None if in_code else self._HEADING.match(line)
+            if match:
+                flush()
+                level = len(match.group(1))
+                path[:] = [(lvl, t) for lvl, t in path if lvl < level]
+                path.append((level, match.group(2)))
+            else:
+                lines.append(line)
+        flush()
+        return sections
+
+    def _units(self, lines: List[str]) -> List[str]:
+        """Split section lines into sentence / list-item units."""
+        units: List[str] = []
+        paragraph: List[str] = []
+
+        def flush_paragraph():
+            if paragraph:
+                joined = " ".join(p.strip() for p in paragraph)
+                units.extend(s for s in self._SENTENCE_END.split(joined) if s.strip())
+                paragraph.clear()
+
+        for line in lines:
+            stripped = line.strip()
+            if not stripped:
+                flush_paragraph()
+            elif re.match(r"^([-*+]|\d+\.|\|)\s*", stripped):
+                # List items and table rows are kept whole
+                flush_paragraph()
+                units.append(line.rstrip())
+            else:
+                paragraph.append(line)
+        flush_paragraph()
+        return units
+
+    def _split_long(self, unit: str, budget: int) -> List[str]:
+        """Hard-split a unit that alone exceeds the budget, on word boundaries."""
+        words = unit.split()
+        pieces, current = [], []
+        for word in words:
+            current.append(word)
+            if self.counter.count(" ".join(current)) > budget and len(current) > 1:
+                current.pop()
+                pieces.append(" ".join(current))
+                current = [word]
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        """
+        Split ``text`` into token-bounded chunks.
+
+        Args:
+            text: Markdown or plain text
+
+        Returns:
+            List of TextChunk
+        """
+        chunks: List[TextChunk] = []
+
+        for heading, lines in self._sections(text):
+            prefix = f"{heading}\n" if heading else ""
+            budget = max(1, self.max_tokens - self.counter.count(prefix))
+
+            units: List[Tuple[str, int]] = []
+            for unit in self._units(lines):
+                tokens = self.counter.count(unit)
+                if tokens > budget:
+                    units.extend((p, self.counter.count(p)) for p in self._split_long(unit, budget))
+                else:
+                    units.append((unit, tokens))
+
+            current: List[Tuple[str, int]] = []
+            current_tokens = 0
+            fresh = 0  # Units in ``current`` not carried over as overlap
+
+            def emit():
+                body = "\n".join(u for u, _ in current)
+                chunk_text = f"{prefix}{body}".strip()
+                chunks.append(TextChunk(
+                    text=chunk_text,
+                    tokens=self.counter.count(chunk_text),
+                    heading=heading
+                ))
+
+            for unit, tokens in units:
+                if current and current_tokens + tokens > budget:
+                    emit()
+                    # Carry trailing units forward as overlap
+                    overlap: List[Tuple[str, int]] = []
+                    overlap_tokens = 0
+                    for prev in reversed(current):
+                        if overlap_tokens + prev[1] > self.overlap_tokens:
+                            break
+                        overlap.insert(0, prev)
+                        overlap_tokens += prev[1]
+                    if overlap_tokens + tokens > budget:
+                        overlap, overlap_tokens = [], 0
+                    current, current_tokens, fresh = overlap, overlap_tokens, 0
+
+                current.append((unit, tokens))
+                current_tokens += tokens
+                fresh += 1
+
+            if current and fresh:
+                emit()
+
+        return chunks
+
+    def split(self, text: str) -> List[str]:
+        """Split ``text`` into chunk strings."""
+        return [c.text for c in self.chunk(text)]
+
+
+# =============================================================================
+# CONTEXT PACKER
+# =============================================================================
+
+@dataclass
+class PackedContext:
+    """Context assembled for a prompt."""
+    text: str
+    documents: List[Any]
+    scores: List[float]
+    token_count: int
+    budget: int
+    dropped_duplicates: int = 0
+    dropped_over_budget: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ContextPacker:
+    """
+    Fills a fixed prompt-token budget greedily in retrieval order.
+
+    Documents are taken in the order given (best first, as ranked by the
+    retriever or reranker); scores are carried along but not re-sorted,
+    since their scale depends on who produced them. Chunks whose word shingles are mostly contained in an already packed
+    chunk (overlap windows, repeated sections) are skipped, and chunks that
+    do not fit are skipped in favour of smaller lower-ranked ones.
+    """
+
+    SEPARATOR = "\n\n---\n\n"
+
+    def __init__(
+        self,
+        budget_tokens: int = 1500,
+        duplicate_threshold: float = 0.6,
+        shingle_size: int = 5,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.budget_tokens = budget_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.shingle_size = shingle_size
+        self.counter = counter or _default_counter
+
+    def _shingles(self, text: str) -> set:
+        words = re.findall(r"\w+", text.lower())
+        n = self.shingle_size
+        if len(words) < n:
+            return {tuple(words)} if words else set()
+        return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+    @staticmethod
+    def format_document(doc) -> str:
+        """Format a document the way ``RetrievalResult.get_context`` does."""
+        return f"[Sumber: {doc.metadata.get('source', 'unknown')}]\n{doc.content}"
+
+    def pack(self, documents: List[Any], scores: List[float]) -> PackedContext:
+        """
+        Pack documents into the budget.
+
+        Args:
+            documents: Retrieved documents, best first
+            scores: Retrieval scores aligned with ``documents``
+
+        Returns:
+            PackedContext with the prompt text and its token count
+        """
+        ranked = zip(documents, list(scores) + [0.0] * (len(documents) - len(scores)))
+
+        separator_tokens = self.counter.count(self.SEPARATOR)
+        packed_docs, packed_scores, parts, seen = [], [], [], []
+        used = 0
+        duplicates = over_budget = 0
+
+        for doc, score in ranked:
+            shingles = self._shingles(doc.content)
+            if shingles and any(
+                len(shingles & other) / len(shingles) >= self.duplicate_threshold
+                for other in seen
+            ):
+                duplicates += 1
+                continue
+
+            part = self.format_document(doc)
+            tokens = self.counter.count(part) + (separator_tokens if parts else 0)
+            if used + tokens > self.budget_tokens:
+                over_budget += 1
+                continue
+
+            parts.append(part)
+            packed_docs.append(doc)
+            packed_scores.append(score)
+            seen.append(shingles)
+            used += tokens
+
+        return PackedContext(
+            text=self.SEPARATOR.join(parts),
+            documents=packed_docs,
+            scores=packed_scores,
+            token_count=used,
+            budget=self.budget_tokens,
+            dropped_duplicates=duplicates,
+            dropped_over_budget=over_budget,
+        )
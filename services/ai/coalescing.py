@@ -0,0 +1,326 @@
+"""
+LABBAIK AI v6.0 - Request Coalescing
+====================================
+Single-flight wrapper for chat services: identical completions that arrive
+while one is already in flight share its response instead of hitting the
+provider again.
+
+Each shared stream is pumped by its own daemon thread (or task), so a
+burst of distinct streams never queues behind a fixed pool; a stream whose
+readers have all left is cancelled and its provider stream closed.
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import Optional, List, Dict, Set, Any, Generator, AsyncGenerator, Iterator
+
+from services.ai.base import ChatCompletionRequest, ChatCompletionResponse
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# STREAM FLIGHTS
+# =============================================================================
+
+class _StreamFlight:
+    """Buffers one provider stream so any number of readers can replay it."""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.readers = 0  # Guarded by the coalescer's lock
+        self._cancelled = threading.Event()
+        self._cond = threading.Condition()
+
+    def cancel(self):
+        """Stop pumping after the next token (no reader is left)."""
+        self._cancelled.set()
+
+    def run(self, tokens: Iterator[str]):
+        try:
+            for token in tokens:
+                if self._cancelled.is_set():
+                    break
+                with self._cond:
+                    self.tokens.append(token)
+                    self._cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            close = getattr(tokens, "close", None)
+            if close is not None:
+                close()
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def read(self) -> Generator[str, None, None]:
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self.tokens) and not self.done:
+                    self._cond.wait()
+                if position < len(self.tokens):
+                    token = self.tokens[position]
+                    position += 1
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            yield token
+
+
+class _AsyncStreamFlight:
+    """Async counterpart of ``_StreamFlight`` bound to one event loop."""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.readers = 0  # Guarded by the coalescer's lock
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def cancel(self):
+        """Cancel the pump task (no reader is left)."""
+        if self.task is not None:
+            self.task.cancel()
+
+    async def run(self, tokens: AsyncGenerator[str, None]):
+        try:
+            async for token in tokens:
+                self.tokens.append(token)
+                self._changed.set()
+        except BaseException as e:
+            self.error = e
+        finally:
+            close = getattr(tokens, "aclose", None)
+            if close is not None:
+                await close()
+            self.done = True
+            self._changed.set()
+
+    async def read(self) -> AsyncGenerator[str, None]:
+        position = 0
+        while True:
+            if position < len(self.tokens):
+                position += 1
+                yield self.tokens[position - 1]
+            elif self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+
+
+# =============================================================================
+# COALESCING CHAT SERVICE
+# =============================================================================
+
+class CoalescingChatService:
+    """
+    Wraps a chat service (or UnifiedChatService) with single-flight
+    request coalescing.
+
+    Requests are keyed on their normalized messages, model, temperature,
+    max_tokens, top_p and stop sequences. The first request for a key calls
+    the provider; requests for the same key arriving before it finishes
+    wait for and share its ChatCompletionResponse, or replay its stream.
+    Nothing is cached once the flight lands.
+    """
+
+    def __init__(self, chat_service):
+        self.chat_service = chat_service
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._stream_flights: Dict[str, _StreamFlight] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._async_stream_flights: Dict[str, _AsyncStreamFlight] = {}
+        self._tasks: Set[asyncio.Task] = set()  # Strong refs to async pumps
+
+        self.provider_calls = 0
+        self.coalesced = 0
+
+    @property
+    def provider_name(self) -> str:
+        return self.chat_service.provider_name
+
+    @property
+    def model(self) -> str:
+        return getattr(self.chat_service, "model", "")
+
+    def initialize(self) -> bool:
+        return self.chat_service.initialize()
+
+    def __getattr__(self, name: str):
+        # Anything else (e.g. get_hedge_stats) comes from the wrapped service
+        if name == "chat_service":
+            raise AttributeError(name)
+        return getattr(self.chat_service, name)
+
+    @staticmethod
+    def request_key(request: ChatCompletionRequest) -> str:
+        """Hash identifying requests that would produce interchangeable answers."""
+        payload = {
+            "messages": [
+                (msg.role.value, " ".join(msg.content.split()))
+                for msg in request.messages
+            ],
+            "model": request.model,
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+            "top_p": request.top_p,
+            "stop": request.stop_sequences,
+        }
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _join(self, table: Dict[str, Any], key: str, factory, reader: bool = False) -> tuple:
+        """Get or create the flight for ``key``; returns (flight, is_leader)."""
+        with self._lock:
+            flight = table.get(key)
+            leader = flight is None
+            if leader:
+                flight = table[key] = factory()
+                self.provider_calls += 1
+            else:
+                self.coalesced += 1
+            if reader:
+                flight.readers += 1
+            return flight, leader
+
+    def _land(self, table: Dict[str, Any], key: str, flight: Any = None):
+        with self._lock:
+            if flight is None or table.get(key) is flight:
+                table.pop(key, None)
+
+    def _leave(self, table: Dict[str, Any], key: str, flight):
+        """Detach a stream reader; the last one out cancels an unfinished flight."""
+        with self._lock:
+            flight.readers -= 1
+            if flight.readers > 0 or flight.done:
+                return
+            # Under the lock, so no new reader can join the cancelled flight
+            if table.get(key) is flight:
+                del table[key]
+        flight.cancel()
+
+    @staticmethod
+    def _mark_coalesced(response: ChatCompletionResponse) -> ChatCompletionResponse:
+        return replace(response, metadata={**response.metadata, "coalesced": True})
+
+    # ==================== COMPLETION ====================
+
+    def complete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Chat completion, shared with identical in-flight requests."""
+        key = self.request_key(request)
+        future, leader = self._join(self._inflight, key, Future)
+
+        if not leader:
+            return self._mark_coalesced(future.result())
+
+        try:
+            response = self.chat_service.complete(request)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._land(self._inflight, key)
+
+    async def acomplete(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
+        """Async chat completion, shared with identical in-flight requests."""
+        loop = asyncio.get_running_loop()
+        key = f"{id(loop)}:{self.request_key(request)}"
+        future, leader = self._join(self._async_inflight, key, loop.create_future)
+
+        if not leader:
+            return self._mark_coalesced(await asyncio.shield(future))
+
+        try:
+            response = await self.chat_service.acomplete(request)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # Followers observe the exception; don't warn about it being unread
+            future.exception()
+            raise
+        finally:
+            self._land(self._async_inflight, key)
+
+    # ==================== STREAMING ====================
+
+    def stream(self, request: ChatCompletionRequest) -> Generator[str, None, None]:
+        """Streaming completion; identical in-flight streams are teed."""
+        key = self.request_key(request)
+        flight, leader = self._join(self._stream_flights, key, _StreamFlight, reader=True)
+
+        if leader:
+            # The provider stream is pumped by its own thread so a reader
+            # that stops early does not stall the others, and concurrent
+            # streams never wait for a pool slot.
+            def pump():
+                try:
+                    flight.run(self.chat_service.stream(request))
+                finally:
+                    self._land(self._stream_flights, key, flight)
+
+            threading.Thread(target=pump, name="llm-stream", daemon=True).start()
+
+        try:
+            yield from flight.read()
+        finally:
+            self._leave(self._stream_flights, key, flight)
+
+    async def astream(self, request: ChatCompletionRequest) -> AsyncGenerator[str, None]:
+        """Async streaming completion; identical in-flight streams are teed."""
+        loop = asyncio.get_running_loop()
+        key = f"{id(loop)}:{self.request_key(request)}"
+        flight, leader = self._join(self._async_stream_flights, key, _AsyncStreamFlight, reader=True)
+
+        if leader:
+            async def pump():
+                try:
+                    await flight.run(self.chat_service.astream(request))
+                finally:
+                    self._land(self._async_stream_flights, key, flight)
+
+            # The loop only keeps weak references to tasks
+            task = flight.task = loop.create_task(pump())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        try:
+            async for token in flight.read():
+                yield token
+        finally:
+            self._leave(self._async_stream_flights, key, flight)
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters."""
+        with self._lock:
+            in_flight = (
+                len(self._inflight) + len(self._stream_flights)
+                + len(self._async_inflight) + len(self._async_stream_flights)
+            )
+        total = self.provider_calls + self.coalesced
+        return {
+            "provider_calls": self.provider_calls,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / total if total else 0.0,
+            "in_flight": in_flight,
+        }
@@ -0,0 +1,399 @@
+"""
+LABBAIK AI v6.0 - Embedding Cache
+=================================
+Persistent content-addressed cache for sentence embeddings.
+
+Vectors are stored per model as a raw float32 matrix that is memory-mapped
+on load, plus an index mapping sha256(text) to a row offset. Several
+processes (the app, scripts/reindex_knowledge.py) may share a cache
+directory: appends are serialized with a file lock and every writer
+re-reads the index under that lock before choosing its rows.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+# =============================================================================
+# EMBEDDING CACHE
+# =============================================================================
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model_name, sha256 of text).
+
+    Layout for a model inside ``cache_dir``::
+
+        <model>.f32         rows of float32, appended in insertion order
+        <model>.index.json  {"model", "dim", "count", "offsets": {sha: row}}
+        <model>.index.log   "<sha> <row>" lines appended since the last snapshot
+        <model>.lock        advisory lock serializing appends across processes
+
+    A store appends its rows and journal lines (no fsync); the JSON
+    snapshot is rewritten, and everything fsynced, only every
+    ``compact_every`` journal lines. Rows lost to a crash read back as
+    zeros and are treated as misses.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        compact_every: int = 1024
+    ):
+        """
+        Args:
+            cache_dir: Directory of the cache files
+            model_name: Embedding model (one matrix per model)
+            max_entries: Stop storing new vectors beyond this many rows
+            compact_every: Journal lines before the JSON index is rewritten
+        """
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self._data_path = self.cache_dir / f"{safe_name}.f32"
+        self._index_path = self.cache_dir / f"{safe_name}.index.json"
+        self._journal_path = self.cache_dir / f"{safe_name}.index.log"
+        self._lock_path = self.cache_dir / f"{safe_name}.lock"
+
+        self._dim: Optional[int] = None
+        self._offsets: Dict[str, int] = {}
+        self._count = 0                 # Rows referenced by the index
+        self._journal_lines = 0         # Journal lines since the snapshot
+        self._journal_pos = 0           # Bytes of the journal already read
+        self._snapshot_version: Optional[Tuple[int, int]] = None
+        self._matrix = None             # np.memmap, reopened when rows are added
+        self._lock = threading.Lock()
+        self._full_logged = False
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        """Content hash used as cache key."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    # ==================== LOCKING ====================
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Advisory lock shared with other processes using the same files."""
+        if fcntl is None:
+            yield
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a+") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ==================== LOADING ====================
+
+    def _reset(self):
+        self._dim = None
+        self._offsets = {}
+        self._count = 0
+        self._journal_lines = 0
+        self._journal_pos = 0
+        self._snapshot_version = None
+        self._matrix = None
+
+    def _refresh(self):
+        """
+        Catch up with the files (file lock held).
+
+        Reloads the JSON snapshot when another process replaced it and
+        applies journal lines appended since the last call.
+        """
+        count = self._count
+        try:
+            stat = self._index_path.stat()
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            version = None
+
+        if version != self._snapshot_version:
+            self._reset()
+            self._snapshot_version = version
+            if version is not None:
+                try:
+                    with open(self._index_path, "r", encoding="utf-8") as f:
+                        index = json.load(f)
+                    if index.get("model") != self.model_name:
+                        logger.warning(f"Embedding cache model mismatch in {self._index_path}, ignoring")
+                    else:
+                        self._dim = index["dim"]
+                        self._offsets = index["offsets"]
+                        self._count = index["count"]
+                except Exception as e:
+                    logger.warning(f"Failed to load embedding cache index, starting empty: {e}")
+            count = -1  # Force reopening the matrix
+
+        try:
+            with open(self._journal_path, "rb") as f:
+                f.seek(self._journal_pos)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        end = data.rfind(b"\n") + 1  # Only complete lines
+        for line in data[:end].splitlines():
+            try:
+                key, row = line.decode("ascii").split()
+                row = int(row)
+            except ValueError:
+                continue
+            self._offsets[key] = row
+            self._count = max(self._count, row + 1)
+            self._journal_lines += 1
+        self._journal_pos += end
+
+        if self._count != count:
+            self._open_matrix()
+
+    def _open_matrix(self):
+        """(Re)open the read-only memory map over the rows on disk."""
+        import numpy as np
+
+        self._matrix = None
+        if not self._count or not self._dim or not self._data_path.exists():
+            return
+        rows = min(self._count, self._data_path.stat().st_size // (self._dim * 4))
+        if rows:
+            self._matrix = np.memmap(
+                self._data_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(rows, self._dim)
+            )
+
+    def _compact(self):
+        """Write the JSON snapshot and truncate the journal (exclusive lock held)."""
+        with open(self._data_path, "rb+") as f:
+            os.fsync(f.fileno())
+        payload = {
+            "model": self.model_name,
+            "dim": self._dim,
+            "count": self._count,
+            "offsets": self._offsets,
+        }
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._index_path)
+        with open(self._journal_path, "wb"):
+            pass
+
+        stat = self._index_path.stat()
+        self._snapshot_version = (stat.st_ino, stat.st_mtime_ns)
+        self._journal_lines = 0
+        self._journal_pos = 0
+
+    # ==================== LOOKUP / STORE ====================
+
+    def _lookup(self, texts: List[str]) -> List[Optional[List[float]]]:
+        results: List[Optional[List[float]]] = []
+        for text in texts:
+            row = self._offsets.get(self.key_for(text))
+            vector = None
+            if row is not None and self._matrix is not None and row < len(self._matrix):
+                vector = self._matrix[row]
+                if not vector.any():  # Row lost in a crash
+                    vector = None
+            results.append(vector.tolist() if vector is not None else None)
+        return results
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            List aligned with ``texts``; None marks a cache miss
+        """
+        with self._lock:
+            if self._snapshot_version is None and not self._count:
+                with self._file_lock(exclusive=False):
+                    self._refresh()
+            results = self._lookup(texts)
+            if any(vector is None for vector in results):
+                # Another process may have stored them since
+                with self._file_lock(exclusive=False):
+                    self._refresh()
+                results = self._lookup(texts)
+
+            found = sum(vector is not None for vector in results)
+            self.hits += found
+            self.misses += len(results) - found
+            return results
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]) -> int:
+        """
+        Store embeddings for texts not yet cached.
+
+        Args:
+            texts: Source texts
+            embeddings: Embeddings aligned with ``texts``
+
+        Returns:
+            Number of new vectors written
+        """
+        import numpy as np
+
+        if not texts:
+            return 0
+
+        with self._lock:
+            try:
+                with self._file_lock(exclusive=True):
+                    self._refresh()
+
+                    new_keys: List[str] = []
+                    seen = set()
+                    new_rows = []
+                    for text, vector in zip(texts, embeddings):
+                        key = self.key_for(text)
+                        if key in self._offsets or key in seen:
+                            continue
+                        seen.add(key)
+                        new_keys.append(key)
+                        new_rows.append(vector)
+
+                    room = self.max_entries - self._count
+                    if len(new_rows) > room:
+                        if not self._full_logged:
+                            logger.warning(
+                                f"Embedding cache full ({self._count} vectors, "
+                                f"max {self.max_entries}); new vectors are not stored"
+                            )
+                            self._full_logged = True
+                        new_keys, new_rows = new_keys[:max(room, 0)], new_rows[:max(room, 0)]
+                    if not new_rows:
+                        return 0
+
+                    block = np.asarray(new_rows, dtype=np.float32)
+                    first_write = self._dim is None
+                    if first_write:
+                        self._dim = int(block.shape[1])
+                    elif block.shape[1] != self._dim:
+                        logger.warning(
+                            f"Embedding dim changed ({self._dim} -> {block.shape[1]}), not caching"
+                        )
+                        return 0
+
+                    # Drop the map before appending so the file can grow on all platforms
+                    self._matrix = None
+
+                    start = self._count
+                    with open(self._data_path, "r+b" if self._data_path.exists() else "wb") as f:
+                        f.seek(start * self._dim * 4)
+                        f.write(block.tobytes())
+                        f.truncate()  # Unreferenced rows of a crashed writer
+                        f.flush()
+
+                    journal = "".join(f"{key} {start + i}\n" for i, key in enumerate(new_keys))
+                    with open(self._journal_path, "ab") as f:
+                        f.write(journal.encode("ascii"))
+                        f.flush()
+                        self._journal_pos = f.tell()
+
+                    for i, key in enumerate(new_keys):
+                        self._offsets[key] = start + i
+                    self._count = start + len(new_keys)
+                    self._journal_lines += len(new_keys)
+
+                    # The snapshot records the dim, so write one with the first rows
+                    if first_write or self._journal_lines >= self.compact_every:
+                        self._compact()
+                    self._open_matrix()
+                    return len(new_keys)
+
+            except Exception as e:
+                logger.error(f"Failed to persist embedding cache: {e}")
+                self._open_matrix()
+                return 0
+
+    # ==================== MAINTENANCE ====================
+
+    def flush(self):
+        """Fold the journal into the JSON snapshot now."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if self._journal_lines and self._dim:
+                self._compact()
+
+    def clear(self):
+        """Remove all cached vectors for this model."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._reset()
+            for path in (self._data_path, self._index_path, self._journal_path):
+                if path.exists():
+                    path.unlink()
+
+    def __len__(self) -> int:
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh()
+            return len(self._offsets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "dim": self._dim,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_caches: Dict[Tuple[str, str], EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(cache_dir: str, model_name: str) -> EmbeddingCache:
+    """
+    Process-wide cache for a (directory, model), so every embedding service
+    on the same files shares one index and lock.
+    """
+    key = (os.path.realpath(cache_dir), model_name)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            max_entries = DEFAULT_MAX_ENTRIES
+            try:
+                from core.config import get_settings
+                max_entries = get_settings().ai.embedding_cache_max_entries
+            except Exception:
+                pass
+            cache = _caches[key] = EmbeddingCache(cache_dir, model_name, max_entries=max_entries)
+        return cache
@@ -0,0 +1,292 @@
+"""
+LABBAIK AI v6.0 - Embedding Worker
+==================================
+Moves SentenceTransformer forward passes off the Streamlit script thread.
+
+Callers enqueue texts on a bounded queue; a dispatcher thread merges
+concurrent requests into micro-batches and runs each batch in a worker
+process that holds its own copy of the model.
+"""
+
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+
+from services.ai.base import LatencyHistogram
+from core.exceptions import RAGError
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# WORKER PROCESS SIDE
+# =============================================================================
+
+_worker_model = None
+
+
+def _load_model(model_name: str):
+    """Pool initializer: load the model once per worker."""
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts: List[str]):
+    """Encode a batch in the worker; returns a float32 numpy matrix."""
+    import numpy as np
+
+    embeddings = _worker_model.encode(texts, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+# =============================================================================
+# EMBEDDING WORKER
+# =============================================================================
+
+class EmbeddingWorker:
+    """
+    Micro-batching embedding worker.
+
+    Requests are merged until ``max_batch`` texts are pending or the oldest
+    has waited ``max_wait_ms``. At most ``processes`` batches run at once;
+    while they run, new requests accumulate into the next batch.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        processes: int = 1,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 1024,
+        use_processes: bool = True
+    ):
+        self.model_name = model_name
+        self.processes = max(1, processes)
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.use_processes = use_processes
+
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue(maxsize=max_queue)
+        self._slots = threading.Semaphore(self.processes)
+        self._pool = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self._warm = threading.Event()  # Set after the first successful batch
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batch_latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        self._batch_sizes: Dict[int, int] = {}
+        self.batches = 0
+        self.texts = 0
+        self.rejected = 0
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        """Start the pool and dispatcher (idempotent)."""
+        with self._start_lock:
+            if self._dispatcher is not None:
+                return
+            if self.use_processes:
+                # spawn: forking a process that may already hold torch threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_model,
+                    initargs=(self.model_name,),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.processes,
+                    thread_name_prefix="embedding",
+                    initializer=_load_model,
+                    initargs=(self.model_name,),
+                )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="embedding-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+            logger.info(
+                f"Embedding worker started: {self.processes} "
+                f"{'process' if self.use_processes else 'thread'}(s), "
+                f"batch<={self.max_batch}, wait<={self.max_wait_ms}ms"
+            )
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting requests and shut the pool down."""
+        self._stopped = True
+        if self._dispatcher is not None:
+            self._queue.put(([], None))  # Wake the dispatcher
+            self._dispatcher.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+    @property
+    def ready(self) -> bool:
+        """A batch has been encoded, i.e. the pool has loaded the model."""
+        return self._warm.is_set()
+
+    # ==================== SUBMIT ====================
+
+    def submit(self, texts: List[str], timeout: Optional[float] = 1.0) -> Future:
+        """
+        Enqueue texts for embedding.
+
+        Args:
+            texts: Texts to embed
+            timeout: Seconds to wait for queue space
+
+        Returns:
+            Future resolving to a list of embeddings aligned with ``texts``
+        """
+        if self._stopped:
+            raise RAGError("Embedding worker is shut down")
+        self.start()
+
+        future: Future = Future()
+        future.enqueued_at = time.perf_counter()
+        try:
+            self._queue.put((list(texts), future), timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise RAGError("Embedding queue is full, try again shortly")
+        return future
+
+    def embed(self, texts: List[str], timeout: Optional[float] = 60.0) -> List[List[float]]:
+        """Embed texts through the worker and wait for the result."""
+        if not texts:
+            return []
+        return self.submit(texts).result(timeout=timeout)
+
+    # ==================== DISPATCH ====================
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        """Block for one request, then gather more until the batch closes."""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+
+        # Wait for a free worker; requests keep queueing meanwhile
+        self._slots.acquire()
+
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _dispatch_loop(self):
+        while not self._stopped:
+            batch = self._collect()
+            batch = [(texts, future) for texts, future in batch if future is not None]
+            if not batch:
+                self._slots.release()
+                continue
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            started = time.perf_counter()
+            for _, future in batch:
+                self.queue_wait.record((started - future.enqueued_at) * 1000)
+
+            try:
+                result = self._pool.submit(_encode_batch, texts)
+            except Exception as e:
+                self._slots.release()
+                for _, future in batch:
+                    future.set_exception(RAGError(f"Failed to generate embeddings: {e}"))
+                continue
+
+            result.add_done_callback(
+                lambda done, batch=batch, started=started, count=len(texts):
+                    self._complete_batch(done, batch, started, count)
+            )
+
+    def _complete_batch(self, done: Future, batch, started: float, count: int):
+        """Split a finished batch back onto the request futures."""
+        self._slots.release()
+        self.batch_latency.record((time.perf_counter() - started) * 1000)
+        with self._stats_lock:
+            self.batches += 1
+            self.texts += count
+            self._batch_sizes[count] = self._batch_sizes.get(count, 0) + 1
+
+        error = done.exception()
+        if error is not None:
+            logger.error(f"Embedding batch failed: {error}")
+            for _, future in batch:
+                future.set_exception(RAGError(f"Failed to generate embeddings: {error}"))
+            return
+
+        matrix = done.result()
+        self._warm.set()
+        offset = 0
+        for texts, future in batch:
+            future.set_result(matrix[offset:offset + len(texts)].tolist())
+            offset += len(texts)
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch size distribution and batch latency."""
+        with self._stats_lock:
+            sizes = dict(sorted(self._batch_sizes.items()))
+            batches, texts, rejected = self.batches, self.texts, self.rejected
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "texts": texts,
+            "mean_batch_size": texts / batches if batches else 0.0,
+            "batch_sizes": sizes,
+            "rejected": rejected,
+            "batch_latency": self.batch_latency.get_stats(),
+            "queue_wait": self.queue_wait.get_stats(),
+        }
+
+
+# =============================================================================
+# PROCESS-WIDE WORKER
+# =============================================================================
+
+_shared_worker: Optional[EmbeddingWorker] = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_worker() -> Optional[EmbeddingWorker]:
+    """
+    Get the process-wide embedding worker configured in settings.
+
+    Returns:
+        The shared EmbeddingWorker, or None when
+        ``ai.embedding_worker_processes`` is 0
+    """
+    global _shared_worker
+
+    with _shared_lock:
+        if _shared_worker is None:
+            from core.config import get_settings
+
+            ai = get_settings().ai
+            if ai.embedding_worker_processes <= 0:
+                return None
+            _shared_worker = EmbeddingWorker(
+                model_name=ai.embedding_model,
+                processes=ai.embedding_worker_processes,
+                max_batch=ai.embedding_max_batch,
+                max_wait_ms=ai.embedding_max_wait_ms,
+                max_queue=ai.embedding_queue_size,
+            )
+        return _shared_worker
@@ -0,0 +1,364 @@
+"""
+LABBAIK AI v6.0 - Chat History Compaction
+=========================================
+Keeps the chat history sent to the LLM bounded on long conversations.
+
+Recent turns are sent verbatim. Once they exceed a token threshold, the
+older ones are folded into a rolling summary ("memory") that is cached per
+conversation, so each turn is summarized once and the prompt prefix only
+changes when the memory is extended. LLM summaries are written in the
+background after the reply; until one lands, the previous memory plus an
+extractive summary of the new turns is sent.
+"""
+
+import re
+import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from services.ai.base import ChatMessage, ChatCompletionRequest, MessageRole
+from services.ai.chunking import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class CompactedHistory:
+    """History as sent to the LLM."""
+    summary: str                    # Rolling memory of older turns ("" if none)
+    messages: List[ChatMessage]     # Recent turns, verbatim
+    summarized: int = 0             # Leading history messages covered by the summary
+    raw_tokens: int = 0             # Tokens of the full history
+    tokens: int = 0                 # Tokens actually sent (summary + messages)
+    key: str = ""                   # Conversation key of the cached memory
+    pending: bool = False           # An LLM summary is queued for ``key``
+
+
+@dataclass
+class _Memory:
+    """Cached summary of a conversation's first ``covered`` messages."""
+    summary: str
+    covered: int
+    fingerprint: str
+    tokens: int = 0
+
+
+@dataclass
+class _SummaryJob:
+    """LLM summary to write once the reply has been sent."""
+    previous: str
+    messages: List[ChatMessage]
+    covered: int
+    fingerprint: str
+
+
+# =============================================================================
+# HISTORY COMPACTOR
+# =============================================================================
+
+class HistoryCompactor:
+    """
+    Rolling summary of older chat turns.
+
+    While the turns after the cached memory fit in ``max_tokens`` they are
+    sent as they are. When they no longer fit, everything but the newest
+    ``recent_tokens`` worth of turns is folded into the memory, by the chat
+    service when one is given, otherwise (or if it fails) by an extractive
+    summary of each turn's first sentence. The chat service is never called
+    from ``compact``: the turn gets an extractive stop-gap and the LLM
+    summary is queued until ``summarize_pending`` runs it on a background
+    thread. Memories are keyed by conversation id (none are kept without
+    one) and fingerprinted, so an edited or cleared history starts a fresh
+    one.
+    """
+
+    SUMMARY_PROMPT = """Ringkas percakapan antara pengguna dan LABBAIK AI (asisten perencanaan Umrah) berikut menjadi catatan singkat.
+
+Pertahankan: rencana dan preferensi pengguna (tanggal, budget, jumlah jamaah, kota, paket), pertanyaan yang sudah dijawab beserta inti jawabannya, dan hal yang masih terbuka.
+Tulis dalam bahasa Indonesia, berupa poin-poin, maksimal {max_tokens} token. Jangan menambah informasi baru."""
+
+    def __init__(
+        self,
+        chat_service=None,
+        max_tokens: int = 400,
+        recent_tokens: int = 150,
+        summary_tokens: int = 120,
+        min_recent_messages: int = 2,
+        max_conversations: int = 512
+    ):
+        """
+        Args:
+            chat_service: BaseChatService used to summarize (extractive if None)
+            max_tokens: Verbatim history above this many tokens is compacted
+            recent_tokens: Newest turns kept verbatim after compaction
+            summary_tokens: Max tokens of the rolling summary
+            min_recent_messages: Messages always kept verbatim
+            max_conversations: Cached memories (LRU)
+        """
+        self.chat_service = chat_service
+        self.max_tokens = max_tokens
+        self.recent_tokens = min(recent_tokens, max_tokens)
+        self.summary_tokens = summary_tokens
+        self.min_recent_messages = min_recent_messages
+        self.max_conversations = max_conversations
+
+        self._memories: "OrderedDict[str, _Memory]" = OrderedDict()
+        self._pending: Dict[str, _SummaryJob] = {}
+        self._running: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.turns = 0
+        self.compacted_turns = 0
+        self.summaries = 0
+        self.llm_summaries = 0
+        self.summary_failures = 0
+        self.raw_tokens = 0
+        self.sent_tokens = 0
+
+    # ==================== HELPERS ====================
+
+    @staticmethod
+    def _fingerprint(messages: List[ChatMessage]) -> str:
+        digest = hashlib.sha1()
+        for msg in messages:
+            digest.update(msg.role.value.encode())
+            digest.update(b"\x00")
+            digest.update(msg.content.encode("utf-8"))
+            digest.update(b"\x01")
+        return digest.hexdigest()
+
+    @staticmethod
+    def conversation_key(conversation_id: Optional[str]) -> str:
+        """Cache key: the conversation (or chat session) id, "" when there is none."""
+        return str(conversation_id) if conversation_id else ""
+
+    def _split_recent(self, messages: List[ChatMessage], tokens: List[int]) -> int:
+        """Index of the first message of the newest turns kept verbatim."""
+        split, used = len(messages), 0
+        while split > 0:
+            kept = len(messages) - split
+            if kept >= self.min_recent_messages and used + tokens[split - 1] > self.recent_tokens:
+                break
+            used += tokens[split - 1]
+            split -= 1
+        # Start the verbatim part on a user turn when there is one to start on
+        turn_start = split
+        while 0 < turn_start < len(messages) and messages[turn_start].role != MessageRole.USER:
+            turn_start -= 1
+        return turn_start or split
+
+    # ==================== SUMMARIZING ====================
+
+    @staticmethod
+    def _first_sentence(text: str, max_words: int) -> str:
+        text = re.sub(r"[#*_`>|]+", " ", text)
+        text = " ".join(text.split())
+        sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        words = sentence.split()
+        return " ".join(words[:max_words]) + (" …" if len(words) > max_words else "")
+
+    def _extractive_summary(self, previous: str, messages: List[ChatMessage]) -> str:
+        """Previous summary plus the first sentence of each turn, oldest lines dropped first."""
+        lines = previous.splitlines() if previous else []
+        for msg in messages:
+            if msg.role == MessageRole.USER:
+                lines.append(f"- Pengguna: {self._first_sentence(msg.content, 30)}")
+            elif msg.role == MessageRole.ASSISTANT:
+                lines.append(f"- LABBAIK: {self._first_sentence(msg.content, 25)}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _summarize(self, previous: str, messages: List[ChatMessage]) -> str:
+        """Fold ``messages`` into the previous summary (blocks on the chat service)."""
+        if self.chat_service is not None:
+            transcript = "\n\n".join(
+                f"{'Pengguna' if msg.role == MessageRole.USER else 'LABBAIK'}: {msg.content}"
+                for msg in messages
+            )
+            if previous:
+                transcript = f"RINGKASAN SEBELUMNYA:\n{previous}\n\nPERCAKAPAN LANJUTAN:\n{transcript}"
+            request = ChatCompletionRequest(
+                messages=[
+                    ChatMessage.system(self.SUMMARY_PROMPT.format(max_tokens=self.summary_tokens)),
+                    ChatMessage.user(transcript),
+                ],
+                temperature=0.2,
+                max_tokens=self.summary_tokens,
+            )
+            try:
+                summary = self.chat_service.complete(request).content.strip()
+                if summary:
+                    self.llm_summaries += 1
+                    return summary
+            except Exception as e:
+                self.summary_failures += 1
+                logger.warning(f"History summary failed, using extractive summary: {e}")
+        return self._extractive_summary(previous, messages)
+
+    # ==================== COMPACTION ====================
+
+    def compact(
+        self,
+        history: Optional[List[ChatMessage]],
+        conversation_id: Optional[str] = None
+    ) -> CompactedHistory:
+        """
+        Compact a conversation's history for the next prompt.
+
+        Args:
+            history: Previous messages, oldest first (without the new question)
+            conversation_id: Stable conversation or chat session id; without
+                one nothing is cached and summaries stay extractive
+
+        Returns:
+            CompactedHistory with the summary and the verbatim recent turns
+        """
+        history = [msg for msg in (history or []) if msg.role != MessageRole.SYSTEM]
+        tokens = [count_tokens(msg.content) for msg in history]
+        raw_tokens = sum(tokens)
+        key = self.conversation_key(conversation_id) if history else ""
+
+        memory = None
+        if key:
+            with self._lock:
+                memory = self._memories.get(key)
+                if memory is not None:
+                    self._memories.move_to_end(key)
+            if memory is not None and (
+                memory.covered > len(history)
+                or memory.fingerprint != self._fingerprint(history[:memory.covered])
+            ):
+                memory = None
+
+        start = memory.covered if memory else 0
+        summary = memory.summary if memory else ""
+        summary_tokens = memory.tokens if memory else 0
+        pending = False
+
+        if sum(tokens[start:]) > self.max_tokens:
+            split = start + self._split_recent(history[start:], tokens[start:])
+            if split > start:
+                previous = summary
+                summary = self._extractive_summary(previous, history[start:split])
+                summary_tokens = count_tokens(summary)
+                fingerprint = self._fingerprint(history[:split])
+                with self._lock:
+                    self.summaries += 1
+                    if key and self.chat_service is not None:
+                        # Stop-gap for this turn; the LLM summary replaces it later
+                        self._pending[key] = _SummaryJob(
+                            previous=previous,
+                            messages=history[start:split],
+                            covered=split,
+                            fingerprint=fingerprint,
+                        )
+                        pending = True
+                    elif key:
+                        self._store(key, _Memory(summary, split, fingerprint, summary_tokens))
+                start = split
+
+        recent = history[start:]
+        sent = (summary_tokens if start else 0) + sum(tokens[start:])
+        with self._lock:
+            self.turns += 1
+            self.compacted_turns += 1 if start else 0
+            self.raw_tokens += raw_tokens
+            self.sent_tokens += sent
+        return CompactedHistory(
+            summary=summary if start else "",
+            messages=recent,
+            summarized=start,
+            raw_tokens=raw_tokens,
+            tokens=sent,
+            key=key,
+            pending=pending,
+        )
+
+    def _store(self, key: str, memory: _Memory):
+        """Cache a memory (lock held)."""
+        self._memories[key] = memory
+        self._memories.move_to_end(key)
+        while len(self._memories) > self.max_conversations:
+            self._memories.popitem(last=False)
+
+    # ==================== BACKGROUND SUMMARIES ====================
+
+    def summarize_pending(self, key: str) -> bool:
+        """
+        Write the queued LLM summary of a conversation in the background.
+
+        Call once the reply has been produced. At most one summary per
+        conversation is in flight; a job queued meanwhile waits for the
+        next call.
+
+        Args:
+            key: CompactedHistory.key of the turn
+
+        Returns:
+            True if a summary was started
+        """
+        with self._lock:
+            if not key or key in self._running:
+                return False
+            job = self._pending.pop(key, None)
+            if job is None:
+                return False
+            self._running.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+            executor = self._executor
+        executor.submit(self._run_job, key, job)
+        return True
+
+    def _run_job(self, key: str, job: _SummaryJob):
+        try:
+            summary = self._summarize(job.previous, job.messages)
+            with self._lock:
+                current = self._memories.get(key)
+                # Keep a memory that already covers more of the conversation
+                if current is None or current.covered < job.covered or (
+                    current.covered == job.covered and current.fingerprint != job.fingerprint
+                ):
+                    self._store(key, _Memory(summary, job.covered, job.fingerprint, count_tokens(summary)))
+                queued = self._pending.get(key)
+                if queued is not None and queued.covered <= job.covered:
+                    del self._pending[key]
+        except Exception as e:
+            logger.warning(f"Background history summary failed: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(key)
+
+    def forget(self, conversation_id: str):
+        """Drop the cached memory of a conversation."""
+        with self._lock:
+            self._memories.pop(str(conversation_id), None)
+            self._pending.pop(str(conversation_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compaction counts and history tokens before/after."""
+        with self._lock:
+            conversations = len(self._memories)
+            pending = len(self._pending) + len(self._running)
+        return {
+            "conversations": conversations,
+            "pending_summaries": pending,
+            "turns": self.turns,
+            "compacted_turns": self.compacted_turns,
+            "summaries": self.summaries,
+            "llm_summaries": self.llm_summaries,
+            "summary_failures": self.summary_failures,
+            "raw_tokens": self.raw_tokens,
+            "sent_tokens": self.sent_tokens,
+            "tokens_saved": self.raw_tokens - self.sent_tokens,
+        }
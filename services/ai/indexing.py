@@ -0,0 +1,305 @@
+"""
+LABBAIK AI v6.0 - Knowledge Indexing Pipeline
+=============================================
+Content-hash incremental indexing of the knowledge base.
+
+Every guide, FAQ and phrase is chunked as its own source unit. Chunk IDs
+are content hashes, so diffing them against the stored manifest tells
+exactly which chunks must be embedded, which deleted and which kept.
+
+With a ``snapshot_path`` the source units, chunks and chunk embeddings
+come from the compiled knowledge snapshot (see data.knowledge.snapshot),
+which is rebuilt automatically when the knowledge modules change.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from services.ai.rag_service import RAGService, Document
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class IndexReport:
+    """Outcome of an indexing run."""
+    sources: int
+    added: int
+    removed: int
+    unchanged: int
+    full_rebuild: bool
+    dry_run: bool
+    wall_time_ms: float
+    knowledge_version: str
+    sparse_rebuild: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def summary(self) -> str:
+        """One-line human readable summary."""
+        mode = "dry run" if self.dry_run else ("full rebuild" if self.full_rebuild else "incremental")
+        return (
+            f"{mode}: {self.sources} sources, +{self.added} added, "
+            f"-{self.removed} removed, {self.unchanged} unchanged"
+            f"{', BM25 rebuilt' if self.sparse_rebuild else ''} "
+            f"in {self.wall_time_ms / 1000:.2f}s"
+        )
+
+
+# =============================================================================
+# KNOWLEDGE INDEXER
+# =============================================================================
+
+class KnowledgeIndexer:
+    """
+    Incremental indexer that keeps a RAGService in sync with the
+    knowledge base source units.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(
+        self,
+        rag_service: RAGService,
+        manifest_path: str = ".cache/knowledge_manifest.json",
+        snapshot_path: Optional[str] = None
+    ):
+        self.rag_service = rag_service
+        self.manifest_path = Path(manifest_path)
+        self.snapshot_path = snapshot_path
+
+    @staticmethod
+    def chunk_id(source_id: str, text: str) -> str:
+        """Content hash identifying a chunk of a source unit."""
+        return hashlib.sha256(f"{source_id}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def version_for(chunk_ids) -> str:
+        """Stable knowledge version derived from the indexed chunk set."""
+        digest = hashlib.sha256("\n".join(sorted(chunk_ids)).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    # ==================== CHUNKING ====================
+
+    def build_chunks(self, sources: List[Dict[str, Any]]) -> Dict[str, Document]:
+        """
+        Chunk every source unit with the RAG service's chunker.
+
+        Args:
+            sources: Units from ``get_knowledge_sources()``
+
+        Returns:
+            Mapping of chunk ID to Document
+        """
+        chunks: Dict[str, Document] = {}
+
+        for source in sources:
+            pieces = self.rag_service.chunker.chunk(source["text"])
+            for position, piece in enumerate(pieces):
+                doc_id = self.chunk_id(source["source_id"], piece.text)
+                chunks[doc_id] = Document(
+                    id=doc_id,
+                    content=piece.text,
+                    metadata={
+                        "source": source["source_id"],
+                        "kind": source.get("kind", "general"),
+                        "category": source.get("category", "general"),
+                        "position": position,
+                        "tokens": piece.tokens,
+                    }
+                )
+
+        return chunks
+
+    def chunks_from_snapshot(self, snapshot) -> Dict[str, Document]:
+        """
+        Documents for the chunk records of a knowledge snapshot.
+
+        Args:
+            snapshot: KnowledgeSnapshot whose chunks match this chunker
+
+        Returns:
+            Mapping of chunk ID to Document
+        """
+        chunks: Dict[str, Document] = {}
+
+        for record in snapshot.chunks:
+            doc_id = self.chunk_id(record["source_id"], record["text"])
+            chunks[doc_id] = Document(
+                id=doc_id,
+                content=record["text"],
+                metadata={
+                    "source": record["source_id"],
+                    "kind": record["kind"],
+                    "category": record["category"],
+                    "position": record["position"],
+                    "tokens": record["tokens"],
+                }
+            )
+
+        return chunks
+
+    def _load_snapshot(self, dry_run: bool):
+        """Current knowledge snapshot with chunks (and embeddings unless dry run)."""
+        from data.knowledge import load_or_build_snapshot
+
+        embedding_service = self.rag_service.vector_store.embedding_service
+        snapshot = load_or_build_snapshot(
+            self.snapshot_path,
+            chunker=self.rag_service.chunker,
+            embedder=None if dry_run else embedding_service,
+        )
+        if snapshot is None or not snapshot.has_chunks(self.rag_service.chunker):
+            return None
+
+        seed = getattr(embedding_service, "seed", None)
+        if seed is not None and snapshot.has_embeddings(embedding_service.model_name):
+            seed([record["text"] for record in snapshot.chunks], snapshot.embeddings())
+        return snapshot
+
+    # ==================== MANIFEST ====================
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != self.MANIFEST_VERSION:
+                return None
+            return manifest
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return None
+
+    def _save_manifest(self, chunks: Dict[str, Document]):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": self.MANIFEST_VERSION,
+            "model": self.rag_service.vector_store.embedding_service.model_name,
+            "sparse": self.rag_service.sparse_index is not None,
+            "chunks": {doc_id: doc.metadata["source"] for doc_id, doc in chunks.items()},
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _needs_full_rebuild(self, manifest: Optional[Dict[str, Any]]) -> bool:
+        """Whether the manifest can no longer be trusted to describe the store."""
+        if manifest is None:
+            return True
+
+        model = self.rag_service.vector_store.embedding_service.model_name
+        if manifest.get("model") != model:
+            logger.info("Embedding model changed, rebuilding index")
+            return True
+
+        if self.rag_service.vector_store.count() != len(manifest.get("chunks", {})):
+            logger.info("Vector store out of sync with manifest, rebuilding index")
+            return True
+
+        return False
+
+    def _needs_sparse_rebuild(self, manifest: Optional[Dict[str, Any]]) -> bool:
+        """
+        Whether the BM25 index must be rebuilt from every chunk.
+
+        The dense store can be in sync while the sparse index is not, e.g.
+        after hybrid retrieval was switched on or ``bm25.npz`` was lost.
+        """
+        sparse_index = self.rag_service.sparse_index
+        if sparse_index is None or manifest is None:
+            return False
+        if not manifest.get("sparse") or sparse_index.count() != len(manifest.get("chunks", {})):
+            logger.info("BM25 index out of sync with manifest, rebuilding it")
+            return True
+        return False
+
+    # ==================== RUN ====================
+
+    def run(
+        self,
+        sources: Optional[List[Dict[str, Any]]] = None,
+        dry_run: bool = False
+    ) -> IndexReport:
+        """
+        Sync the RAG indexes with the knowledge base.
+
+        Args:
+            sources: Source units (defaults to the bundled knowledge base,
+                read from the snapshot when ``snapshot_path`` is set)
+            dry_run: Only compute the diff
+
+        Returns:
+            IndexReport with added/removed/unchanged counts and wall time
+        """
+        start = time.perf_counter()
+
+        snapshot = None
+        if sources is None and self.snapshot_path:
+            snapshot = self._load_snapshot(dry_run)
+
+        if snapshot is not None:
+            sources = snapshot.sources
+            chunks = self.chunks_from_snapshot(snapshot)
+            snapshot.close()
+        else:
+            if sources is None:
+                from data.knowledge import get_knowledge_sources
+                sources = get_knowledge_sources()
+            chunks = self.build_chunks(sources)
+
+        manifest = self._load_manifest()
+        full_rebuild = self._needs_full_rebuild(manifest)
+        sparse_rebuild = not full_rebuild and self._needs_sparse_rebuild(manifest)
+
+        previous = set() if full_rebuild else set(manifest["chunks"])
+        current = set(chunks)
+
+        to_add = [chunks[doc_id] for doc_id in chunks if doc_id not in previous]
+        to_remove = sorted(previous - current)
+        unchanged = len(current & previous)
+
+        if not dry_run:
+            if full_rebuild:
+                self.rag_service.clear_knowledge()
+            if to_remove:
+                self.rag_service.delete_knowledge(to_remove)
+            if to_add:
+                self.rag_service.upsert_documents(to_add)
+            if sparse_rebuild:
+                documents = list(chunks.values())
+                self.rag_service.sparse_index.clear()
+                self.rag_service.sparse_index.add_documents(
+                    [doc.id for doc in documents],
+                    [doc.content for doc in documents],
+                    [doc.metadata for doc in documents]
+                )
+            self._save_manifest(chunks)
+            self.rag_service.knowledge_version = self.version_for(current)
+
+        report = IndexReport(
+            sources=len(sources),
+            added=len(to_add),
+            removed=len(to_remove),
+            unchanged=unchanged,
+            full_rebuild=full_rebuild,
+            dry_run=dry_run,
+            wall_time_ms=(time.perf_counter() - start) * 1000,
+            knowledge_version=self.version_for(current),
+            sparse_rebuild=sparse_rebuild,
+        )
+        logger.info(f"Knowledge indexing {report.summary()}")
+        return report
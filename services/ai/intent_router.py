@@ -0,0 +1,346 @@
+"""
+LABBAIK AI v6.0 - Intent Router
+===============================
+Answers common chat questions from the curated FAQ without an LLM call.
+
+Routing runs before RAG:
+
+1. An Aho-Corasick automaton finds every FAQ keyword and chat-context
+   phrase in the question in one pass. Keywords are weighted by how
+   specific they are across the FAQ set ("haid" counts, "umrah" does not).
+   Text is folded to transliteration keys first, so "thawaf" matches
+   "tawaf" and "sa'i" matches "sai".
+2. If no FAQ clearly wins on keywords, the question is compared to the FAQ
+   questions by embedding similarity (when an embedding model is ready).
+3. Only a confident match is answered directly; everything else is
+   escalated to RAGService.
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from data.knowledge.search_index import analyze
+from data.knowledge.transliteration import normalize_transliteration, normalize_word
+from services.ai.base import LatencyHistogram
+from core.logging_config import perf_logger
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# AHO-CORASICK
+# =============================================================================
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: all occurrences of all patterns in one pass.
+
+    Matches are reported only on word boundaries, so "cara" does not fire
+    inside "bicara".
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]  # (pattern length, value)
+        self._built = False
+
+    def add(self, pattern: str, value: Any):
+        """Add a pattern (already normalized) with the value reported on match."""
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((len(pattern), value))
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links (breadth first)."""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Yield (start, end, value) for every whole-word occurrence.
+
+        Args:
+            text: Normalized text
+        """
+        if not self._built:
+            self.build()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._out[state]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end == len(text) or not text[end].isalnum()
+                ):
+                    yield start, end, value
+
+
+# =============================================================================
+# ROUTER
+# =============================================================================
+
+@dataclass
+class IntentMatch:
+    """Outcome of routing one question."""
+    method: str  # "keyword" | "semantic" | "none"
+    confidence: float
+    intent: Optional[str] = None  # FAQ id
+    answer: Optional[str] = None  # Set only when answered without the LLM
+    context: Optional[str] = None  # Chat context label from the context phrases
+    faq: Any = None
+    latency_ms: float = 0.0
+
+    @property
+    def answered(self) -> bool:
+        return self.answer is not None
+
+
+class IntentRouter:
+    """
+    Routes chat questions to curated FAQ answers or to the LLM.
+
+    Keyword confidence is the share of the question's specific words
+    explained by the FAQ with the highest keyword weight (its keywords and
+    question text), divided by the number of FAQs tied for that weight.
+    A question equal to an FAQ question scores 1. Semantic confidence is
+    the cosine similarity to the nearest FAQ question, accepted only with
+    a margin over the second nearest.
+    """
+
+    def __init__(
+        self,
+        faqs: Optional[List[Any]] = None,
+        contexts: Optional[Dict[str, Iterable[str]]] = None,
+        embedding_service=None,
+        keyword_threshold: float = 0.65,
+        semantic_threshold: float = 0.8,
+        semantic_margin: float = 0.03
+    ):
+        """
+        Args:
+            faqs: FAQ items (defaults to ``get_all_faqs()``)
+            contexts: Chat context label -> phrases that select it
+            embedding_service: Service with ``embed(texts)`` for the
+                nearest-neighbour fallback (keyword routing only if None)
+            keyword_threshold: Min keyword confidence to answer directly
+            semantic_threshold: Min cosine similarity to answer directly
+            semantic_margin: Min similarity lead over the second-best FAQ
+        """
+        if faqs is None:
+            from data.knowledge import get_all_faqs
+            faqs = get_all_faqs()
+
+        self.faqs = {faq.id: faq for faq in faqs}
+        self.embedding_service = embedding_service
+        self.keyword_threshold = keyword_threshold
+        self.semantic_threshold = semantic_threshold
+        self.semantic_margin = semantic_margin
+
+        # Specificity of a term: inverse document frequency over the FAQs
+        documents = {
+            faq.id: self._terms(f"{faq.question} {faq.answer} {' '.join(faq.keywords)}")
+            for faq in faqs
+        }
+        df: Dict[str, int] = {}
+        for terms in documents.values():
+            for term in terms:
+                df[term] = df.get(term, 0) + 1
+        n = max(1, len(faqs))
+        self._idf = {term: math.log((n + 1) / (count + 0.5)) for term, count in df.items()}
+        # Terms in half the FAQs or more say nothing about which one is meant
+        self._common = {term for term, count in df.items() if count * 2 >= n}
+
+        self._faq_terms = {
+            faq.id: self._terms(f"{faq.question} {' '.join(faq.keywords)}")
+            for faq in faqs
+        }
+        self._questions = {self._fold(faq.question): faq.id for faq in faqs}
+
+        self._matcher = AhoCorasick()
+        self._keyword_weight: Dict[str, float] = {}
+        for faq in faqs:
+            for keyword in faq.keywords:
+                pattern = self._fold(keyword)
+                self._matcher.add(pattern, ("faq", faq.id, pattern))
+                terms = [t for t in self._terms(keyword) if t not in self._common]
+                self._keyword_weight[pattern] = (
+                    sum(self._idf.get(t, 0.0) for t in terms) / len(terms) if terms else 0.0
+                )
+        for label, phrases in (contexts or {}).items():
+            for phrase in phrases:
+                self._matcher.add(self._fold(phrase), ("context", label, None))
+        self._matcher.build()
+
+        self._faq_ids = list(self.faqs)
+        self._faq_vectors = None
+        self._vector_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"routed": 0, "keyword": 0, "semantic": 0, "escalated": 0}
+        self.route_latency = LatencyHistogram(min_ms=0.01)
+        self.escalated_latency = LatencyHistogram()
+
+    # ==================== MATCHING ====================
+
+    @staticmethod
+    def _fold(text: str) -> str:
+        """Text as space-separated transliteration keys (matcher input)."""
+        return " ".join(normalize_transliteration(text))
+
+    @staticmethod
+    def _terms(text: str) -> set:
+        """Stemmed, stopword-free, transliteration-folded terms."""
+        return {normalize_word(term) for term in analyze(text)}
+
+    def _keyword_match(self, question: str) -> Tuple[Optional[str], float, Optional[str]]:
+        """Best FAQ by keywords, its confidence and the chat context."""
+        folded = self._fold(question)
+        scores: Dict[str, float] = {}
+        matched: Dict[str, set] = {}
+        contexts: Dict[str, int] = {}
+        for _, _, (kind, label, pattern) in self._matcher.iter(folded):
+            if kind == "context":
+                contexts[label] = contexts.get(label, 0) + 1
+            elif pattern not in matched.setdefault(label, set()):
+                matched[label].add(pattern)
+                scores[label] = scores.get(label, 0.0) + self._keyword_weight[pattern]
+
+        context = max(contexts, key=contexts.get) if contexts else None
+        if folded in self._questions:
+            return self._questions[folded], 1.0, context
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] <= 0:
+            return None, 0.0, context
+
+        best, best_score = ranked[0]
+        tied = sum(1 for _, score in ranked if score >= best_score - 1e-9)
+
+        terms = self._terms(question) - self._common
+        coverage = len(terms & self._faq_terms[best]) / len(terms) if terms else 0.0
+        return best, coverage / tied, context
+
+    def _semantic_match(self, question: str) -> Tuple[Optional[str], float]:
+        """Nearest FAQ question by embedding, if it leads by the margin."""
+        import numpy as np
+
+        with self._vector_lock:
+            if self._faq_vectors is None:
+                vectors = np.asarray(self.embedding_service.embed(
+                    [self.faqs[faq_id].question for faq_id in self._faq_ids]
+                ), dtype=np.float32)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                self._faq_vectors = vectors / np.maximum(norms, 1e-12)
+
+        query = np.asarray(self.embedding_service.embed([question])[0], dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        similarities = self._faq_vectors @ query
+        order = np.argsort(-similarities)
+        best = float(similarities[order[0]])
+        second = float(similarities[order[1]]) if len(order) > 1 else -1.0
+        if best - second < self.semantic_margin:
+            return None, best
+        return self._faq_ids[order[0]], best
+
+    # ==================== ROUTING ====================
+
+    @staticmethod
+    def format_answer(faq) -> str:
+        """Curated answer as shown in chat."""
+        return f"## ❓ {faq.question}\n\n{faq.answer}"
+
+    def route(self, question: str, use_semantic: bool = True) -> IntentMatch:
+        """
+        Route a question.
+
+        Args:
+            question: User question
+            use_semantic: Allow the embedding fallback (False while the
+                model is still loading)
+
+        Returns:
+            IntentMatch; ``answered`` tells whether the LLM can be skipped
+        """
+        start = time.perf_counter()
+
+        faq_id, confidence, context = self._keyword_match(question)
+        method = "keyword"
+        if confidence < self.keyword_threshold:
+            method, faq_id = "none", None
+            if use_semantic and self.embedding_service is not None:
+                try:
+                    semantic_id, similarity = self._semantic_match(question)
+                    confidence = max(confidence, similarity)
+                    if semantic_id and similarity >= self.semantic_threshold:
+                        method, faq_id, confidence = "semantic", semantic_id, similarity
+                except Exception as e:
+                    logger.warning(f"Semantic intent match failed: {e}")
+
+        faq = self.faqs.get(faq_id) if faq_id else None
+        match = IntentMatch(
+            method=method,
+            confidence=confidence,
+            intent=faq_id,
+            answer=self.format_answer(faq) if faq else None,
+            context=context,
+            faq=faq,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+
+        with self._stats_lock:
+            self._stats["routed"] += 1
+            self._stats[method if match.answered else "escalated"] += 1
+        self.route_latency.record(match.latency_ms)
+        perf_logger.log_metric(
+            "intent_route", match.latency_ms,
+            tags={"method": method, "intent": faq_id or "", "confidence": f"{confidence:.2f}"},
+        )
+        return match
+
+    def record_escalation(self, latency_ms: float):
+        """Record the end-to-end latency of a question answered by the LLM."""
+        self.escalated_latency.record(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routing counts, LLM-free share and latencies."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        answered = stats["keyword"] + stats["semantic"]
+        stats["llm_free_ratio"] = answered / stats["routed"] if stats["routed"] else 0.0
+        stats["route_latency"] = self.route_latency.get_stats()
+        stats["escalated_latency"] = self.escalated_latency.get_stats()
+        return stats
@@ -5,12 +5,17 @@ Retrieval-Augmented Generation service with ChromaDB and sentence transformers.
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any, Tuple, Generator, AsyncGenerator
 from dataclasses import dataclass, field
 from pathlib import Path
 import hashlib
 import json
+import uuid
 
 from services.ai.base import (
     BaseChatService,
@@ -19,8 +24,16 @@ from services.ai.base import (
     ChatCompletionResponse,
     MessageRole,
 )
+from services.ai.embedding_cache import get_embedding_cache
+from services.ai.embedding_worker import EmbeddingWorker
+from services.ai.sparse_index import BM25Index, reciprocal_rank_fusion
+from services.ai.answer_cache import SemanticAnswerCache
+from services.ai.chunking import MarkdownChunker, ContextPacker, count_tokens
+from services.ai.reranker import CrossEncoderReranker
+from services.ai.history import HistoryCompactor
 from core.exceptions import RAGError, AIServiceError
 from core.constants import Messages
+from core.logging_config import perf_logger
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +87,41 @@ class RAGResponse:
     sources: List[Dict[str, Any]]
     confidence: float
     chat_response: ChatCompletionResponse
+    context_tokens: int = 0
+    prompt_tokens: int = 0
+
+
+@dataclass
+class RAGStreamEvent:
+    """
+    Event yielded by ``RAGService.stream_query``.
+    
+    A stream is one "sources" event (sources, confidence), any number of
+    "token" events (content) and one "done" event carrying the full
+    RAGResponse and latency metrics.
+    """
+    type: str
+    content: str = ""
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    confidence: float = 0.0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    response: Optional[RAGResponse] = None
+
+
+@dataclass
+class _QueryPlan:
+    """Everything needed to generate an answer once retrieval is done."""
+    request: Optional[ChatCompletionRequest]
+    context: str = ""
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    confidence: float = 0.0
+    context_tokens: int = 0
+    prompt_tokens: int = 0
+    history_tokens: int = 0
+    cache_vector: Optional[List[float]] = None
+    cache_scope: str = ""
+    cached: Optional[RAGResponse] = None
+    history_key: str = ""              # Conversation with a queued history summary
 
 
 # =============================================================================
@@ -84,22 +132,44 @@ class LocalEmbeddingService:
     """
     Local embedding service using sentence-transformers.
     No API key required - runs on device.
+    
+    When ``cache_dir`` is set, embeddings are persisted in an
+    EmbeddingCache and only cache misses go through the model. With a
+    ``worker`` the model runs in the EmbeddingWorker's pool instead of
+    the calling thread. Precomputed vectors (e.g. from the knowledge
+    snapshot) can be handed in with ``seed()``.
     """
     
     DEFAULT_MODEL = "all-MiniLM-L6-v2"
     
-    def __init__(self, model_name: str = None):
+    # Models are shared per process so a warmed-up model (see
+    # services.ai.warmup) is reused by every service instance
+    _shared_models: Dict[str, Any] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        model_name: str = None,
+        cache_dir: Optional[str] = None,
+        worker: Optional[EmbeddingWorker] = None
+    ):
         self.model_name = model_name or self.DEFAULT_MODEL
         self._model = None
         self._initialized = False
+        self.cache = get_embedding_cache(cache_dir, self.model_name) if cache_dir else None
+        self.worker = worker
+        self._seeded: Dict[str, List[float]] = {}
     
     def initialize(self) -> bool:
         """Initialize the embedding model."""
+        if self.worker is not None:
+            self.worker.start()
+            self._initialized = True
+            return True
+        
         try:
-            from sentence_transformers import SentenceTransformer
-            self._model = SentenceTransformer(self.model_name)
+            self._model = self.load_model(self.model_name)
             self._initialized = True
-            logger.info(f"Embedding model loaded: {self.model_name}")
             return True
         except ImportError:
             logger.error("sentence-transformers not installed. Run: pip install sentence-transformers")
@@ -108,16 +178,49 @@ class LocalEmbeddingService:
             logger.error(f"Failed to load embedding model: {e}")
             return False
     
+    @classmethod
+    def load_model(cls, model_name: str):
+        """
+        Load a SentenceTransformer once per process.
+        
+        Args:
+            model_name: sentence-transformers model name
+            
+        Returns:
+            The shared model instance
+        """
+        with cls._shared_lock:
+            model = cls._shared_models.get(model_name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                
+                start = time.perf_counter()
+                model = SentenceTransformer(model_name)
+                cls._shared_models[model_name] = model
+                logger.info(
+                    f"Embedding model loaded: {model_name} "
+                    f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+                )
+            return model
+    
+    @classmethod
+    def is_model_loaded(cls, model_name: str = None) -> bool:
+        """Whether the model is already resident in this process."""
+        return (model_name or cls.DEFAULT_MODEL) in cls._shared_models
+    
     def _ensure_initialized(self):
         """Ensure model is initialized."""
         if not self._initialized:
             if not self.initialize():
                 raise RAGError("Failed to initialize embedding model")
     
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for texts."""
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Run the model forward pass."""
         self._ensure_initialized()
         
+        if self.worker is not None:
+            return self.worker.embed(texts)
+        
         try:
             embeddings = self._model.encode(texts, convert_to_numpy=True)
             return embeddings.tolist()
@@ -125,6 +228,52 @@ class LocalEmbeddingService:
             logger.error(f"Embedding generation failed: {e}")
             raise RAGError(f"Failed to generate embeddings: {e}")
     
+    def seed(self, texts: List[str], vectors) -> int:
+        """
+        Register precomputed embeddings of this model.
+        
+        Args:
+            texts: Embedded texts
+            vectors: Matching rows (list of lists or 2-D array)
+            
+        Returns:
+            Number of texts seeded
+        """
+        for text, vector in zip(texts, vectors):
+            self._seeded[text] = vector.tolist() if hasattr(vector, "tolist") else list(vector)
+        return len(texts)
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for texts, encoding only unseeded cache misses."""
+        if not self._seeded:
+            return self._embed_cached(texts)
+        
+        embeddings = [self._seeded.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            encoded = self._embed_cached([texts[i] for i in missing])
+            for i, vector in zip(missing, encoded):
+                embeddings[i] = vector
+        return embeddings
+    
+    def _embed_cached(self, texts: List[str]) -> List[List[float]]:
+        """Embed through the persistent cache, if any."""
+        if self.cache is None:
+            return self._encode(texts)
+        
+        embeddings = self.cache.get_many(texts)
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        
+        if missing:
+            # Encode each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = dict(zip(unique_texts, self._encode(unique_texts)))
+            self.cache.put_many(unique_texts, [encoded[t] for t in unique_texts])
+            for i in missing:
+                embeddings[i] = encoded[texts[i]]
+        
+        return embeddings
+    
     def embed_single(self, text: str) -> List[float]:
         """Generate embedding for single text."""
         return self.embed([text])[0]
@@ -134,7 +283,73 @@ class LocalEmbeddingService:
 # VECTOR STORE
 # =============================================================================
 
-class ChromaVectorStore:
+class BaseVectorStore(ABC):
+    """
+    Abstract base class for vector stores.
+    Implementations share the add/search/delete/count/clear surface.
+    """
+    
+    embedding_service: LocalEmbeddingService
+    
+    @abstractmethod
+    def initialize(self) -> bool:
+        """Initialize the store."""
+        pass
+    
+    @abstractmethod
+    def add_documents(self, documents: List[Document], batch_size: int = 100) -> int:
+        """Add documents to the vector store."""
+        pass
+    
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> RetrievalResult:
+        """Search for similar documents."""
+        pass
+    
+    @abstractmethod
+    def delete(self, ids: List[str]) -> int:
+        """Delete documents by ID."""
+        pass
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Get document count."""
+        pass
+    
+    @abstractmethod
+    def clear(self) -> bool:
+        """Clear all documents."""
+        pass
+    
+    def _generate_id(self, content: str) -> str:
+        """Generate unique ID for content."""
+        return hashlib.md5(content.encode()).hexdigest()
+    
+    def add_texts(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> int:
+        """Add texts to the vector store."""
+        documents = []
+        for i, text in enumerate(texts):
+            doc = Document(
+                id=ids[i] if ids else self._generate_id(text),
+                content=text,
+                metadata=metadatas[i] if metadatas else {}
+            )
+            documents.append(doc)
+        
+        return self.add_documents(documents)
+
+
+class ChromaVectorStore(BaseVectorStore):
     """
     Vector store using ChromaDB for document storage and retrieval.
     """
@@ -193,10 +408,6 @@ class ChromaVectorStore:
             if not self.initialize():
                 raise RAGError("Failed to initialize vector store")
     
-    def _generate_id(self, content: str) -> str:
-        """Generate unique ID for content."""
-        return hashlib.md5(content.encode()).hexdigest()
-    
     def add_documents(
         self,
         documents: List[Document],
@@ -216,8 +427,8 @@ class ChromaVectorStore:
             # Generate embeddings
             embeddings = self.embedding_service.embed(contents)
             
-            # Add to collection
-            self._collection.add(
+            # Upsert so re-indexing unchanged content does not duplicate it
+            self._collection.upsert(
                 ids=ids,
                 documents=contents,
                 embeddings=embeddings,
@@ -230,24 +441,6 @@ class ChromaVectorStore:
         logger.info(f"Added {added} documents to vector store")
         return added
     
-    def add_texts(
-        self,
-        texts: List[str],
-        metadatas: Optional[List[Dict[str, Any]]] = None,
-        ids: Optional[List[str]] = None
-    ) -> int:
-        """Add texts to the vector store."""
-        documents = []
-        for i, text in enumerate(texts):
-            doc = Document(
-                id=ids[i] if ids else self._generate_id(text),
-                content=text,
-                metadata=metadatas[i] if metadatas else {}
-            )
-            documents.append(doc)
-        
-        return self.add_documents(documents)
-    
     def search(
         self,
         query: str,
@@ -332,23 +525,578 @@ class ChromaVectorStore:
             return False
 
 
+class NumpyVectorStore(BaseVectorStore):
+    """
+    In-process vector store backed by a contiguous float32 NumPy matrix.
+    
+    Embeddings are L2-normalized on insert so a single matrix-vector product
+    gives cosine similarity; top-k uses ``argpartition``. Metadata filters
+    are answered from precomputed (key, value) bitmasks. When
+    ``persist_directory`` is set the index is saved as a ``.npy`` matrix plus
+    a JSON metadata file and memory-mapped on load.
+    
+    With ``quantization="int8"`` rows are also kept as int8 codes with a
+    per-dimension scale/offset. Searches score the codes, then rerank the
+    best ``top_k * rerank_factor`` candidates exactly against the float
+    rows. When persisted, the float matrix stays memory-mapped so only the
+    reranked rows are paged in and the resident index is ~4x smaller.
+    
+    An RLock guards the arrays, since searches run while background
+    indexing adds or deletes documents; embeddings are computed outside it.
+    """
+    
+    QUANT_BLOCK_ROWS = 8192  # Rows dequantized per block while scoring
+    
+    def __init__(
+        self,
+        collection_name: str = "labbaik_knowledge",
+        persist_directory: Optional[str] = None,
+        embedding_service: Optional[LocalEmbeddingService] = None,
+        quantization: Optional[str] = None,
+        rerank_factor: int = 4
+    ):
+        if quantization not in (None, "none", "int8"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self.embedding_service = embedding_service or LocalEmbeddingService()
+        self.quantization = quantization if quantization != "none" else None
+        self.rerank_factor = max(1, rerank_factor)
+        
+        self._matrix = None  # (capacity, dim) float32, or read-only memmap
+        self._size = 0
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._masks: Dict[Tuple[str, Any], Any] = {}
+        self._initialized = False
+        self._lock = threading.RLock()
+        
+        # int8 codes (size, dim) with per-dimension dequantization params
+        self._codes = None
+        self._q_scale = None
+        self._q_offset = None
+    
+    # ==================== PERSISTENCE ====================
+    
+    @property
+    def _matrix_path(self) -> Optional[Path]:
+        if not self.persist_directory:
+            return None
+        return Path(self.persist_directory) / f"{self.collection_name}.npy"
+    
+    @property
+    def _meta_path(self) -> Optional[Path]:
+        if not self.persist_directory:
+            return None
+        return Path(self.persist_directory) / f"{self.collection_name}.meta.json"
+    
+    @property
+    def _codes_path(self) -> Optional[Path]:
+        if not self.persist_directory:
+            return None
+        return Path(self.persist_directory) / f"{self.collection_name}.q8.npz"
+    
+    def initialize(self) -> bool:
+        """Initialize the store, loading a persisted index if present."""
+        with self._lock:
+            try:
+                import numpy as np
+                
+                if self._meta_path and self._meta_path.exists() and self._matrix_path.exists():
+                    with open(self._meta_path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                    
+                    if meta.get("model") != self.embedding_service.model_name:
+                        logger.warning(
+                            f"Vector index built with {meta.get('model')}, "
+                            f"expected {self.embedding_service.model_name}; starting empty"
+                        )
+                    else:
+                        matrix = np.load(self._matrix_path, mmap_mode="r")
+                        if len(matrix) != len(meta["ids"]):
+                            raise RAGError("Vector index and metadata are out of sync")
+                        
+                        self._matrix = matrix
+                        self._size = len(matrix)
+                        self._ids = meta["ids"]
+                        self._contents = meta["documents"]
+                        self._metadatas = meta["metadatas"]
+                        self._id_to_row = {doc_id: i for i, doc_id in enumerate(self._ids)}
+                        self._rebuild_masks()
+                        if self.quantization:
+                            self._load_codes()
+                
+                self._initialized = True
+                logger.info(f"NumPy vector store initialized: {self.collection_name} ({self._size} docs)")
+                return True
+                
+            except ImportError:
+                logger.error("numpy not installed. Run: pip install numpy")
+                return False
+            except Exception as e:
+                logger.error(f"Failed to initialize NumPy vector store: {e}")
+                return False
+    
+    def _ensure_initialized(self):
+        """Ensure store is initialized."""
+        if not self._initialized:
+            if not self.initialize():
+                raise RAGError("Failed to initialize vector store")
+    
+    def _persist(self):
+        """Atomically write matrix and metadata to disk."""
+        if not self.persist_directory:
+            return
+        
+        import numpy as np
+        
+        directory = Path(self.persist_directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        matrix = self._active_matrix()
+        if matrix is None:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        
+        tmp_matrix = self._matrix_path.with_suffix(".npy.tmp")
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+        
+        tmp_meta = self._meta_path.with_suffix(".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.embedding_service.model_name,
+                "ids": self._ids,
+                "documents": self._contents,
+                "metadatas": self._metadatas,
+            }, f, ensure_ascii=False)
+        
+        os.replace(tmp_matrix, self._matrix_path)
+        os.replace(tmp_meta, self._meta_path)
+        
+        if self._codes is not None:
+            tmp_codes = self._codes_path.with_suffix(".tmp.npz")
+            np.savez(tmp_codes, codes=self._codes, scale=self._q_scale, offset=self._q_offset)
+            os.replace(tmp_codes, self._codes_path)
+            
+            # Only the codes need to stay resident; float rows are paged in for rerank
+            self._matrix = np.load(self._matrix_path, mmap_mode="r")
+        elif self._codes_path.exists():
+            self._codes_path.unlink()
+    
+    def _load_codes(self):
+        """Load persisted int8 codes, re-quantizing if missing or stale."""
+        import numpy as np
+        
+        if self._codes_path.exists():
+            with np.load(self._codes_path) as data:
+                if len(data["codes"]) == self._size:
+                    self._codes = data["codes"]
+                    self._q_scale = data["scale"]
+                    self._q_offset = data["offset"]
+                    return
+        self._quantize()
+    
+    # ==================== MATRIX HELPERS ====================
+    
+    def _quantize(self):
+        """Recompute int8 codes and per-dimension scale/offset for all rows."""
+        import numpy as np
+        
+        matrix = self._active_matrix()
+        if not self.quantization or matrix is None or self._size == 0:
+            self._codes = self._q_scale = self._q_offset = None
+            return
+        
+        low = matrix.min(axis=0)
+        span = matrix.max(axis=0) - low
+        scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+        
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        for start in range(0, self._size, self.QUANT_BLOCK_ROWS):
+            block = matrix[start:start + self.QUANT_BLOCK_ROWS]
+            codes[start:start + len(block)] = np.clip(
+                np.rint((block - low) / scale) - 128, -128, 127
+            )
+        
+        self._codes = codes
+        self._q_scale = scale
+        self._q_offset = low.astype(np.float32)
+    
+    def _approx_scores(self, query_vector):
+        """Dot products against the dequantized codes, in bounded blocks."""
+        import numpy as np
+        
+        # x ~= offset + scale * (code + 128)
+        weights = (query_vector * self._q_scale).astype(np.float32)
+        bias = float(query_vector @ self._q_offset) + 128.0 * float(weights.sum())
+        
+        scores = np.empty(self._size, dtype=np.float32)
+        for start in range(0, self._size, self.QUANT_BLOCK_ROWS):
+            block = self._codes[start:start + self.QUANT_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ weights
+        return scores + bias
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Resident bytes of the index arrays (memory maps excluded)."""
+        import numpy as np
+        
+        matrix = self._active_matrix()
+        float_bytes = 0
+        if matrix is not None and not isinstance(self._matrix, np.memmap):
+            float_bytes = matrix.nbytes
+        quant_bytes = 0
+        if self._codes is not None:
+            quant_bytes = self._codes.nbytes + self._q_scale.nbytes + self._q_offset.nbytes
+        return {
+            "float32_bytes": float_bytes,
+            "int8_bytes": quant_bytes,
+            "resident_bytes": float_bytes + quant_bytes,
+        }
+    
+    def _active_matrix(self):
+        """View over the populated rows."""
+        if self._matrix is None:
+            return None
+        return self._matrix[:self._size]
+    
+    def _reserve(self, rows: int, dim: int):
+        """Ensure a writable in-memory buffer with room for ``rows`` more vectors."""
+        import numpy as np
+        
+        needed = self._size + rows
+        writable = isinstance(self._matrix, np.ndarray) and not isinstance(self._matrix, np.memmap)
+        
+        if writable and self._matrix.shape[0] >= needed:
+            return
+        
+        capacity = max(needed, 2 * (self._matrix.shape[0] if self._matrix is not None else 0), 64)
+        buffer = np.empty((capacity, dim), dtype=np.float32)
+        if self._size:
+            buffer[:self._size] = self._matrix[:self._size]
+        self._matrix = buffer  # Drops any memmap reference
+    
+    @staticmethod
+    def _normalize(vectors):
+        """L2-normalize rows."""
+        import numpy as np
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _rebuild_masks(self):
+        """Precompute boolean masks for every scalar (key, value) metadata pair."""
+        import numpy as np
+        
+        masks: Dict[Tuple[str, Any], Any] = {}
+        for row, metadata in enumerate(self._metadatas):
+            for key, value in metadata.items():
+                if isinstance(value, (str, int, float, bool)):
+                    mask = masks.get((key, value))
+                    if mask is None:
+                        mask = masks[(key, value)] = np.zeros(self._size, dtype=bool)
+                    mask[row] = True
+        self._masks = masks
+    
+    def _filter_mask(self, filter_metadata: Dict[str, Any]):
+        """Resolve a Chroma-style ``where`` filter to a boolean row mask."""
+        import numpy as np
+        
+        mask = np.ones(self._size, dtype=bool)
+        empty = np.zeros(self._size, dtype=bool)
+        
+        for key, condition in filter_metadata.items():
+            if key == "$and":
+                for sub_filter in condition:
+                    mask &= self._filter_mask(sub_filter)
+            elif key == "$or":
+                any_mask = empty.copy()
+                for sub_filter in condition:
+                    any_mask |= self._filter_mask(sub_filter)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                if "$eq" in condition:
+                    mask &= self._masks.get((key, condition["$eq"]), empty)
+                elif "$in" in condition:
+                    any_mask = empty.copy()
+                    for value in condition["$in"]:
+                        any_mask |= self._masks.get((key, value), empty)
+                    mask &= any_mask
+                else:
+                    raise RAGError(f"Unsupported metadata filter: {condition}")
+            else:
+                mask &= self._masks.get((key, condition), empty)
+        
+        return mask
+    
+    # ==================== PUBLIC API ====================
+    
+    def add_documents(
+        self,
+        documents: List[Document],
+        batch_size: int = 100
+    ) -> int:
+        """Add (or replace) documents in the vector store."""
+        self._ensure_initialized()
+        
+        # Embed first so the arrays change in one step under the lock
+        batches = []
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i:i + batch_size]
+            batches.append((batch, self._normalize(
+                self.embedding_service.embed([doc.content for doc in batch])
+            )))
+        
+        added = 0
+        with self._lock:
+            for batch, vectors in batches:
+                self._reserve(len(batch), vectors.shape[1])
+                
+                for doc, vector in zip(batch, vectors):
+                    doc_id = doc.id or self._generate_id(doc.content)
+                    row = self._id_to_row.get(doc_id)
+                    
+                    if row is None:
+                        row = self._size
+                        self._size += 1
+                        self._ids.append(doc_id)
+                        self._contents.append(doc.content)
+                        self._metadatas.append(dict(doc.metadata))
+                        self._id_to_row[doc_id] = row
+                    else:
+                        self._contents[row] = doc.content
+                        self._metadatas[row] = dict(doc.metadata)
+                    
+                    self._matrix[row] = vector
+                
+                added += len(batch)
+                logger.debug(f"Added {added}/{len(documents)} documents")
+            
+            self._rebuild_masks()
+            self._quantize()
+            self._persist()
+        
+        logger.info(f"Added {added} documents to vector store")
+        return added
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> RetrievalResult:
+        """Search for similar documents by cosine similarity."""
+        self._ensure_initialized()
+        
+        if self._size == 0 or top_k <= 0:
+            return RetrievalResult(documents=[], scores=[], query=query)
+        
+        try:
+            query_vector = self._normalize(self.embedding_service.embed_single(query))
+            with self._lock:
+                return self._search_vector(query, query_vector, top_k, filter_metadata)
+        except RAGError:
+            raise
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            raise RAGError(f"Search failed: {e}")
+    
+    def _search_vector(
+        self,
+        query: str,
+        query_vector,
+        top_k: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> RetrievalResult:
+        """Top-k rows for a normalized query vector (lock held)."""
+        import numpy as np
+        
+        if self._size == 0:
+            return RetrievalResult(documents=[], scores=[], query=query)
+        
+        if self._codes is not None:
+            scores = self._approx_scores(query_vector)
+        else:
+            scores = self._active_matrix() @ query_vector
+        
+        candidates = self._size
+        if filter_metadata:
+            mask = self._filter_mask(filter_metadata)
+            candidates = int(mask.sum())
+            scores = np.where(mask, scores, -np.inf)
+        
+        k = min(top_k, candidates)
+        if k == 0:
+            return RetrievalResult(documents=[], scores=[], query=query)
+        
+        # Quantized scores only shortlist; the shortlist is rescored exactly
+        shortlist = k
+        if self._codes is not None:
+            shortlist = min(candidates, k * self.rerank_factor)
+        
+        if shortlist < self._size:
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+        else:
+            top = np.arange(self._size)
+        
+        if self._codes is not None:
+            top = np.sort(top)  # Sequential reads from the memory map
+            scores = np.full(self._size, -np.inf, dtype=np.float32)
+            scores[top] = np.asarray(self._matrix[top], dtype=np.float32) @ query_vector
+        
+        top = top[np.argsort(-scores[top], kind="stable")][:k]
+        
+        documents = [
+            Document(
+                id=self._ids[row],
+                content=self._contents[row],
+                metadata=dict(self._metadatas[row])
+            )
+            for row in top
+        ]
+        result_scores = [max(0.0, min(1.0, float(scores[row]))) for row in top]
+        
+        return RetrievalResult(
+            documents=documents,
+            scores=result_scores,
+            query=query
+        )
+    
+    def delete(self, ids: List[str]) -> int:
+        """Delete documents by ID."""
+        self._ensure_initialized()
+        
+        with self._lock:
+            rows = sorted({self._id_to_row[i] for i in ids if i in self._id_to_row})
+            if not rows:
+                return 0
+            
+            try:
+                import numpy as np
+                
+                keep = np.ones(self._size, dtype=bool)
+                keep[rows] = False
+                
+                matrix = np.ascontiguousarray(self._active_matrix()[keep], dtype=np.float32)
+                removed = set(rows)
+                
+                self._ids = [doc_id for i, doc_id in enumerate(self._ids) if i not in removed]
+                self._contents = [c for i, c in enumerate(self._contents) if i not in removed]
+                self._metadatas = [m for i, m in enumerate(self._metadatas) if i not in removed]
+                self._id_to_row = {doc_id: i for i, doc_id in enumerate(self._ids)}
+                self._matrix = matrix
+                self._size = len(matrix)
+                
+                self._rebuild_masks()
+                self._quantize()
+                self._persist()
+                
+                logger.info(f"Deleted {len(rows)} documents")
+                return len(rows)
+            except Exception as e:
+                logger.error(f"Delete failed: {e}")
+                return 0
+    
+    def count(self) -> int:
+        """Get document count."""
+        self._ensure_initialized()
+        with self._lock:
+            return self._size
+    
+    def clear(self) -> bool:
+        """Clear all documents."""
+        self._ensure_initialized()
+        
+        with self._lock:
+            try:
+                self._matrix = None
+                self._size = 0
+                self._ids = []
+                self._contents = []
+                self._metadatas = []
+                self._id_to_row = {}
+                self._masks = {}
+                self._codes = self._q_scale = self._q_offset = None
+                
+                for path in (self._matrix_path, self._meta_path, self._codes_path):
+                    if path and path.exists():
+                        path.unlink()
+                
+                logger.info("Vector store cleared")
+                return True
+            except Exception as e:
+                logger.error(f"Clear failed: {e}")
+                return False
+
+
+VECTOR_STORE_BACKENDS: Dict[str, type] = {
+    "chroma": ChromaVectorStore,
+    "numpy": NumpyVectorStore,
+}
+
+
+def create_vector_store(backend: str = "chroma", **kwargs) -> BaseVectorStore:
+    """
+    Create a vector store by backend name.
+    
+    Args:
+        backend: "chroma" or "numpy"
+        **kwargs: Passed to the store constructor
+    
+    Returns:
+        Vector store instance
+    """
+    backend = backend.lower()
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unknown vector store backend: {backend}")
+    return VECTOR_STORE_BACKENDS[backend](**kwargs)
+
+
 # =============================================================================
 # RAG SERVICE
 # =============================================================================
 
+class _StreamTimer:
+    """Collects streamed tokens and records time-to-first-token."""
+    
+    def __init__(self, provider: str, model: str, start: float):
+        self.provider = provider
+        self.model = model
+        self.start = start
+        self.ttft_ms: Optional[float] = None
+        self._parts: List[str] = []
+    
+    def token(self, text: str):
+        if self.ttft_ms is None:
+            self.ttft_ms = self.elapsed_ms()
+            perf_logger.log_ai_latency(self.provider, self.model, self.ttft_ms, 0, stage="ttft")
+        self._parts.append(text)
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+    
+    @property
+    def answer(self) -> str:
+        return "".join(self._parts)
+
+
 class RAGService:
     """
     Retrieval-Augmented Generation service.
     Combines vector retrieval with LLM for context-aware responses.
     """
     
+    # Identical on every request so providers with prompt-prefix caching can
+    # reuse it; per-turn context goes into the final user message instead
     RAG_SYSTEM_PROMPT = """Anda adalah LABBAIK AI, asisten cerdas untuk perencanaan ibadah Umrah.
 
-Gunakan konteks berikut untuk menjawab pertanyaan pengguna. Jika informasi tidak ada dalam konteks, 
-katakan bahwa Anda tidak memiliki informasi tersebut dan sarankan untuk mencari dari sumber terpercaya.
-
-KONTEKS:
-{context}
+Setiap pertanyaan pengguna disertai KONTEKS dari basis pengetahuan. Gunakan konteks tersebut untuk menjawab.
+Jika informasi tidak ada dalam konteks, katakan bahwa Anda tidak memiliki informasi tersebut dan sarankan
+untuk mencari dari sumber terpercaya.
 
 INSTRUKSI:
 1. Jawab berdasarkan konteks yang diberikan
@@ -357,17 +1105,57 @@ INSTRUKSI:
 4. Sertakan referensi sumber jika relevan
 5. Dorong pengguna untuk DYOR (Do Your Own Research)"""
     
+    HISTORY_SUMMARY_PROMPT = """RINGKASAN PERCAKAPAN SEBELUMNYA:
+{summary}"""
+    
+    QUESTION_PROMPT = """KONTEKS:
+{context}
+
+PERTANYAAN:
+{question}"""
+    
     def __init__(
         self,
         chat_service: BaseChatService,
-        vector_store: Optional[ChromaVectorStore] = None,
+        vector_store: Optional[BaseVectorStore] = None,
         top_k: int = 5,
-        min_confidence: float = 0.5
+        min_confidence: float = 0.5,
+        vector_backend: str = "chroma",
+        sparse_index: Optional[BM25Index] = None,
+        hybrid: bool = False,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        chunker: Optional[MarkdownChunker] = None,
+        context_budget: int = 1500,
+        reranker: Optional[CrossEncoderReranker] = None,
+        history_compactor: Optional[HistoryCompactor] = None
     ):
         self.chat_service = chat_service
-        self.vector_store = vector_store or ChromaVectorStore()
+        self.vector_store = vector_store or create_vector_store(vector_backend)
         self.top_k = top_k
         self.min_confidence = min_confidence
+        
+        # Hybrid retrieval: BM25 fused with dense results
+        self.sparse_index = sparse_index or (BM25Index() if hybrid else None)
+        self._retrieval_stats = {
+            "queries": 0,
+            "lexical_only": 0,
+            "fused": 0,
+            "sparse_ms_total": 0.0,
+        }
+        
+        # Semantic answer cache, invalidated whenever knowledge changes
+        self.answer_cache = answer_cache
+        self.knowledge_version = "0"
+        
+        # Token-aware chunking and budgeted prompt context
+        self.chunker = chunker or MarkdownChunker()
+        self.context_packer = ContextPacker(budget_tokens=context_budget)
+        
+        # Optional cross-encoder second stage
+        self.reranker = reranker
+        
+        # Rolling summary of older turns (last 6 messages verbatim if None)
+        self.history_compactor = history_compactor
     
     def initialize(self) -> bool:
         """Initialize RAG service."""
@@ -383,7 +1171,8 @@ INSTRUKSI:
         self,
         question: str,
         chat_history: Optional[List[ChatMessage]] = None,
-        filter_metadata: Optional[Dict[str, Any]] = None
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
     ) -> RAGResponse:
         """
         Query the RAG system.
@@ -392,19 +1181,116 @@ INSTRUKSI:
             question: User's question
             chat_history: Previous chat messages for context
             filter_metadata: Metadata filter for retrieval
+            conversation_id: Key of the cached history summary
         
         Returns:
             RAGResponse with answer and sources
         """
-        # Retrieve relevant documents
-        retrieval = self.vector_store.search(
-            query=question,
-            top_k=self.top_k,
-            filter_metadata=filter_metadata
+        plan = self._plan_query(question, chat_history, filter_metadata, conversation_id)
+        if plan.cached:
+            return plan.cached
+        
+        chat_response = self.chat_service.complete(plan.request)
+        return self._finish_query(question, plan, chat_response)
+    
+    def stream_query(
+        self,
+        question: str,
+        chat_history: Optional[List[ChatMessage]] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
+    ) -> Generator[RAGStreamEvent, None, None]:
+        """
+        Query the RAG system, streaming the answer as it is generated.
+        
+        Args:
+            question: User's question
+            chat_history: Previous chat messages for context
+            filter_metadata: Metadata filter for retrieval
+            conversation_id: Key of the cached history summary
+        
+        Yields:
+            RAGStreamEvent: "sources", then "token"s, then "done"
+        """
+        start = time.perf_counter()
+        plan = self._plan_query(question, chat_history, filter_metadata, conversation_id)
+        if plan.cached:
+            yield from self._cached_stream(plan.cached, start)
+            return
+        
+        yield self._sources_event(plan)
+        
+        timer = _StreamTimer(self._provider_name, self._model_name, start)
+        for token in self.chat_service.stream(plan.request):
+            timer.token(token)
+            yield RAGStreamEvent(type="token", content=token)
+        
+        yield self._finish_stream(question, plan, timer)
+    
+    async def astream_query(
+        self,
+        question: str,
+        chat_history: Optional[List[ChatMessage]] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        conversation_id: Optional[str] = None
+    ) -> AsyncGenerator[RAGStreamEvent, None]:
+        """
+        Async version of ``stream_query``.
+        
+        Retrieval runs in a worker thread so embedding the question does not
+        block the event loop.
+        """
+        start = time.perf_counter()
+        plan = await asyncio.to_thread(
+            self._plan_query, question, chat_history, filter_metadata, conversation_id
         )
+        if plan.cached:
+            for event in self._cached_stream(plan.cached, start):
+                yield event
+            return
+        
+        yield self._sources_event(plan)
         
-        # Get context from top documents
-        context = retrieval.get_context(max_docs=self.top_k)
+        timer = _StreamTimer(self._provider_name, self._model_name, start)
+        async for token in self.chat_service.astream(plan.request):
+            timer.token(token)
+            yield RAGStreamEvent(type="token", content=token)
+        
+        yield self._finish_stream(question, plan, timer)
+    
+    # ==================== QUERY HELPERS ====================
+    
+    @property
+    def _provider_name(self) -> str:
+        return getattr(self.chat_service, "provider_name", type(self.chat_service).__name__)
+    
+    @property
+    def _model_name(self) -> str:
+        return getattr(self.chat_service, "model", "") or ""
+    
+    def _plan_query(
+        self,
+        question: str,
+        chat_history: Optional[List[ChatMessage]],
+        filter_metadata: Optional[Dict[str, Any]],
+        conversation_id: Optional[str] = None
+    ) -> _QueryPlan:
+        """Check the answer cache, retrieve and build the completion request."""
+        # Serve paraphrases of already answered questions from cache
+        cache_vector = None
+        cache_scope = json.dumps(filter_metadata, sort_keys=True) if filter_metadata else ""
+        if self.answer_cache is not None and not chat_history:
+            cache_vector = self.vector_store.embedding_service.embed_single(question)
+            cached = self.answer_cache.lookup(cache_vector, cache_scope, self.knowledge_version)
+            if cached:
+                return _QueryPlan(request=None, cached=cached[0])
+        
+        # Retrieve relevant documents
+        retrieval = self.retrieve(question, filter_metadata)
+        
+        # Pack top documents into the prompt token budget
+        packed = self.context_packer.pack(retrieval.documents, retrieval.scores)
+        context = packed.text
         
         # Calculate confidence based on scores
         confidence = (
@@ -412,48 +1298,297 @@ INSTRUKSI:
             if retrieval.scores else 0.0
         )
         
-        # Build messages
-        messages = []
-        
-        # System prompt with context
-        system_prompt = self.RAG_SYSTEM_PROMPT.format(context=context)
-        messages.append(ChatMessage.system(system_prompt))
+        # Build messages, most stable first: fixed system prompt, history
+        # summary, verbatim recent turns, then this turn's context + question
+        messages = [ChatMessage.system(self.RAG_SYSTEM_PROMPT)]
         
-        # Add chat history
-        if chat_history:
-            for msg in chat_history[-6:]:  # Last 6 messages
-                messages.append(msg)
+        history_tokens = 0
+        history_key = ""
+        if chat_history and self.history_compactor is not None:
+            history = self.history_compactor.compact(chat_history, conversation_id)
+            history_key = history.key if history.pending else ""
+            if history.summary:
+                messages.append(ChatMessage.system(
+                    self.HISTORY_SUMMARY_PROMPT.format(summary=history.summary)
+                ))
+            messages.extend(history.messages)
+            history_tokens = history.tokens
+        elif chat_history:
+            messages.extend(chat_history[-6:])  # Last 6 messages
+            history_tokens = sum(count_tokens(msg.content) for msg in chat_history[-6:])
         
-        # Add current question
-        messages.append(ChatMessage.user(question))
+        messages.append(ChatMessage.user(
+            self.QUESTION_PROMPT.format(context=context, question=question)
+        ))
+        prompt_tokens = sum(count_tokens(msg.content) for msg in messages)
+        perf_logger.log_metric(
+            "rag_prompt_tokens", prompt_tokens, unit="tokens",
+            tags={"history_tokens": str(history_tokens), "context_tokens": str(packed.token_count)},
+        )
         
-        # Generate response
         request = ChatCompletionRequest(
             messages=messages,
             temperature=0.7,
             max_tokens=2048
         )
         
-        chat_response = self.chat_service.complete(request)
-        
         # Build sources list
         sources = [
             {
                 "content": doc.content[:200] + "...",
                 "source": doc.metadata.get("source", "unknown"),
-                "score": retrieval.scores[i] if i < len(retrieval.scores) else 0
+                "score": packed.scores[i]
             }
-            for i, doc in enumerate(retrieval.documents[:3])
+            for i, doc in enumerate(packed.documents[:3])
         ]
         
-        return RAGResponse(
-            answer=chat_response.content,
+        return _QueryPlan(
+            request=request,
             context=context,
             sources=sources,
             confidence=confidence,
-            chat_response=chat_response
+            context_tokens=packed.token_count,
+            prompt_tokens=prompt_tokens,
+            history_tokens=history_tokens,
+            cache_vector=cache_vector,
+            cache_scope=cache_scope,
+            history_key=history_key,
+        )
+    
+    def _finish_query(
+        self,
+        question: str,
+        plan: _QueryPlan,
+        chat_response: ChatCompletionResponse
+    ) -> RAGResponse:
+        """Wrap the completion in a RAGResponse and cache it."""
+        response = RAGResponse(
+            answer=chat_response.content,
+            context=plan.context,
+            sources=plan.sources,
+            confidence=plan.confidence,
+            chat_response=chat_response,
+            context_tokens=plan.context_tokens,
+            prompt_tokens=plan.prompt_tokens
+        )
+        
+        if plan.cache_vector is not None:
+            self.answer_cache.store(
+                question, plan.cache_vector, response, plan.cache_scope, self.knowledge_version
+            )
+        
+        # The reply is out: summarize older turns for the next prompt
+        if plan.history_key:
+            self.history_compactor.summarize_pending(plan.history_key)
+        
+        return response
+    
+    @staticmethod
+    def _sources_event(plan: _QueryPlan) -> RAGStreamEvent:
+        return RAGStreamEvent(
+            type="sources",
+            sources=plan.sources,
+            confidence=plan.confidence,
+            metrics={"context_tokens": plan.context_tokens, "prompt_tokens": plan.prompt_tokens},
+        )
+    
+    @staticmethod
+    def _cached_stream(response: RAGResponse, start: float) -> List[RAGStreamEvent]:
+        """Events for an answer served from the semantic cache."""
+        latency_ms = (time.perf_counter() - start) * 1000
+        metrics = {
+            "ttft_ms": latency_ms,
+            "latency_ms": latency_ms,
+            "context_tokens": response.context_tokens,
+            "semantic_cache_hit": True,
+        }
+        return [
+            RAGStreamEvent(
+                type="sources",
+                sources=response.sources,
+                confidence=response.confidence,
+                metrics={"context_tokens": response.context_tokens},
+            ),
+            RAGStreamEvent(type="token", content=response.answer),
+            RAGStreamEvent(
+                type="done",
+                content=response.answer,
+                sources=response.sources,
+                confidence=response.confidence,
+                metrics=metrics,
+                response=response,
+            ),
+        ]
+    
+    def _finish_stream(
+        self,
+        question: str,
+        plan: _QueryPlan,
+        timer: "_StreamTimer"
+    ) -> RAGStreamEvent:
+        """Build the final "done" event once the provider stream is exhausted."""
+        answer = timer.answer
+        latency_ms = timer.elapsed_ms()
+        
+        # Providers do not report usage on streams, so estimate it
+        prompt_tokens = plan.prompt_tokens
+        completion_tokens = count_tokens(answer)
+        chat_response = ChatCompletionResponse(
+            content=answer,
+            model=self._model_name,
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            finish_reason="stop",
+            latency_ms=latency_ms,
+            metadata={"streamed": True, "ttft_ms": timer.ttft_ms},
+        )
+        response = self._finish_query(question, plan, chat_response)
+        
+        perf_logger.log_ai_latency(
+            self._provider_name, self._model_name, latency_ms,
+            chat_response.total_tokens, stage="total"
+        )
+        
+        return RAGStreamEvent(
+            type="done",
+            content=answer,
+            sources=plan.sources,
+            confidence=plan.confidence,
+            metrics={
+                "ttft_ms": timer.ttft_ms,
+                "latency_ms": latency_ms,
+                "context_tokens": plan.context_tokens,
+                "prompt_tokens": prompt_tokens,
+                "history_tokens": plan.history_tokens,
+                "completion_tokens": completion_tokens,
+                "semantic_cache_hit": False,
+            },
+            response=response,
         )
     
+    # Lexical answers skip the embedding model when the top BM25 hit covers
+    # every query term and clearly beats the runner-up.
+    LEXICAL_MIN_COVERAGE = 1.0
+    LEXICAL_MIN_MARGIN = 1.5
+    RRF_K = 60
+    
+    def retrieve(
+        self,
+        question: str,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> RetrievalResult:
+        """
+        Retrieve context documents for a question.
+        
+        Uses dense search only, unless a sparse index is configured; then
+        BM25 runs first and either answers alone (confident lexical match)
+        or is fused with dense results via reciprocal-rank fusion. With a
+        reranker, a wider candidate set is rescored by the cross-encoder.
+        """
+        self._retrieval_stats["queries"] += 1
+        
+        if self.reranker is None:
+            return self._first_stage(question, self.top_k, filter_metadata)
+        
+        result = self._first_stage(
+            question, max(self.top_k, self.reranker.candidates), filter_metadata
+        )
+        result.documents, result.scores, _ = self.reranker.rerank(
+            question, result.documents, result.scores, top_k=self.top_k
+        )
+        return result
+    
+    def _first_stage(
+        self,
+        question: str,
+        k: int,
+        filter_metadata: Optional[Dict[str, Any]]
+    ) -> RetrievalResult:
+        """Dense or hybrid retrieval of the top ``k`` documents."""
+        if self.sparse_index is None or self.sparse_index.count() == 0:
+            return self.vector_store.search(
+                query=question,
+                top_k=k,
+                filter_metadata=filter_metadata
+            )
+        
+        # Operator filters ($in, $and, ...) are only understood by the vector store
+        flat_filter = filter_metadata and not any(
+            key.startswith("$") or isinstance(v, dict) for key, v in filter_metadata.items()
+        )
+        if filter_metadata and not flat_filter:
+            return self.vector_store.search(question, k, filter_metadata)
+        
+        sparse = self.sparse_index.search(question, k * 2, filter_metadata)
+        self._retrieval_stats["sparse_ms_total"] += sparse.latency_ms
+        
+        top_score = sparse.hits[0].score if sparse.hits else 0.0
+        
+        def lexical_score(score: float) -> float:
+            return score / top_score if top_score else 0.0
+        
+        if self._is_lexical_confident(sparse):
+            self._retrieval_stats["lexical_only"] += 1
+            hits = sparse.hits[:k]
+            return RetrievalResult(
+                documents=[Document(id=h.id, content=h.content, metadata=h.metadata) for h in hits],
+                scores=[lexical_score(h.score) * sparse.coverage for h in hits],
+                query=question
+            )
+        
+        dense = self.vector_store.search(question, k * 2, filter_metadata)
+        if not sparse.hits:
+            dense.documents = dense.documents[:k]
+            dense.scores = dense.scores[:k]
+            return dense
+        
+        self._retrieval_stats["fused"] += 1
+        
+        documents: Dict[str, Document] = {}
+        raw: Dict[str, Dict[str, float]] = {}
+        for doc, score in zip(dense.documents, dense.scores):
+            documents[doc.id] = doc
+            raw.setdefault(doc.id, {})["dense_score"] = score
+        for hit in sparse.hits:
+            documents.setdefault(hit.id, Document(id=hit.id, content=hit.content, metadata=hit.metadata))
+            raw.setdefault(hit.id, {})["lexical_score"] = lexical_score(hit.score) * sparse.coverage
+        
+        fused = reciprocal_rank_fusion(
+            [[d.id for d in dense.documents], [h.id for h in sparse.hits]],
+            k=self.RRF_K
+        )[:k]
+        
+        # Scores follow the fused rank: RRF over its maximum (first in both
+        # lists), so they stay in [0, 1]. The per-retriever scores are on
+        # different scales and only kept in the metadata.
+        best = 2.0 / (self.RRF_K + 1)
+        fused_documents = []
+        for doc_id, _ in fused:
+            doc = documents[doc_id]
+            fused_documents.append(Document(
+                id=doc.id,
+                content=doc.content,
+                metadata={**doc.metadata, **raw[doc_id]},
+                embedding=doc.embedding,
+            ))
+        
+        return RetrievalResult(
+            documents=fused_documents,
+            scores=[min(1.0, score / best) for _, score in fused],
+            query=question
+        )
+    
+    def _is_lexical_confident(self, sparse) -> bool:
+        """Whether BM25 alone is trustworthy enough to skip dense retrieval."""
+        if not sparse.hits or sparse.coverage < self.LEXICAL_MIN_COVERAGE:
+            return False
+        if len(sparse.hits) == 1:
+            return True
+        return sparse.hits[0].score >= self.LEXICAL_MIN_MARGIN * sparse.hits[1].score
+    
     def add_knowledge(
         self,
         texts: List[str],
@@ -471,26 +1606,90 @@ INSTRUKSI:
         Returns:
             Number of documents added
         """
-        metadatas = [
-            {"source": source, "category": category or "general"}
-            for _ in texts
+        documents = [
+            Document(
+                id=self.vector_store._generate_id(text),
+                content=text,
+                metadata={"source": source, "category": category or "general"}
+            )
+            for text in texts
         ]
         
-        return self.vector_store.add_texts(texts, metadatas)
+        return self.upsert_documents(documents)
+    
+    def upsert_documents(self, documents: List[Document]) -> int:
+        """
+        Add or replace documents in every index.
+        
+        Args:
+            documents: Documents with stable IDs
+        
+        Returns:
+            Number of documents written
+        """
+        if not documents:
+            return 0
+        
+        added = self.vector_store.add_documents(documents)
+        
+        if self.sparse_index is not None:
+            self.sparse_index.add_documents(
+                [doc.id for doc in documents],
+                [doc.content for doc in documents],
+                [doc.metadata for doc in documents]
+            )
+        
+        self._bump_knowledge_version()
+        return added
+    
+    def delete_knowledge(self, ids: List[str]) -> int:
+        """
+        Delete documents from every index.
+        
+        Args:
+            ids: Document IDs
+        
+        Returns:
+            Number of documents deleted from the vector store
+        """
+        if not ids:
+            return 0
+        
+        deleted = self.vector_store.delete(ids)
+        
+        if self.sparse_index is not None:
+            self.sparse_index.delete(ids)
+        
+        self._bump_knowledge_version()
+        return deleted
+    
+    def clear_knowledge(self) -> bool:
+        """Remove all documents from every index."""
+        cleared = self.vector_store.clear()
+        
+        if self.sparse_index is not None:
+            self.sparse_index.clear()
+        
+        self._bump_knowledge_version()
+        return cleared
+    
+    def _bump_knowledge_version(self):
+        """Mark the knowledge base as changed (invalidates cached answers)."""
+        self.knowledge_version = uuid.uuid4().hex
     
     def load_knowledge_file(
         self,
         file_path: str,
-        chunk_size: int = 500,
-        chunk_overlap: int = 50
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None
     ) -> int:
         """
         Load knowledge from a text file.
         
         Args:
-            file_path: Path to text file
-            chunk_size: Size of text chunks
-            chunk_overlap: Overlap between chunks
+            file_path: Path to text or markdown file
+            chunk_size: Max tokens per chunk (defaults to the service chunker)
+            chunk_overlap: Overlap tokens between chunks
         
         Returns:
             Number of chunks added
@@ -501,46 +1700,65 @@ INSTRUKSI:
         
         content = path.read_text(encoding="utf-8")
         
-        # Simple chunking
-        chunks = self._chunk_text(content, chunk_size, chunk_overlap)
+        chunker = self.chunker
+        if chunk_size is not None or chunk_overlap is not None:
+            chunker = MarkdownChunker(
+                max_tokens=chunk_size or self.chunker.max_tokens,
+                overlap_tokens=(
+                    chunk_overlap if chunk_overlap is not None else self.chunker.overlap_tokens
+                ),
+                counter=self.chunker.counter
+            )
         
         return self.add_knowledge(
-            texts=chunks,
+            texts=chunker.split(content),
             source=path.name,
             category=path.stem
         )
     
-    def _chunk_text(
-        self,
-        text: str,
-        chunk_size: int,
-        overlap: int
-    ) -> List[str]:
-        """Split text into overlapping chunks."""
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                last_period = chunk.rfind(".")
-                if last_period > chunk_size // 2:
-                    end = start + last_period + 1
-                    chunk = text[start:end]
-            
-            chunks.append(chunk.strip())
-            start = end - overlap
-        
-        return [c for c in chunks if c]  # Remove empty chunks
+    def chunk_text(self, text: str) -> List[str]:
+        """Split text into token-bounded, heading-aware chunks."""
+        return self.chunker.split(text)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get RAG system statistics."""
-        return {
+        stats = {
             "document_count": self.vector_store.count(),
+            "vector_store": type(self.vector_store).__name__,
             "top_k": self.top_k,
             "min_confidence": self.min_confidence,
+            "chunk_tokens": self.chunker.max_tokens,
+            "context_budget": self.context_packer.budget_tokens,
             "chat_provider": self.chat_service.provider_name,
         }
+        
+        hedge_stats = getattr(self.chat_service, "get_hedge_stats", None)
+        if callable(hedge_stats):
+            stats["hedging"] = hedge_stats()
+        
+        if self.sparse_index is not None:
+            queries = self._retrieval_stats["queries"]
+            stats["hybrid"] = {
+                "sparse_documents": self.sparse_index.count(),
+                "queries": queries,
+                "lexical_only": self._retrieval_stats["lexical_only"],
+                "fused": self._retrieval_stats["fused"],
+                "avg_sparse_ms": (
+                    self._retrieval_stats["sparse_ms_total"] / queries if queries else 0.0
+                ),
+            }
+        
+        if self.reranker is not None:
+            stats["rerank"] = self.reranker.get_stats()
+        
+        if self.answer_cache is not None:
+            stats["answer_cache"] = self.answer_cache.get_stats()
+        
+        if self.history_compactor is not None:
+            stats["history"] = self.history_compactor.get_stats()
+        
+        embedding_cache = self.vector_store.embedding_service.cache
+        if embedding_cache is not None:
+            stats["embedding_cache"] = embedding_cache.get_stats()
+        
+        return stats
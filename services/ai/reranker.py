@@ -0,0 +1,206 @@
+"""
+LABBAIK AI v6.0 - Cross-Encoder Reranker
+========================================
+Second-stage reranking of retrieved chunks with a small CPU cross-encoder.
+
+Bi-encoder distance tends to favour broad overview chunks; a cross-encoder
+reads the question and chunk together and ranks the precise FAQ higher.
+All candidates are scored in one batched forward pass under a hard latency
+budget: if the pass does not finish in time, the first-stage order is kept.
+"""
+
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional, List, Dict, Any, Tuple
+
+from services.ai.base import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Budgeted cross-encoder reranker.
+
+    The model runs on a single background thread so the caller can stop
+    waiting when ``budget_ms`` runs out. A pass that overruns keeps the
+    thread busy; queries arriving meanwhile skip reranking instead of
+    queueing behind it. The model is loaded on that thread as well, so
+    queries before it is ready fall back immediately.
+    """
+
+    # Multilingual (mMARCO) MiniLM: the knowledge base is Indonesian
+    DEFAULT_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        candidates: int = 20,
+        budget_ms: float = 150.0,
+        max_length: int = 256,
+        model=None
+    ):
+        """
+        Args:
+            model_name: sentence-transformers CrossEncoder model name
+            candidates: First-stage candidates to rescore
+            budget_ms: Max time to wait for the forward pass
+            max_length: Token limit per (question, chunk) pair
+            model: Preloaded model exposing ``predict(pairs)`` (tests, benchmarks)
+        """
+        self.model_name = model_name or self.DEFAULT_MODEL
+        self.candidates = candidates
+        self.budget_ms = budget_ms
+        self.max_length = max_length
+
+        self._model = model
+        self._load_error: Optional[str] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._busy = threading.Lock()
+        self._loading = None
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.queries = 0
+        self.reranked = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.top1_changed = 0
+
+    # ==================== MODEL ====================
+
+    def _load(self):
+        try:
+            from sentence_transformers import CrossEncoder
+
+            start = time.perf_counter()
+            self._model = CrossEncoder(self.model_name, max_length=self.max_length)
+            logger.info(
+                f"Cross-encoder loaded: {self.model_name} "
+                f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+            )
+        except ImportError:
+            self._load_error = "sentence-transformers not installed"
+            logger.error("sentence-transformers not installed. Run: pip install sentence-transformers")
+        except Exception as e:
+            self._load_error = str(e)
+            logger.error(f"Failed to load cross-encoder: {e}")
+
+    def warmup(self):
+        """Start loading the model on the reranker thread (idempotent)."""
+        if self._model is None and self._loading is None:
+            self._loading = self._executor.submit(self._load)
+        return self._loading
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    # ==================== RERANK ====================
+
+    def _predict(self, question: str, texts: List[str]) -> List[float]:
+        try:
+            pairs = [(question, text) for text in texts]
+            raw = self._model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+            # Logits -> (0, 1) so RAG confidence thresholds keep their meaning
+            return [1.0 / (1.0 + math.exp(-float(score))) for score in raw]
+        finally:
+            self._busy.release()
+
+    def rerank(
+        self,
+        question: str,
+        documents: List[Any],
+        scores: List[float],
+        top_k: Optional[int] = None
+    ) -> Tuple[List[Any], List[float], bool]:
+        """
+        Reorder first-stage candidates by cross-encoder relevance.
+
+        Args:
+            question: User question
+            documents: First-stage documents (with ``content``), best first
+            scores: First-stage scores aligned with ``documents``
+            top_k: Number of results to keep (default: all)
+
+        Returns:
+            (documents, scores, reranked). When the budget is exceeded or the
+            model is unavailable the first-stage order and scores are
+            returned with ``reranked`` False.
+        """
+        top_k = top_k or len(documents)
+        fallback = (documents[:top_k], scores[:top_k], False)
+
+        with self._stats_lock:
+            self.queries += 1
+        if len(documents) < 2:
+            return fallback
+
+        if self._model is None:
+            self.warmup()
+            with self._stats_lock:
+                self.skipped += 1
+            return fallback
+
+        # A previous pass that overran the budget still holds the thread
+        if not self._busy.acquire(blocking=False):
+            with self._stats_lock:
+                self.skipped += 1
+            return fallback
+
+        candidates = documents[:self.candidates]
+        start = time.perf_counter()
+        try:
+            future = self._executor.submit(
+                self._predict, question, [doc.content for doc in candidates]
+            )
+        except Exception:
+            self._busy.release()
+            raise
+
+        try:
+            new_scores = future.result(timeout=self.budget_ms / 1000)
+        except FutureTimeout:
+            with self._stats_lock:
+                self.timeouts += 1
+            logger.debug(f"Rerank exceeded {self.budget_ms:.0f}ms budget, keeping first-stage order")
+            return fallback
+        except Exception as e:
+            logger.warning(f"Rerank failed, keeping first-stage order: {e}")
+            return fallback
+        finally:
+            self.latency.record((time.perf_counter() - start) * 1000)
+
+        order = sorted(range(len(candidates)), key=lambda i: new_scores[i], reverse=True)[:top_k]
+        with self._stats_lock:
+            self.reranked += 1
+            if order and order[0] != 0:
+                self.top1_changed += 1
+
+        return [candidates[i] for i in order], [new_scores[i] for i in order], True
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rerank counters and per-query latency."""
+        with self._stats_lock:
+            queries, reranked = self.queries, self.reranked
+            timeouts, skipped, changed = self.timeouts, self.skipped, self.top1_changed
+        return {
+            "model": self.model_name,
+            "ready": self.ready,
+            "load_error": self._load_error,
+            "candidates": self.candidates,
+            "budget_ms": self.budget_ms,
+            "queries": queries,
+            "reranked": reranked,
+            "timeouts": timeouts,
+            "skipped": skipped,
+            "top1_changed": changed,
+            "top1_changed_rate": changed / reranked if reranked else 0.0,
+            "latency": self.latency.get_stats(),
+        }
@@ -0,0 +1,430 @@
+"""
+LABBAIK AI v6.0 - Sparse Lexical Index
+======================================
+BM25 index over knowledge chunks, stored as compact CSR arrays.
+
+Complements dense retrieval for short Indonesian keyword queries
+("miqat", "dam", "haid thawaf") where sentence embeddings miss exact terms.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+STOPWORDS = frozenset([
+    "yang", "dan", "di", "ke", "dari", "untuk", "dengan", "pada", "dalam",
+    "ini", "itu", "atau", "adalah", "akan", "juga", "saja", "apa", "apakah",
+    "bagaimana", "berapa", "kapan", "mengapa", "kenapa", "saat", "oleh",
+    "bisa", "harus", "ada", "tidak", "sudah", "belum", "the", "a", "of",
+])
+
+_APOSTROPHES = re.compile(r"['‘’ʼ`]")
+_TOKEN = re.compile(r"[0-9a-zÀ-ɏ؀-ۿ]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, fold apostrophes (sa'i -> sai) and split into word tokens,
+    dropping common Indonesian stopwords.
+    """
+    text = _APOSTROPHES.sub("", text.lower())
+    return [t for t in _TOKEN.findall(text) if t not in STOPWORDS]
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class SparseHit:
+    """A single lexical match."""
+    id: str
+    score: float
+    content: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SparseSearchResult:
+    """Result of a BM25 query."""
+    hits: List[SparseHit]
+    query_terms: List[str]
+    coverage: float  # Fraction of query terms present in the top hit
+    latency_ms: float = 0.0
+
+
+# =============================================================================
+# BM25 INDEX
+# =============================================================================
+
+class BM25Index:
+    """
+    Okapi BM25 over tokenized chunks.
+
+    Postings are kept term-major in CSR form: ``indptr[t]:indptr[t+1]``
+    slices ``doc_ids``/``tfs`` for term ``t``. New documents are tokenized
+    once and merged into the arrays; deletes compact the arrays so document
+    frequencies stay exact.
+    """
+
+    def __init__(
+        self,
+        persist_path: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.k1 = k1
+        self.b = b
+
+        self._vocab: Dict[str, int] = {}
+        self._indptr = None     # int64 (n_terms + 1,)
+        self._doc_ids = None    # int32 (nnz,)
+        self._tfs = None        # float32 (nnz,)
+        self._doc_len = None    # float32 (n_docs,)
+
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # ==================== PERSISTENCE ====================
+
+    def _load(self):
+        """Load persisted arrays if present."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.persist_path or not self.persist_path.exists():
+            return
+
+        try:
+            import numpy as np
+
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                self._indptr = data["indptr"]
+                self._doc_ids = data["doc_ids"]
+                self._tfs = data["tfs"]
+                self._doc_len = data["doc_len"]
+
+            self._vocab = {term: i for i, term in enumerate(meta["terms"])}
+            self._ids = meta["ids"]
+            self._contents = meta["documents"]
+            self._metadatas = meta["metadatas"]
+            self._id_to_row = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            logger.info(f"BM25 index loaded: {len(self._ids)} docs, {len(self._vocab)} terms")
+        except Exception as e:
+            logger.warning(f"Failed to load BM25 index, starting empty: {e}")
+            self._reset()
+
+    def _persist(self):
+        """Atomically write the index to ``persist_path``."""
+        if not self.persist_path:
+            return
+
+        import numpy as np
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        terms = [None] * len(self._vocab)
+        for term, i in self._vocab.items():
+            terms[i] = term
+
+        meta = json.dumps({
+            "terms": terms,
+            "ids": self._ids,
+            "documents": self._contents,
+            "metadatas": self._metadatas,
+        }, ensure_ascii=False)
+
+        tmp_path = self.persist_path.with_suffix(".tmp.npz")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(meta),
+                indptr=self._indptr,
+                doc_ids=self._doc_ids,
+                tfs=self._tfs,
+                doc_len=self._doc_len,
+            )
+        os.replace(tmp_path, self.persist_path)
+
+    def _reset(self):
+        import numpy as np
+
+        self._vocab = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.float32)
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._ids = []
+        self._contents = []
+        self._metadatas = []
+        self._id_to_row = {}
+
+    def _ensure_arrays(self):
+        self._load()
+        if self._indptr is None:
+            self._reset()
+
+    # ==================== MUTATION ====================
+
+    def add_documents(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Add or replace documents.
+
+        Only the new texts are tokenized; their postings are merged into the
+        existing CSR arrays.
+
+        Returns:
+            Number of documents indexed
+        """
+        import numpy as np
+
+        if not ids:
+            return 0
+
+        with self._lock:
+            self._ensure_arrays()
+
+            # Replacing a document = delete + add
+            existing = [doc_id for doc_id in ids if doc_id in self._id_to_row]
+            if existing:
+                self._delete_rows(existing)
+
+            # Last write wins for duplicate ids in one batch
+            batch: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+            for i, doc_id in enumerate(ids):
+                batch[doc_id] = (texts[i], dict(metadatas[i]) if metadatas else {})
+
+            new_terms, new_docs, new_tfs, new_lens = [], [], [], []
+            for doc_id, (text, metadata) in batch.items():
+                row = len(self._ids)
+                self._ids.append(doc_id)
+                self._contents.append(text)
+                self._metadatas.append(metadata)
+                self._id_to_row[doc_id] = row
+
+                counts: Dict[int, int] = {}
+                tokens = tokenize(text)
+                for token in tokens:
+                    term_id = self._vocab.setdefault(token, len(self._vocab))
+                    counts[term_id] = counts.get(term_id, 0) + 1
+
+                for term_id, tf in counts.items():
+                    new_terms.append(term_id)
+                    new_docs.append(row)
+                    new_tfs.append(tf)
+                new_lens.append(len(tokens))
+
+            old_terms = np.repeat(
+                np.arange(len(self._indptr) - 1, dtype=np.int64),
+                np.diff(self._indptr)
+            )
+            self._rebuild_csr(
+                np.concatenate([old_terms, np.asarray(new_terms, dtype=np.int64)]),
+                np.concatenate([self._doc_ids, np.asarray(new_docs, dtype=np.int32)]),
+                np.concatenate([self._tfs, np.asarray(new_tfs, dtype=np.float32)]),
+            )
+            self._doc_len = np.concatenate([self._doc_len, np.asarray(new_lens, dtype=np.float32)])
+
+            self._persist()
+            return len(batch)
+
+    def _rebuild_csr(self, terms, doc_ids, tfs):
+        """Sort COO postings term-major and store as CSR."""
+        import numpy as np
+
+        order = np.argsort(terms, kind="stable")
+        self._doc_ids = np.ascontiguousarray(doc_ids[order], dtype=np.int32)
+        self._tfs = np.ascontiguousarray(tfs[order], dtype=np.float32)
+        counts = np.bincount(terms, minlength=len(self._vocab))
+        self._indptr = np.zeros(len(self._vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._indptr[1:])
+
+    def _delete_rows(self, ids: List[str]) -> int:
+        """Remove documents and compact the arrays (lock held)."""
+        import numpy as np
+
+        rows = sorted({self._id_to_row[i] for i in ids if i in self._id_to_row})
+        if not rows:
+            return 0
+
+        keep_doc = np.ones(len(self._ids), dtype=bool)
+        keep_doc[rows] = False
+        remap = np.cumsum(keep_doc, dtype=np.int64) - 1
+
+        terms = np.repeat(
+            np.arange(len(self._indptr) - 1, dtype=np.int64),
+            np.diff(self._indptr)
+        )
+        keep_posting = keep_doc[self._doc_ids]
+        self._rebuild_csr(
+            terms[keep_posting],
+            remap[self._doc_ids[keep_posting]].astype(np.int32),
+            self._tfs[keep_posting],
+        )
+        self._doc_len = self._doc_len[keep_doc]
+
+        removed = set(rows)
+        self._ids = [d for i, d in enumerate(self._ids) if i not in removed]
+        self._contents = [c for i, c in enumerate(self._contents) if i not in removed]
+        self._metadatas = [m for i, m in enumerate(self._metadatas) if i not in removed]
+        self._id_to_row = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        return len(rows)
+
+    def delete(self, ids: List[str]) -> int:
+        """Delete documents by ID."""
+        with self._lock:
+            self._ensure_arrays()
+            deleted = self._delete_rows(ids)
+            if deleted:
+                self._persist()
+            return deleted
+
+    def clear(self):
+        """Remove all documents."""
+        with self._lock:
+            self._loaded = True
+            self._reset()
+            if self.persist_path and self.persist_path.exists():
+                self.persist_path.unlink()
+
+    def count(self) -> int:
+        """Get document count."""
+        with self._lock:
+            self._load()
+            return len(self._ids)
+
+    # ==================== QUERY ====================
+
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], filter_metadata: Dict[str, Any]) -> bool:
+        """Plain equality filter on flat metadata."""
+        return all(metadata.get(k) == v for k, v in filter_metadata.items())
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_metadata: Optional[Dict[str, Any]] = None
+    ) -> SparseSearchResult:
+        """
+        Rank documents by BM25.
+
+        Args:
+            query: Query text
+            top_k: Number of hits
+            filter_metadata: Optional flat key == value filter
+
+        Returns:
+            SparseSearchResult with hits and query-term coverage
+        """
+        import time
+        import numpy as np
+
+        start = time.perf_counter()
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            self._ensure_arrays()
+            n_docs = len(self._ids)
+            term_ids = [self._vocab[t] for t in terms if t in self._vocab]
+
+            if not n_docs or not term_ids or top_k <= 0:
+                return SparseSearchResult(
+                    hits=[], query_terms=terms, coverage=0.0,
+                    latency_ms=(time.perf_counter() - start) * 1000
+                )
+
+            avgdl = float(self._doc_len.mean()) or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len / avgdl)
+            scores = np.zeros(n_docs, dtype=np.float32)
+            matched = np.zeros(n_docs, dtype=np.int32)
+
+            for term_id in term_ids:
+                lo, hi = self._indptr[term_id], self._indptr[term_id + 1]
+                docs = self._doc_ids[lo:hi]
+                tf = self._tfs[lo:hi]
+                df = hi - lo
+                idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+                matched[docs] += 1
+
+            if filter_metadata:
+                allowed = np.fromiter(
+                    (self._matches(m, filter_metadata) for m in self._metadatas),
+                    dtype=bool, count=n_docs
+                )
+                scores[~allowed] = 0
+
+            candidates = int(np.count_nonzero(scores))
+            k = min(top_k, candidates)
+            if k == 0:
+                top = np.zeros(0, dtype=np.int64)
+            elif k < n_docs:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+            else:
+                top = np.argsort(-scores, kind="stable")[:k]
+
+            hits = [
+                SparseHit(
+                    id=self._ids[row],
+                    score=float(scores[row]),
+                    content=self._contents[row],
+                    metadata=dict(self._metadatas[row]),
+                )
+                for row in top
+            ]
+            coverage = float(matched[top[0]]) / len(terms) if len(top) else 0.0
+
+        return SparseSearchResult(
+            hits=hits,
+            query_terms=terms,
+            coverage=coverage,
+            latency_ms=(time.perf_counter() - start) * 1000
+        )
+
+
+# =============================================================================
+# RANK FUSION
+# =============================================================================
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Ranked lists of document ids (best first)
+        k: RRF damping constant
+
+    Returns:
+        (id, fused_score) pairs, best first
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
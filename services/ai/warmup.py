@@ -0,0 +1,247 @@
+"""
+LABBAIK AI v6.0 - Model Warmup
+==============================
+Loads the embedding model in a background thread at process start so the
+first chat after a container restart does not pay for importing torch and
+loading weights on the request path.
+
+The UI checks ``is_embedding_ready()`` to show a loading indicator instead
+of blocking; RAG code that needs the model simply waits on the same load.
+"""
+
+import time
+import logging
+import threading
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROBE = "Bagaimana tata cara umrah?"
+
+
+class EmbeddingWarmup:
+    """
+    One-shot background loader for the embedding model.
+
+    ``start()`` is idempotent and returns immediately. The thread imports
+    sentence-transformers, loads the model into LocalEmbeddingService's
+    shared cache (or starts the EmbeddingWorker pool when configured) and
+    runs one probe encode so lazy kernels are initialised as well.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, use_worker: bool = True):
+        self.model_name = model_name
+        self.use_worker = use_worker
+
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.import_ms = 0.0
+        self.load_ms = 0.0
+        self.probe_ms = 0.0
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self) -> "EmbeddingWarmup":
+        """Start loading in the background (no-op if already started)."""
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.perf_counter()
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-warmup", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            start = time.perf_counter()
+            # Heavy imports happen here, off the script thread
+            from services.ai.rag_service import LocalEmbeddingService
+            from services.ai.embedding_worker import get_embedding_worker
+
+            if self.model_name is None:
+                from core.config import get_settings
+                self.model_name = get_settings().ai.embedding_model
+            self.import_ms = (time.perf_counter() - start) * 1000
+
+            worker = get_embedding_worker() if self.use_worker else None
+            start = time.perf_counter()
+            service = LocalEmbeddingService(self.model_name, worker=worker)
+            if not service.initialize():
+                raise RuntimeError("embedding model failed to initialize")
+            self.load_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            service.embed_single(WARMUP_PROBE)
+            self.probe_ms = (time.perf_counter() - start) * 1000
+
+            logger.info(
+                f"Embedding warmup done: import {self.import_ms:.0f}ms, "
+                f"load {self.load_ms:.0f}ms, probe {self.probe_ms:.0f}ms"
+            )
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Embedding warmup failed: {e}")
+        finally:
+            self._ready.set()
+
+    # ==================== STATUS ====================
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def done(self) -> bool:
+        """Warmup finished, successfully or not."""
+        return self._ready.is_set()
+
+    @property
+    def ready(self) -> bool:
+        """The model is loaded and a probe encode succeeded."""
+        return self._ready.is_set() and self.error is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until warmup finishes.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the model is ready
+        """
+        if self._thread is None:
+            return False
+        self._ready.wait(timeout)
+        return self.ready
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Warmup state and phase timings."""
+        if self._thread is None:
+            state = "idle"
+        elif not self.done:
+            state = "loading"
+        else:
+            state = "failed" if self.error else "ready"
+        return {
+            "state": state,
+            "model": self.model_name,
+            "import_ms": self.import_ms,
+            "load_ms": self.load_ms,
+            "probe_ms": self.probe_ms,
+            "error": self.error,
+        }
+
+
+# =============================================================================
+# PROCESS-WIDE WARMUP
+# =============================================================================
+
+_warmup: Optional[EmbeddingWarmup] = None
+_warmup_lock = threading.Lock()
+
+
+def start_embedding_warmup(model_name: Optional[str] = None) -> EmbeddingWarmup:
+    """
+    Start the process-wide embedding warmup (idempotent).
+
+    Safe to call on every Streamlit rerun; only the first call starts a
+    thread.
+
+    Args:
+        model_name: Model to load (defaults to ``ai.embedding_model``)
+
+    Returns:
+        The shared EmbeddingWarmup
+    """
+    global _warmup
+
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = EmbeddingWarmup(model_name)
+        return _warmup.start()
+
+
+def is_embedding_ready() -> bool:
+    """
+    Whether the app's embedding path can encode without loading the model.
+
+    Checks the process-wide EmbeddingWorker when one is configured,
+    otherwise the in-process model, whichever way it was loaded.
+    """
+    try:
+        from core.config import get_settings
+        from services.ai.embedding_worker import get_embedding_worker
+        from services.ai.rag_service import LocalEmbeddingService
+    except ImportError:
+        return False
+
+    worker = get_embedding_worker()
+    if worker is not None:
+        return worker.ready
+    return LocalEmbeddingService.is_model_loaded(get_settings().ai.embedding_model)
+
+
+def wait_for_embedding(timeout: Optional[float] = None) -> bool:
+    """Wait for the warmup started by ``start_embedding_warmup``."""
+    return _warmup.wait(timeout) if _warmup is not None else False
+
+
+def get_warmup_stats() -> Dict[str, Any]:
+    """Stats of the process-wide warmup."""
+    if _warmup is None:
+        return {"state": "idle"}
+    return _warmup.get_stats()
+
+
+# =============================================================================
+# BACKGROUND TASKS
+# =============================================================================
+
+_tasks: Dict[str, Dict[str, Any]] = {}
+_tasks_lock = threading.Lock()
+
+
+def run_in_background(name: str, target: Callable[[], Any]) -> bool:
+    """
+    Run a one-shot setup task (e.g. knowledge indexing) in a daemon thread.
+
+    Idempotent per name: only the first call for a name starts a thread.
+
+    Args:
+        name: Task name, also used as the thread name
+        target: Callable to run
+
+    Returns:
+        True if this call started the task
+    """
+    with _tasks_lock:
+        if name in _tasks:
+            return False
+        task = _tasks[name] = {"state": "running", "error": None, "ms": 0.0}
+
+    def run():
+        start = time.perf_counter()
+        try:
+            target()
+            task["state"] = "done"
+        except Exception as e:
+            task["state"] = "failed"
+            task["error"] = str(e)
+            logger.warning(f"Background task {name} failed: {e}")
+        finally:
+            task["ms"] = (time.perf_counter() - start) * 1000
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return True
+
+
+def get_background_tasks() -> Dict[str, Dict[str, Any]]:
+    """State, error and wall time of each background task."""
+    with _tasks_lock:
+        return {name: dict(task) for name, task in _tasks.items()}
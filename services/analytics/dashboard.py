@@ -193,11 +193,12 @@ def render_analytics_dashboard():
     st.divider()
     
     # Tabs for different views
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📈 Trend Harian", 
         "🕐 Distribusi Waktu",
         "🌍 Geografis",
-        "📱 Device & Flow"
+        "📱 Device & Flow",
+        "🗄️ Database"
     ])
     
     with tab1:
@@ -211,6 +212,9 @@ def render_analytics_dashboard():
     
     with tab4:
         render_device_flow(dashboard)
+    
+    with tab5:
+        render_query_profile()
 
 
 def render_daily_trend(dashboard: AnalyticsDashboard):
@@ -391,6 +395,87 @@ def render_device_flow(dashboard: AnalyticsDashboard):
             """, unsafe_allow_html=True)
 
 
+def render_query_profile():
+    """Render database query timings from the query profiler."""
+    
+    st.markdown("### 🗄️ Performa Database")
+    st.caption("Query sejak proses dimulai, dikelompokkan per fingerprint (nilai literal dihapus)")
+    
+    try:
+        from services.database.profiler import get_query_profiler
+    except ImportError:
+        st.info("Query profiler belum tersedia")
+        return
+    
+    profiler = get_query_profiler()
+    stats = profiler.get_stats()
+    if not stats["queries"]:
+        st.info("Belum ada query database yang tercatat")
+        return
+    
+    import pandas as pd
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Query", f"{stats['queries']:,}")
+    with col2:
+        st.metric("Rata-rata", f"{stats['mean_ms']:.1f} ms")
+    with col3:
+        st.metric("Error", stats["errors"])
+    with col4:
+        st.metric(
+            "Rerun > Budget",
+            f"{stats['reruns_over_budget']}/{stats['reruns']}",
+            help=f"Budget: {profiler.rerun_budget} query per rerun halaman",
+        )
+    
+    try:
+        from services.database.cache import get_query_cache
+        cache = get_query_cache().get_stats()
+    except ImportError:
+        cache = None
+    if cache and cache["enabled"]:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Cache Hit Ratio", f"{cache['hit_ratio']:.0%}")
+        with col2:
+            st.metric(
+                "Round-trip Dihemat", f"{cache['round_trips_saved']:,}",
+                help="Cache hit dikurangi query pengecekan watermark",
+            )
+        with col3:
+            st.metric("Entri Cache", f"{cache['entries']:,}")
+        with col4:
+            st.metric("Invalidasi", f"{cache['invalidations']:,}")
+    
+    st.markdown(f"#### 🐢 Query Lambat (≥ {profiler.slow_query_ms:.0f} ms)")
+    slow = profiler.slow_queries()
+    if slow:
+        st.dataframe(pd.DataFrame(slow), use_container_width=True, hide_index=True)
+    else:
+        st.caption("Tidak ada query lambat dalam jendela waktu terakhir")
+    
+    st.markdown("#### ⏱️ Total Waktu per Query")
+    st.caption("Rata-rata per panggilan: ambil koneksi pool / execute / fetch / konversi dict")
+    st.dataframe(
+        pd.DataFrame(profiler.top_fingerprints(profiler.top_n)),
+        use_container_width=True,
+        hide_index=True,
+    )
+    
+    st.markdown("#### 🔁 Query per Rerun Halaman")
+    reruns = profiler.reruns()
+    if reruns:
+        st.dataframe(pd.DataFrame(reruns), use_container_width=True, hide_index=True)
+    
+    plans = profiler.plans()
+    if plans:
+        st.markdown("#### 🔍 EXPLAIN (ANALYZE, BUFFERS)")
+        for fp, plan in plans.items():
+            with st.expander(fp[:100]):
+                st.code(plan, language="text")
+
+
 # =============================================================================
 # MINI WIDGET FOR HOME PAGE
 # =============================================================================
@@ -430,4 +515,5 @@ __all__ = [
     "AnalyticsDashboard",
     "render_analytics_dashboard",
     "render_analytics_mini_widget",
+    "render_query_profile",
 ]
@@ -153,10 +153,22 @@ class AnalyticsTracker:
         except Exception as e:
             logger.debug(f"Could not update session: {e}")
     
+    ENGAGEMENT_QUERY = """
+        SELECT 
+            AVG(page_count) as avg_pages,
+            AVG(duration_seconds) as avg_duration,
+            COUNT(CASE WHEN is_returning THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 as returning_rate,
+            COUNT(CASE WHEN device_type = 'mobile' THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 as mobile_rate
+        FROM visitor_sessions
+        WHERE last_activity >= NOW() - INTERVAL '30 days'
+    """
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get comprehensive visitor statistics.
         
+        The six queries are independent and run concurrently.
+        
         Returns:
             Dictionary with all stats
         """
@@ -164,6 +176,8 @@ class AnalyticsTracker:
             return self._get_fallback_stats()
         
         try:
+            from services.database.async_connection import Query, gather_queries
+            
             # Total stats
             total_query = """
                 SELECT 
@@ -171,10 +185,6 @@ class AnalyticsTracker:
                     COALESCE(SUM(page_views), 0) as total_views
                 FROM visitor_stats
             """
-            total = self.db.fetch_one(total_query) or {}
-            
-            if total.get('total_visitors', 0) == 0:
-                return self._get_fallback_stats()
             
             # Today's stats
             today_query = """
@@ -184,7 +194,6 @@ class AnalyticsTracker:
                 FROM visitor_stats
                 WHERE date = CURRENT_DATE
             """
-            today = self.db.fetch_one(today_query) or {}
             
             # This week's stats
             week_query = """
@@ -194,7 +203,6 @@ class AnalyticsTracker:
                 FROM visitor_stats
                 WHERE date >= CURRENT_DATE - INTERVAL '7 days'
             """
-            week = self.db.fetch_one(week_query) or {}
             
             # This month's stats
             month_query = """
@@ -204,7 +212,6 @@ class AnalyticsTracker:
                 FROM visitor_stats
                 WHERE date >= DATE_TRUNC('month', CURRENT_DATE)
             """
-            month = self.db.fetch_one(month_query) or {}
             
             # Popular pages
             pages_query = """
@@ -214,10 +221,32 @@ class AnalyticsTracker:
                 ORDER BY views DESC
                 LIMIT 6
             """
-            popular = self.db.fetch_all(pages_query) or []
+            
+            results = gather_queries([
+                Query(total_query),
+                Query(today_query),
+                Query(week_query),
+                Query(month_query),
+                Query(pages_query, fetch="all"),
+                Query(self.ENGAGEMENT_QUERY),
+            ], db=self.db, return_exceptions=True)
+            *core, engagement_row = results
+            for result in core:
+                if isinstance(result, Exception):
+                    raise result
+            total, today, week, month = (row or {} for row in core[:4])
+            popular = core[4] or []
+            
+            if total.get('total_visitors', 0) == 0:
+                return self._get_fallback_stats()
             
             # Engagement metrics
-            engagement = self._get_engagement_metrics()
+            try:
+                if isinstance(engagement_row, Exception):
+                    raise engagement_row
+                engagement = self._parse_engagement(engagement_row or {})
+            except Exception:
+                engagement = self._default_engagement()
             
             return {
                 "total_visitors": int(total.get('total_visitors', 0)),
@@ -240,36 +269,35 @@ class AnalyticsTracker:
     def _get_engagement_metrics(self) -> Dict[str, Any]:
         """Get engagement metrics from sessions."""
         try:
-            query = """
-                SELECT 
-                    AVG(page_count) as avg_pages,
-                    AVG(duration_seconds) as avg_duration,
-                    COUNT(CASE WHEN is_returning THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 as returning_rate,
-                    COUNT(CASE WHEN device_type = 'mobile' THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 as mobile_rate
-                FROM visitor_sessions
-                WHERE last_activity >= NOW() - INTERVAL '30 days'
-            """
-            result = self.db.fetch_one(query) or {}
-            
-            avg_duration = int(result.get('avg_duration', 272) or 272)
-            minutes = avg_duration // 60
-            seconds = avg_duration % 60
-            
-            return {
-                "avg_pages_per_visit": round(float(result.get('avg_pages', 1.3) or 1.3), 1),
-                "avg_session_duration": f"{minutes}m {seconds}s",
-                "returning_visitors_pct": round(float(result.get('returning_rate', 34) or 34), 0),
-                "mobile_users_pct": round(float(result.get('mobile_rate', 67) or 67), 0),
-                "top_region": "Jakarta"  # TODO: implement geo tracking
-            }
+            result = self.db.fetch_one(self.ENGAGEMENT_QUERY) or {}
+            return self._parse_engagement(result)
         except:
-            return {
-                "avg_pages_per_visit": 1.3,
-                "avg_session_duration": "4m 32s",
-                "returning_visitors_pct": 34,
-                "mobile_users_pct": 67,
-                "top_region": "Jakarta"
-            }
+            return self._default_engagement()
+    
+    @staticmethod
+    def _parse_engagement(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Format the engagement query row."""
+        avg_duration = int(result.get('avg_duration', 272) or 272)
+        minutes = avg_duration // 60
+        seconds = avg_duration % 60
+        
+        return {
+            "avg_pages_per_visit": round(float(result.get('avg_pages', 1.3) or 1.3), 1),
+            "avg_session_duration": f"{minutes}m {seconds}s",
+            "returning_visitors_pct": round(float(result.get('returning_rate', 34) or 34), 0),
+            "mobile_users_pct": round(float(result.get('mobile_rate', 67) or 67), 0),
+            "top_region": "Jakarta"  # TODO: implement geo tracking
+        }
+    
+    @staticmethod
+    def _default_engagement() -> Dict[str, Any]:
+        return {
+            "avg_pages_per_visit": 1.3,
+            "avg_session_duration": "4m 32s",
+            "returning_visitors_pct": 34,
+            "mobile_users_pct": 67,
+            "top_region": "Jakarta"
+        }
     
     def _get_fallback_stats(self) -> Dict[str, Any]:
         """Return demo stats when database is not available."""
@@ -12,6 +12,21 @@ from services.database.repository import (
     ChatRepository,
     BookingRepository,
 )
+from services.database.cache import (
+    QueryCache,
+    get_query_cache,
+)
+from services.database.async_connection import (
+    AsyncDatabaseConnection,
+    Query,
+    get_async_db,
+    gather_queries,
+)
+from services.database.profiler import (
+    QueryProfiler,
+    get_query_profiler,
+    fingerprint,
+)
 
 __all__ = [
     'DatabaseConnection',
@@ -20,4 +35,13 @@ __all__ = [
     'UserRepository',
     'ChatRepository',
     'BookingRepository',
+    'QueryCache',
+    'get_query_cache',
+    'AsyncDatabaseConnection',
+    'Query',
+    'get_async_db',
+    'gather_queries',
+    'QueryProfiler',
+    'get_query_profiler',
+    'fingerprint',
 ]
@@ -0,0 +1,457 @@
+"""
+LABBAIK AI v6.0 - Async Database Connection
+===========================================
+Async PostgreSQL access next to the psycopg2 pool.
+
+Dashboards issue several independent aggregate queries per render; over
+a remote Neon connection each one costs a network round-trip, so running
+them one after another adds up. ``AsyncDatabaseConnection`` keeps a
+psycopg 3 ``AsyncConnectionPool`` on a dedicated event-loop thread and
+``gather_queries`` runs a batch of reads concurrently from ordinary
+(Streamlit) code. Without psycopg 3 or a database URL the batch runs
+sequentially on the psycopg2 pool, so callers need no fallback of their own.
+"""
+
+from __future__ import annotations
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from services.database.profiler import QueryTiming, fingerprint, get_query_profiler
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class Query:
+    """One statement of a ``gather_queries`` batch."""
+    sql: str
+    params: Optional[tuple] = None
+    fetch: str = "one"              # one | all | none (rowcount)
+    tables: Sequence[str] = ()      # QueryCache tags; empty = not cached
+
+    @property
+    def operation(self) -> str:
+        return {"one": "fetch_one", "all": "fetch_all", "none": "execute"}[self.fetch]
+
+
+# =============================================================================
+# ASYNC DATABASE CONNECTION
+# =============================================================================
+
+class AsyncDatabaseConnection:
+    """
+    Async counterpart of DatabaseConnection (same fetch_one / fetch_all /
+    execute API, as coroutines).
+
+    The pool lives on a private event loop in a daemon thread so it
+    survives Streamlit reruns. The coroutines can be awaited from any
+    event loop; calls from another loop are forwarded to the pool's loop.
+    """
+
+    _instance: Optional["AsyncDatabaseConnection"] = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls) -> "AsyncDatabaseConnection":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._pool = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._open_lock: Optional[asyncio.Lock] = None
+        self._unavailable: Optional[str] = None
+        self._retry_at: Optional[float] = None  # None: unavailable for good
+        self._failures = 0
+        self.profiler = get_query_profiler()
+        self.enabled = True
+        self.pool_size = 6
+        self.query_timeout = 30.0
+        self.retry_seconds = 30.0
+        try:
+            from core.config import get_settings
+            db = get_settings().database
+            self.enabled = db.async_queries_enabled
+            self.pool_size = db.async_pool_size
+            self.query_timeout = db.async_query_timeout
+            self.retry_seconds = db.async_retry_seconds
+        except Exception:
+            pass
+        self._initialized = True
+
+    # ==================== LIFECYCLE ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="async-db-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the pool's loop from synchronous code.
+
+        Args:
+            coro: Coroutine (typically using this connection)
+            timeout: Seconds to wait for the result; on expiry the
+                coroutine is cancelled and TimeoutError raised
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Async database call exceeded {timeout}s")
+
+    async def _on_loop(self, coro):
+        """Await ``coro`` on the pool's loop, whichever loop the caller runs on."""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def _open(self, connection_string: Optional[str] = None) -> bool:
+        if self._pool is not None:
+            return True
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()  # Created on the pool's loop
+        async with self._open_lock:
+            if self._pool is not None:
+                return True
+            if self._unavailable:
+                if self._retry_at is None or time.monotonic() < self._retry_at:
+                    return False
+                self._unavailable = None
+            return await self._open_pool(connection_string)
+
+    async def _open_pool(self, connection_string: Optional[str]) -> bool:
+        try:
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError:
+            self._unavailable, self._retry_at = "psycopg 3 not installed", None
+            logger.info("psycopg[pool] not installed; batched queries run sequentially")
+            return False
+
+        if connection_string is None:
+            from services.database.repository import get_db
+            db = get_db()
+            connection_string = db._connection_string or db._get_connection_string()
+        if not connection_string:
+            self._unavailable, self._retry_at = "no database URL", None
+            return False
+
+        pool = AsyncConnectionPool(
+            connection_string,
+            min_size=self.pool_size,
+            max_size=self.pool_size,
+            open=False,
+        )
+        try:
+            await pool.open(wait=True, timeout=30)
+        except Exception as e:
+            # Stop the pool's workers still trying to connect
+            try:
+                await pool.close()
+            except Exception:
+                pass
+            self._failures += 1
+            backoff = min(self.retry_seconds * 2 ** (self._failures - 1), 600.0)
+            self._unavailable = f"pool failed to open: {e}"
+            self._retry_at = time.monotonic() + backoff
+            logger.error(
+                f"Failed to initialize async database pool, retrying in {backoff:.0f}s "
+                f"(batches run sequentially until then): {e}"
+            )
+            return False
+
+        self._pool = pool
+        self._failures = 0
+        logger.info(f"Async database pool initialized ({self.pool_size} connections)")
+        return True
+
+    def initialize(self, connection_string: Optional[str] = None) -> bool:
+        """
+        Open the async pool (blocking).
+
+        Args:
+            connection_string: Database URL (auto-detect if not provided)
+
+        Returns:
+            True if the pool is ready
+        """
+        if self._pool is not None:
+            return True
+        if not self.enabled:
+            return False
+        if self._unavailable and (self._retry_at is None or time.monotonic() < self._retry_at):
+            return False
+        return self.run(self._open(connection_string))
+
+    @property
+    def available(self) -> bool:
+        """True once the async pool is open."""
+        return self._pool is not None
+
+    def close(self):
+        """Close the pool and stop the loop thread."""
+        if self._loop is None:
+            return
+        if self._pool is not None:
+            self.run(self._pool.close())
+            self._pool = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = self._thread = None
+        logger.info("Async database connections closed")
+
+    # ==================== QUERIES ====================
+
+    async def _run(self, operation: str, query: str, params: tuple = None, rerun=None):
+        """Run one statement on a pooled connection and record its timings."""
+        if self._pool is None and not await self._open():
+            from services.database.repository import ConnectionError
+            raise ConnectionError(f"Async database pool not available ({self._unavailable})")
+
+        from psycopg.rows import dict_row
+        from services.database.repository import DatabaseError
+
+        timing = QueryTiming(fingerprint=fingerprint(query), operation=operation)
+        start = time.perf_counter()
+        try:
+            async with self._pool.connection() as conn:
+                mark = time.perf_counter()
+                timing.acquire_ms = (mark - start) * 1000
+                async with conn.cursor(row_factory=dict_row) as cursor:
+                    await cursor.execute(query, params)
+                    now = time.perf_counter()
+                    timing.execute_ms, mark = (now - mark) * 1000, now
+
+                    if operation == "execute":
+                        timing.rows = max(cursor.rowcount, 0)
+                        return cursor.rowcount
+
+                    if operation == "fetch_one":
+                        row = await cursor.fetchone()
+                        rows = [row] if row else []
+                    else:
+                        rows = await cursor.fetchall()
+                    timing.fetch_ms = (time.perf_counter() - mark) * 1000
+                    timing.rows = len(rows)
+                    # dict_row already builds dicts while fetching
+
+                    if operation == "fetch_one":
+                        return rows[0] if rows else None
+                    return rows
+        except Exception as e:
+            timing.error = True
+            logger.error(f"Database error: {e}")
+            raise DatabaseError(str(e))
+        finally:
+            timing.total_ms = (time.perf_counter() - start) * 1000
+            self.profiler.record(timing, query, params, rerun=rerun)
+
+    async def execute(self, query: str, params: tuple = None) -> int:
+        """
+        Execute a query and return affected rows.
+
+        Args:
+            query: SQL query
+            params: Query parameters
+
+        Returns:
+            Number of affected rows
+        """
+        return await self._on_loop(self._run("execute", query, params))
+
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict]:
+        """
+        Fetch single row as dictionary.
+
+        Args:
+            query: SQL query
+            params: Query parameters
+
+        Returns:
+            Row as dictionary or None
+        """
+        return await self._on_loop(self._run("fetch_one", query, params))
+
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict]:
+        """
+        Fetch all rows as list of dictionaries.
+
+        Args:
+            query: SQL query
+            params: Query parameters
+
+        Returns:
+            List of rows as dictionaries
+        """
+        return await self._on_loop(self._run("fetch_all", query, params))
+
+    async def gather(self, queries: Iterable[Query], return_exceptions: bool = False, rerun=None) -> List[Any]:
+        """
+        Run queries concurrently, each on its own pooled connection.
+
+        Args:
+            queries: Statements to run
+            return_exceptions: Return errors in place of results instead of raising
+            rerun: Profiler rerun report to attribute the queries to
+
+        Returns:
+            Results in the order of ``queries``
+        """
+        tasks = [self._run(q.operation, q.sql, q.params, rerun=rerun) for q in queries]
+        return await self._on_loop(asyncio.gather(*tasks, return_exceptions=return_exceptions))
+
+
+def get_async_db() -> AsyncDatabaseConnection:
+    """Get the async database connection singleton."""
+    return AsyncDatabaseConnection()
+
+
+# =============================================================================
+# BATCHED QUERIES
+# =============================================================================
+
+def gather_queries(
+    queries: Sequence[Query],
+    db=None,
+    cache=None,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """
+    Run independent read queries concurrently from synchronous code.
+
+    Cached results (``Query.tables`` set and ``cache`` given) are served
+    first; the misses run together on the async pool, or one by one on the
+    psycopg2 pool when async access is unavailable. Cache watermark checks
+    that are due run in the same concurrent batch as the misses.
+
+    Args:
+        queries: Statements to run
+        db: DatabaseConnection for the sequential fallback and cache
+            watermarks (default: ``get_db()``)
+        cache: QueryCache to read through
+        return_exceptions: Return errors in place of results instead of raising
+
+    Returns:
+        Results in the order of ``queries``
+    """
+    if db is None:
+        from services.database.repository import get_db
+        db = get_db()
+
+    def cacheable(query: Query) -> bool:
+        return cache is not None and bool(query.tables) and query.fetch != "none"
+
+    watermarks = []
+    if cache is not None:
+        watermarks = cache.due_watermarks(
+            table for query in queries if cacheable(query) for table in query.tables
+        )
+
+    results: List[Any] = [None] * len(queries)
+    hits = []
+    pending = []
+    for i, query in enumerate(queries):
+        token = None
+        if cacheable(query):
+            hit, value, token = cache.lookup(
+                db, query.sql, query.params, query.tables, check_watermarks=False
+            )
+            if hit:
+                results[i] = value
+                hits.append(i)
+                continue
+        pending.append((i, query, token))
+
+    batch = [Query(sql) for _, sql in watermarks] + [query for _, query, _ in pending]
+    values = _run_batch(batch, db)
+    changed = {
+        table for (table, _), row in zip(watermarks, values)
+        if cache.apply_watermark(table, row)
+    }
+    values = values[len(watermarks):]
+
+    # Rare: a hit was served from a table whose watermark just moved
+    stale = [i for i in hits if changed & set(queries[i].tables)]
+    if stale:
+        extra = []
+        for i in stale:
+            query = queries[i]
+            hit, value, token = cache.lookup(
+                db, query.sql, query.params, query.tables, check_watermarks=False
+            )
+            if hit:
+                results[i] = value
+            else:
+                extra.append((i, query, token))
+        pending += extra
+        values += _run_batch([query for _, query, _ in extra], db)
+
+    for (i, query, token), value in zip(pending, values):
+        if isinstance(value, BaseException):
+            if not return_exceptions:
+                raise value
+        elif cache is not None:
+            cache.store(token, value)
+        results[i] = value
+    return results
+
+
+def _run_batch(queries: List[Query], db) -> List[Any]:
+    """Results (or exceptions) of ``queries``: concurrently when possible."""
+    if not queries:
+        return []
+
+    async_db = get_async_db()
+    # Same database as the sync connection (the first batch opens the pool)
+    if len(queries) > 1 and async_db.enabled and async_db.initialize(
+        getattr(db, "_connection_string", None)
+    ):
+        rerun = async_db.profiler.current_rerun()
+        try:
+            return async_db.run(
+                async_db.gather(queries, return_exceptions=True, rerun=rerun),
+                timeout=async_db.query_timeout,
+            )
+        except Exception as e:
+            from services.database.repository import DatabaseError
+            logger.error(f"Query batch failed: {e}")
+            return [DatabaseError(str(e))] * len(queries)
+
+    values = []
+    for query in queries:
+        try:
+            values.append(getattr(db, query.operation)(query.sql, query.params))
+        except Exception as e:
+            values.append(e)
+    return values
@@ -0,0 +1,135 @@
+"""
+LABBAIK AI v6.0 - Bulk Write Helpers
+====================================
+Batching and COPY encoding for the bulk repository writes.
+
+``CopyStream`` turns an iterator of rows into the text format of
+``COPY ... FROM STDIN`` on demand, so a load of any size is streamed to
+the server in fixed-size chunks without materializing it.
+"""
+
+import io
+import json
+import logging
+from datetime import date, datetime, time
+from enum import Enum
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# BATCHING
+# =============================================================================
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def row_values(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> Iterator[Tuple]:
+    """
+    Rows as value tuples in ``columns`` order.
+
+    Raises:
+        ValueError: If a row has different columns than the first one
+    """
+    expected = set(columns)
+    for row in rows:
+        if row.keys() != expected:
+            raise ValueError(
+                f"Bulk rows must share columns: expected {sorted(expected)}, got {sorted(row)}"
+            )
+        yield tuple(row[col] for col in columns)
+
+
+def dedupe(rows: List[Tuple], key_indexes: Sequence[int]) -> List[Tuple]:
+    """
+    Keep the last row per conflict key.
+
+    One INSERT ... ON CONFLICT DO UPDATE cannot touch the same row twice,
+    so duplicates within a batch are collapsed first.
+    """
+    latest: Dict[Tuple, Tuple] = {}
+    for row in rows:
+        key = tuple(row[i] for i in key_indexes)
+        latest.pop(key, None)
+        latest[key] = row
+    return list(latest.values())
+
+
+# =============================================================================
+# COPY ENCODING
+# =============================================================================
+
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+})
+
+
+def copy_literal(value: Any) -> str:
+    r"""
+    One field in COPY text format (NULL is ``\N``).
+
+    Values are written the way psycopg2 would pass them as parameters;
+    dicts and lists are JSON-encoded, as ``create`` sends them.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class CopyStream(io.RawIOBase):
+    """Readable file over rows, encoded for ``COPY ... FROM STDIN`` on demand."""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._rows = iter(rows)
+        self._buffer = b""
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int):
+        lines = []
+        length = len(self._buffer)
+        for row in self._rows:
+            line = ("\t".join(copy_literal(v) for v in row) + "\n").encode("utf-8")
+            lines.append(line)
+            length += len(line)
+            self.rows += 1
+            if length >= size:
+                break
+        self._buffer += b"".join(lines)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            self._fill(float("inf"))
+            data, self._buffer = self._buffer, b""
+            return data
+        if len(self._buffer) < size:
+            self._fill(size)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
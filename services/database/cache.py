@@ -0,0 +1,377 @@
+"""
+LABBAIK AI v6.0 - Query Result Cache
+====================================
+Read-through cache for repository queries.
+
+Results are keyed by the SQL text and parameters and tagged with the
+tables they read. A write through a repository invalidates its table at
+once; writes from outside the app (the n8n price workflow, the SQL
+editor) are caught by a per-table watermark, ``MAX(updated_at)`` by
+default, that is re-read at most every ``watermark_seconds`` and
+invalidates the table when it changes. With the indexes in
+scripts/query_cache_watermark_indexes.sql it is a one-row index read
+rather than a table scan. Rows deleted outside the app do not move it;
+those reads expire after ``ttl_seconds``.
+"""
+
+import sys
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATERMARK_SQL = "SELECT MAX(updated_at) AS last FROM {table}"
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class CachedResult:
+    """A cached query result."""
+    value: Any
+    versions: Tuple[Tuple[str, int], ...]   # (table, version) at fill time
+    created_at: float                       # time.monotonic()
+    size_bytes: int
+
+
+def _copy(value: Any) -> Any:
+    """Row-level copy so callers cannot mutate cached rows."""
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _size_of(value: Any) -> int:
+    rows = value if isinstance(value, list) else [value]
+    size = sys.getsizeof(rows)
+    for row in rows:
+        if isinstance(row, dict):
+            size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+    return size
+
+
+# =============================================================================
+# QUERY CACHE
+# =============================================================================
+
+class QueryCache:
+    """
+    LRU cache of query results with table-level invalidation.
+
+    Each table has a version counter. Entries remember the versions of
+    their tables when filled and are discarded on lookup once any of them
+    has moved on, so invalidating a table is O(1).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        watermark_seconds: float = 10.0
+    ):
+        """
+        Args:
+            enabled: Serve reads from the cache at all
+            max_entries: Entry cap (LRU eviction)
+            max_bytes: Approximate memory cap (LRU eviction)
+            ttl_seconds: Max age of an entry regardless of invalidation
+            watermark_seconds: Min interval between watermark reads of a table
+        """
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.watermark_seconds = watermark_seconds
+
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self._versions: Dict[str, int] = {}
+        self._watermark_sql: Dict[str, Optional[str]] = {}
+        self._watermarks: Dict[str, Tuple[float, Any]] = {}  # table -> (checked_at, mark)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.watermark_checks = 0
+        self.watermark_changes = 0
+        self.evictions = 0
+
+    def configure(self, **options):
+        """Update limits (unknown options are ignored)."""
+        for name, value in options.items():
+            if hasattr(self, name) and not name.startswith("_"):
+                setattr(self, name, value)
+
+    # ==================== WATERMARKS ====================
+
+    def register_watermark(self, table: str, sql: Optional[str] = DEFAULT_WATERMARK_SQL):
+        """
+        Set the statement whose result changes whenever ``table`` does.
+
+        Args:
+            table: Table name
+            sql: Watermark query (``{table}`` is substituted); None disables
+                the check (only in-app writes invalidate)
+        """
+        with self._lock:
+            self._watermark_sql[table] = sql.format(table=table) if sql else None
+
+    def due_watermarks(self, tables: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Claim the watermark checks that are due for ``tables``.
+
+        Claimed checks are not handed out again for ``watermark_seconds``,
+        so concurrent readers do not repeat them. Run each statement with
+        ``fetch_one`` and pass the outcome to ``apply_watermark``.
+
+        Returns:
+            (table, sql) pairs to check
+        """
+        if not self.enabled:
+            return []
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for table in sorted(set(tables)):
+                sql = self._watermark_sql.get(table, DEFAULT_WATERMARK_SQL.format(table=table))
+                checked_at, mark = self._watermarks.get(table, (None, None))
+                if sql and (checked_at is None or now - checked_at >= self.watermark_seconds):
+                    due.append((table, sql))
+                    self._watermarks[table] = (now, mark)
+        return due
+
+    def apply_watermark(self, table: str, row: Any) -> bool:
+        """
+        Record the result of a claimed watermark check.
+
+        Args:
+            table: Table name
+            row: ``fetch_one`` result, or the exception the check raised
+
+        Returns:
+            True if the table was invalidated
+        """
+        if isinstance(row, BaseException):
+            logger.warning(f"Watermark check failed for {table}: {row}")
+            self.invalidate(table)
+            return True
+        mark = tuple(row.values()) if row else None
+        with self._lock:
+            self.watermark_checks += 1
+            checked_at, previous = self._watermarks.get(table, (time.monotonic(), None))
+            self._watermarks[table] = (checked_at, mark)
+        if previous is not None and previous != mark:
+            self.watermark_changes += 1
+            self.invalidate(table)
+            return True
+        return False
+
+    def _check_watermarks(self, db, tables: Iterable[str]):
+        """Re-read due watermarks; invalidate tables whose mark changed."""
+        for table, sql in self.due_watermarks(tables):
+            try:
+                row = db.fetch_one(sql)
+            except Exception as e:
+                row = e
+            self.apply_watermark(table, row)
+
+    # ==================== READ-THROUGH ====================
+
+    @staticmethod
+    def make_key(query: str, params: Any) -> str:
+        """
+        Cache key of a statement.
+
+        The exact SQL text is used, not its fingerprint: fingerprints strip
+        inlined literals (``city = 'Makkah'``), which would merge distinct queries.
+        """
+        return hashlib.sha1(f"{query}\x00{params!r}".encode("utf-8")).hexdigest()
+
+    def lookup(
+        self,
+        db,
+        query: str,
+        params: Any = None,
+        tables: Iterable[str] = (),
+        check_watermarks: bool = True
+    ) -> Tuple[bool, Any, Any]:
+        """
+        Look a read up without running it.
+
+        Args:
+            db: DatabaseConnection (for watermark checks)
+            query: SQL query
+            params: Query parameters
+            tables: Tables the query reads (invalidation tags)
+            check_watermarks: Run due watermark checks first (False when
+                the caller runs them itself, see ``due_watermarks``)
+
+        Returns:
+            (hit, value, token); on a miss, pass ``token`` to ``store``
+            with the result (None token: not cacheable)
+        """
+        tables = tuple(sorted(set(tables)))
+        if not self.enabled or not tables:
+            return False, None, None
+
+        if check_watermarks:
+            self._check_watermarks(db, tables)
+
+        key = self.make_key(query, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fresh = now - entry.created_at <= self.ttl_seconds and all(
+                    self._versions.get(table, 0) == version for table, version in entry.versions
+                )
+                if fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    value = entry.value
+                else:
+                    self._drop(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+            versions = tuple((table, self._versions.get(table, 0)) for table in tables)
+
+        if entry is not None:
+            self._note_hit()
+            return True, _copy(value), None
+        return False, None, (key, versions, now)
+
+    def store(self, token: Any, value: Any):
+        """Cache the result of a ``lookup`` miss."""
+        if token is None:
+            return
+        key, versions, now = token
+        stored = _copy(value)
+        size = _size_of(stored)
+        with self._lock:
+            # A write that raced with this read bumped a version: do not cache
+            if all(self._versions.get(table, 0) == version for table, version in versions):
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = CachedResult(stored, versions, now, size)
+                self._bytes += size
+                while self._entries and (
+                    len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+                ):
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def fetch(
+        self,
+        db,
+        operation: str,
+        query: str,
+        params: Any = None,
+        tables: Iterable[str] = ()
+    ) -> Any:
+        """
+        Serve a read from cache or the database.
+
+        Args:
+            db: DatabaseConnection
+            operation: "fetch_one" or "fetch_all"
+            query: SQL query
+            params: Query parameters
+            tables: Tables the query reads (invalidation tags)
+
+        Returns:
+            Same as ``db.fetch_one`` / ``db.fetch_all``
+        """
+        hit, value, token = self.lookup(db, query, params, tables)
+        if hit:
+            return value
+        value = getattr(db, operation)(query, params)
+        self.store(token, value)
+        return value
+
+    def _drop(self, key: str):
+        """Remove an entry (lock held)."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size_bytes
+
+    @staticmethod
+    def _note_hit():
+        """Count the saved round-trip against the current page rerun."""
+        try:
+            from services.database.profiler import get_query_profiler
+            get_query_profiler().record_cache_hit()
+        except Exception:
+            pass
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, *tables: str):
+        """Invalidate every cached result that read any of ``tables``."""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            self.invalidations += len(tables)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio, round-trips saved and size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                # Every hit skips one query; watermark reads are the price
+                "round_trips_saved": self.hits - self.watermark_checks,
+                "watermark_checks": self.watermark_checks,
+                "watermark_changes": self.watermark_changes,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide query cache, configured from ``database`` settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = QueryCache()
+                try:
+                    from core.config import get_settings
+                    db = get_settings().database
+                    cache.configure(
+                        enabled=db.query_cache_enabled,
+                        max_entries=db.query_cache_max_entries,
+                        ttl_seconds=db.query_cache_ttl_seconds,
+                        watermark_seconds=db.query_cache_watermark_seconds,
+                    )
+                except Exception:
+                    pass
+                _cache = cache
+    return _cache
@@ -0,0 +1,469 @@
+"""
+LABBAIK AI v6.0 - Query Profiler
+================================
+Instrumentation for DatabaseConnection.
+
+Every statement is recorded under its fingerprint (the SQL with literals
+and parameters replaced by ``?``) with its time split into pool acquire,
+execute, fetch and dict conversion. The profiler keeps per-fingerprint
+totals, a rolling table of the slowest executions, optional
+``EXPLAIN (ANALYZE, BUFFERS)`` plans for slow reads, and a query budget
+report per Streamlit rerun.
+"""
+
+import re
+import time
+import functools
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# FINGERPRINTING
+# =============================================================================
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """
+    Normalize a statement so executions that differ only in values group together.
+
+    Comments are removed, string/number literals and driver placeholders
+    become ``?``, ``IN (?, ?, ...)`` lists collapse to ``(?+)`` and
+    whitespace is squeezed. Cached, since most statements are constant
+    strings with parameters passed separately.
+    """
+    text = _COMMENT.sub(" ", query)
+    text = _STRING.sub("?", text)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(?+)", text)
+    return _WHITESPACE.sub(" ", text).strip().rstrip(";")
+
+
+def is_read_only(query: str) -> bool:
+    """True for plain SELECT/WITH statements that are safe to EXPLAIN ANALYZE."""
+    text = _WHITESPACE.sub(" ", _COMMENT.sub(" ", query)).strip().upper()
+    if not text.startswith(("SELECT", "WITH")):
+        return False
+    return not re.search(r"\b(INSERT|UPDATE|DELETE|MERGE|CREATE|ALTER|DROP|TRUNCATE)\b", text)
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class QueryTiming:
+    """One executed statement."""
+    fingerprint: str
+    operation: str              # fetch_one | fetch_all | execute | execute_values | copy | iter_rows
+    acquire_ms: float = 0.0     # Waiting for a pooled connection
+    execute_ms: float = 0.0     # cursor.execute (server time + network)
+    fetch_ms: float = 0.0       # fetchone/fetchall
+    convert_ms: float = 0.0     # Rows -> dicts
+    total_ms: float = 0.0       # Includes commit and returning the connection
+    rows: int = 0
+    error: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+
+@dataclass
+class QueryStats:
+    """Totals for one fingerprint."""
+    fingerprint: str
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    acquire_ms: float = 0.0
+    execute_ms: float = 0.0
+    fetch_ms: float = 0.0
+    convert_ms: float = 0.0
+    plan: Optional[str] = None      # Last EXPLAIN (ANALYZE, BUFFERS) output
+    plan_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        calls = max(1, self.calls)
+        return {
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / calls, 2),
+            "max_ms": round(self.max_ms, 2),
+            "acquire_ms": round(self.acquire_ms / calls, 2),
+            "execute_ms": round(self.execute_ms / calls, 2),
+            "fetch_ms": round(self.fetch_ms / calls, 2),
+            "convert_ms": round(self.convert_ms / calls, 2),
+            "has_plan": self.plan is not None,
+        }
+
+
+@dataclass
+class RerunReport:
+    """Queries issued during one Streamlit rerun."""
+    label: str
+    queries: int = 0
+    total_ms: float = 0.0
+    budget: int = 0
+    cache_hits: int = 0         # Reads served by the query cache (round-trips saved)
+    fingerprints: Dict[str, int] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.budget) and self.queries > self.budget
+
+    @property
+    def repeated(self) -> Dict[str, int]:
+        """Fingerprints issued more than once in the rerun."""
+        return {fp: count for fp, count in self.fingerprints.items() if count > 1}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page": self.label,
+            "queries": self.queries,
+            "budget": self.budget,
+            "db_ms": round(self.total_ms, 2),
+            "distinct": len(self.fingerprints),
+            "repeated": sum(count - 1 for count in self.repeated.values()),
+            "cache_hits": self.cache_hits,
+            "over_budget": self.over_budget,
+        }
+
+
+# =============================================================================
+# QUERY PROFILER
+# =============================================================================
+
+class QueryProfiler:
+    """
+    Collects QueryTimings from DatabaseConnection.
+
+    Slow statements (``slow_query_ms``) go into a rolling top-N table that
+    forgets entries older than ``window_seconds`` and are logged as
+    ``db_query`` perf events. With ``explain_threshold_ms`` set, read-only
+    statements slower than it get an ``EXPLAIN (ANALYZE, BUFFERS)`` plan
+    captured in a background thread, at most once per fingerprint per
+    ``explain_cooldown_seconds``.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        slow_query_ms: float = 200.0,
+        top_n: int = 20,
+        window_seconds: float = 3600.0,
+        explain_threshold_ms: float = 0.0,
+        explain_cooldown_seconds: float = 600.0,
+        rerun_budget: int = 10,
+        max_fingerprints: int = 500,
+        max_reruns: int = 50
+    ):
+        """
+        Args:
+            enabled: Record statements at all
+            slow_query_ms: Executions at or above this are "slow"
+            top_n: Size of the slow query table
+            window_seconds: Slow executions older than this are dropped
+            explain_threshold_ms: Capture plans above this (0 = off)
+            explain_cooldown_seconds: Min time between plans of one fingerprint
+            rerun_budget: Queries allowed per rerun before it is flagged (0 = no budget)
+            max_fingerprints: Per-fingerprint totals kept (LRU)
+            max_reruns: Rerun reports kept
+        """
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.top_n = top_n
+        self.window_seconds = window_seconds
+        self.explain_threshold_ms = explain_threshold_ms
+        self.explain_cooldown_seconds = explain_cooldown_seconds
+        self.rerun_budget = rerun_budget
+        self.max_fingerprints = max_fingerprints
+
+        self._stats: "OrderedDict[str, QueryStats]" = OrderedDict()
+        self._slow: List[QueryTiming] = []
+        self._reruns: deque = deque(maxlen=max_reruns)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        # Set by DatabaseConnection: (query, params) -> plan text
+        self.explainer: Optional[Callable[[str, Any], str]] = None
+        self._explaining: set = set()
+
+        self.queries = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def configure(self, **options):
+        """Update thresholds (unknown options are ignored)."""
+        for name, value in options.items():
+            if hasattr(self, name) and not name.startswith("_"):
+                setattr(self, name, value)
+
+    # ==================== RECORDING ====================
+
+    def record(self, timing: QueryTiming, query: str = "", params: Any = None, rerun=None):
+        """
+        Record one executed statement.
+
+        Args:
+            timing: Phase timings of the statement
+            query: Original SQL (for EXPLAIN)
+            params: Original parameters (for EXPLAIN)
+            rerun: RerunReport to count it against (default: this thread's)
+        """
+        if not self.enabled:
+            return
+
+        explain = False
+        with self._lock:
+            self.queries += 1
+            self.errors += int(timing.error)
+            self.total_ms += timing.total_ms
+
+            stats = self._stats.get(timing.fingerprint)
+            if stats is None:
+                stats = self._stats[timing.fingerprint] = QueryStats(timing.fingerprint)
+                while len(self._stats) > self.max_fingerprints:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(timing.fingerprint)
+            stats.calls += 1
+            stats.errors += int(timing.error)
+            stats.rows += timing.rows
+            stats.total_ms += timing.total_ms
+            stats.max_ms = max(stats.max_ms, timing.total_ms)
+            stats.acquire_ms += timing.acquire_ms
+            stats.execute_ms += timing.execute_ms
+            stats.fetch_ms += timing.fetch_ms
+            stats.convert_ms += timing.convert_ms
+
+            slow = timing.total_ms >= self.slow_query_ms
+            if slow:
+                self._add_slow(timing)
+
+            if (
+                self.explain_threshold_ms
+                and self.explainer is not None
+                and not timing.error
+                and timing.total_ms >= self.explain_threshold_ms
+                and timing.fingerprint not in self._explaining
+                and timing.timestamp - stats.plan_at >= self.explain_cooldown_seconds
+                and is_read_only(query)
+            ):
+                self._explaining.add(timing.fingerprint)
+                stats.plan_at = timing.timestamp
+                explain = True
+
+        if rerun is None:
+            rerun = self.current_rerun()
+        if rerun is not None:
+            rerun.queries += 1
+            rerun.total_ms += timing.total_ms
+            rerun.fingerprints[timing.fingerprint] = rerun.fingerprints.get(timing.fingerprint, 0) + 1
+
+        if slow:
+            self._log_event("db_query", timing.total_ms, {
+                "fingerprint": timing.fingerprint[:200],
+                "operation": timing.operation,
+                "acquire_ms": f"{timing.acquire_ms:.1f}",
+                "execute_ms": f"{timing.execute_ms:.1f}",
+                "fetch_ms": f"{timing.fetch_ms:.1f}",
+                "convert_ms": f"{timing.convert_ms:.1f}",
+                "rows": str(timing.rows),
+                "error": str(timing.error).lower(),
+            })
+
+        if explain:
+            threading.Thread(
+                target=self._capture_plan,
+                args=(timing.fingerprint, query, params),
+                name="query-explain",
+                daemon=True,
+            ).start()
+
+    def current_rerun(self) -> Optional[RerunReport]:
+        """The page rerun being profiled on this thread, if any."""
+        return getattr(self._local, "rerun", None)
+
+    def record_cache_hit(self):
+        """Count a read served without a query against the current rerun."""
+        rerun = self.current_rerun()
+        if rerun is not None:
+            rerun.cache_hits += 1
+
+    def _add_slow(self, timing: QueryTiming):
+        """Insert into the rolling top-N (lock held)."""
+        cutoff = timing.timestamp - self.window_seconds
+        self._slow = [t for t in self._slow if t.timestamp >= cutoff]
+        self._slow.append(timing)
+        self._slow.sort(key=lambda t: t.total_ms, reverse=True)
+        del self._slow[self.top_n:]
+
+    def _capture_plan(self, fp: str, query: str, params: Any):
+        try:
+            plan = self.explainer(query, params)
+        except Exception as e:
+            plan = None
+            logger.warning(f"EXPLAIN failed for {fp[:80]}: {e}")
+        with self._lock:
+            self._explaining.discard(fp)
+            if plan and fp in self._stats:
+                self._stats[fp].plan = plan
+
+    @staticmethod
+    def _log_event(name: str, value: float, tags: Dict[str, str], unit: str = "ms"):
+        try:
+            from core.logging_config import perf_logger
+            perf_logger.log_metric(name, value, unit=unit, tags=tags)
+        except Exception:
+            pass
+
+    # ==================== RERUN BUDGET ====================
+
+    @contextmanager
+    def rerun(self, label: str):
+        """
+        Count the queries issued by this thread until the block exits.
+
+        Streamlit runs a session's script in one thread, so wrapping the
+        page render attributes its queries to the rerun.
+        """
+        report = RerunReport(label=label, budget=self.rerun_budget)
+        previous = getattr(self._local, "rerun", None)
+        self._local.rerun = report
+        try:
+            yield report
+        finally:
+            self._local.rerun = previous
+            self._finish_rerun(report)
+
+    def _finish_rerun(self, report: RerunReport):
+        if not self.enabled or not (report.queries or report.cache_hits):
+            return
+        with self._lock:
+            self._reruns.append(report)
+        self._log_event("db_rerun", report.total_ms, {
+            "page": report.label,
+            "queries": str(report.queries),
+            "budget": str(report.budget),
+            "distinct": str(len(report.fingerprints)),
+            "cache_hits": str(report.cache_hits),
+            "over_budget": str(report.over_budget).lower(),
+        })
+        if report.over_budget:
+            repeated = ", ".join(
+                f"{count}x {fp[:60]}" for fp, count in
+                sorted(report.repeated.items(), key=lambda item: item[1], reverse=True)[:3]
+            )
+            logger.warning(
+                f"Page '{report.label}' issued {report.queries} queries "
+                f"(budget {report.budget}, {report.total_ms:.0f}ms)"
+                + (f"; repeated: {repeated}" if repeated else "")
+            )
+
+    # ==================== REPORTS ====================
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        """Rolling top-N slowest executions, slowest first."""
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            slow = [t for t in self._slow if t.timestamp >= cutoff]
+        return [
+            {
+                "fingerprint": t.fingerprint,
+                "operation": t.operation,
+                "total_ms": round(t.total_ms, 2),
+                "acquire_ms": round(t.acquire_ms, 2),
+                "execute_ms": round(t.execute_ms, 2),
+                "fetch_ms": round(t.fetch_ms, 2),
+                "convert_ms": round(t.convert_ms, 2),
+                "rows": t.rows,
+                "at": time.strftime("%H:%M:%S", time.localtime(t.timestamp)),
+            }
+            for t in slow
+        ]
+
+    def top_fingerprints(self, n: int = 20, by: str = "total_ms") -> List[Dict[str, Any]]:
+        """Fingerprints ranked by ``by`` (total_ms, calls, max_ms, rows)."""
+        with self._lock:
+            ranked = sorted(self._stats.values(), key=lambda s: getattr(s, by), reverse=True)[:n]
+            return [s.to_dict() for s in ranked]
+
+    def plans(self) -> Dict[str, str]:
+        """Captured EXPLAIN plans by fingerprint."""
+        with self._lock:
+            return {fp: s.plan for fp, s in self._stats.items() if s.plan}
+
+    def reruns(self) -> List[Dict[str, Any]]:
+        """Recent rerun reports, newest first."""
+        with self._lock:
+            return [report.to_dict() for report in reversed(self._reruns)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Overall counts."""
+        with self._lock:
+            reruns = list(self._reruns)
+            return {
+                "queries": self.queries,
+                "errors": self.errors,
+                "total_ms": round(self.total_ms, 2),
+                "mean_ms": round(self.total_ms / self.queries, 2) if self.queries else 0.0,
+                "fingerprints": len(self._stats),
+                "slow": len(self._slow),
+                "reruns": len(reruns),
+                "reruns_over_budget": sum(1 for r in reruns if r.over_budget),
+            }
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+            self._slow = []
+            self._reruns.clear()
+            self.queries = self.errors = 0
+            self.total_ms = 0.0
+
+
+_profiler: Optional[QueryProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Process-wide profiler, configured from ``database`` settings."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                profiler = QueryProfiler()
+                try:
+                    from core.config import get_settings
+                    db = get_settings().database
+                    profiler.configure(
+                        enabled=db.profile_queries,
+                        slow_query_ms=db.slow_query_ms,
+                        top_n=db.slow_query_top_n,
+                        explain_threshold_ms=db.explain_threshold_ms,
+                        rerun_budget=db.rerun_query_budget,
+                    )
+                except Exception:
+                    pass
+                _profiler = profiler
+    return _profiler
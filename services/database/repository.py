@@ -6,13 +6,20 @@ Database connection pool and base repository pattern.
 
 from __future__ import annotations
 import os
+import time
 import logging
-from typing import Optional, List, Dict, Any, Type, TypeVar, Generic
+import itertools
+import uuid
+from typing import Optional, List, Dict, Any, Type, TypeVar, Generic, Callable, Iterable, Iterator, Sequence, Tuple, Union
 from contextlib import contextmanager
 from abc import ABC, abstractmethod
 from datetime import datetime
 import json
 
+from services.database.profiler import QueryTiming, fingerprint, get_query_profiler
+from services.database.cache import QueryCache, DEFAULT_WATERMARK_SQL, get_query_cache
+from services.database.bulk import CopyStream, batched, dedupe, row_values
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -60,6 +67,8 @@ class DatabaseConnection:
         
         self._pool = None
         self._connection_string = None
+        self.profiler = get_query_profiler()
+        self.profiler.explainer = self._explain
         self._initialized = True
     
     def _get_connection_string(self) -> Optional[str]:
@@ -181,6 +190,77 @@ class DatabaseConnection:
             finally:
                 cursor.close()
     
+    @staticmethod
+    def _dict_cursor_factory():
+        try:
+            from psycopg2.extras import RealDictCursor
+            return RealDictCursor
+        except ImportError:
+            return None
+    
+    def _run(self, operation: str, query: str, params: tuple = None):
+        """
+        Run a statement on a pooled connection and record its timings.
+        
+        Args:
+            operation: "execute" (returns rowcount), "fetch_one" or "fetch_all"
+            query: SQL query
+            params: Query parameters
+        """
+        timing = QueryTiming(fingerprint=fingerprint(query), operation=operation)
+        start = time.perf_counter()
+        try:
+            with self.get_connection() as conn:
+                mark = time.perf_counter()
+                timing.acquire_ms = (mark - start) * 1000
+                
+                factory = None if operation == "execute" else self._dict_cursor_factory()
+                cursor = conn.cursor(cursor_factory=factory)
+                try:
+                    cursor.execute(query, params)
+                    now = time.perf_counter()
+                    timing.execute_ms, mark = (now - mark) * 1000, now
+                    
+                    if operation == "execute":
+                        timing.rows = max(cursor.rowcount, 0)
+                        return cursor.rowcount
+                    
+                    rows = [cursor.fetchone()] if operation == "fetch_one" else cursor.fetchall()
+                    rows = [row for row in rows if row]
+                    now = time.perf_counter()
+                    timing.fetch_ms, mark = (now - mark) * 1000, now
+                    
+                    if factory is not None:
+                        result = [dict(row) for row in rows]
+                    else:
+                        columns = [desc[0] for desc in cursor.description]
+                        result = [dict(zip(columns, row)) for row in rows]
+                    timing.convert_ms = (time.perf_counter() - mark) * 1000
+                    timing.rows = len(result)
+                    
+                    if operation == "fetch_one":
+                        return result[0] if result else None
+                    return result
+                finally:
+                    cursor.close()
+        except Exception:
+            timing.error = True
+            raise
+        finally:
+            timing.total_ms = (time.perf_counter() - start) * 1000
+            self.profiler.record(timing, query, params)
+    
+    def _explain(self, query: str, params: tuple = None) -> str:
+        """EXPLAIN (ANALYZE, BUFFERS) a read-only statement; not itself profiled."""
+        conn = self._pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+                return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            conn.rollback()
+            self._pool.putconn(conn)
+    
     def execute(self, query: str, params: tuple = None) -> int:
         """
         Execute a query and return affected rows.
@@ -192,9 +272,7 @@ class DatabaseConnection:
         Returns:
             Number of affected rows
         """
-        with self.get_cursor() as cursor:
-            cursor.execute(query, params)
-            return cursor.rowcount
+        return self._run("execute", query, params)
     
     def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict]:
         """
@@ -207,21 +285,7 @@ class DatabaseConnection:
         Returns:
             Row as dictionary or None
         """
-        try:
-            from psycopg2.extras import RealDictCursor
-            
-            with self.get_cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-                return dict(row) if row else None
-        except ImportError:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                row = cursor.fetchone()
-                if row:
-                    columns = [desc[0] for desc in cursor.description]
-                    return dict(zip(columns, row))
-                return None
+        return self._run("fetch_one", query, params)
     
     def fetch_all(self, query: str, params: tuple = None) -> List[Dict]:
         """
@@ -234,18 +298,140 @@ class DatabaseConnection:
         Returns:
             List of rows as dictionaries
         """
+        return self._run("fetch_all", query, params)
+    
+    def iter_rows(self, query: str, params: tuple = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream rows through a server-side (named) cursor.
+        
+        Rows arrive ``batch_size`` at a time, so large scans run in constant
+        memory. The pooled connection is held until the generator is
+        exhausted or closed; consume it promptly.
+        
+        Args:
+            query: SQL query
+            params: Query parameters
+            batch_size: Rows fetched per round trip
+        
+        Yields:
+            Rows as dictionaries
+        """
+        timing = QueryTiming(fingerprint=fingerprint(query), operation="iter_rows")
+        start = time.perf_counter()
         try:
-            from psycopg2.extras import RealDictCursor
-            
-            with self.get_cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
-        except ImportError:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                return [dict(zip(columns, row)) for row in rows]
+            with self.get_connection() as conn:
+                timing.acquire_ms = (time.perf_counter() - start) * 1000
+                cursor = conn.cursor(
+                    name=f"labbaik_{uuid.uuid4().hex[:16]}",
+                    cursor_factory=self._dict_cursor_factory(),
+                )
+                cursor.itersize = batch_size
+                try:
+                    mark = time.perf_counter()
+                    cursor.execute(query, params)
+                    timing.execute_ms = (time.perf_counter() - mark) * 1000
+                    while True:
+                        mark = time.perf_counter()
+                        rows = cursor.fetchmany(batch_size)
+                        timing.fetch_ms += (time.perf_counter() - mark) * 1000
+                        if not rows:
+                            break
+                        timing.rows += len(rows)
+                        for row in rows:
+                            yield dict(row)
+                finally:
+                    cursor.close()
+                    # Read-only; also ends the transaction if the caller stopped early
+                    conn.rollback()
+        except Exception:
+            timing.error = True
+            raise
+        finally:
+            # Database time only, not the time spent by the consumer
+            timing.total_ms = timing.acquire_ms + timing.execute_ms + timing.fetch_ms
+            self.profiler.record(timing)
+    
+    def execute_values(
+        self,
+        query: str,
+        batches: Iterable[Sequence[tuple]],
+        fetch: bool = False
+    ) -> Union[int, List[Dict]]:
+        """
+        Run a multi-row ``VALUES %s`` statement once per batch, in one transaction.
+        
+        Args:
+            query: SQL with a single ``VALUES %s`` placeholder
+            batches: Row tuples, one statement per batch
+            fetch: Collect the RETURNING rows
+        
+        Returns:
+            Returned rows as dictionaries if ``fetch``, else affected row count
+        """
+        from psycopg2.extras import execute_values
+        
+        fp = fingerprint(query)
+        factory = self._dict_cursor_factory() if fetch else None
+        affected, returned = 0, []
+        start = time.perf_counter()
+        with self.get_connection() as conn:
+            acquire_ms = (time.perf_counter() - start) * 1000
+            cursor = conn.cursor(cursor_factory=factory)
+            try:
+                for batch in batches:
+                    timing = QueryTiming(fingerprint=fp, operation="execute_values", acquire_ms=acquire_ms)
+                    acquire_ms = 0.0
+                    mark = time.perf_counter()
+                    try:
+                        rows = execute_values(cursor, query, batch, page_size=len(batch), fetch=fetch)
+                        timing.execute_ms = (time.perf_counter() - mark) * 1000
+                        if fetch:
+                            returned.extend(dict(row) for row in rows)
+                            timing.rows = len(rows)
+                        else:
+                            timing.rows = max(cursor.rowcount, 0)
+                        affected += timing.rows
+                    except Exception:
+                        timing.error = True
+                        raise
+                    finally:
+                        timing.total_ms = timing.acquire_ms + (time.perf_counter() - mark) * 1000
+                        self.profiler.record(timing)
+            finally:
+                cursor.close()
+        return returned if fetch else affected
+    
+    def copy_from(self, query: str, stream) -> int:
+        """
+        Stream rows into a table with ``COPY ... FROM STDIN``.
+        
+        Args:
+            query: COPY statement
+            stream: File-like object with the data (e.g. CopyStream)
+        
+        Returns:
+            Number of rows copied
+        """
+        timing = QueryTiming(fingerprint=fingerprint(query), operation="copy")
+        start = time.perf_counter()
+        try:
+            with self.get_connection() as conn:
+                mark = time.perf_counter()
+                timing.acquire_ms = (mark - start) * 1000
+                cursor = conn.cursor()
+                try:
+                    cursor.copy_expert(query, stream, size=256 * 1024)
+                    timing.execute_ms = (time.perf_counter() - mark) * 1000
+                    timing.rows = cursor.rowcount if cursor.rowcount >= 0 else getattr(stream, "rows", 0)
+                    return timing.rows
+                finally:
+                    cursor.close()
+        except Exception:
+            timing.error = True
+            raise
+        finally:
+            timing.total_ms = (time.perf_counter() - start) * 1000
+            self.profiler.record(timing)
     
     def close(self):
         """Close all connections in the pool."""
@@ -267,10 +453,19 @@ def get_db() -> DatabaseConnection:
 class BaseRepository(ABC, Generic[T]):
     """
     Abstract base repository with common CRUD operations.
+    
+    Reads go through the process-wide QueryCache, tagged with
+    ``table_name``; create/update/delete invalidate the table. Subclasses
+    that write with their own SQL call ``_invalidate()``. ``watermark_sql``
+    detects writes made outside the app (None: in-app writes only).
     """
     
-    def __init__(self, db: DatabaseConnection = None):
+    watermark_sql: Optional[str] = DEFAULT_WATERMARK_SQL
+    
+    def __init__(self, db: DatabaseConnection = None, cache: QueryCache = None):
         self.db = db or get_db()
+        self.cache = cache or get_query_cache()
+        self.cache.register_watermark(self.table_name, self.watermark_sql)
     
     @property
     @abstractmethod
@@ -284,6 +479,18 @@ class BaseRepository(ABC, Generic[T]):
         """Return the model class."""
         pass
     
+    def _fetch_one(self, query: str, params: tuple = None, tables: tuple = None) -> Optional[Dict]:
+        """Cached ``db.fetch_one``; ``tables`` defaults to this repository's table."""
+        return self.cache.fetch(self.db, "fetch_one", query, params, tables or (self.table_name,))
+    
+    def _fetch_all(self, query: str, params: tuple = None, tables: tuple = None) -> List[Dict]:
+        """Cached ``db.fetch_all``; ``tables`` defaults to this repository's table."""
+        return self.cache.fetch(self.db, "fetch_all", query, params, tables or (self.table_name,))
+    
+    def _invalidate(self, *tables: str):
+        """Drop cached reads of ``tables`` (default: this repository's table)."""
+        self.cache.invalidate(*(tables or (self.table_name,)))
+    
     def _to_model(self, data: Dict) -> T:
         """Convert dictionary to model instance."""
         return self.model_class(**data)
@@ -296,6 +503,16 @@ class BaseRepository(ABC, Generic[T]):
             return model.dict()
         return dict(model)
     
+    def _prepare_row(self, model: T) -> Dict:
+        """Model as column values for INSERT (JSON fields encoded)."""
+        data = self._to_dict(model)
+        
+        # Handle JSON fields
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                data[key] = json.dumps(value)
+        return data
+    
     def find_by_id(self, id: str) -> Optional[T]:
         """
         Find entity by ID.
@@ -307,7 +524,7 @@ class BaseRepository(ABC, Generic[T]):
             Model instance or None
         """
         query = f"SELECT * FROM {self.table_name} WHERE id = %s"
-        data = self.db.fetch_one(query, (id,))
+        data = self._fetch_one(query, (id,))
         return self._to_model(data) if data else None
     
     def find_all(
@@ -320,6 +537,9 @@ class BaseRepository(ABC, Generic[T]):
         """
         Find all entities with pagination.
         
+        OFFSET pages cost O(offset); prefer ``find_page`` beyond the first
+        few pages.
+        
         Args:
             limit: Maximum results
             offset: Results offset
@@ -334,28 +554,34 @@ class BaseRepository(ABC, Generic[T]):
             ORDER BY {order_by} {order_dir}
             LIMIT %s OFFSET %s
         """
-        rows = self.db.fetch_all(query, (limit, offset))
+        rows = self._fetch_all(query, (limit, offset))
         return [self._to_model(row) for row in rows]
     
-    def find_by(self, **conditions) -> List[T]:
+    def find_by(self, limit: Optional[int] = None, **conditions) -> List[T]:
         """
         Find entities by conditions.
         
         Args:
+            limit: Maximum results (None: all matches; use ``iter_by`` or
+                ``find_page`` for large result sets)
             **conditions: Column=value conditions
         
         Returns:
             List of matching model instances
         """
         if not conditions:
-            return self.find_all()
+            return self.find_all(limit=limit or 100)
         
         where_clauses = [f"{col} = %s" for col in conditions.keys()]
+        params = tuple(conditions.values())
         query = f"""
             SELECT * FROM {self.table_name}
             WHERE {' AND '.join(where_clauses)}
         """
-        rows = self.db.fetch_all(query, tuple(conditions.values()))
+        if limit is not None:
+            query += "LIMIT %s"
+            params += (limit,)
+        rows = self._fetch_all(query, params)
         return [self._to_model(row) for row in rows]
     
     def find_one_by(self, **conditions) -> Optional[T]:
@@ -368,9 +594,95 @@ class BaseRepository(ABC, Generic[T]):
         Returns:
             Model instance or None
         """
-        results = self.find_by(**conditions)
+        results = self.find_by(limit=1, **conditions)
         return results[0] if results else None
     
+    # ==================== KEYSET PAGINATION & STREAMING ====================
+    
+    def find_page(
+        self,
+        after: Optional[Tuple] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_dir: str = "DESC",
+        **conditions
+    ) -> Tuple[List[T], Optional[Tuple]]:
+        """
+        Keyset (seek) pagination: the page after a given row.
+        
+        Rows are ordered by ``(order_by, id)`` and the next page starts
+        after the last row's key, so any page costs an index seek instead
+        of skipping ``offset`` rows as ``find_all`` does. Needs an index on
+        the conditions plus ``(order_by, id)``; see
+        scripts/keyset_pagination_indexes.sql.
+        
+        Args:
+            after: Key returned with the previous page (None: first page)
+            limit: Page size
+            order_by: Column to order by (``id`` for id order only)
+            order_dir: Order direction (ASC/DESC)
+            **conditions: Column=value conditions
+        
+        Returns:
+            (models, key of the next page or None after the last page)
+        """
+        order_dir = order_dir.upper()
+        if order_dir not in ("ASC", "DESC"):
+            raise ValueError(f"order_dir must be ASC or DESC, got {order_dir!r}")
+        key_columns = ["id"] if order_by == "id" else [order_by, "id"]
+        
+        where_clauses = [f"{col} = %s" for col in conditions.keys()]
+        params = tuple(conditions.values())
+        if after is not None:
+            after = tuple(after) if isinstance(after, (tuple, list)) else (after,)
+            if len(after) != len(key_columns):
+                raise ValueError(f"after must be a key of {key_columns}, got {after!r}")
+            operator = "<" if order_dir == "DESC" else ">"
+            where_clauses.append(
+                f"({', '.join(key_columns)}) {operator} ({', '.join(['%s'] * len(key_columns))})"
+            )
+            params += after
+        
+        query = f"""
+            SELECT * FROM {self.table_name}
+            {'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}
+            ORDER BY {', '.join(f'{col} {order_dir}' for col in key_columns)}
+            LIMIT %s
+        """
+        rows = self._fetch_all(query, params + (limit,))
+        next_key = tuple(rows[-1][col] for col in key_columns) if len(rows) == limit else None
+        return [self._to_model(row) for row in rows], next_key
+    
+    def iter_by(
+        self,
+        batch_size: int = 1000,
+        order_by: Optional[str] = None,
+        **conditions
+    ) -> Iterator[T]:
+        """
+        Stream entities matching conditions in constant memory.
+        
+        Uses a server-side cursor (``DatabaseConnection.iter_rows``), so rows
+        are fetched ``batch_size`` at a time and bypass the query cache.
+        For exports and background jobs.
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            order_by: Optional ORDER BY clause (e.g. "created_at DESC")
+            **conditions: Column=value conditions (none: the whole table)
+        
+        Yields:
+            Model instances
+        """
+        where_clauses = [f"{col} = %s" for col in conditions.keys()]
+        query = f"""
+            SELECT * FROM {self.table_name}
+            {'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''}
+            {'ORDER BY ' + order_by if order_by else ''}
+        """
+        for row in self.db.iter_rows(query, tuple(conditions.values()), batch_size=batch_size):
+            yield self._to_model(row)
+    
     def create(self, model: T) -> T:
         """
         Create new entity.
@@ -381,12 +693,7 @@ class BaseRepository(ABC, Generic[T]):
         Returns:
             Created model with ID
         """
-        data = self._to_dict(model)
-        
-        # Handle JSON fields
-        for key, value in data.items():
-            if isinstance(value, (dict, list)):
-                data[key] = json.dumps(value)
+        data = self._prepare_row(model)
         
         columns = list(data.keys())
         placeholders = ["%s"] * len(columns)
@@ -398,8 +705,141 @@ class BaseRepository(ABC, Generic[T]):
         """
         
         result = self.db.fetch_one(query, tuple(data.values()))
+        self._invalidate()
         return self._to_model(result)
     
+    # ==================== BULK WRITES ====================
+    
+    def _bulk_rows(self, models: Iterable[T]):
+        """(columns, value tuples) of ``models``; columns come from the first one."""
+        rows = (self._prepare_row(model) for model in models)
+        first = next(rows, None)
+        if first is None:
+            return [], iter(())
+        columns = list(first.keys())
+        return columns, row_values(itertools.chain([first], rows), columns)
+    
+    def _bulk_insert(
+        self,
+        models: Iterable[T],
+        batch_size: int,
+        returning: bool,
+        conflict: Sequence[str] = (),
+        on_conflict: Optional[Callable[[List[str]], str]] = None
+    ) -> Union[List[T], int]:
+        """Multi-row INSERT of ``models``, one statement per batch."""
+        columns, values = self._bulk_rows(models)
+        if not columns:
+            return [] if returning else 0
+        
+        batches = batched(values, batch_size)
+        if conflict:
+            missing = [col for col in conflict if col not in columns]
+            if missing:
+                raise ValueError(f"Conflict columns not in rows: {missing}")
+            key_indexes = [columns.index(col) for col in conflict]
+            batches = (dedupe(batch, key_indexes) for batch in batches)
+        
+        query = f"""
+            INSERT INTO {self.table_name} ({', '.join(columns)})
+            VALUES %s
+            {on_conflict(columns) if on_conflict else ''}
+            {'RETURNING *' if returning else ''}
+        """
+        try:
+            result = self.db.execute_values(query, batches, fetch=returning)
+        finally:
+            self._invalidate()
+        return [self._to_model(row) for row in result] if returning else result
+    
+    def create_many(
+        self,
+        models: Iterable[T],
+        batch_size: int = 1000,
+        returning: bool = True
+    ) -> Union[List[T], int]:
+        """
+        Create entities with multi-row INSERTs (one round trip per batch).
+        
+        Rows are prepared exactly like ``create`` and all batches run in one
+        transaction. ``models`` may be a generator; with ``returning=False``
+        memory stays bounded by ``batch_size``.
+        
+        Args:
+            models: Model instances to create
+            batch_size: Rows per INSERT statement
+            returning: Return the created models (else the row count)
+        
+        Returns:
+            Created models, or the number of rows inserted
+        """
+        return self._bulk_insert(models, batch_size, returning)
+    
+    def upsert_many(
+        self,
+        models: Iterable[T],
+        conflict: Sequence[str] = ("id",),
+        update: Optional[Sequence[str]] = None,
+        batch_size: int = 1000,
+        returning: bool = True
+    ) -> Union[List[T], int]:
+        """
+        Insert or update entities with ``INSERT ... ON CONFLICT``.
+        
+        Args:
+            models: Model instances
+            conflict: Conflict target (columns of a unique index)
+            update: Columns overwritten on conflict (default: all but the
+                conflict columns, ``id`` and ``created_at``); empty means
+                DO NOTHING, and skipped rows are not returned
+            batch_size: Rows per statement; duplicate conflict keys within
+                a batch keep the last row
+            returning: Return the written models (else the row count)
+        
+        Returns:
+            Written models, or the number of rows inserted or updated
+        """
+        if not conflict:
+            raise ValueError("upsert_many needs a conflict target")
+        target = ", ".join(conflict)
+        
+        def on_conflict(columns: List[str]) -> str:
+            if update is None:
+                keep = set(conflict) | {"id", "created_at"}
+                assignments = [col for col in columns if col not in keep]
+            else:
+                assignments = list(update)
+            if not assignments:
+                return f"ON CONFLICT ({target}) DO NOTHING"
+            sets = ", ".join(f"{col} = EXCLUDED.{col}" for col in assignments)
+            return f"ON CONFLICT ({target}) DO UPDATE SET {sets}"
+        
+        return self._bulk_insert(models, batch_size, returning, conflict, on_conflict)
+    
+    def copy_from_iter(self, models: Iterable[T]) -> int:
+        """
+        Load entities with ``COPY ... FROM STDIN``, streamed from an iterator.
+        
+        The fastest path for large imports: rows are encoded on demand (JSON
+        fields as in ``create``) and nothing is returned. Fails as a whole on
+        a conflicting row; use ``upsert_many`` for data that may exist.
+        
+        Args:
+            models: Model instances (or column dicts); may be a generator
+        
+        Returns:
+            Number of rows copied
+        """
+        columns, values = self._bulk_rows(models)
+        if not columns:
+            return 0
+        
+        query = f"COPY {self.table_name} ({', '.join(columns)}) FROM STDIN"
+        try:
+            return self.db.copy_from(query, CopyStream(values))
+        finally:
+            self._invalidate()
+    
     def update(self, id: str, updates: Dict[str, Any]) -> Optional[T]:
         """
         Update entity by ID.
@@ -433,6 +873,7 @@ class BaseRepository(ABC, Generic[T]):
         
         params = tuple(updates.values()) + (id,)
         result = self.db.fetch_one(query, params)
+        self._invalidate()
         return self._to_model(result) if result else None
     
     def delete(self, id: str) -> bool:
@@ -447,6 +888,7 @@ class BaseRepository(ABC, Generic[T]):
         """
         query = f"DELETE FROM {self.table_name} WHERE id = %s"
         affected = self.db.execute(query, (id,))
+        self._invalidate()
         return affected > 0
     
     def count(self, **conditions) -> int:
@@ -465,17 +907,17 @@ class BaseRepository(ABC, Generic[T]):
                 SELECT COUNT(*) as count FROM {self.table_name}
                 WHERE {' AND '.join(where_clauses)}
             """
-            result = self.db.fetch_one(query, tuple(conditions.values()))
+            result = self._fetch_one(query, tuple(conditions.values()))
         else:
             query = f"SELECT COUNT(*) as count FROM {self.table_name}"
-            result = self.db.fetch_one(query)
+            result = self._fetch_one(query)
         
         return result["count"] if result else 0
     
     def exists(self, id: str) -> bool:
         """Check if entity exists."""
         query = f"SELECT 1 FROM {self.table_name} WHERE id = %s LIMIT 1"
-        result = self.db.fetch_one(query, (id,))
+        result = self._fetch_one(query, (id,))
         return result is not None
 
 
@@ -513,8 +955,9 @@ class UserRepository(BaseRepository):
         return self.update(user_id, {"last_login": datetime.utcnow()})
     
     def find_active_users(self, limit: int = 100):
-        """Find all active users."""
-        return self.find_by(is_active=True)[:limit]
+        """Find the newest active users."""
+        users, _ = self.find_page(limit=limit, is_active=True)
+        return users
     
     def update_points(self, user_id: str, points_to_add: int):
         """Add points to user."""
@@ -525,6 +968,7 @@ class UserRepository(BaseRepository):
             RETURNING *
         """
         result = self.db.fetch_one(query, (points_to_add, datetime.utcnow(), user_id))
+        self._invalidate()
         return self._to_model(result) if result else None
 
 
@@ -533,7 +977,16 @@ class UserRepository(BaseRepository):
 # =============================================================================
 
 class ChatRepository(BaseRepository):
-    """Repository for Chat entities."""
+    """
+    Repository for Chat entities.
+    
+    Messages live in ``conversation_messages``, one row per message
+    (see scripts/conversation_messages_schema.sql), so adding a message is
+    a single INSERT and history is read a page at a time. The legacy
+    ``conversations.messages`` JSON column is no longer written.
+    """
+    
+    MESSAGES_TABLE = "conversation_messages"
     
     @property
     def table_name(self) -> str:
@@ -552,23 +1005,112 @@ class ChatRepository(BaseRepository):
             ORDER BY updated_at DESC
             LIMIT %s
         """
-        rows = self.db.fetch_all(query, (user_id, limit))
+        rows = self._fetch_all(query, (user_id, limit))
         return [self._to_model(row) for row in rows]
     
-    def add_message(self, conversation_id: str, role: str, content: str):
-        """Add message to conversation."""
-        # First get existing messages
-        conv = self.find_by_id(conversation_id)
-        if not conv:
+    def _to_message(self, row: Dict):
+        from data.models import ChatMessage, MessageRole
+        return ChatMessage(
+            id=row["id"],
+            role=MessageRole(row["role"]),
+            content=row["content"],
+            timestamp=row["created_at"],
+            metadata=row.get("metadata") or {},
+        )
+    
+    def append_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Append a message to a conversation.
+        
+        One statement: the INSERT and the conversation's ``updated_at``
+        bump run together, and concurrent appends never overwrite each other.
+        
+        Args:
+            conversation_id: Conversation ID
+            role: Message role ("user", "assistant", "system")
+            content: Message text
+            metadata: Optional message metadata
+        
+        Returns:
+            The stored ChatMessage (with its row ``id``)
+        """
+        from data.models import MessageRole
+        
+        query = f"""
+            WITH touched AS (
+                UPDATE {self.table_name} SET updated_at = NOW()
+                WHERE id = %s
+                RETURNING id
+            )
+            INSERT INTO {self.MESSAGES_TABLE} (conversation_id, role, content, metadata)
+            SELECT id, %s, %s, %s FROM touched
+            RETURNING *
+        """
+        params = (
+            conversation_id,
+            MessageRole(role).value,
+            content,
+            json.dumps(metadata or {}),
+        )
+        row = self.db.fetch_one(query, params)
+        self._invalidate()  # updated_at moved
+        if not row:
             raise RecordNotFoundError("Conversation", conversation_id)
+        return self._to_message(row)
+    
+    def add_message(self, conversation_id: str, role: str, content: str):
+        """Add message to conversation (see ``append_message``)."""
+        return self.append_message(conversation_id, role, content)
+    
+    def get_messages(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        before_id: Optional[int] = None
+    ):
+        """
+        Read one page of history, newest page first.
         
-        from data.models import ChatMessage, MessageRole
-        message = ChatMessage(role=MessageRole(role), content=content)
-        conv.messages.append(message)
+        Args:
+            conversation_id: Conversation ID
+            limit: Page size
+            before_id: Only messages older than this message id (the
+                oldest ``id`` of the previously loaded page)
         
-        return self.update(conversation_id, {
-            "messages": [m.model_dump() for m in conv.messages]
-        })
+        Returns:
+            Up to ``limit`` ChatMessages in chronological order
+        """
+        if before_id is None:
+            query = f"""
+                SELECT * FROM {self.MESSAGES_TABLE}
+                WHERE conversation_id = %s
+                ORDER BY id DESC
+                LIMIT %s
+            """
+            params = (conversation_id, limit)
+        else:
+            query = f"""
+                SELECT * FROM {self.MESSAGES_TABLE}
+                WHERE conversation_id = %s AND id < %s
+                ORDER BY id DESC
+                LIMIT %s
+            """
+            params = (conversation_id, before_id, limit)
+        
+        rows = self.db.fetch_all(query, params)
+        return [self._to_message(row) for row in reversed(rows)]
+    
+    def count_messages(self, conversation_id: str) -> int:
+        """Number of messages in a conversation."""
+        query = f"SELECT COUNT(*) as count FROM {self.MESSAGES_TABLE} WHERE conversation_id = %s"
+        result = self.db.fetch_one(query, (conversation_id,))
+        return result["count"] if result else 0
     
     def archive(self, conversation_id: str):
         """Archive a conversation."""
@@ -633,4 +1175,4 @@ class BookingRepository(BaseRepository):
             query += " AND created_at <= %s"
             params.append(end_date)
         
-        return self.db.fetch_one(query, tuple(params) if params else None)
\ No newline at end of file
+        return self._fetch_one(query, tuple(params) if params else None)
\ No newline at end of file
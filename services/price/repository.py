@@ -15,6 +15,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 from services.database.repository import BaseRepository, get_db, DatabaseConnection
+from services.database.cache import QueryCache, get_query_cache
+from services.database.async_connection import Query, gather_queries
 
 logger = logging.getLogger(__name__)
 
@@ -97,14 +99,42 @@ class PriceFlight:
 # PRICE REPOSITORY
 # =============================================================================
 
+PACKAGES = ("prices_packages", "scraping_sources")
+HOTELS = ("prices_hotels",)
+FLIGHTS = ("prices_flights",)
+ALL_PRICES = ("prices_packages", "prices_hotels", "prices_flights")
+
+
 class PriceRepository:
     """
     Repository untuk mengakses data harga dari database.
     Data diupdate oleh n8n workflow setiap 6 jam.
+    
+    Reads go through the shared QueryCache. n8n writes directly to the
+    database, so freshness comes from the watermark: a new scrape moves
+    ``MAX(scraped_at)`` of the table (an index read, see
+    scripts/query_cache_watermark_indexes.sql) and drops its cached reads.
     """
     
-    def __init__(self, db: DatabaseConnection = None):
+    WATERMARK_SQL = "SELECT MAX(scraped_at) AS last FROM {table}"
+    
+    def __init__(self, db: DatabaseConnection = None, cache: QueryCache = None):
         self.db = db or get_db()
+        self.cache = cache or get_query_cache()
+        for table in ALL_PRICES:
+            self.cache.register_watermark(table, self.WATERMARK_SQL)
+        # A handful of rows: counting them is cheap
+        self.cache.register_watermark("scraping_sources", "SELECT COUNT(*) AS n FROM {table}")
+    
+    def _fetch_one(self, query: str, params: tuple = None, tables: tuple = ALL_PRICES) -> Optional[Dict]:
+        return self.cache.fetch(self.db, "fetch_one", query, params, tables)
+    
+    def _fetch_all(self, query: str, params: tuple = None, tables: tuple = ALL_PRICES) -> List[Dict]:
+        return self.cache.fetch(self.db, "fetch_all", query, params, tables)
+    
+    def _gather(self, *queries: Query) -> List[Any]:
+        """Run independent reads concurrently (through the cache)."""
+        return gather_queries(queries, db=self.db, cache=self.cache)
     
     # ==================== PACKAGES ====================
     
@@ -153,7 +183,7 @@ class PriceRepository:
         query += " ORDER BY p.price_idr ASC LIMIT %s"
         params.append(limit)
         
-        return self.db.fetch_all(query, tuple(params))
+        return self._fetch_all(query, tuple(params), PACKAGES)
     
     def get_cheapest_packages(self, limit: int = 5) -> List[Dict]:
         """Ambil paket termurah."""
@@ -170,7 +200,7 @@ class PriceRepository:
             LEFT JOIN scraping_sources s ON p.source_id = s.id
             WHERE p.id = %s
         """
-        return self.db.fetch_one(query, (package_id,))
+        return self._fetch_one(query, (package_id,), PACKAGES)
     
     # ==================== HOTELS ====================
     
@@ -214,7 +244,7 @@ class PriceRepository:
         query += " ORDER BY star_rating DESC, price_per_night_idr ASC LIMIT %s"
         params.append(limit)
         
-        return self.db.fetch_all(query, tuple(params))
+        return self._fetch_all(query, tuple(params), HOTELS)
     
     def get_hotels_near_haram(self, city: str = 'Makkah', max_distance: int = 500) -> List[Dict]:
         """Ambil hotel dekat Masjidil Haram/Nabawi."""
@@ -228,7 +258,7 @@ class PriceRepository:
             ORDER BY price_per_night_idr ASC
             LIMIT %s
         """
-        return self.db.fetch_all(query, (city, limit))
+        return self._fetch_all(query, (city, limit), HOTELS)
     
     # ==================== FLIGHTS ====================
     
@@ -278,7 +308,7 @@ class PriceRepository:
         query += " ORDER BY departure_date ASC, price_idr ASC LIMIT %s"
         params.append(limit)
         
-        return self.db.fetch_all(query, tuple(params))
+        return self._fetch_all(query, tuple(params), FLIGHTS)
     
     def get_direct_flights(self, origin: str = None, destination: str = None) -> List[Dict]:
         """Ambil penerbangan langsung."""
@@ -295,7 +325,7 @@ class PriceRepository:
             ORDER BY price_idr ASC
             LIMIT %s
         """
-        return self.db.fetch_all(query, (origin, destination, limit))
+        return self._fetch_all(query, (origin, destination, limit), FLIGHTS)
     
     # ==================== STATISTICS ====================
     
@@ -303,11 +333,11 @@ class PriceRepository:
         """
         Ambil ringkasan harga untuk dashboard.
         
+        The four aggregates are independent and run concurrently.
+        
         Returns:
             Dictionary dengan statistik harga
         """
-        summary = {}
-        
         # Package stats
         pkg_query = """
             SELECT 
@@ -318,7 +348,6 @@ class PriceRepository:
             FROM prices_packages
             WHERE is_available = true
         """
-        summary['packages'] = self.db.fetch_one(pkg_query)
         
         # Hotel stats by city
         hotel_query = """
@@ -332,7 +361,6 @@ class PriceRepository:
             WHERE is_available = true
             GROUP BY city
         """
-        summary['hotels'] = self.db.fetch_all(hotel_query)
         
         # Flight stats by route
         flight_query = """
@@ -345,7 +373,6 @@ class PriceRepository:
             WHERE is_available = true AND departure_date >= CURRENT_DATE
             GROUP BY origin_city, destination_city
         """
-        summary['flights'] = self.db.fetch_all(flight_query)
         
         # Last update
         update_query = """
@@ -356,10 +383,19 @@ class PriceRepository:
                 UNION ALL SELECT MAX(scraped_at) FROM prices_flights
             ) t
         """
-        result = self.db.fetch_one(update_query)
-        summary['last_update'] = result.get('last_update') if result else None
         
-        return summary
+        packages, hotels, flights, result = self._gather(
+            Query(pkg_query, tables=PACKAGES[:1]),
+            Query(hotel_query, fetch="all", tables=HOTELS),
+            Query(flight_query, fetch="all", tables=FLIGHTS),
+            Query(update_query, tables=ALL_PRICES),
+        )
+        return {
+            'packages': packages,
+            'hotels': hotels,
+            'flights': flights,
+            'last_update': result.get('last_update') if result else None,
+        }
     
     def get_last_update(self) -> Optional[datetime]:
         """Get waktu update terakhir."""
@@ -371,7 +407,7 @@ class PriceRepository:
                 UNION ALL SELECT MAX(scraped_at) FROM prices_flights
             ) t
         """
-        result = self.db.fetch_one(query)
+        result = self._fetch_one(query)
         return result.get('last_update') if result else None
     
     # ==================== FOR COST SIMULATOR ====================
@@ -383,50 +419,47 @@ class PriceRepository:
         Returns:
             Dictionary dengan min/max/avg untuk setiap kategori
         """
-        ranges = {}
-        
-        # Package range
-        pkg = self.db.fetch_one("""
-            SELECT 
-                MIN(price_idr) as min,
-                MAX(price_idr) as max,
-                AVG(price_idr)::integer as avg
-            FROM prices_packages WHERE is_available = true
-        """)
-        ranges['package'] = pkg or {'min': 23000000, 'max': 55000000, 'avg': 35000000}
-        
-        # Hotel Makkah range
-        hotel_makkah = self.db.fetch_one("""
-            SELECT 
-                MIN(price_per_night_idr) as min,
-                MAX(price_per_night_idr) as max,
-                AVG(price_per_night_idr)::integer as avg
-            FROM prices_hotels WHERE is_available = true AND city = 'Makkah'
-        """)
-        ranges['hotel_makkah'] = hotel_makkah or {'min': 500000, 'max': 5000000, 'avg': 1500000}
-        
-        # Hotel Madinah range
-        hotel_madinah = self.db.fetch_one("""
-            SELECT 
-                MIN(price_per_night_idr) as min,
-                MAX(price_per_night_idr) as max,
-                AVG(price_per_night_idr)::integer as avg
-            FROM prices_hotels WHERE is_available = true AND city = 'Madinah'
-        """)
-        ranges['hotel_madinah'] = hotel_madinah or {'min': 400000, 'max': 3000000, 'avg': 1200000}
-        
-        # Flight range
-        flight = self.db.fetch_one("""
-            SELECT 
-                MIN(price_idr) as min,
-                MAX(price_idr) as max,
-                AVG(price_idr)::integer as avg
-            FROM prices_flights 
-            WHERE is_available = true AND departure_date >= CURRENT_DATE
-        """)
-        ranges['flight'] = flight or {'min': 10000000, 'max': 20000000, 'avg': 15000000}
-        
-        return ranges
+        pkg, hotel_makkah, hotel_madinah, flight = self._gather(
+            # Package range
+            Query("""
+                SELECT 
+                    MIN(price_idr) as min,
+                    MAX(price_idr) as max,
+                    AVG(price_idr)::integer as avg
+                FROM prices_packages WHERE is_available = true
+            """, tables=PACKAGES[:1]),
+            # Hotel Makkah range
+            Query("""
+                SELECT 
+                    MIN(price_per_night_idr) as min,
+                    MAX(price_per_night_idr) as max,
+                    AVG(price_per_night_idr)::integer as avg
+                FROM prices_hotels WHERE is_available = true AND city = 'Makkah'
+            """, tables=HOTELS),
+            # Hotel Madinah range
+            Query("""
+                SELECT 
+                    MIN(price_per_night_idr) as min,
+                    MAX(price_per_night_idr) as max,
+                    AVG(price_per_night_idr)::integer as avg
+                FROM prices_hotels WHERE is_available = true AND city = 'Madinah'
+            """, tables=HOTELS),
+            # Flight range
+            Query("""
+                SELECT 
+                    MIN(price_idr) as min,
+                    MAX(price_idr) as max,
+                    AVG(price_idr)::integer as avg
+                FROM prices_flights 
+                WHERE is_available = true AND departure_date >= CURRENT_DATE
+            """, tables=FLIGHTS),
+        )
+        return {
+            'package': pkg or {'min': 23000000, 'max': 55000000, 'avg': 35000000},
+            'hotel_makkah': hotel_makkah or {'min': 500000, 'max': 5000000, 'avg': 1500000},
+            'hotel_madinah': hotel_madinah or {'min': 400000, 'max': 3000000, 'avg': 1200000},
+            'flight': flight or {'min': 10000000, 'max': 20000000, 'avg': 15000000},
+        }
 
 
 # =============================================================================
@@ -456,53 +489,39 @@ def get_price_repo() -> PriceRepository:
     return PriceRepository()
 
 
-# Streamlit cached versions
-try:
-    import streamlit as st
-    
-    @st.cache_data(ttl=300)  # Cache 5 menit
-    def get_cached_packages(limit: int = 50, min_price: float = None, max_price: float = None):
-        """Get packages dengan cache Streamlit."""
-        repo = get_price_repo()
-        return repo.get_all_packages(limit=limit, min_price=min_price, max_price=max_price)
-    
-    @st.cache_data(ttl=300)
-    def get_cached_hotels(city: str = None, min_stars: int = None, max_distance: int = None):
-        """Get hotels dengan cache Streamlit."""
-        repo = get_price_repo()
-        return repo.get_all_hotels(city=city, min_stars=min_stars, max_distance=max_distance)
-    
-    @st.cache_data(ttl=300)
-    def get_cached_flights(origin: str = None, destination: str = None, direct_only: bool = False):
-        """Get flights dengan cache Streamlit."""
-        repo = get_price_repo()
-        return repo.get_all_flights(origin=origin, destination=destination, direct_only=direct_only)
-    
-    @st.cache_data(ttl=600)  # Cache 10 menit
-    def get_cached_price_summary():
-        """Get price summary dengan cache."""
-        repo = get_price_repo()
-        return repo.get_price_summary()
-    
-    @st.cache_data(ttl=600)
-    def get_cached_price_ranges():
-        """Get price ranges untuk simulator dengan cache."""
-        repo = get_price_repo()
-        return repo.get_price_ranges()
-
-except ImportError:
-    # Fallback jika tidak ada Streamlit (untuk testing)
-    def get_cached_packages(*args, **kwargs):
-        return get_price_repo().get_all_packages(*args, **kwargs)
-    
-    def get_cached_hotels(*args, **kwargs):
-        return get_price_repo().get_all_hotels(*args, **kwargs)
-    
-    def get_cached_flights(*args, **kwargs):
-        return get_price_repo().get_all_flights(*args, **kwargs)
-    
-    def get_cached_price_summary():
-        return get_price_repo().get_price_summary()
-    
-    def get_cached_price_ranges():
-        return get_price_repo().get_price_ranges()
+# Served from the shared QueryCache instead of st.cache_data: entries are
+# dropped as soon as a new n8n scrape changes a table's watermark rather
+# than after a fixed TTL.
+
+def get_cached_packages(limit: int = 50, min_price: float = None, max_price: float = None):
+    """Get packages (cached)."""
+    return get_price_repo().get_all_packages(limit=limit, min_price=min_price, max_price=max_price)
+
+
+def get_cached_hotels(city: str = None, min_stars: int = None, max_distance: int = None, limit: int = 50):
+    """Get hotels (cached)."""
+    return get_price_repo().get_all_hotels(
+        city=city, min_stars=min_stars, max_distance=max_distance, limit=limit
+    )
+
+
+def get_cached_flights(
+    origin: str = None,
+    destination: str = None,
+    direct_only: bool = False,
+    limit: int = 50
+):
+    """Get flights (cached)."""
+    return get_price_repo().get_all_flights(
+        origin=origin, destination=destination, direct_only=direct_only, limit=limit
+    )
+
+
+def get_cached_price_summary():
+    """Get price summary (cached)."""
+    return get_price_repo().get_price_summary()
+
+
+def get_cached_price_ranges():
+    """Get price ranges untuk simulator (cached)."""
+    return get_price_repo().get_price_ranges()
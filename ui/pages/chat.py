@@ -6,10 +6,15 @@ smart suggestions, rich responses, and history.
 """
 
 import streamlit as st
+import time
+import uuid
+import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Union
 import random
 
+logger = logging.getLogger(__name__)
+
 # =============================================================================
 # CONSTANTS & DATA
 # =============================================================================
@@ -60,6 +65,30 @@ QUICK_CATEGORIES = {
     ],
 }
 
+# Phrases that set the follow-up context
+CONTEXT_KEYWORDS = {
+    "persiapan": ["syarat", "persyaratan", "dokumen", "persiapan"],
+    "ibadah": ["tata cara", "rukun", "cara", "thawaf", "sai", "ihram"],
+    "biaya": ["biaya", "harga", "cost", "budget", "mahal", "murah"],
+}
+
+# Quick question tabs whose questions also select a context
+QUICK_CATEGORY_CONTEXTS = {
+    "📋 Persiapan": "persiapan",
+    "🕋 Ibadah": "ibadah",
+    "💰 Biaya": "biaya",
+}
+
+# Messages shown per page of chat history
+CHAT_PAGE_SIZE = 50
+
+# Canned answer per context when no LLM is configured
+CONTEXT_RESPONSES = {
+    "persiapan": "syarat",
+    "ibadah": "tata_cara",
+    "biaya": "biaya",
+}
+
 # Suggested follow-ups based on context
 FOLLOW_UP_SUGGESTIONS = {
     "persiapan": [
@@ -185,6 +214,8 @@ def init_chat_state():
                 "timestamp": datetime.now().isoformat(),
             }
         ]
+        st.session_state.chat_visible = CHAT_PAGE_SIZE
+        load_chat_history()
     
     if "chat_context" not in st.session_state:
         st.session_state.chat_context = "default"
@@ -192,6 +223,10 @@ def init_chat_state():
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
     
+    # Keys the history summary of guests, whose chats are not stored
+    if "chat_session_id" not in st.session_state:
+        st.session_state.chat_session_id = uuid.uuid4().hex
+    
     # Check for quick question from home page
     if "quick_question" in st.session_state and st.session_state.quick_question:
         question = st.session_state.quick_question
@@ -200,35 +235,371 @@ def init_chat_state():
 
 
 def add_message(role: str, content: str):
-    """Add message to chat."""
-    st.session_state.chat_messages.append({
+    """Add message to chat (and to the stored conversation when signed in)."""
+    message = {
         "role": role,
         "content": content,
         "timestamp": datetime.now().isoformat(),
-    })
+    }
+    st.session_state.chat_messages.append(message)
+    
+    stored = persist_message(role, content)
+    if stored is not None:
+        message["id"] = stored.id
 
 
-def get_ai_response(user_message: str) -> str:
-    """Get AI response for user message (mock implementation)."""
+# =============================================================================
+# CHAT HISTORY STORAGE
+# =============================================================================
+
+def get_chat_repository():
+    """ChatRepository for the signed-in user's history (None without a database)."""
+    if not st.session_state.get("user_id"):
+        return None
+    try:
+        from services.database.repository import ChatRepository, get_db
+    except ImportError:
+        return None
+    if not get_db().initialize():
+        return None
+    return ChatRepository()
+
+
+def _message_dict(message) -> Dict[str, Any]:
+    role = message.role.value if hasattr(message.role, "value") else message.role
+    return {
+        "id": message.id,
+        "role": role,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+    }
+
+
+def load_chat_history():
+    """Load the newest page of the user's latest conversation."""
+    repo = get_chat_repository()
+    if repo is None:
+        return
     
-    user_lower = user_message.lower()
+    try:
+        conversations = repo.find_by_user(st.session_state.user_id, limit=1)
+        if not conversations:
+            return
+        conversation_id = conversations[0].id
+        messages = repo.get_messages(conversation_id, limit=CHAT_PAGE_SIZE)
+    except Exception as e:
+        logger.warning(f"Could not load chat history: {e}")
+        return
+    
+    st.session_state.conversation_id = conversation_id
+    st.session_state.chat_has_more = len(messages) == CHAT_PAGE_SIZE
+    st.session_state.chat_messages.extend(_message_dict(m) for m in messages)
+
+
+def load_older_messages():
+    """Show one more page of history, fetching it from the database if needed."""
+    st.session_state.chat_visible = st.session_state.get("chat_visible", CHAT_PAGE_SIZE) + CHAT_PAGE_SIZE
     
-    # Detect context and generate response
-    if any(word in user_lower for word in ["syarat", "persyaratan", "dokumen", "persiapan"]):
-        st.session_state.chat_context = "persiapan"
-        return SAMPLE_RESPONSES["syarat"]
+    messages = st.session_state.chat_messages
+    conversation_id = st.session_state.get("conversation_id")
+    if not conversation_id or not st.session_state.get("chat_has_more"):
+        return
+    if len(messages) > st.session_state.chat_visible:
+        return
     
-    elif any(word in user_lower for word in ["tata cara", "rukun", "cara", "thawaf", "sai", "ihram"]):
-        st.session_state.chat_context = "ibadah"
-        return SAMPLE_RESPONSES["tata_cara"]
+    repo = get_chat_repository()
+    oldest_id = next((m["id"] for m in messages if m.get("id")), None)
+    if repo is None or oldest_id is None:
+        return
     
-    elif any(word in user_lower for word in ["biaya", "harga", "cost", "budget", "mahal", "murah"]):
-        st.session_state.chat_context = "biaya"
-        return SAMPLE_RESPONSES["biaya"]
+    try:
+        older = repo.get_messages(conversation_id, limit=CHAT_PAGE_SIZE, before_id=oldest_id)
+    except Exception as e:
+        logger.warning(f"Could not load older messages: {e}")
+        return
     
-    else:
-        st.session_state.chat_context = "default"
-        return f"""
+    st.session_state.chat_has_more = len(older) == CHAT_PAGE_SIZE
+    # Keep the greeting first
+    messages[1:1] = [_message_dict(m) for m in older]
+
+
+def persist_message(role: str, content: str):
+    """Append a message to the stored conversation, starting one if needed."""
+    repo = get_chat_repository()
+    if repo is None:
+        return None
+    
+    try:
+        conversation_id = st.session_state.get("conversation_id")
+        if not conversation_id:
+            from data.models import ChatConversation
+            conversation = repo.create(ChatConversation(
+                user_id=st.session_state.user_id,
+                title=content[:80] if role == "user" else None,
+            ))
+            conversation_id = st.session_state.conversation_id = conversation.id
+        return repo.append_message(conversation_id, role, content)
+    except Exception as e:
+        logger.warning(f"Could not store chat message: {e}")
+        return None
+
+
+# =============================================================================
+# AI SERVICES
+# =============================================================================
+
+def detect_context(user_message: str) -> str:
+    """Chat context from keywords, first matching context wins ("default" if none)."""
+    user_lower = user_message.lower()
+    for context, words in CONTEXT_KEYWORDS.items():
+        if any(word in user_lower for word in words):
+            return context
+    return "default"
+
+
+def get_context_phrases() -> Dict[str, List[str]]:
+    """Context label -> keywords and quick questions that select it."""
+    phrases = {context: list(words) for context, words in CONTEXT_KEYWORDS.items()}
+    for category, context in QUICK_CATEGORY_CONTEXTS.items():
+        phrases[context].extend(QUICK_CATEGORIES[category])
+    return phrases
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_service():
+    """Process-wide embedding service shared by the intent router and RAG."""
+    from core.config import get_settings
+    from services.ai.rag_service import LocalEmbeddingService
+    from services.ai.embedding_worker import get_embedding_worker
+    
+    ai = get_settings().ai
+    return LocalEmbeddingService(
+        model_name=ai.embedding_model,
+        cache_dir=ai.embedding_cache_dir or None,
+        worker=get_embedding_worker(),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_intent_router():
+    """Process-wide intent router (None when disabled)."""
+    try:
+        from core.config import get_settings
+        from services.ai.intent_router import IntentRouter
+    except ImportError as e:
+        logger.warning(f"Intent router unavailable: {e}")
+        return None
+    
+    ai = get_settings().ai
+    if not ai.intent_router_enabled:
+        return None
+    
+    return IntentRouter(
+        contexts=get_context_phrases(),
+        embedding_service=get_embedding_service(),
+        keyword_threshold=ai.intent_keyword_threshold,
+        semantic_threshold=ai.intent_semantic_threshold,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_rag_service():
+    """
+    Process-wide RAG service over the knowledge base (None without an LLM key).
+    
+    The knowledge base is indexed in a background thread; until it is done
+    answers use whatever is already in the vector store. Setup errors are
+    raised, not returned, so ``st.cache_resource`` retries on the next call
+    instead of caching the failure.
+    """
+    try:
+        from core.config import get_settings
+        from services.ai.chat_service import GroqChatService, OpenAIChatService, UnifiedChatService
+        from services.ai.coalescing import CoalescingChatService
+        from services.ai.rag_service import RAGService, create_vector_store
+        from services.ai.answer_cache import SemanticAnswerCache
+        from services.ai.reranker import CrossEncoderReranker
+        from services.ai.sparse_index import BM25Index
+        from services.ai.chunking import MarkdownChunker
+        from services.ai.indexing import KnowledgeIndexer
+        from services.ai.history import HistoryCompactor
+        from services.ai.warmup import run_in_background
+    except ImportError as e:
+        logger.warning(f"RAG unavailable: {e}")
+        return None
+    
+    ai = get_settings().ai
+    providers = []
+    if ai.groq_api_key:
+        providers.append(GroqChatService(
+            api_key=ai.groq_api_key,
+            model=ai.groq_model,
+            max_tokens=ai.groq_max_tokens,
+            temperature=ai.groq_temperature,
+        ))
+    if ai.openai_api_key:
+        providers.append(OpenAIChatService(api_key=ai.openai_api_key, model=ai.openai_model))
+    if not providers:
+        return None
+    
+    # Identical questions in flight at the same time share one LLM call
+    chat_service = CoalescingChatService(UnifiedChatService(
+        providers[0],
+        providers[1] if len(providers) > 1 else None,
+        hedge=ai.hedge_requests,
+        hedge_percentile=ai.hedge_percentile,
+        hedge_min_delay_ms=ai.hedge_min_delay_ms,
+        hedge_max_delay_ms=ai.hedge_max_delay_ms,
+    ))
+    reranker = None
+    if ai.rerank_enabled:
+        reranker = CrossEncoderReranker(
+            model_name=ai.rerank_model,
+            candidates=ai.rerank_candidates,
+            budget_ms=ai.rerank_budget_ms,
+        )
+        # Loads on the reranker's own thread; queries skip reranking until ready
+        reranker.warmup()
+    
+    # Quantization only applies to the numpy backend
+    store_options = {}
+    if ai.vector_store_backend.lower() == "numpy":
+        store_options = {
+            "quantization": ai.vector_store_quantization,
+            "rerank_factor": ai.vector_rerank_factor,
+        }
+    
+    rag = RAGService(
+        chat_service=chat_service,
+        vector_store=create_vector_store(
+            ai.vector_store_backend,
+            persist_directory=ai.vector_store_dir,
+            embedding_service=get_embedding_service(),
+            **store_options,
+        ),
+        # BM25 + vector fusion; persisted next to the vector store like
+        # scripts/reindex_knowledge.py --hybrid
+        sparse_index=BM25Index(
+            persist_path=f"{ai.vector_store_dir}/bm25.npz"
+        ) if ai.hybrid_retrieval else None,
+        top_k=ai.top_k_results,
+        chunker=MarkdownChunker(max_tokens=ai.chunk_size, overlap_tokens=ai.chunk_overlap),
+        context_budget=ai.context_token_budget,
+        answer_cache=SemanticAnswerCache(
+            similarity_threshold=ai.semantic_cache_threshold,
+            ttl_seconds=ai.semantic_cache_ttl_seconds,
+            max_bytes=ai.semantic_cache_max_bytes,
+        ) if ai.semantic_cache_enabled else None,
+        reranker=reranker,
+        history_compactor=HistoryCompactor(
+            chat_service,
+            max_tokens=ai.history_max_tokens,
+            recent_tokens=ai.history_recent_tokens,
+            summary_tokens=ai.history_summary_tokens,
+        ) if ai.history_compaction_enabled else None,
+    )
+    if not rag.initialize():
+        raise RuntimeError("RAG service failed to initialize")
+    
+    indexer = KnowledgeIndexer(
+        rag,
+        manifest_path=f"{ai.vector_store_dir}/manifest_{ai.vector_store_backend}.json",
+        snapshot_path=ai.knowledge_snapshot_path or None,
+    )
+    run_in_background("knowledge-indexing", indexer.run)
+    return rag
+
+
+def _stream_tokens(first: str, events: Iterator) -> Iterator[str]:
+    """Yield an already-read first token, then the rest of a RAG stream."""
+    yield first
+    try:
+        for event in events:
+            if event.type == "token":
+                yield event.content
+    except Exception as e:
+        logger.error(f"RAG stream failed: {e}")
+        yield "\n\n_Maaf, jawaban terputus. Silakan coba lagi._"
+
+
+def get_rag_answer(user_message: str) -> Optional[Iterator[str]]:
+    """
+    Stream an answer with RAG + LLM, or None when no LLM is available.
+    
+    Retrieval and the first token are read before returning, so failures
+    up to that point still fall back to the canned responses, as do
+    questions asked while the knowledge base is still being indexed.
+    """
+    try:
+        rag = get_rag_service()
+    except Exception as e:
+        logger.error(f"RAG setup failed: {e}")
+        return None
+    if rag is None or not is_knowledge_indexed():
+        return None
+    
+    from services.ai.base import ChatMessage
+    
+    # Previous turns, without the greeting and the message being answered
+    history = [
+        ChatMessage.user(msg["content"]) if msg["role"] == "user" else ChatMessage.assistant(msg["content"])
+        for msg in st.session_state.chat_messages[1:-1]
+    ]
+    events = rag.stream_query(
+        user_message,
+        chat_history=history or None,
+        conversation_id=st.session_state.get("conversation_id") or st.session_state.get("chat_session_id"),
+    )
+    try:
+        for event in events:
+            if event.type == "token" and event.content:
+                return _stream_tokens(event.content, events)
+            if event.type == "done":
+                answer = event.response.answer if event.response else ""
+                return iter([answer]) if answer else None
+    except Exception as e:
+        logger.error(f"RAG query failed: {e}")
+    return None
+
+
+def get_ai_response(user_message: str) -> Union[str, Iterator[str]]:
+    """
+    Answer a chat message.
+    
+    Clear FAQ intents are answered by the intent router from the curated
+    FAQ; everything else is escalated to RAG, whose answer is returned as
+    a token stream. Without an LLM, the canned response for the detected
+    context is used.
+    """
+    router = get_intent_router()
+    match = None
+    if router is not None:
+        try:
+            from services.ai.warmup import is_embedding_ready
+            use_semantic = is_embedding_ready()
+        except ImportError:
+            use_semantic = False
+        match = router.route(user_message, use_semantic=use_semantic)
+    
+    # Keyword detection when the router is off or found no context
+    context = match.context if match and match.context else detect_context(user_message)
+    st.session_state.chat_context = context
+    
+    if match and match.answered:
+        return match.answer
+    
+    start = time.perf_counter()
+    answer = get_rag_answer(user_message)
+    if answer is not None:
+        # Time to first token
+        if router is not None:
+            router.record_escalation((time.perf_counter() - start) * 1000)
+        return answer
+    
+    if context in CONTEXT_RESPONSES:
+        return SAMPLE_RESPONSES[CONTEXT_RESPONSES[context]]
+    
+    return f"""
 Terima kasih atas pertanyaannya! 🤲
 
 Pertanyaan Anda tentang **"{user_message}"** sangat baik.
@@ -246,15 +617,32 @@ Silakan pilih kategori di bawah untuk pertanyaan yang lebih spesifik, atau ketik
 """
 
 
-def process_user_message(message: str):
-    """Process user message and get response."""
+def process_user_message(message: str, container=None):
+    """
+    Process user message and get response.
+    
+    Args:
+        message: The user's message
+        container: Chat container to stream a RAG answer into (without
+            one the stream is collected before the rerun)
+    """
     
     # Add user message
     add_message("user", message)
     
-    # Get AI response (simulated)
+    # Get AI response (curated FAQ or RAG)
     response = get_ai_response(message)
     
+    if not isinstance(response, str):
+        if container is not None:
+            with container:
+                with st.chat_message("user"):
+                    st.markdown(message)
+                with st.chat_message("assistant", avatar="🕋"):
+                    response = st.write_stream(response)
+        else:
+            response = "".join(response)
+    
     # Add AI response
     add_message("assistant", response)
 
@@ -304,6 +692,10 @@ def render_sidebar():
         
         if st.button("🗑️ Hapus Chat", use_container_width=True):
             st.session_state.chat_messages = [st.session_state.chat_messages[0]]
+            # Next message starts a new stored conversation
+            st.session_state.pop("conversation_id", None)
+            st.session_state.chat_session_id = uuid.uuid4().hex
+            st.session_state.chat_has_more = False
             st.rerun()
         
         if st.button("📤 Export Chat", use_container_width=True):
@@ -328,8 +720,14 @@ def render_chat_messages():
     """Render chat message history."""
     
     messages = st.session_state.chat_messages
+    visible = st.session_state.get("chat_visible", CHAT_PAGE_SIZE)
     
-    for msg in messages:
+    if len(messages) > visible or st.session_state.get("chat_has_more"):
+        if st.button("⬆️ Tampilkan pesan sebelumnya", key="chat_load_older", use_container_width=True):
+            load_older_messages()
+            st.rerun()
+    
+    for msg in messages[-visible:]:
         role = msg["role"]
         content = msg["content"]
         
@@ -341,7 +739,7 @@ def render_chat_messages():
                 st.markdown(content)
 
 
-def render_follow_up_suggestions():
+def render_follow_up_suggestions(container=None):
     """Render follow-up question suggestions."""
     
     context = st.session_state.get("chat_context", "default")
@@ -355,17 +753,17 @@ def render_follow_up_suggestions():
         for col, suggestion in zip(cols, suggestions):
             with col:
                 if st.button(suggestion, key=f"followup_{suggestion}", use_container_width=True):
-                    process_user_message(suggestion)
+                    process_user_message(suggestion, container)
                     st.rerun()
 
 
-def render_chat_input():
+def render_chat_input(container=None):
     """Render chat input."""
     
     user_input = st.chat_input("Ketik pertanyaan Anda di sini...")
     
     if user_input:
-        process_user_message(user_input)
+        process_user_message(user_input, container)
         st.rerun()
 
 
@@ -392,19 +790,79 @@ def render_chat_features():
                 st.info("Bagikan chat ini")
 
 
+def is_ai_model_ready() -> bool:
+    """Whether the background embedding warmup has finished."""
+    try:
+        from services.ai.warmup import get_warmup_stats
+        # Warmup disabled or failed: RAG loads the model on demand
+        return get_warmup_stats()["state"] != "loading"
+    except ImportError:
+        return True
+
+
+def is_knowledge_indexed() -> bool:
+    """
+    Whether background knowledge indexing has finished.
+    
+    A first run or a model change rebuilds the index from empty, so RAG
+    answers wait for it instead of retrieving from a half-built store.
+    """
+    try:
+        from services.ai.warmup import get_background_tasks
+        task = get_background_tasks().get("knowledge-indexing")
+    except ImportError:
+        return True
+    return task is None or task["state"] != "running"
+
+
+def get_hedge_stats() -> Optional[Dict[str, Any]]:
+    """Hedging stats of the RAG chat service (None when hedging is off)."""
+    try:
+        rag = get_rag_service()
+    except Exception:
+        return None
+    hedge_stats = getattr(rag.chat_service, "get_hedge_stats", None) if rag is not None else None
+    if hedge_stats is None:
+        return None
+    stats = hedge_stats()
+    return stats if stats["enabled"] else None
+
+
 def render_ai_status():
     """Render AI status indicator."""
     
     col1, col2, col3 = st.columns([2, 2, 1])
     
     with col1:
-        st.caption("🟢 AI Assistant Aktif")
+        if is_ai_model_ready():
+            hedge = get_hedge_stats()
+            help_text = None
+            if hedge and hedge["requests"]:
+                wins = ", ".join(f"{name} {count}" for name, count in hedge["wins"].items()) or "-"
+                help_text = (
+                    f"Hedging LLM: {hedge['hedged']}/{hedge['requests']} ({hedge['hedge_rate']:.0%}), "
+                    f"batas {hedge['hedge_delay_ms']:.0f}ms, menang: {wins}"
+                )
+            st.caption("🟢 AI Assistant Aktif", help=help_text)
+        else:
+            st.caption("🟡 Memuat model AI...")
     
     with col2:
         st.caption(f"💬 {len(st.session_state.chat_messages)} pesan")
     
     with col3:
-        st.caption("⚡ Fast Mode")
+        router = get_intent_router()
+        stats = router.get_stats() if router is not None else None
+        if stats and stats["routed"]:
+            st.caption(
+                f"⚡ {stats['llm_free_ratio']:.0%} instan",
+                help=(
+                    f"Dijawab dari FAQ tanpa LLM: {stats['keyword'] + stats['semantic']}"
+                    f"/{stats['routed']} (p50 {stats['route_latency']['p50_ms']:.2f}ms)"
+                ),
+            )
+        else:
+            st.caption("⚡ Fast Mode")
 
 
 # =============================================================================
@@ -446,13 +904,13 @@ def render_chat_page():
         render_chat_messages()
     
     # Follow-up suggestions
-    render_follow_up_suggestions()
+    render_follow_up_suggestions(chat_container)
     
     # Additional features
     render_chat_features()
     
     # Chat input
-    render_chat_input()
+    render_chat_input(chat_container)
     
     # Footer
     st.divider()